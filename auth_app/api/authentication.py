@@ -22,3 +22,15 @@ class CookieJWTAuthentication(JWTAuthentication):
             raise exceptions.AuthenticationFailed("Invalid or expired access token.")
 
         return (user, validated_token)
+
+
+def authenticate_request(request):
+    """Return the user authenticated by JWT cookie or header, or None.
+
+    For plain (async) Django views, which do not run DRF's authentication.
+    """
+    try:
+        result = CookieJWTAuthentication().authenticate(request)
+    except exceptions.AuthenticationFailed:
+        return None
+    return result[0] if result else None
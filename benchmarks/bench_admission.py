@@ -0,0 +1,149 @@
+"""
+Benchmark: pipeline latency under overload with and without admission control.
+
+Requests arrive at a fixed rate (``--rate`` per second for ``--duration``
+seconds, open loop: arrivals do not wait for earlier requests) and call
+``pipeline.build_quiz`` as the create view does. The pipeline is the stub
+backend plus ``--work`` seconds of injected CPU work holding the GIL
+(``CpuBoundStubBackend`` in ``benchmarks/fakes.py``), so a process
+completes at most ``1 / --work`` quizzes per second and a rate above
+that is overload. Each variant runs in a fresh process:
+- unlimited: every request starts its run at once (the default); the runs
+  share the CPU and all of them slow down as the backlog grows.
+- limited: QUIZLY_PIPELINE_CONCURRENCY=``--concurrency`` with a wait
+  queue of ``--queue-size``; excess requests are rejected right away with
+  429 (PipelineOverloadedError) and a Retry-After.
+
+Reported per variant: admitted and rejected requests, latency percentiles
+of the admitted requests, the latency of rejections and the mean
+Retry-After.
+
+Usage:
+    python benchmarks/bench_admission.py --rate 10 --duration 6 --work 0.2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+VARIANTS = ("unlimited", "limited")
+
+
+def run_variant(variant: str, args) -> dict:
+    """Offer the load to this process and return the outcomes."""
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-length")
+    os.environ["QUIZLY_PIPELINE_WARMUP"] = "false"
+
+    import django
+
+    django.setup()
+
+    from django.test import override_settings
+
+    from quizzes_app.services.error import PipelineOverloadedError
+    from quizzes_app.services.pipeline import build_quiz, get_backend
+
+    overrides = {
+        "QUIZLY_PIPELINE_BACKENDS": {"cpu_stub": "benchmarks.fakes.CpuBoundStubBackend"},
+        "QUIZLY_PIPELINE_MODE": "cpu_stub",
+        "QUIZLY_PIPELINE_CONCURRENCY": args.concurrency if variant == "limited" else 0,
+        "QUIZLY_PIPELINE_HOST_CONCURRENCY": 0,
+        "QUIZLY_PIPELINE_QUEUE_SIZE": args.queue_size,
+        "QUIZLY_PIPELINE_QUEUE_TIMEOUT": args.queue_timeout,
+        "BENCH_CPU_WORK": args.work,
+    }
+    admitted, rejected, waits = [], [], []
+    lock = threading.Lock()
+
+    def request(i: int) -> None:
+        start = time.perf_counter()
+        try:
+            build_quiz(f"https://www.youtube.com/watch?v=load{i:07d}")
+        except PipelineOverloadedError as e:
+            with lock:
+                rejected.append(time.perf_counter() - start)
+                waits.append(e.wait)
+        else:
+            with lock:
+                admitted.append(time.perf_counter() - start)
+
+    with override_settings(**overrides):
+        get_backend()  # Calibrates the CPU work outside the measurement.
+        threads = []
+        begin = time.perf_counter()
+        for i in range(int(args.rate * args.duration)):
+            delay = begin + i / args.rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            thread = threading.Thread(target=request, args=(i,))
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - begin
+
+    return {
+        "admitted": sorted(admitted),
+        "rejected": sorted(rejected),
+        "retry_after": statistics.mean(waits) if waits else None,
+        "wall": wall,
+    }
+
+
+def _ms(values: list, q: float) -> str:
+    if not values:
+        return "-"
+    from benchmarks.bench_suite import percentile
+
+    return f"{percentile(values, q) * 1000:.0f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rate", type=float, default=10, help="Arriving requests per second.")
+    parser.add_argument("--duration", type=float, default=6, help="Seconds of arrivals.")
+    parser.add_argument("--work", type=float, default=0.2, help="CPU seconds per pipeline run.")
+    parser.add_argument("--concurrency", type=int, default=1, help="Pipeline slots of the limited variant.")
+    parser.add_argument("--queue-size", type=int, default=4, help="Wait queue of the limited variant.")
+    parser.add_argument("--queue-timeout", type=float, default=30, help="Longest wait for a slot.")
+    parser.add_argument("--worker", choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_variant(args.worker, args)))
+        return
+
+    sys.path.insert(0, str(ROOT))
+    print(
+        f"{'variant':<10} {'admitted':>8} {'rejected':>8} {'p50_ms':>7} {'p95_ms':>7} {'max_ms':>7} "
+        f"{'reject_ms':>9} {'retry_s':>7} {'wall_s':>6}"
+    )
+    forwarded = [
+        f"--{name.replace('_', '-')}={getattr(args, name)}"
+        for name in ("rate", "duration", "work", "concurrency", "queue_size", "queue_timeout")
+    ]
+    for variant in VARIANTS:
+        output = subprocess.run(
+            [sys.executable, __file__, "--worker", variant, *forwarded],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        retry = f"{result['retry_after']:.1f}" if result["retry_after"] is not None else "-"
+        print(
+            f"{variant:<10} {len(result['admitted']):>8} {len(result['rejected']):>8} "
+            f"{_ms(result['admitted'], 50):>7} {_ms(result['admitted'], 95):>7} {_ms(result['admitted'], 100):>7} "
+            f"{_ms(result['rejected'], 50):>9} {retry:>7} {result['wall']:>6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
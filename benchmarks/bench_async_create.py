@@ -0,0 +1,229 @@
+"""
+Benchmark: concurrent quiz creations with the sync and the async create view.
+
+Sends ``--requests`` ``POST /api/createQuiz/`` requests, arriving evenly
+over ``--ramp`` seconds, to the project's ASGI application (``core.asgi``)
+in-process, using the stub pipeline with ``--latency`` seconds of injected
+latency (QUIZLY_STUB_LATENCY) to stand in for download, Whisper and Gemini.
+Each view runs in its own subprocess (the URLconf picks the view from
+QUIZLY_ASYNC_VIEWS at import) against a temporary SQLite database.
+
+As a baseline, the sync view is also served the way it is deployed
+without ASGI: by a WSGI server with a bounded thread pool
+(``--wsgi-threads``, like ``gunicorn --threads``), where requests beyond
+the pool size queue until a thread is free.
+
+Reported per run: wall-clock time, request latency percentiles and the
+peak number of threads in the server process. Note that Django's ASGI
+handler gives every request its own short-lived thread for sync
+middleware and ORM calls, so under ASGI the thread count follows the
+number of in-flight requests for both views; the async view does not
+block those threads while the pipeline runs.
+
+Usage:
+    python benchmarks/bench_async_create.py --requests 200 --latency 2 --ramp 2 --wsgi-threads 32
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+VIDEO_URL = "https://www.youtube.com/watch?v=abcdefghijk"
+MODES = ("sync-wsgi", "sync-asgi", "async")
+
+
+def setup_django(db_path: str):
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-length")
+
+    import django
+    from django.conf import settings
+
+    django.setup()
+    # Concurrent writers: WAL and IMMEDIATE transactions avoid lock-upgrade
+    # retries, so SQLite does not dominate the measured latency.
+    settings.DATABASES["default"]["NAME"] = db_path
+    settings.DATABASES["default"]["OPTIONS"] = {
+        "timeout": 60,
+        "transaction_mode": "IMMEDIATE",
+        "init_command": "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;",
+    }
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+
+async def post(application, token: str) -> tuple:
+    """Send one ASGI request; return (status code, seconds)."""
+    body = json.dumps({"url": VIDEO_URL}).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/createQuiz/",
+        "raw_path": b"/api/createQuiz/",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"cookie", f"access_token={token}".encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    status = None
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.Event().wait()  # Never disconnects.
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    start = time.perf_counter()
+    await application(scope, receive, send)
+    return status, time.perf_counter() - start
+
+
+async def run_asgi_load(application, token: str, requests: int, ramp: float) -> dict:
+    peak_threads = threading.active_count()
+    stop = asyncio.Event()
+
+    async def sample_threads():
+        nonlocal peak_threads
+        while not stop.is_set():
+            peak_threads = max(peak_threads, threading.active_count())
+            await asyncio.sleep(0.05)
+
+    sampler = asyncio.create_task(sample_threads())
+    start = time.perf_counter()
+
+    async def arrive(index):
+        await asyncio.sleep(ramp * index / requests)
+        return await post(application, token)
+
+    results = await asyncio.gather(*[arrive(i) for i in range(requests)])
+    wall = time.perf_counter() - start
+    stop.set()
+    await sampler
+
+    latencies = sorted(seconds for _status, seconds in results)
+    return {
+        "ok": sum(1 for status, _seconds in results if status == 201),
+        "wall": wall,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(0.95 * (len(latencies) - 1))],
+        "peak_threads": peak_threads,
+    }
+
+
+def run_wsgi_load(token: str, requests: int, ramp: float, threads: int) -> dict:
+    from django.test import Client
+
+    def post_wsgi(index):
+        submitted = start + ramp * index / requests
+        client = Client()
+        client.cookies["access_token"] = token
+        response = client.post("/api/createQuiz/", {"url": VIDEO_URL}, content_type="application/json")
+        # Latency from arrival: includes the wait for a free thread.
+        return response.status_code, time.perf_counter() - submitted
+
+    peak_threads = threading.active_count()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = []
+        for i in range(requests):
+            time.sleep(max(0.0, start + ramp * i / requests - time.perf_counter()))
+            futures.append(pool.submit(post_wsgi, i))
+        while not all(future.done() for future in futures):
+            peak_threads = max(peak_threads, threading.active_count())
+            time.sleep(0.05)
+    wall = time.perf_counter() - start
+
+    results = [future.result() for future in futures]
+    latencies = sorted(seconds for _status, seconds in results)
+    return {
+        "ok": sum(1 for status, _seconds in results if status == 201),
+        "wall": wall,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(0.95 * (len(latencies) - 1))],
+        "peak_threads": peak_threads,
+    }
+
+
+def run_view(mode: str, requests: int, latency: float, ramp: float, wsgi_threads: int) -> dict:
+    """Run the load test in this process with the view selected by the environment."""
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, "bench.sqlite3"))
+
+        from django.contrib.auth.models import User
+        from django.test import override_settings
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from core.asgi import application
+
+        user = User.objects.create_user(username="bench", password="bench-password")
+        token = str(AccessToken.for_user(user))
+        with override_settings(ALLOWED_HOSTS=["testserver"], QUIZLY_PIPELINE_MODE="stub"):
+            asyncio.run(post(application, token))  # Warm-up: imports and DB connection.
+            with override_settings(QUIZLY_STUB_LATENCY=latency):
+                if mode == "sync-wsgi":
+                    return run_wsgi_load(token, requests, ramp, wsgi_threads)
+                return asyncio.run(run_asgi_load(application, token, requests, ramp))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per run.")
+    parser.add_argument("--latency", type=float, default=2.0, help="Injected pipeline latency (s).")
+    parser.add_argument("--ramp", type=float, default=2.0, help="Seconds over which requests arrive.")
+    parser.add_argument("--wsgi-threads", type=int, default=32, help="Threads of the WSGI baseline.")
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_view(args.worker, args.requests, args.latency, args.ramp, args.wsgi_threads)))
+        return
+
+    print(
+        f"{args.requests} requests arriving within {args.ramp:.1f}s, "
+        f"{args.latency:.1f}s stub latency"
+    )
+    print(f"{'mode':<10} {'ok':>6} {'wall_s':>8} {'p50_s':>8} {'p95_s':>8} {'req/s':>8} {'threads':>8}")
+    for mode in MODES:
+        env = {**os.environ, "QUIZLY_ASYNC_VIEWS": "true" if mode == "async" else "false"}
+        output = subprocess.run(
+            [sys.executable, __file__, "--worker", mode,
+             "--requests", str(args.requests), "--latency", str(args.latency),
+             "--ramp", str(args.ramp), "--wsgi-threads", str(args.wsgi_threads)],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{mode:<10} {result['ok']:>6} {result['wall']:>8.2f} {result['p50']:>8.2f} "
+            f"{result['p95']:>8.2f} {args.requests / result['wall']:>8.1f} {result['peak_threads']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: bytes on disk and transcription time per audio download profile.
+
+For each local sample file, the output of every profile in
+``AUDIO_PROFILES`` is reproduced with ffmpeg (the same conversion the
+yt-dlp post-processor performs) and then transcribed with the warm
+Whisper model used by ``transcribe_audio``:
+
+- best:    the sample as published (no conversion).
+- compact: a ~48 kbps Opus stream, like the smallest YouTube audio format.
+- speech:  the compact stream converted to 16 kHz mono FLAC.
+
+Usage:
+    python benchmarks/bench_audio_profiles.py samples/*.webm --model base
+
+Requires ffmpeg on PATH.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test import override_settings  # noqa: E402
+
+from quizzes_app.services.quiz_pipeline_prod import transcribe_audio  # noqa: E402
+from quizzes_app.services.whisper_models import preload_models  # noqa: E402
+
+
+def ffmpeg(*args) -> None:
+    subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", *args],
+        check=True,
+    )
+
+
+def build_variants(sample: Path, workdir: Path) -> dict:
+    """Return {profile: path} for one sample file."""
+    best = workdir / f"best{sample.suffix}"
+    shutil.copyfile(sample, best)
+
+    compact = workdir / "compact.opus"
+    ffmpeg("-i", str(sample), "-vn", "-c:a", "libopus", "-b:a", "48k", str(compact))
+
+    speech = workdir / "speech.flac"
+    ffmpeg("-i", str(compact), "-vn", "-ar", "16000", "-ac", "1", str(speech))
+
+    return {"best": best, "compact": compact, "speech": speech}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("samples", nargs="+", help="Local audio/video sample files.")
+    parser.add_argument("--model", default="base", help="Whisper model name.")
+    args = parser.parse_args()
+
+    if shutil.which("ffmpeg") is None:
+        parser.error("ffmpeg is required for this benchmark")
+
+    with override_settings(QUIZLY_WHISPER_MODEL=args.model):
+        preload_models([args.model])
+
+        print(f"{'sample':<30} {'profile':<8} {'bytes':>12} {'transcribe_s':>13}")
+        totals = {}
+        for sample in map(Path, args.samples):
+            with tempfile.TemporaryDirectory(prefix="quizly_bench_") as tmp:
+                for profile, path in build_variants(sample, Path(tmp)).items():
+                    size = path.stat().st_size
+                    start = time.perf_counter()
+                    transcribe_audio(str(path))
+                    elapsed = time.perf_counter() - start
+
+                    total = totals.setdefault(profile, [0, 0.0])
+                    total[0] += size
+                    total[1] += elapsed
+                    print(f"{sample.name[:30]:<30} {profile:<8} {size:>12} {elapsed:>13.2f}")
+
+        print()
+        for profile, (size, elapsed) in totals.items():
+            print(f"{'TOTAL':<30} {profile:<8} {size:>12} {elapsed:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: process startup time and memory of a web worker.
+
+Starts fresh Python processes that set up Django, load the URLconf and
+answer one authenticated ``GET /api/quizzes/`` (what a CRUD-only worker
+does before serving traffic), and reports per pipeline mode:
+- the time until that first response,
+- the peak RSS of the process,
+- which heavy libraries (torch, whisper, numba, tiktoken, yt_dlp,
+  google.genai) ended up imported.
+
+``eager`` imports the prod pipeline up front, like the views did before
+the pipeline was resolved lazily, as a baseline.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("torch", "whisper", "numba", "tiktoken", "yt_dlp", "google.genai")
+VARIANTS = {
+    # name: (QUIZLY_PIPELINE_MODE, import the prod pipeline up front)
+    "stub": ("stub", False),
+    "prod": ("prod", False),
+    "eager": ("stub", True),
+}
+
+WORKER = """
+import json, os, resource, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import django
+django.setup()
+if {eager!r}:
+    import quizzes_app.services.quiz_pipeline_prod  # noqa
+from django.conf import settings
+from django.core.management import call_command
+settings.DATABASES["default"]["NAME"] = {db!r}
+call_command("migrate", verbosity=0)
+ready = time.perf_counter()
+
+from django.contrib.auth.models import User
+from django.test import Client
+from rest_framework_simplejwt.tokens import AccessToken
+user = User.objects.create_user(username="bench", password="bench-password")
+client = Client()
+client.cookies["access_token"] = str(AccessToken.for_user(user))
+settings.ALLOWED_HOSTS = ["testserver"]
+assert client.get("/api/quizzes/").status_code == 200
+end = time.perf_counter()
+
+print(json.dumps({{
+    "setup_s": ready - start,
+    "first_response_s": end - start,
+    "rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_once(variant: str) -> dict:
+    mode, eager = VARIANTS[variant]
+    with tempfile.TemporaryDirectory() as tmp:
+        code = WORKER.format(
+            root=str(ROOT), eager=eager, db=os.path.join(tmp, "bench.sqlite3"), heavy=HEAVY_MODULES
+        )
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "core.settings",
+            "SECRET_KEY": os.environ.get("SECRET_KEY", "benchmark-secret-key-with-enough-length"),
+            "QUIZLY_PIPELINE_MODE": mode,
+            "QUIZLY_WHISPER_PRELOAD": "",
+        }
+        output = subprocess.run(
+            [sys.executable, "-c", code], env=env, cwd=tmp, check=True, capture_output=True, text=True
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="Processes started per variant.")
+    args = parser.parse_args()
+
+    print(f"{'variant':<8} {'setup_s':>8} {'first_s':>8} {'rss_mib':>8}  heavy modules")
+    for variant in VARIANTS:
+        results = [run_once(variant) for _ in range(args.runs)]
+        print(
+            f"{variant:<8} {statistics.median(r['setup_s'] for r in results):>8.2f} "
+            f"{statistics.median(r['first_response_s'] for r in results):>8.2f} "
+            f"{statistics.median(r['rss_mib'] for r in results):>8.0f}  "
+            f"{', '.join(results[-1]['heavy']) or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""
+Benchmark suite: latency, throughput and memory of the API and the pipeline.
+
+Runs every scenario a fixed number of times against local fakes for
+yt-dlp, Whisper and Gemini (``benchmarks/fakes.py``, replaying recorded
+fixtures) and a temporary SQLite database, so runs are repeatable and
+need neither network access, ffmpeg nor model weights.
+
+Scenarios:
+- api.create/list/retrieve/update/delete: The quiz endpoints through the
+  full middleware and JWT cookie authentication (prod pipeline mode).
+- pipeline.preflight/captions/download/vad/transcribe/generate: The
+  individual pipeline stages.
+- pipeline.build: ``build_quiz_prod`` end to end (Whisper path).
+
+Reported per scenario: p50/p95/p99 latency, requests per second
+(sequential) and the peak Python memory allocated while it runs
+(tracemalloc, measured in a separate pass so it does not distort the
+timings).
+
+Results are stored as JSON in ``benchmarks/results/<commit>.json`` (with
+a ``-dirty`` suffix for uncommitted changes). ``--compare`` prints the
+change against an earlier result, ``--fail-over`` turns p95 regressions
+above a percentage into a non-zero exit status.
+
+Usage:
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --only api.list pipeline.generate --iterations 200
+    python benchmarks/bench_suite.py --compare 0d9ccf8 --fail-over 20
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-length")
+
+SETTINGS = {
+    "ALLOWED_HOSTS": ["testserver"],
+    "QUIZLY_PIPELINE_MODE": "prod",
+    "QUIZLY_ASYNC_JOBS": False,
+    "QUIZLY_USE_CAPTIONS": False,
+    "QUIZLY_VAD_ENABLED": False,
+    "QUIZLY_TRANSCRIBE_WORKERS": 1,
+    "QUIZLY_QUIZ_STRATEGY": "single",
+    "QUIZLY_WHISPER_LANGUAGE": "",
+    "QUIZLY_METRICS_DIR": "",
+}
+
+
+class Scenario:
+    """
+    A benchmarked operation.
+
+    Args:
+        name (str): Scenario name (``<group>.<operation>``).
+        run (callable): The measured operation.
+        prepare (callable, optional): Untimed; returns the arguments of
+            the next ``run`` call.
+        finish (callable, optional): Untimed; called with the result of
+            every ``run`` call (e.g. to delete temp files).
+    """
+
+    def __init__(self, name, run, prepare=None, finish=None):
+        self.name = name
+        self.run = run
+        self.prepare = prepare
+        self.finish = finish
+
+    def call(self) -> float:
+        """Run the operation once and return its duration in seconds."""
+        args = self.prepare() if self.prepare else ()
+        start = time.perf_counter()
+        result = self.run(*args)
+        elapsed = time.perf_counter() - start
+        if self.finish:
+            self.finish(result)
+        return elapsed
+
+
+def setup_django(db_path: str, lock_dir: str):
+    import django
+    from django.conf import settings
+
+    django.setup()
+    settings.DATABASES["default"]["NAME"] = db_path
+    settings.QUIZLY_LOCK_DIR = lock_dir
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """Return the ``q`` percentile (0-100) using the nearest-rank method."""
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def measure(scenario: Scenario, iterations: int, warmup: int, memory_iterations: int) -> dict:
+    for _ in range(warmup):
+        scenario.call()
+
+    gc.collect()
+    timings = [scenario.call() for _ in range(iterations)]
+    timings.sort()
+
+    gc.collect()
+    tracemalloc.start()
+    for _ in range(memory_iterations):
+        scenario.call()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = sum(timings)
+    return {
+        "iterations": iterations,
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p95_ms": percentile(timings, 95) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+        "mean_ms": total / iterations * 1000,
+        "rps": iterations / total if total else 0.0,
+        "peak_kib": peak / 1024,
+    }
+
+
+def build_scenarios(tmp_dir: str) -> list:
+    """Create the benchmark users and data and return all scenarios."""
+    import itertools
+    import shutil
+
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from benchmarks.fakes import load_fixture, load_gemini_fixture, write_wav
+    from quizzes_app.services.audio import load_audio
+    from quizzes_app.services.persist_quiz import persist_quiz
+    from quizzes_app.services.quiz_pipeline_prod import (
+        build_quiz_prod,
+        extract_audio,
+        fetch_captions,
+        generate_quiz,
+        preflight_video,
+        speech_only,
+        transcribe_audio,
+    )
+
+    payload = json.loads(load_gemini_fixture("quiz_valid")["text"])
+    counter = itertools.count()
+
+    def next_url():
+        # A new video ID per call, so no cache or single-flight result is reused.
+        return f"https://www.youtube.com/watch?v=bench{next(counter):06d}"
+
+    def client_for(user):
+        client = Client()
+        client.cookies["access_token"] = str(AccessToken.for_user(user))
+        return client
+
+    def expect(status):
+        def check(response):
+            assert response.status_code == status, (response.status_code, response.content[:200])
+        return check
+
+    # The reader's quizzes never change in number, so list timings stay comparable.
+    reader = User.objects.create_user(username="bench-reader", password="bench-password")
+    writer = User.objects.create_user(username="bench-writer", password="bench-password")
+    quizzes = [persist_quiz(owner=reader, video_url=next_url(), payload=payload) for _ in range(20)]
+    reader_client = client_for(reader)
+    writer_client = client_for(writer)
+    detail = f"/api/quizzes/{quizzes[0].pk}/"
+
+    def create_quiz(url):
+        return writer_client.post("/api/createQuiz/", {"url": url}, content_type="application/json")
+
+    def new_quiz_path():
+        quiz = persist_quiz(owner=writer, video_url=next_url(), payload=payload)
+        return (f"/api/quizzes/{quiz.pk}/",)
+
+    def remove_audio(path):
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+    video_url = next_url()
+    info = preflight_video(video_url)
+    transcript = load_fixture("whisper_result.json")["text"]
+    wav_path = write_wav(os.path.join(tmp_dir, "clip.wav"))
+
+    return [
+        Scenario("api.create", create_quiz, prepare=lambda: (next_url(),), finish=expect(201)),
+        Scenario("api.list", lambda: reader_client.get("/api/quizzes/"), finish=expect(200)),
+        Scenario("api.retrieve", lambda: reader_client.get(detail), finish=expect(200)),
+        Scenario(
+            "api.update",
+            lambda: reader_client.patch(detail, {"title": "Updated"}, content_type="application/json"),
+            finish=expect(200),
+        ),
+        Scenario("api.delete", writer_client.delete, prepare=new_quiz_path, finish=expect(204)),
+        Scenario("pipeline.preflight", preflight_video, prepare=lambda: (next_url(),)),
+        Scenario("pipeline.captions", lambda: fetch_captions(video_url, info=info)),
+        Scenario("pipeline.download", lambda: extract_audio(video_url, info=info), finish=remove_audio),
+        Scenario("pipeline.vad", lambda: speech_only(load_audio(wav_path))),
+        Scenario("pipeline.transcribe", lambda: transcribe_audio(wav_path)),
+        Scenario("pipeline.generate", lambda: generate_quiz(transcript, video_title=info["title"])),
+        Scenario("pipeline.build", build_quiz_prod, prepare=lambda: (next_url(),)),
+    ]
+
+
+def git_revision() -> str:
+    """Return the short commit hash, with ``-dirty`` for uncommitted changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, check=True, capture_output=True, text=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=ROOT, check=True, capture_output=True, text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def resolve_result(ref: str) -> Path:
+    """Return the result file for a path, commit hash or result name."""
+    path = Path(ref)
+    if path.is_file():
+        return path
+    try:
+        ref = subprocess.run(
+            ["git", "rev-parse", "--short", ref], cwd=ROOT, check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return RESULTS_DIR / f"{ref}.json"
+
+
+def print_results(results: dict) -> None:
+    print(f"{'scenario':<20} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9} {'req/s':>9} {'peak_kib':>9}")
+    for name, r in results["scenarios"].items():
+        print(
+            f"{name:<20} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+            f"{r['rps']:>9.1f} {r['peak_kib']:>9.0f}"
+        )
+    print(f"max RSS: {results['max_rss_kib'] / 1024:.0f} MiB")
+
+
+def compare(baseline: dict, results: dict, fail_over: float = None) -> list:
+    """
+    Print the change of every scenario against ``baseline``.
+
+    Returns:
+        list: Names of scenarios whose p95 grew by more than ``fail_over`` percent.
+    """
+    regressions = []
+    print(f"\nagainst {baseline['revision']}:")
+    print(f"{'scenario':<20} {'p50':>9} {'p95':>9} {'req/s':>9} {'peak':>9}")
+    for name, r in results["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            print(f"{name:<20} {'(new)':>9}")
+            continue
+        changes = [
+            _change(base[field], r[field]) for field in ("p50_ms", "p95_ms", "rps", "peak_kib")
+        ]
+        print(f"{name:<20} " + " ".join(f"{change:>+8.1f}%" for change in changes))
+        if fail_over is not None and changes[1] > fail_over:
+            regressions.append(name)
+    return regressions
+
+
+def _change(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=50, help="Timed runs per scenario.")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed runs before timing.")
+    parser.add_argument("--memory-iterations", type=int, default=5, help="Runs under tracemalloc.")
+    parser.add_argument("--only", nargs="+", metavar="SCENARIO", help="Run only these scenarios (or groups).")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<commit>.json).")
+    parser.add_argument("--no-save", action="store_true", help="Do not store the results.")
+    parser.add_argument("--compare", metavar="REF", help="Result file or commit to compare against.")
+    parser.add_argument(
+        "--fail-over", type=float, metavar="PCT", help="Exit with status 1 if a p95 regresses by more than PCT %%."
+    )
+    args = parser.parse_args()
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, "bench.sqlite3"), os.path.join(tmp, "locks"))
+
+        from django.test import override_settings
+
+        from benchmarks.fakes import install_fakes
+
+        with override_settings(**SETTINGS), install_fakes():
+            scenarios = build_scenarios(tmp)
+            if args.only:
+                scenarios = [
+                    s for s in scenarios if s.name in args.only or s.name.split(".")[0] in args.only
+                ]
+            measured = {}
+            for scenario in scenarios:
+                measured[scenario.name] = measure(
+                    scenario, args.iterations, args.warmup, args.memory_iterations
+                )
+
+    results = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"iterations": args.iterations, "warmup": args.warmup},
+        "scenarios": measured,
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+    print_results(results)
+
+    if not args.no_save:
+        output = Path(args.output) if args.output else RESULTS_DIR / f"{results['revision']}.json"
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"results: {output}")
+
+    if args.compare:
+        baseline_path = resolve_result(args.compare)
+        if not baseline_path.is_file():
+            sys.exit(f"no results for {args.compare} ({baseline_path})")
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        regressions = compare(baseline, results, args.fail_over)
+        if regressions:
+            sys.exit(f"p95 regressed by more than {args.fail_over:g}%: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: audio seconds and transcription time with and without VAD trimming.
+
+Each local clip is transcribed twice with the warm Whisper model used by
+``transcribe_audio``: once as-is and once with ``QUIZLY_VAD_ENABLED``, which
+drops silence and quiet breaks before Whisper runs. The VAD time (loading
+and detection) is included in the "vad" wall-clock figure.
+
+Usage:
+    python benchmarks/bench_vad.py samples/*.wav --model base
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test import override_settings  # noqa: E402
+
+from quizzes_app.services import metrics  # noqa: E402
+from quizzes_app.services.audio import SAMPLE_RATE, load_audio  # noqa: E402
+from quizzes_app.services.quiz_pipeline_prod import transcribe_audio  # noqa: E402
+from quizzes_app.services.whisper_models import preload_models  # noqa: E402
+
+
+def timed_transcribe(path: str, vad: bool) -> tuple:
+    """Return (audio seconds given to Whisper, wall-clock seconds)."""
+    metrics.reset()
+    with override_settings(QUIZLY_VAD_ENABLED=vad):
+        start = time.perf_counter()
+        transcribe_audio(path)
+        elapsed = time.perf_counter() - start
+
+    if vad:
+        seconds = metrics.get_counter("transcribe_audio_seconds_total", stage="speech")
+    else:
+        seconds = len(load_audio(path)) / SAMPLE_RATE
+    return seconds, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("samples", nargs="+", help="Local audio/video sample files.")
+    parser.add_argument("--model", default="base", help="Whisper model name.")
+    args = parser.parse_args()
+
+    with override_settings(QUIZLY_WHISPER_MODEL=args.model, QUIZLY_TRANSCRIBE_WORKERS=1):
+        preload_models([args.model])
+
+        print(f"{'sample':<30} {'audio_s':>9} {'speech_s':>9} {'plain_s':>9} {'vad_s':>9} {'speedup':>8}")
+        totals = [0.0, 0.0, 0.0, 0.0]
+        for sample in map(str, args.samples):
+            audio_seconds, plain_elapsed = timed_transcribe(sample, vad=False)
+            speech_seconds, vad_elapsed = timed_transcribe(sample, vad=True)
+
+            for i, value in enumerate((audio_seconds, speech_seconds, plain_elapsed, vad_elapsed)):
+                totals[i] += value
+            print(
+                f"{Path(sample).name[:30]:<30} {audio_seconds:>9.1f} {speech_seconds:>9.1f} "
+                f"{plain_elapsed:>9.2f} {vad_elapsed:>9.2f} {plain_elapsed / vad_elapsed:>7.2f}x"
+            )
+
+        audio_seconds, speech_seconds, plain_elapsed, vad_elapsed = totals
+        print()
+        print(
+            f"{'TOTAL':<30} {audio_seconds:>9.1f} {speech_seconds:>9.1f} "
+            f"{plain_elapsed:>9.2f} {vad_elapsed:>9.2f} {plain_elapsed / vad_elapsed:>7.2f}x"
+        )
+        print(f"Audio seconds removed by VAD: {1 - speech_seconds / audio_seconds:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: first-quiz latency of a fresh process with and without warmup.
+
+Starts a fresh process per variant that builds ``--quizzes`` quizzes
+(prod backend, Whisper path) one after another against the local fakes
+of ``benchmarks/fakes.py``, and compares the first quiz with the median
+of the following ones (steady state):
+- cold: the first request pays for importing the pipeline, loading the
+  tokenizer, creating the Gemini client and loading yt-dlp's extractors.
+- warm: ``pipeline.warmup()`` runs first, as QUIZLY_PIPELINE_WARMUP does
+  in ``pipeline.warmup_process`` at server start.
+
+Installing the fakes imports whisper (and torch), yt-dlp and the Gemini
+SDK in both variants, and the fake Whisper model loads instantly, so the
+cold penalty measured here is a lower bound: with real models, loading
+the Whisper weights adds seconds to the cold first quiz.
+
+Usage:
+    python benchmarks/bench_warmup.py --quizzes 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+VARIANTS = ("cold", "warm")
+
+
+def run_variant(variant: str, quizzes: int) -> dict:
+    """Build the quizzes in this process and return the timings."""
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-length")
+    os.environ["QUIZLY_PIPELINE_WARMUP"] = "false"
+
+    from benchmarks.bench_suite import SETTINGS, setup_django
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, "bench.sqlite3"), os.path.join(tmp, "locks"))
+
+        from django.test import override_settings
+
+        from benchmarks.fakes import install_fakes
+        from quizzes_app.services.pipeline import build_quiz, warmup
+
+        with override_settings(**SETTINGS), install_fakes():
+            steps = []
+            if variant == "warm":
+                steps = [(step, seconds) for step, seconds, _error in warmup()]
+
+            timings = []
+            for i in range(quizzes):
+                start = time.perf_counter()
+                build_quiz(f"https://www.youtube.com/watch?v=warm{variant}{i:03d}")
+                timings.append(time.perf_counter() - start)
+
+    return {"first": timings[0], "steady": statistics.median(timings[1:]), "steps": steps}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quizzes", type=int, default=10, help="Quizzes built per process.")
+    parser.add_argument("--worker", choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_variant(args.worker, args.quizzes)))
+        return
+
+    print(f"{'variant':<8} {'first_ms':>9} {'steady_ms':>10} {'first/steady':>13}")
+    for variant in VARIANTS:
+        output = subprocess.run(
+            [sys.executable, __file__, "--worker", variant, "--quizzes", str(args.quizzes)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{variant:<8} {result['first'] * 1000:>9.1f} {result['steady'] * 1000:>10.1f} "
+            f"{result['first'] / result['steady']:>12.1f}x"
+        )
+        if result["steps"]:
+            print("         warmup: " + ", ".join(f"{step} {seconds:.2f}s" for step, seconds in result["steps"]))
+
+
+if __name__ == "__main__":
+    main()
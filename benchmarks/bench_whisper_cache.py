@@ -0,0 +1,93 @@
+"""
+Benchmark: per-request transcription latency with and without the model cache.
+
+Compares the old behavior (``whisper.load_model`` on every request) with
+``transcribe_audio`` backed by the process-wide model registry, using the
+same fixed local audio clip for every request.
+
+Usage:
+    python benchmarks/bench_whisper_cache.py --audio path/to/clip.wav
+    python benchmarks/bench_whisper_cache.py --model tiny --requests 5
+
+Without ``--audio`` a deterministic 10 second synthetic clip is used,
+so the benchmark runs without ffmpeg or network access to YouTube.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import django  # noqa: E402
+
+django.setup()
+
+import numpy as np  # noqa: E402
+import whisper  # noqa: E402
+from django.test import override_settings  # noqa: E402
+
+from quizzes_app.services.quiz_pipeline_prod import transcribe_audio  # noqa: E402
+from quizzes_app.services.whisper_models import registry  # noqa: E402
+
+
+def synthetic_clip(seconds: float = 10.0) -> np.ndarray:
+    """Return a deterministic 16 kHz mono clip (tone bursts with pauses)."""
+    rate = whisper.audio.SAMPLE_RATE
+    t = np.arange(int(seconds * rate)) / rate
+    envelope = (np.sin(2 * np.pi * 0.5 * t) > 0).astype(np.float32)
+    return (0.2 * np.sin(2 * np.pi * 220 * t) * envelope).astype(np.float32)
+
+
+def run_uncached(model_name: str, audio, requests: int) -> list:
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        model = whisper.load_model(model_name)
+        model.transcribe(audio)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_cached(model_name: str, audio, requests: int) -> list:
+    registry.clear()
+    timings = []
+    with override_settings(QUIZLY_WHISPER_MODEL=model_name):
+        for _ in range(requests):
+            start = time.perf_counter()
+            transcribe_audio(audio)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(label: str, timings: list) -> None:
+    print(
+        f"{label:<10} first={timings[0]:.2f}s "
+        f"median={statistics.median(timings):.2f}s "
+        f"mean_after_first={statistics.mean(timings[1:] or timings):.2f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--audio", help="Path to a local audio clip (requires ffmpeg).")
+    parser.add_argument("--model", default="base", help="Whisper model name.")
+    parser.add_argument("--requests", type=int, default=5, help="Requests per variant.")
+    args = parser.parse_args()
+
+    audio = args.audio or synthetic_clip()
+    # Make sure the weights are on disk so downloads do not skew the numbers.
+    whisper.load_model(args.model)
+
+    print(f"model={args.model} requests={args.requests} audio={args.audio or 'synthetic 10s'}")
+    report("before", run_uncached(args.model, audio, args.requests))
+    report("after", run_cached(args.model, audio, args.requests))
+
+
+if __name__ == "__main__":
+    main()
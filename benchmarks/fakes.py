@@ -0,0 +1,247 @@
+"""
+Local fakes for yt-dlp, Whisper and Gemini, backed by recorded fixtures.
+
+The fakes answer like the real services do, but instantly and always the
+same way, so benchmarks measure Quizly's own code (request handling,
+ORM, audio handling, transcript budgeting, schema validation) and not
+the network or the models.
+
+Recorded data lives in ``benchmarks/fixtures``:
+- youtube_info.json: yt-dlp metadata of a 10 minute video.
+- captions_en.json3: The video's caption track.
+- whisper_result.json: Whisper's result for the video.
+Gemini replays ``quiz_valid`` from the test fixtures (``quizzes_app/tests/fixtures``).
+
+Includes:
+- FakeYoutubeDL: Stand-in for ``yt_dlp.YoutubeDL``.
+- FakeWhisperModel: Stand-in for a loaded Whisper model.
+- FakeGeminiClient: Stand-in for ``genai.Client``.
+- CpuBoundStubBackend: Stub pipeline backend with injected CPU work.
+- write_wav: Write a deterministic 16 kHz mono WAV file.
+- install_fakes: Context manager that patches all three services.
+"""
+
+import copy
+import io
+import json
+import os
+import time
+import wave
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+from quizzes_app.services import metrics
+from quizzes_app.services.pipeline_backends import StubBackend
+from quizzes_app.services.quiz_pipeline_stub import build_quiz_stub
+from quizzes_app.services.youtube import video_id_from_url
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+GEMINI_FIXTURES_DIR = Path(__file__).resolve().parent.parent / "quizzes_app" / "tests" / "fixtures" / "gemini"
+RECORDED_VIDEO_ID = "abcdefghijk"
+AUDIO_SECONDS = 60
+SAMPLE_RATE = 16000
+
+
+def load_fixture(name: str):
+    """Return the fixture ``name`` (parsed JSON)."""
+    with open(FIXTURES_DIR / name, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_gemini_fixture(name: str) -> dict:
+    """Return the recorded Gemini response ``name`` from the test fixtures."""
+    with open(GEMINI_FIXTURES_DIR / f"{name}.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_wav(path: str, seconds: float = AUDIO_SECONDS) -> str:
+    """
+    Write a deterministic 16 kHz mono 16-bit WAV file (speech-like bursts).
+
+    Returns:
+        str: ``path``.
+    """
+    with open(path, "wb") as f:
+        f.write(_wav_bytes(seconds))
+    return path
+
+
+@lru_cache(maxsize=None)
+def _wav_bytes(seconds: float) -> bytes:
+    # Synthesized once, so "downloads" only cost the file write.
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = (np.sin(2 * np.pi * 0.4 * t) > -0.3).astype(np.float32)
+    samples = 0.3 * np.sin(2 * np.pi * 180 * t) * envelope
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes((samples * 32767).astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+class FakeYoutubeDL:
+    """
+    Replays the recorded metadata for every video and "downloads" a WAV file.
+
+    The recorded video ID is replaced by the requested one, so every
+    video looks distinct to the transcript cache and single-flight locks.
+    """
+
+    _info = None
+    _captions = None
+
+    def __init__(self, params=None):
+        self.params = params or {}
+        if FakeYoutubeDL._info is None:
+            FakeYoutubeDL._info = load_fixture("youtube_info.json")["info"]
+            FakeYoutubeDL._captions = (FIXTURES_DIR / "captions_en.json3").read_bytes()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def extract_info(self, url, download=True, process=True):
+        info = self._info_for(video_id_from_url(url) or RECORDED_VIDEO_ID)
+        if download:
+            return self.process_ie_result(info, download=True)
+        return info
+
+    def process_ie_result(self, info, download=True):
+        info = copy.deepcopy(info)
+        if download:
+            path = self.prepare_filename({**info, "ext": "wav"})
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            write_wav(path)
+            size = os.path.getsize(path)
+            for hook in self.params.get("progress_hooks", []):
+                hook({"status": "downloading", "downloaded_bytes": size // 2, "total_bytes": size})
+                hook({"status": "finished", "downloaded_bytes": size, "total_bytes": size})
+            info["requested_downloads"] = [{"filepath": path}]
+        return info
+
+    def prepare_filename(self, info):
+        template = self.params.get("outtmpl", "%(id)s.%(ext)s")
+        return template % {"id": info.get("id"), "ext": info.get("ext", "webm")}
+
+    def get_info_extractor(self, ie_key):
+        return None
+
+    def urlopen(self, url):
+        return io.BytesIO(self._captions)
+
+    def _info_for(self, video_id: str) -> dict:
+        text = json.dumps(self._info).replace(RECORDED_VIDEO_ID, video_id)
+        return json.loads(text)
+
+
+class FakeWhisperModel:
+    """Returns the recorded Whisper result for any audio."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.result = load_fixture("whisper_result.json")
+
+    @classmethod
+    def load(cls, name, *args, **kwargs):
+        return cls(name)
+
+    def transcribe(self, audio, **options):
+        return {
+            "text": self.result["text"],
+            "segments": copy.deepcopy(self.result["segments"]),
+            "language": self.result["language"],
+        }
+
+
+class RecordedResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGeminiClient:
+    """Answers every request with the recorded response ``name``."""
+
+    def __init__(self, name: str = "quiz_valid"):
+        self.text = load_gemini_fixture(name)["text"]
+        self.models = self
+        self.requests = 0
+
+    def __call__(self, **kwargs):
+        # Used as the patched genai.Client constructor.
+        return self
+
+    def generate_content(self, model, contents, config=None):
+        self.requests += 1
+        return RecordedResponse(self.text)
+
+
+class CpuBoundStubBackend(StubBackend):
+    """
+    The stub pipeline plus BENCH_CPU_WORK seconds of CPU work per quiz.
+
+    The work is a pure-Python loop that holds the GIL, like the parts of
+    transcription and payload handling that do, so concurrent runs in a
+    process share one core. It is recorded as the ``generate`` stage.
+    """
+
+    name = "cpu_stub"
+
+    def __init__(self):
+        self.spins_per_second = _calibrate_spin()
+
+    def build(self, video_url: str, progress=None) -> dict:
+        from django.conf import settings
+
+        with metrics.timed("pipeline_stage_seconds", stage="generate"):
+            _spin(int(self.spins_per_second * getattr(settings, "BENCH_CPU_WORK", 0.1)))
+            return build_quiz_stub(video_url, progress=progress, latency=0)
+
+
+def _spin(iterations: int) -> int:
+    total = 0
+    for i in range(iterations):
+        total += i & 7
+    return total
+
+
+def _calibrate_spin() -> float:
+    """Return the iterations of ``_spin`` per second on this machine."""
+    iterations = 500_000
+    start = time.perf_counter()
+    _spin(iterations)
+    return iterations / (time.perf_counter() - start)
+
+
+@contextmanager
+def install_fakes():
+    """
+    Patch yt-dlp, Whisper and Gemini with the local fakes.
+
+    The libraries are patched, not the pipeline modules, so installing
+    the fakes does not import the pipeline itself.
+
+    Yields:
+        FakeGeminiClient: The installed Gemini fake.
+    """
+    from quizzes_app.services import llm_client
+    from quizzes_app.services.whisper_models import registry
+
+    gemini = FakeGeminiClient()
+    _wav_bytes(AUDIO_SECONDS)  # Not part of any measured download.
+    with ExitStack() as stack:
+        stack.enter_context(patch("yt_dlp.YoutubeDL", FakeYoutubeDL))
+        stack.enter_context(patch("whisper.load_model", FakeWhisperModel.load))
+        stack.enter_context(patch("google.genai.Client", gemini))
+        llm_client.reset_client()
+        registry.clear()
+        stack.callback(registry.clear)
+        stack.callback(llm_client.reset_client)
+        yield gemini
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_asgi_application()
+
+# Only server processes warm up (QUIZLY_PIPELINE_WARMUP), not management commands.
+from quizzes_app.services.pipeline import warmup_process  # noqa: E402
+
+warmup_process()
@@ -30,6 +30,130 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 QUIZLY_PIPELINE_MODE = os.getenv("QUIZLY_PIPELINE_MODE", "stub")
 
+# Pipeline backends (QUIZLY_PIPELINE_MODE selects one by name)
+QUIZLY_PIPELINE_BACKENDS = {
+    "stub": "quizzes_app.services.pipeline_backends.StubBackend",
+    "prod": "quizzes_app.services.pipeline_backends.ProdBackend",
+    "captions": "quizzes_app.services.pipeline_backends.CaptionsBackend",
+    "replay": "quizzes_app.services.pipeline_backends.ReplayBackend",
+}
+QUIZLY_PIPELINE_WARMUP = os.getenv("QUIZLY_PIPELINE_WARMUP", "false").lower() in ("1", "true", "yes")  # warm up server and job worker processes at start
+QUIZLY_REPLAY_DIR = os.getenv("QUIZLY_REPLAY_DIR", "")  # recorded payloads of the replay backend
+
+# Gemini client (shared per process; retries with jittered exponential backoff)
+QUIZLY_GEMINI_MODEL = os.getenv("QUIZLY_GEMINI_MODEL", "gemini-2.5-flash")
+QUIZLY_GEMINI_TIMEOUT = float(os.getenv("QUIZLY_GEMINI_TIMEOUT", "120"))
+QUIZLY_GEMINI_MAX_ATTEMPTS = int(os.getenv("QUIZLY_GEMINI_MAX_ATTEMPTS", "4"))
+QUIZLY_GEMINI_BACKOFF_BASE = float(os.getenv("QUIZLY_GEMINI_BACKOFF_BASE", "1.0"))
+QUIZLY_GEMINI_BACKOFF_MAX = float(os.getenv("QUIZLY_GEMINI_BACKOFF_MAX", "30"))
+QUIZLY_QUIZ_REPAIR_ATTEMPTS = int(os.getenv("QUIZLY_QUIZ_REPAIR_ATTEMPTS", "2"))  # rounds re-requesting only invalid questions
+
+# Transcript token budget for the quiz prompt (longer transcripts are reduced to representative segments)
+QUIZLY_TRANSCRIPT_TOKEN_BUDGET = int(os.getenv("QUIZLY_TRANSCRIPT_TOKEN_BUDGET", "12000"))
+QUIZLY_TRANSCRIPT_SEGMENT_TOKENS = int(os.getenv("QUIZLY_TRANSCRIPT_SEGMENT_TOKENS", "300"))
+QUIZLY_TOKEN_ENCODING = os.getenv("QUIZLY_TOKEN_ENCODING", "cl100k_base")
+
+# Quiz generation strategy: "single" (one Gemini call), "map_reduce" or "auto" (map-reduce for long transcripts)
+QUIZLY_QUIZ_STRATEGY = os.getenv("QUIZLY_QUIZ_STRATEGY", "single")
+QUIZLY_MAP_REDUCE_MIN_TOKENS = int(os.getenv("QUIZLY_MAP_REDUCE_MIN_TOKENS", "12000"))
+QUIZLY_MAP_REDUCE_SECTION_TOKENS = int(os.getenv("QUIZLY_MAP_REDUCE_SECTION_TOKENS", "4000"))
+QUIZLY_MAP_REDUCE_MAX_SECTIONS = int(os.getenv("QUIZLY_MAP_REDUCE_MAX_SECTIONS", "8"))
+QUIZLY_MAP_REDUCE_CONCURRENCY = int(os.getenv("QUIZLY_MAP_REDUCE_CONCURRENCY", "4"))
+
+# Whisper model cache (one loaded model per size and worker process)
+QUIZLY_WHISPER_MODEL = os.getenv("QUIZLY_WHISPER_MODEL", "base")
+QUIZLY_WHISPER_PRELOAD = [
+    name.strip()
+    for name in os.getenv("QUIZLY_WHISPER_PRELOAD", "").split(",")
+    if name.strip()
+]
+QUIZLY_WHISPER_MAX_MEMORY_MB = int(os.getenv("QUIZLY_WHISPER_MAX_MEMORY_MB", "2048"))
+QUIZLY_WHISPER_IDLE_TIMEOUT = int(os.getenv("QUIZLY_WHISPER_IDLE_TIMEOUT", "3600"))
+QUIZLY_WHISPER_LANGUAGE = os.getenv("QUIZLY_WHISPER_LANGUAGE", "")  # empty = auto-detect
+
+# Chunked parallel transcription (1 = single sequential pass, 0 = one process per CPU core)
+QUIZLY_TRANSCRIBE_WORKERS = int(os.getenv("QUIZLY_TRANSCRIBE_WORKERS", "1"))
+QUIZLY_TRANSCRIBE_MIN_PARALLEL_SECONDS = int(os.getenv("QUIZLY_TRANSCRIBE_MIN_PARALLEL_SECONDS", "300"))
+QUIZLY_TRANSCRIBE_CHUNK_SECONDS = int(os.getenv("QUIZLY_TRANSCRIBE_CHUNK_SECONDS", "120"))
+QUIZLY_TRANSCRIBE_CHUNK_OVERLAP = float(os.getenv("QUIZLY_TRANSCRIBE_CHUNK_OVERLAP", "1.0"))
+
+# Energy-based voice activity detection before Whisper (drops silence / quiet breaks)
+QUIZLY_VAD_ENABLED = os.getenv("QUIZLY_VAD_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Transcript cache keyed by (video id, Whisper model, language)
+QUIZLY_TRANSCRIPT_CACHE_TTL = int(os.getenv("QUIZLY_TRANSCRIPT_CACHE_TTL", str(30 * 24 * 3600)))
+QUIZLY_TRANSCRIPT_CACHE_MAX_MB = int(os.getenv("QUIZLY_TRANSCRIPT_CACHE_MAX_MB", "256"))
+
+# Metadata preflight limits (checked before any audio is downloaded)
+QUIZLY_MAX_VIDEO_DURATION = int(os.getenv("QUIZLY_MAX_VIDEO_DURATION", "7200"))  # seconds, 0 = no limit
+QUIZLY_ALLOW_AGE_RESTRICTED = os.getenv("QUIZLY_ALLOW_AGE_RESTRICTED", "false").lower() in ("1", "true", "yes")
+
+# Negative cache: seconds a rejected video is rejected without asking YouTube again (0 = not cached)
+QUIZLY_NEGATIVE_CACHE_TTLS = {
+    "unavailable": int(os.getenv("QUIZLY_NEGATIVE_CACHE_TTL_UNAVAILABLE", "600")),
+    "live": int(os.getenv("QUIZLY_NEGATIVE_CACHE_TTL_LIVE", "300")),
+    "age_restricted": int(os.getenv("QUIZLY_NEGATIVE_CACHE_TTL_AGE_RESTRICTED", "86400")),
+    "too_long": int(os.getenv("QUIZLY_NEGATIVE_CACHE_TTL_TOO_LONG", "86400")),
+}
+
+# yt-dlp download profile: "speech" (16 kHz mono FLAC), "compact" or "best"
+QUIZLY_AUDIO_PROFILE = os.getenv("QUIZLY_AUDIO_PROFILE", "speech")
+
+# Download workspaces (one directory per run, removed afterwards; may be a tmpfs such as /dev/shm/quizly)
+QUIZLY_WORKSPACE_DIR = os.getenv("QUIZLY_WORKSPACE_DIR", "")  # empty = <system temp dir>/quizly_workspaces
+QUIZLY_WORKSPACE_QUOTA_MB = float(os.getenv("QUIZLY_WORKSPACE_QUOTA_MB", "0"))  # all workspaces, 0 = unlimited
+QUIZLY_WORKSPACE_WAIT = float(os.getenv("QUIZLY_WORKSPACE_WAIT", "60"))
+QUIZLY_WORKSPACE_MAX_AGE = float(os.getenv("QUIZLY_WORKSPACE_MAX_AGE", "21600"))  # 0 = only dead processes
+QUIZLY_WORKSPACE_SWEEP_INTERVAL = float(os.getenv("QUIZLY_WORKSPACE_SWEEP_INTERVAL", "600"))  # 0 = no sweeper
+
+# Use YouTube captions as transcript before falling back to Whisper
+QUIZLY_USE_CAPTIONS = os.getenv("QUIZLY_USE_CAPTIONS", "true").lower() in ("1", "true", "yes")
+QUIZLY_CAPTIONS_ALLOW_AUTO = os.getenv("QUIZLY_CAPTIONS_ALLOW_AUTO", "true").lower() in ("1", "true", "yes")
+
+# Single-flight coalescing of concurrent pipeline runs for the same video
+QUIZLY_LOCK_DIR = os.getenv("QUIZLY_LOCK_DIR", "")  # empty = <system temp dir>/quizly_locks
+QUIZLY_SINGLE_FLIGHT_RESULT_TTL = int(os.getenv("QUIZLY_SINGLE_FLIGHT_RESULT_TTL", "60"))
+QUIZLY_SINGLE_FLIGHT_LOCK_TIMEOUT = int(os.getenv("QUIZLY_SINGLE_FLIGHT_LOCK_TIMEOUT", "1800"))
+
+# Admission control: concurrent pipeline runs (0 = unlimited) and the bounded wait queue
+QUIZLY_PIPELINE_CONCURRENCY = int(os.getenv("QUIZLY_PIPELINE_CONCURRENCY", "0"))  # per process
+QUIZLY_PIPELINE_HOST_CONCURRENCY = int(os.getenv("QUIZLY_PIPELINE_HOST_CONCURRENCY", "0"))  # per host (QUIZLY_LOCK_DIR)
+QUIZLY_PIPELINE_QUEUE_SIZE = int(os.getenv("QUIZLY_PIPELINE_QUEUE_SIZE", "8"))
+QUIZLY_PIPELINE_QUEUE_TIMEOUT = float(os.getenv("QUIZLY_PIPELINE_QUEUE_TIMEOUT", "30"))
+QUIZLY_PIPELINE_RETRY_AFTER = float(os.getenv("QUIZLY_PIPELINE_RETRY_AFTER", "30"))  # run estimate before any run finished
+
+# Asynchronous quiz jobs (createQuiz returns 202 and a local worker pool runs the pipeline)
+QUIZLY_ASYNC_JOBS = os.getenv("QUIZLY_ASYNC_JOBS", "false").lower() in ("1", "true", "yes")
+QUIZLY_JOB_WORKERS = int(os.getenv("QUIZLY_JOB_WORKERS", "2"))
+QUIZLY_JOB_POLL_INTERVAL = float(os.getenv("QUIZLY_JOB_POLL_INTERVAL", "1.0"))
+QUIZLY_SSE_POLL_INTERVAL = float(os.getenv("QUIZLY_SSE_POLL_INTERVAL", "0.5"))
+QUIZLY_SSE_KEEPALIVE = float(os.getenv("QUIZLY_SSE_KEEPALIVE", "15"))
+
+# Fair-share job scheduling (costs in seconds of audio to transcribe)
+QUIZLY_JOB_USER_CONCURRENCY = int(os.getenv("QUIZLY_JOB_USER_CONCURRENCY", "0"))  # running jobs per user, 0 = unlimited
+QUIZLY_JOB_FAIR_SHARE_WINDOW = int(os.getenv("QUIZLY_JOB_FAIR_SHARE_WINDOW", "3600"))
+QUIZLY_JOB_MAX_WAIT = int(os.getenv("QUIZLY_JOB_MAX_WAIT", "1800"))  # older jobs run first, 0 = never
+QUIZLY_JOB_BASE_COST = float(os.getenv("QUIZLY_JOB_BASE_COST", "60"))
+QUIZLY_JOB_DEFAULT_COST = float(os.getenv("QUIZLY_JOB_DEFAULT_COST", "600"))  # cost of jobs without estimate
+QUIZLY_JOB_LONG_COST = float(os.getenv("QUIZLY_JOB_LONG_COST", "1200"))  # threshold of the "long" class
+QUIZLY_JOB_METADATA_MAX_AGE = float(os.getenv("QUIZLY_JOB_METADATA_MAX_AGE", "3600"))  # reuse of the estimate's metadata
+
+# Job retries (resume from stage checkpoints)
+QUIZLY_JOB_MAX_ATTEMPTS = int(os.getenv("QUIZLY_JOB_MAX_ATTEMPTS", "1"))  # 1 = no automatic retries
+QUIZLY_JOB_RETRY_DELAY = float(os.getenv("QUIZLY_JOB_RETRY_DELAY", "30"))  # unless the error has a Retry-After
+QUIZLY_JOB_STALE_AFTER = float(os.getenv("QUIZLY_JOB_STALE_AFTER", "1800"))  # running jobs of stopped workers, 0 = never
+QUIZLY_JOB_HEARTBEAT_INTERVAL = float(os.getenv("QUIZLY_JOB_HEARTBEAT_INTERVAL", "60"))  # keep below QUIZLY_JOB_STALE_AFTER
+
+# Native async create view (requires ASGI) and stub latency for load tests
+QUIZLY_ASYNC_VIEWS = os.getenv("QUIZLY_ASYNC_VIEWS", "false").lower() in ("1", "true", "yes")
+QUIZLY_ASYNC_IO_THREADS = int(os.getenv("QUIZLY_ASYNC_IO_THREADS", "32"))
+QUIZLY_STUB_LATENCY = float(os.getenv("QUIZLY_STUB_LATENCY", "0"))
+
+# Metrics endpoint (/metrics); a shared directory aggregates all worker processes
+QUIZLY_METRICS_DIR = os.getenv("QUIZLY_METRICS_DIR", "")  # empty = metrics of the answering process only
+QUIZLY_METRICS_FLUSH_INTERVAL = float(os.getenv("QUIZLY_METRICS_FLUSH_INTERVAL", "5"))
+QUIZLY_METRICS_TOKEN = os.getenv("QUIZLY_METRICS_TOKEN", "")
+
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
@@ -53,6 +177,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'quizzes_app.middleware.request_metrics_middleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -3,8 +3,11 @@
 from django.contrib import admin
 from django.urls import include, path
 
+from quizzes_app.api.monitoring import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('auth_app.api.urls')),
     path('api/', include('quizzes_app.api.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -9,7 +9,14 @@ Provides:
 """
 
 from django.contrib import admin
-from quizzes_app.models import Quiz, Question
+from quizzes_app.models import (
+    CachedTranscript,
+    PipelineCheckpoint,
+    Question,
+    Quiz,
+    QuizJob,
+    RejectedVideo,
+)
 
 
 @admin.register(Quiz)
@@ -49,3 +56,78 @@ class QuestionAdmin(admin.ModelAdmin):
     search_fields = ("question_title", "quiz__title", "answer")
     list_filter = ("quiz",)
     readonly_fields = ("created_at", "updated_at")
+
+
+@admin.register(QuizJob)
+class QuizJobAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the QuizJob model.
+
+    Displays:
+    - ID, owner, status, stage, progress, resulting quiz, creation date
+
+    Enables:
+    - Searching by owner username and video URL
+    - Filtering by status and creation date
+    """
+
+    list_display = ("id", "owner", "status", "stage", "progress", "quiz", "created_at")
+    search_fields = ("owner__username", "video_url")
+    list_filter = ("status", "created_at")
+    readonly_fields = ("created_at", "updated_at", "started_at", "finished_at")
+
+
+@admin.register(CachedTranscript)
+class CachedTranscriptAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the CachedTranscript model.
+
+    Displays:
+    - Video ID, Whisper model, language, size, hits, last use
+
+    Enables:
+    - Searching by video ID
+    - Filtering by Whisper model and language
+    """
+
+    list_display = ("video_id", "model_name", "language", "size", "hits", "last_used_at")
+    search_fields = ("video_id",)
+    list_filter = ("model_name", "language")
+    readonly_fields = ("created_at", "last_used_at", "hits", "size")
+
+
+@admin.register(PipelineCheckpoint)
+class PipelineCheckpointAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the PipelineCheckpoint model.
+
+    Displays:
+    - Job, stage, creation date
+
+    Enables:
+    - Filtering by stage
+    """
+
+    list_display = ("job", "stage", "created_at")
+    list_filter = ("stage",)
+    readonly_fields = ("created_at",)
+
+
+@admin.register(RejectedVideo)
+class RejectedVideoAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the RejectedVideo model.
+
+    Displays:
+    - Video ID, reason, hits, expiry
+
+    Enables:
+    - Searching by video ID
+    - Filtering by reason
+    - Deleting entries to let a video be checked again right away
+    """
+
+    list_display = ("video_id", "reason", "hits", "expires_at")
+    search_fields = ("video_id",)
+    list_filter = ("reason",)
+    readonly_fields = ("created_at", "hits")
@@ -0,0 +1,109 @@
+"""
+Native async views for quiz creation under ASGI.
+
+``QuizCreateView`` runs the whole pipeline in the request thread, so
+under ASGI every in-flight quiz creation holds a thread for minutes.
+``create_quiz`` runs the same workflow as a coroutine: blocking stages
+are offloaded to bounded executors (see ``abuild_quiz_prod``), so one
+ASGI worker can keep hundreds of quiz creations in flight.
+
+Enabled with QUIZLY_ASYNC_VIEWS; the project must then be served via
+ASGI (``core/asgi.py``).
+
+Includes:
+- create_quiz: Async equivalent of QuizCreateView.
+"""
+
+import json
+import math
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from auth_app.api.authentication import authenticate_request
+from quizzes_app.api.serializers import (
+    CreateQuizSerializer,
+    QuizJobSerializer,
+    QuizWithTimestampsSerializer,
+)
+from quizzes_app.services.persist_quiz import persist_quiz
+from quizzes_app.services.quiz_jobs import enqueue_quiz_job
+from quizzes_app.services.pipeline import abuild_quiz
+
+
+@csrf_exempt
+@require_POST
+async def create_quiz(request):
+    """
+    Generate a new quiz without blocking the event loop.
+
+    Same request, responses and error format as QuizCreateView:
+    201 with the created quiz, 202 with the job status if
+    QUIZLY_ASYNC_JOBS is enabled, 400 for an invalid URL, 401 without
+    valid credentials and the pipeline's status codes on failure
+    (with ``Retry-After`` where the error defines a wait).
+
+    Args:
+        request (HttpRequest): The incoming request (JWT cookie or header).
+
+    Returns:
+        JsonResponse: The created quiz, the queued job or an error.
+    """
+    user = await sync_to_async(authenticate_request)(request)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+
+    serializer = CreateQuizSerializer(data=_request_data(request))
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    video_url = serializer.validated_data["url"]
+
+    if getattr(settings, "QUIZLY_ASYNC_JOBS", False):
+        job = await sync_to_async(enqueue_quiz_job)(owner=user, video_url=video_url)
+        response = JsonResponse(QuizJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+        response["Location"] = reverse("quiz-job-detail", kwargs={"pk": job.pk})
+        return response
+
+    try:
+        payload = await abuild_quiz(video_url)
+        data = await sync_to_async(_persist)(user, video_url, payload)
+    except APIException as e:
+        return _error_response(e)
+
+    return JsonResponse(data, status=status.HTTP_201_CREATED)
+
+
+def _persist(user, video_url: str, payload: dict) -> dict:
+    """Persist the quiz and serialize it in one thread hop."""
+    quiz = persist_quiz(owner=user, video_url=video_url, payload=payload)
+    return QuizWithTimestampsSerializer(quiz).data
+
+
+def _request_data(request) -> dict:
+    """Parse a JSON or form-encoded request body."""
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+    return request.POST
+
+
+def _error_response(exc: APIException) -> JsonResponse:
+    """Render an APIException the way DRF's exception handler does."""
+    detail = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+    response = JsonResponse(detail, status=exc.status_code, safe=False)
+    wait = getattr(exc, "wait", None)
+    if wait:
+        response["Retry-After"] = str(math.ceil(wait))
+    return response
@@ -0,0 +1,104 @@
+"""
+Server-Sent Events stream for asynchronous quiz jobs.
+
+Instead of polling ``/api/jobs/<id>/``, clients can open
+``/api/jobs/<id>/events/`` and receive every change of the job as it
+happens. The view is an async Django view: served via ASGI
+(``core/asgi.py``) an open stream does not hold a worker thread.
+
+Events:
+- progress: Job status, stage and progress in percent (on every change).
+- quiz: The finished quiz, sent once the job has succeeded.
+- error: The error message, sent if the job has failed.
+
+Includes:
+- quiz_job_events: Stream the progress and result of a quiz job.
+"""
+
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+
+from auth_app.api.authentication import authenticate_request
+from quizzes_app.api.serializers import QuizJobSerializer, QuizWithTimestampsSerializer
+from quizzes_app.models import Quiz, QuizJob
+
+
+async def quiz_job_events(request, pk):
+    """
+    Stream the progress and result of a quiz job as Server-Sent Events.
+
+    The job row is polled every QUIZLY_SSE_POLL_INTERVAL seconds; a
+    keep-alive comment is sent after QUIZLY_SSE_KEEPALIVE seconds without
+    events. The stream ends after the ``quiz`` or ``error`` event.
+
+    Args:
+        request (HttpRequest): The incoming request (JWT cookie or header).
+        pk (int): Primary key of the QuizJob.
+
+    Returns:
+        StreamingHttpResponse: The ``text/event-stream`` response, or a
+        JSON error response (401, 403, 404).
+    """
+    user = await sync_to_async(authenticate_request)(request)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."}, status=401
+        )
+
+    job = await QuizJob.objects.filter(pk=pk).afirst()
+    if job is None:
+        return JsonResponse({"detail": "No QuizJob matches the given query."}, status=404)
+    if job.owner_id != user.pk:
+        return JsonResponse(
+            {"detail": "You do not have permission to perform this action."}, status=403
+        )
+
+    response = StreamingHttpResponse(_job_events(pk), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def _job_events(pk):
+    poll_interval = float(getattr(settings, "QUIZLY_SSE_POLL_INTERVAL", 0.5))
+    keepalive = float(getattr(settings, "QUIZLY_SSE_KEEPALIVE", 15))
+
+    last_state = None
+    last_sent = time.monotonic()
+    while True:
+        job = await QuizJob.objects.filter(pk=pk).afirst()
+        if job is None:
+            yield _event("error", {"detail": "Job no longer exists."})
+            return
+
+        state = (job.status, job.stage, job.progress)
+        if state != last_state:
+            last_state = state
+            last_sent = time.monotonic()
+            yield _event("progress", QuizJobSerializer(job).data)
+
+        if job.status == QuizJob.STATUS_SUCCEEDED:
+            yield _event("quiz", await sync_to_async(_quiz_data)(job.quiz_id))
+            return
+        if job.status == QuizJob.STATUS_FAILED:
+            yield _event("error", {"detail": job.error})
+            return
+
+        if time.monotonic() - last_sent >= keepalive:
+            last_sent = time.monotonic()
+            yield ": keepalive\n\n"
+        await asyncio.sleep(poll_interval)
+
+
+def _quiz_data(quiz_id) -> dict:
+    quiz = Quiz.objects.prefetch_related("questions").get(pk=quiz_id)
+    return QuizWithTimestampsSerializer(quiz).data
+
+
+def _event(name: str, data) -> str:
+    return f"event: {name}\ndata: {json.dumps(data, default=str)}\n\n"
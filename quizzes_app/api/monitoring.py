@@ -0,0 +1,52 @@
+"""
+Monitoring endpoint in the Prometheus text format.
+
+Includes:
+- metrics_view: Expose the pipeline and request metrics of all worker processes.
+"""
+
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+from quizzes_app.services import job_scheduler, metrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Return all metrics in the Prometheus text exposition format.
+
+    Besides the counters and histograms of the worker processes, the
+    depth of the job queue and the wait of its oldest job per priority
+    class are read from the database.
+
+    With QUIZLY_METRICS_TOKEN set, the scraper must send it as
+    ``Authorization: Bearer <token>``; otherwise the endpoint is open
+    and should only be reachable from the internal network.
+
+    Args:
+        request (HttpRequest): The scrape request.
+
+    Returns:
+        HttpResponse: The exposition text, or 401 for a missing/wrong token.
+    """
+    token = getattr(settings, "QUIZLY_METRICS_TOKEN", "")
+    if token:
+        sent = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(sent.encode(), f"Bearer {token}".encode()):
+            return HttpResponse("Unauthorized\n", status=401, content_type="text/plain")
+
+    return HttpResponse(metrics.render_text(gauges=_job_queue_gauges()), content_type=CONTENT_TYPE)
+
+
+def _job_queue_gauges() -> list:
+    gauges = []
+    for priority, stats in job_scheduler.queue_stats().items():
+        gauges.append(("job_queue_depth", {"priority": priority}, stats["depth"]))
+        gauges.append(("job_queue_oldest_wait_seconds", {"priority": priority}, stats["oldest_wait"]))
+    return gauges
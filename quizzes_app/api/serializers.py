@@ -7,13 +7,14 @@ Includes:
 - QuizSerializer: Basic quiz serialization including questions.
 - QuizWithTimestampsSerializer: Extended version with timestamps.
 - CreateQuizSerializer: Validates YouTube URL and triggers quiz generation.
+- QuizJobSerializer: Reports status and progress of an asynchronous quiz job.
 """
 
 import re
 from rest_framework import serializers
 from urllib.parse import urlparse, parse_qs
 
-from quizzes_app.models import Question, Quiz
+from quizzes_app.models import Question, Quiz, QuizJob
 
 YOUTUBE_DOMAINS = {"youtube.com", "www.youtube.com", "m.youtube.com", "youtu.be"}
 VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
@@ -115,3 +116,34 @@ class CreateQuizSerializer(serializers.Serializer):
             raise serializers.ValidationError("Invalid YouTube video ID.")
 
         return f"https://www.youtube.com/watch?v={video_id}"
+
+
+class QuizJobSerializer(serializers.ModelSerializer):
+    """
+    Read-only serializer for asynchronous quiz generation jobs.
+
+    Exposes the job status, current pipeline stage, progress in percent,
+    the attempts so far and the id of the resulting quiz once the job
+    has succeeded.
+    """
+
+    quiz_id = serializers.IntegerField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = QuizJob
+        fields = [
+            "id",
+            "status",
+            "stage",
+            "progress",
+            "quiz_id",
+            "error",
+            "video_url",
+            "attempts",
+            "retry_at",
+            "created_at",
+            "updated_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
@@ -2,18 +2,33 @@
 URL configuration for quiz creation and quiz management endpoints.
 
 Provides:
-- POST /createQuiz/ → Generate a quiz from a YouTube URL.
+- POST /createQuiz/ → Generate a quiz from a YouTube URL
+  (native async view with QUIZLY_ASYNC_VIEWS).
+- GET /jobs/<id>/ → Status of an asynchronous quiz generation job.
+- POST /jobs/<id>/retry/ → Queue a failed job again (resumes from checkpoints).
+- GET /jobs/<id>/events/ → Progress and result of a job as Server-Sent Events.
 - CRUD operations for quizzes via QuizViewSet (registered under /quizzes/).
 """
 
+from django.conf import settings
 from django.urls import path, include
 from rest_framework import routers
-from .views import QuizCreateView, QuizViewSet
+from .async_views import create_quiz
+from .events import quiz_job_events
+from .views import QuizCreateView, QuizJobDetailView, QuizJobRetryView, QuizViewSet
 
 router = routers.SimpleRouter()
 router.register(r"quizzes", QuizViewSet, basename="quiz")
 
+if getattr(settings, "QUIZLY_ASYNC_VIEWS", False):
+    create_quiz_view = create_quiz
+else:
+    create_quiz_view = QuizCreateView.as_view()
+
 urlpatterns = [
-    path("createQuiz/", QuizCreateView.as_view(), name="create-quiz"),
+    path("createQuiz/", create_quiz_view, name="create-quiz"),
+    path("jobs/<int:pk>/", QuizJobDetailView.as_view(), name="quiz-job-detail"),
+    path("jobs/<int:pk>/retry/", QuizJobRetryView.as_view(), name="quiz-job-retry"),
+    path("jobs/<int:pk>/events/", quiz_job_events, name="quiz-job-events"),
     path("", include(router.urls)),
 ]
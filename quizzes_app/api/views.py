@@ -3,6 +3,8 @@ Views for quiz creation and quiz management.
 
 This module provides:
 - QuizCreateView: Generates a new quiz using the CreateQuizSerializer.
+- QuizJobDetailView: Reports status and progress of an asynchronous quiz job.
+- QuizJobRetryView: Queues a failed quiz job again.
 - QuizViewSet: Full CRUD operations for quizzes with owner-based permissions.
 """
 
@@ -10,18 +12,20 @@ from rest_framework import status, generics, viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.conf import settings
+from django.urls import reverse
 
-from quizzes_app.models import Quiz
+from quizzes_app.models import Quiz, QuizJob
 from quizzes_app.api.serializers import (
     QuizSerializer,
     CreateQuizSerializer,
     QuizWithTimestampsSerializer,
+    QuizJobSerializer,
 )
 from quizzes_app.api.permissions import IsQuizOwner
-from quizzes_app.services.quiz_pipeline_prod import build_quiz_prod
-from quizzes_app.services.quiz_pipeline_stub import build_quiz_stub
+from quizzes_app.services.pipeline import build_quiz
 from quizzes_app.services.persist_quiz import persist_quiz
 from quizzes_app.services.error import AIPipelineError
+from quizzes_app.services.quiz_jobs import enqueue_quiz_job, retry_job
 
 
 class QuizCreateView(generics.CreateAPIView):
@@ -33,6 +37,9 @@ class QuizCreateView(generics.CreateAPIView):
     2. Execute the AI pipeline (Whisper/Gemini or stub), depending on project settings.
     3. Persist the generated quiz and its questions via the service layer.
     4. Return the created quiz with timestamps using QuizWithTimestampsSerializer.
+
+    With QUIZLY_ASYNC_JOBS enabled, steps 2-3 run out of band instead:
+    a QuizJob is queued and 202 Accepted is returned with the job status.
     """
 
     serializer_class = CreateQuizSerializer
@@ -44,12 +51,17 @@ class QuizCreateView(generics.CreateAPIView):
         user = request.user
         video_url = serializer.validated_data["url"]
 
+        if getattr(settings, "QUIZLY_ASYNC_JOBS", False):
+            job = enqueue_quiz_job(owner=user, video_url=video_url)
+            location = reverse("quiz-job-detail", kwargs={"pk": job.pk})
+            return Response(
+                QuizJobSerializer(job).data,
+                status=status.HTTP_202_ACCEPTED,
+                headers={"Location": location},
+            )
+
         try:
-            mode = getattr(settings, "QUIZLY_PIPELINE_MODE", "stub")
-            if mode == "prod":
-                payload = build_quiz_prod(video_url)
-            else:
-                payload = build_quiz_stub(video_url)
+            payload = build_quiz(video_url)
         except AIPipelineError as e:
             raise e
 
@@ -59,6 +71,49 @@ class QuizCreateView(generics.CreateAPIView):
         return Response(output_data, status=status.HTTP_201_CREATED)
 
 
+class QuizJobDetailView(generics.RetrieveAPIView):
+    """
+    API endpoint for polling an asynchronous quiz generation job.
+
+    Returns the job status, current stage, progress and, once finished,
+    the id of the resulting quiz. Only the job owner can access it.
+    """
+
+    serializer_class = QuizJobSerializer
+    permission_classes = [IsAuthenticated, IsQuizOwner]
+    queryset = QuizJob.objects.all()
+
+
+class QuizJobRetryView(generics.GenericAPIView):
+    """
+    API endpoint for retrying a failed quiz generation job.
+
+    The job is queued again and resumes at the first pipeline stage
+    without a checkpoint, so only the failed stage is repeated.
+    Returns 202 Accepted with the job status, or 409 Conflict if the job
+    has not failed. Only the job owner can retry it.
+    """
+
+    serializer_class = QuizJobSerializer
+    permission_classes = [IsAuthenticated, IsQuizOwner]
+    queryset = QuizJob.objects.all()
+
+    def post(self, request, *args, **kwargs):
+        job = self.get_object()
+        if not retry_job(job):
+            return Response(
+                {"detail": "Only failed jobs can be retried."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        location = reverse("quiz-job-detail", kwargs={"pk": job.pk})
+        return Response(
+            self.get_serializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": location},
+        )
+
+
 class QuizViewSet(viewsets.ModelViewSet):
     """
     ViewSet for listing, retrieving, updating, and deleting quizzes.
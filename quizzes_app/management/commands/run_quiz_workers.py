@@ -0,0 +1,50 @@
+"""
+Management command that runs the local quiz job worker pool.
+
+Usage:
+    python manage.py run_quiz_workers --workers 2
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from quizzes_app.services.pipeline import warmup_process
+from quizzes_app.services.quiz_jobs import QuizJobWorkerPool
+
+
+class Command(BaseCommand):
+    """
+    Process queued quiz generation jobs until interrupted.
+    """
+
+    help = "Run the worker pool that processes queued quiz generation jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of worker threads (default: QUIZLY_JOB_WORKERS).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=None,
+            help="Seconds to wait when the queue is empty (default: QUIZLY_JOB_POLL_INTERVAL).",
+        )
+
+    def handle(self, *args, **options):
+        warmup_process()
+        pool = QuizJobWorkerPool(
+            workers=options["workers"], poll_interval=options["poll_interval"]
+        )
+        pool.start()
+        self.stdout.write(f"Started {pool.workers} quiz job worker(s). Press Ctrl+C to stop.")
+
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping workers, waiting for running jobs to finish...")
+            pool.stop()
@@ -0,0 +1,44 @@
+"""
+Management command that runs the warmup steps of a pipeline backend.
+
+Loads (and, on first use, downloads) the backend's models, tokenizer and
+clients and reports how long each step took. Useful at deploy time to
+fill the host's model caches and to check the configuration; server and
+job worker processes warm themselves up with QUIZLY_PIPELINE_WARMUP.
+
+Usage:
+    python manage.py warmup_pipeline --backend prod
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quizzes_app.services.pipeline import get_backend, warmup
+
+
+class Command(BaseCommand):
+    """
+    Warm up a pipeline backend and report the duration of every step.
+    """
+
+    help = "Run the warmup steps of a quiz pipeline backend."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--backend",
+            default=None,
+            help="Backend name (default: QUIZLY_PIPELINE_MODE).",
+        )
+
+    def handle(self, *args, **options):
+        backend = get_backend(options["backend"])
+        self.stdout.write(f"Backend {backend.name}: stages {', '.join(backend.stages) or '-'}")
+
+        results = warmup(options["backend"])
+        for step, seconds, error in results:
+            outcome = f"failed: {error}" if error else "ok"
+            self.stdout.write(f"  {step:<16} {seconds:7.2f}s  {outcome}")
+
+        failed = [step for step, _seconds, error in results if error]
+        if failed:
+            raise CommandError(f"Warmup failed: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS(f"Backend {backend.name} is warm."))
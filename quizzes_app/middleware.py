@@ -0,0 +1,55 @@
+"""
+Request-level metrics for the API.
+
+Includes:
+- request_metrics_middleware: Record the latency of every ``/api/`` request.
+"""
+
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.utils.decorators import sync_and_async_middleware
+
+from quizzes_app.services import metrics
+
+
+@sync_and_async_middleware
+def request_metrics_middleware(get_response):
+    """
+    Record the latency of ``/api/`` requests in ``http_request_duration_seconds``.
+
+    Labels are the HTTP method, the view (URL name such as
+    ``quiz-detail``, not the concrete path, to keep the number of series
+    bounded) and the status code. For streaming responses the
+    time until the response starts is recorded.
+    """
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            start = time.perf_counter()
+            response = await get_response(request)
+            _record(request, response, start)
+            return response
+
+    else:
+
+        def middleware(request):
+            start = time.perf_counter()
+            response = get_response(request)
+            _record(request, response, start)
+            return response
+
+    return middleware
+
+
+def _record(request, response, start: float) -> None:
+    if not request.path.startswith("/api/"):
+        return
+    match = getattr(request, "resolver_match", None)
+    metrics.observe(
+        "http_request_duration_seconds",
+        time.perf_counter() - start,
+        method=request.method,
+        view=(match.view_name or match.route) if match else "unmatched",
+        status=str(response.status_code),
+    )
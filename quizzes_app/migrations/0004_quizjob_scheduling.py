@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes_app', '0003_cachedtranscript'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizjob',
+            name='duration',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='quizjob',
+            name='estimated_cost',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='quizjob',
+            name='priority',
+            field=models.CharField(choices=[('unknown', 'Unknown'), ('cached', 'Cached'), ('short', 'Short'), ('long', 'Long')], default='unknown', max_length=16),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes_app', '0004_quizjob_scheduling'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizjob',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='quizjob',
+            name='retry_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='PipelineCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(max_length=32)),
+                ('data', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='quizzes_app.quizjob')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('job', 'stage'), name='unique_pipeline_checkpoint')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes_app', '0005_pipelinecheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RejectedVideo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(max_length=32, unique=True)),
+                ('reason', models.CharField(max_length=32)),
+                ('detail', models.TextField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -4,6 +4,10 @@ Models for quizzes and quiz questions.
 This module defines:
 - Quiz: Represents a generated quiz linked to a YouTube video.
 - Question: Represents a single question belonging to a quiz.
+- QuizJob: Represents an asynchronous quiz generation job.
+- PipelineCheckpoint: Represents the saved output of a pipeline stage of a job.
+- CachedTranscript: Represents a cached transcript of a YouTube video.
+- RejectedVideo: Represents a cached rejection of a YouTube video.
 """
 
 from django.db import models
@@ -58,3 +62,181 @@ class Question(models.Model):
     def __str__(self):
         """Return a truncated version of the question title."""
         return self.question_title[:50]
+
+
+class QuizJob(models.Model):
+    """
+    Represents an asynchronous quiz generation job.
+
+    Jobs are stored in the database and picked up by the local worker
+    pool (see ``quizzes_app.services.quiz_jobs``), so no external broker
+    is required.
+
+    Fields:
+    - owner: User who requested the quiz.
+    - video_url: Normalized URL of the source YouTube video.
+    - status: Lifecycle state (queued, running, succeeded, failed).
+    - stage: Current pipeline stage (e.g. download, transcribe, generate).
+    - progress: Overall progress in percent (0-100).
+    - quiz: The resulting quiz once the job has succeeded.
+    - error: Error message if the job failed.
+    - created_at: Timestamp when the job was queued.
+    - updated_at: Timestamp of the last status/progress update.
+    - started_at: Timestamp when a worker claimed the job.
+    - finished_at: Timestamp when the job succeeded or failed.
+    - priority: Scheduling class (cached, short, long, or unknown until
+      the job has been estimated).
+    - duration: Video duration in seconds, from the metadata (if known).
+    - estimated_cost: Estimated pipeline cost in seconds of video to
+      transcribe (0 for cached transcripts), used for fair sharing.
+    - attempts: Number of times a worker claimed the job.
+    - retry_at: Earliest time a requeued job may run again.
+    """
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    PRIORITY_UNKNOWN = "unknown"
+    PRIORITY_CACHED = "cached"
+    PRIORITY_SHORT = "short"
+    PRIORITY_LONG = "long"
+    PRIORITY_CHOICES = [
+        (PRIORITY_UNKNOWN, "Unknown"),
+        (PRIORITY_CACHED, "Cached"),
+        (PRIORITY_SHORT, "Short"),
+        (PRIORITY_LONG, "Long"),
+    ]
+
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="quiz_jobs")
+    video_url = models.URLField()
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True
+    )
+    stage = models.CharField(max_length=32, default=STATUS_QUEUED)
+    progress = models.PositiveSmallIntegerField(default=0)
+    quiz = models.ForeignKey(
+        Quiz, null=True, blank=True, on_delete=models.SET_NULL, related_name="jobs"
+    )
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    priority = models.CharField(max_length=16, choices=PRIORITY_CHOICES, default=PRIORITY_UNKNOWN)
+    duration = models.PositiveIntegerField(null=True, blank=True)
+    estimated_cost = models.FloatField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    retry_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        """Return a readable representation of the job."""
+        return f"Job {self.pk} ({self.status}, {self.owner.username})"
+
+
+class PipelineCheckpoint(models.Model):
+    """
+    Represents the saved output of one pipeline stage of a quiz job.
+
+    When a job is retried (after a transient failure, a manual retry or a
+    worker restart), the pipeline resumes at the first stage without a
+    checkpoint instead of starting over with the download.
+
+    Fields:
+    - job: The job the stage ran for.
+    - stage: Stage name (metadata, transcript, response, payload).
+    - data: The stage output as JSON.
+    - created_at: Timestamp when the stage completed.
+    """
+
+    job = models.ForeignKey(QuizJob, on_delete=models.CASCADE, related_name="checkpoints")
+    stage = models.CharField(max_length=32)
+    data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["job", "stage"], name="unique_pipeline_checkpoint")
+        ]
+
+    def __str__(self):
+        """Return a readable representation of the checkpoint."""
+        return f"Job {self.job_id}: {self.stage}"
+
+
+class CachedTranscript(models.Model):
+    """
+    Represents a cached transcript of a YouTube video.
+
+    Transcripts are content-addressed by video ID, Whisper model and
+    language, so repeat submissions of the same video skip the download
+    and transcription stages.
+
+    Fields:
+    - video_id: YouTube video ID.
+    - model_name: Whisper model that produced the transcript.
+    - language: Transcription language ("auto" for auto-detection).
+    - text: The transcript text.
+    - size: Length of the transcript in characters.
+    - hits: Number of times the cached transcript was reused.
+    - created_at: Timestamp when the transcript was stored.
+    - last_used_at: Timestamp of the last cache hit (or creation).
+    """
+
+    video_id = models.CharField(max_length=32)
+    model_name = models.CharField(max_length=64)
+    language = models.CharField(max_length=16)
+    text = models.TextField()
+    size = models.PositiveIntegerField(default=0)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["video_id", "model_name", "language"],
+                name="unique_cached_transcript",
+            )
+        ]
+
+    def __str__(self):
+        """Return a readable representation of the cache key."""
+        return f"{self.video_id} ({self.model_name}, {self.language})"
+
+
+class RejectedVideo(models.Model):
+    """
+    Represents a cached rejection of a YouTube video (negative cache).
+
+    Videos rejected by the metadata preflight (private, deleted, live,
+    age-restricted, too long) are remembered for a short, per-reason
+    time, so repeat submissions fail without asking YouTube again.
+
+    Fields:
+    - video_id: YouTube video ID.
+    - reason: Rejection reason (error code of VideoRejectedError).
+    - detail: The original error message.
+    - hits: Number of lookups answered by this entry (not counting the
+      in-process memo).
+    - created_at: Timestamp when the rejection was stored.
+    - expires_at: Timestamp after which the video is checked again.
+    """
+
+    video_id = models.CharField(max_length=32, unique=True)
+    reason = models.CharField(max_length=32)
+    detail = models.TextField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        """Return a readable representation of the rejection."""
+        return f"{self.video_id} ({self.reason})"
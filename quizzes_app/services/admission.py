@@ -0,0 +1,306 @@
+"""
+Admission control for pipeline runs.
+
+A pipeline run holds CPU (Whisper), memory (models, audio) and network
+capacity for seconds to minutes. Without a limit, every concurrent
+request starts its own run, so under overload all of them slow down
+together and time out. The admission controller caps the number of
+concurrent runs:
+- per process (QUIZLY_PIPELINE_CONCURRENCY), and
+- per host (QUIZLY_PIPELINE_HOST_CONCURRENCY), with one slot lock file
+  per run in QUIZLY_LOCK_DIR shared by all processes.
+
+Requests beyond the limit wait in a bounded queue
+(QUIZLY_PIPELINE_QUEUE_SIZE, at most QUIZLY_PIPELINE_QUEUE_TIMEOUT
+seconds). When the queue is full or the wait times out, the request is
+rejected with 429 and a ``Retry-After`` estimated from the recent
+pipeline stage latencies. Background jobs wait without a bound instead,
+they are queued already.
+
+Both limits default to 0 (unlimited), which leaves the pipeline as is.
+
+Includes:
+- AdmissionController: The limiter.
+- admission: The shared instance used by ``pipeline.build_quiz``.
+"""
+
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from filelock import FileLock, Timeout
+
+from quizzes_app.services import metrics
+from quizzes_app.services.error import PipelineOverloadedError
+
+# Weight of the latest run in the moving average of run durations.
+EWMA_ALPHA = 0.2
+
+
+class _Ticket:
+    """
+    An admitted run: the slots it holds and when it started.
+    """
+
+    def __init__(self, key=None, process_slot=False, host_lock=None):
+        self.key = key
+        self.process_slot = process_slot
+        self.host_lock = host_lock
+        self.started = time.monotonic()
+
+
+class AdmissionController:
+    """
+    Limit concurrent pipeline runs per process and per host.
+
+    Parameters:
+        concurrency (int, optional): Runs per process, 0 = unlimited
+            (QUIZLY_PIPELINE_CONCURRENCY).
+        host_concurrency (int, optional): Runs per host, 0 = unlimited
+            (QUIZLY_PIPELINE_HOST_CONCURRENCY).
+        queue_size (int, optional): Requests per process that may wait for
+            a slot (QUIZLY_PIPELINE_QUEUE_SIZE).
+        queue_timeout (float, optional): Longest wait for a slot in seconds
+            (QUIZLY_PIPELINE_QUEUE_TIMEOUT).
+        lock_dir (str, optional): Directory for the host slot lock files
+            (QUIZLY_LOCK_DIR).
+        poll_interval (float): Seconds between attempts to get a host slot.
+
+    A caller with a key (the video ID) that already runs in this process
+    is admitted without a slot: it only waits for that run's result
+    (single-flight coalescing).
+    """
+
+    def __init__(
+        self,
+        concurrency=None,
+        host_concurrency=None,
+        queue_size=None,
+        queue_timeout=None,
+        lock_dir=None,
+        poll_interval=0.05,
+    ):
+        self._concurrency = concurrency
+        self._host_concurrency = host_concurrency
+        self._queue_size = queue_size
+        self._queue_timeout = queue_timeout
+        self._lock_dir = lock_dir
+        self.poll_interval = poll_interval
+        self._condition = threading.Condition()
+        self._running = 0
+        self._waiting = 0
+        self._keys = {}
+        self._average_run = None
+
+    @property
+    def concurrency(self) -> int:
+        """Return the limit of concurrent runs per process (0 = unlimited)."""
+        if self._concurrency is not None:
+            return int(self._concurrency)
+        return int(getattr(settings, "QUIZLY_PIPELINE_CONCURRENCY", 0))
+
+    @property
+    def host_concurrency(self) -> int:
+        """Return the limit of concurrent runs per host (0 = unlimited)."""
+        if self._host_concurrency is not None:
+            return int(self._host_concurrency)
+        return int(getattr(settings, "QUIZLY_PIPELINE_HOST_CONCURRENCY", 0))
+
+    @property
+    def queue_size(self) -> int:
+        """Return how many requests may wait for a slot."""
+        if self._queue_size is not None:
+            return int(self._queue_size)
+        return int(getattr(settings, "QUIZLY_PIPELINE_QUEUE_SIZE", 8))
+
+    @property
+    def queue_timeout(self) -> float:
+        """Return the longest wait for a slot, in seconds."""
+        if self._queue_timeout is not None:
+            return float(self._queue_timeout)
+        return float(getattr(settings, "QUIZLY_PIPELINE_QUEUE_TIMEOUT", 30))
+
+    @property
+    def lock_dir(self) -> str:
+        """Return the directory holding the host slot lock files."""
+        lock_dir = self._lock_dir or getattr(settings, "QUIZLY_LOCK_DIR", "")
+        return lock_dir or os.path.join(tempfile.gettempdir(), "quizly_locks")
+
+    @property
+    def waiting(self) -> int:
+        """Return the number of requests waiting for a slot in this process."""
+        with self._condition:
+            return self._waiting
+
+    @contextmanager
+    def admit(self, key=None, bounded=True, stages=()):
+        """
+        Hold a pipeline slot for the duration of the block.
+
+        Args:
+            key (str, optional): Coalescing key of the run (video ID).
+            bounded (bool): Reject when the queue is full or the wait times
+                out; False waits until a slot is free (background jobs).
+            stages (tuple): Pipeline stages, used to estimate Retry-After.
+
+        Raises:
+            PipelineOverloadedError: If the request is not admitted.
+        """
+        ticket = self.acquire(key=key, bounded=bounded, stages=stages)
+        try:
+            yield
+        finally:
+            self.release(ticket)
+
+    def acquire(self, key=None, bounded=True, stages=()) -> _Ticket:
+        """
+        Wait for a pipeline slot and return the ticket to ``release``.
+
+        Blocks the calling thread; async callers run it on the I/O pool.
+        See ``admit`` for the arguments.
+        """
+        concurrency = self.concurrency
+        host_concurrency = self.host_concurrency
+        if concurrency <= 0 and host_concurrency <= 0:
+            return _Ticket()
+
+        with self._condition:
+            if key is not None and key in self._keys:
+                self._keys[key] += 1
+                metrics.increment("pipeline_admission_total", outcome="coalesced")
+                return _Ticket(key=key)
+
+        start = time.monotonic()
+        deadline = start + self.queue_timeout if bounded else None
+        process_slot = False
+        try:
+            if concurrency > 0:
+                self._acquire_process_slot(concurrency, bounded, deadline, stages)
+                process_slot = True
+            host_lock = None
+            if host_concurrency > 0:
+                host_lock = self._acquire_host_slot(host_concurrency, bounded, deadline, stages)
+        except PipelineOverloadedError:
+            if process_slot:
+                self._release_process_slot()
+            raise
+
+        metrics.increment("pipeline_admission_total", outcome="admitted")
+        metrics.observe("pipeline_queue_seconds", time.monotonic() - start)
+        with self._condition:
+            if key is not None:
+                self._keys[key] = self._keys.get(key, 0) + 1
+        return _Ticket(key=key, process_slot=process_slot, host_lock=host_lock)
+
+    def release(self, ticket: _Ticket) -> None:
+        """Give back the slots of an admitted run."""
+        with self._condition:
+            if ticket.key is not None:
+                remaining = self._keys.get(ticket.key, 1) - 1
+                if remaining > 0:
+                    self._keys[ticket.key] = remaining
+                else:
+                    self._keys.pop(ticket.key, None)
+            if ticket.process_slot or ticket.host_lock is not None:
+                duration = time.monotonic() - ticket.started
+                if self._average_run is None:
+                    self._average_run = duration
+                else:
+                    self._average_run += EWMA_ALPHA * (duration - self._average_run)
+        if ticket.host_lock is not None:
+            ticket.host_lock.release()
+        if ticket.process_slot:
+            self._release_process_slot()
+
+    def retry_after(self, stages=()) -> int:
+        """
+        Estimate the seconds until a rejected request would be admitted.
+
+        One run takes the sum of the mean latencies of ``stages`` (from the
+        ``pipeline_stage_seconds`` histograms of this process), or the
+        moving average of recent run durations for backends without stage
+        metrics, or QUIZLY_PIPELINE_RETRY_AFTER before anything ran. The
+        queue ahead of the request drains ``concurrency`` runs at a time.
+
+        Returns:
+            int: Seconds, at least 1.
+        """
+        run = 0.0
+        for stage in stages:
+            histogram = metrics.get_histogram("pipeline_stage_seconds", stage=stage)
+            if histogram["count"]:
+                run += histogram["sum"] / histogram["count"]
+        if not run:
+            run = self._average_run or float(getattr(settings, "QUIZLY_PIPELINE_RETRY_AFTER", 30))
+
+        limits = [n for n in (self.concurrency, self.host_concurrency) if n > 0]
+        slots = min(limits) if limits else 1
+        return max(1, math.ceil(run * (self.waiting + 1) / slots))
+
+    def _acquire_process_slot(self, concurrency, bounded, deadline, stages) -> None:
+        with self._condition:
+            if self._running < concurrency and not self._waiting:
+                self._running += 1
+                return
+            if bounded and self._waiting >= self.queue_size:
+                self._reject("queue_full", stages)
+
+            self._waiting += 1
+            try:
+                while self._running >= concurrency:
+                    timeout = None if deadline is None else deadline - time.monotonic()
+                    if timeout is not None and timeout <= 0:
+                        self._reject("timeout", stages)
+                    self._condition.wait(timeout)
+                self._running += 1
+            finally:
+                self._waiting -= 1
+
+    def _release_process_slot(self) -> None:
+        with self._condition:
+            self._running -= 1
+            self._condition.notify()
+
+    def _acquire_host_slot(self, host_concurrency, bounded, deadline, stages) -> FileLock:
+        os.makedirs(self.lock_dir, exist_ok=True)
+        lock = self._try_host_slot(host_concurrency)
+        if lock is not None:
+            return lock
+
+        with self._condition:
+            if bounded and self._waiting >= self.queue_size:
+                self._reject("queue_full", stages)
+            self._waiting += 1
+        try:
+            while True:
+                if deadline is not None and time.monotonic() >= deadline:
+                    self._reject("timeout", stages)
+                time.sleep(self.poll_interval)
+                lock = self._try_host_slot(host_concurrency)
+                if lock is not None:
+                    return lock
+        finally:
+            with self._condition:
+                self._waiting -= 1
+
+    def _try_host_slot(self, host_concurrency):
+        # Not thread-local: async callers release on another thread.
+        for slot in range(host_concurrency):
+            lock = FileLock(os.path.join(self.lock_dir, f"pipeline_slot_{slot}.lock"), thread_local=False)
+            try:
+                lock.acquire(timeout=0)
+            except Timeout:
+                continue
+            return lock
+        return None
+
+    def _reject(self, outcome: str, stages) -> None:
+        metrics.increment("pipeline_admission_total", outcome=outcome)
+        raise PipelineOverloadedError(wait=self.retry_after(stages))
+
+
+admission = AdmissionController()
@@ -0,0 +1,237 @@
+"""
+Audio helpers for the transcription stage.
+
+All functions work on 16 kHz mono float32 NumPy arrays, the input
+format Whisper expects.
+
+Includes:
+- load_audio: Load an audio file as a 16 kHz mono array.
+- frame_rms: Per-frame RMS energy of an audio array.
+- split_at_silence: Split long audio into overlapping chunks at quiet points.
+- detect_speech: Energy-based voice activity detection.
+- keep_spans: Concatenate the speech spans of an audio array.
+- remap_timestamp / remap_segments: Map times in trimmed audio back to the original.
+"""
+
+import wave
+
+import numpy as np
+from whisper.audio import SAMPLE_RATE
+from whisper.audio import load_audio as _ffmpeg_load_audio
+
+FRAME_SECONDS = 0.03
+
+
+def load_audio(path: str) -> np.ndarray:
+    """
+    Load an audio file as a 16 kHz mono float32 array.
+
+    16 kHz mono 16-bit WAV files are read directly; everything else
+    (including the FLAC files of the "speech" download profile) is
+    decoded and resampled by ffmpeg.
+
+    Args:
+        path (str): Path to the audio file.
+
+    Returns:
+        np.ndarray: Audio samples in the range [-1, 1].
+    """
+    if path.lower().endswith(".wav"):
+        try:
+            with wave.open(path, "rb") as wav:
+                if (
+                    wav.getframerate() == SAMPLE_RATE
+                    and wav.getnchannels() == 1
+                    and wav.getsampwidth() == 2
+                ):
+                    frames = wav.readframes(wav.getnframes())
+                    return np.frombuffer(frames, np.int16).astype(np.float32) / 32768.0
+        except (wave.Error, EOFError):
+            pass
+
+    return _ffmpeg_load_audio(path)
+
+
+def frame_rms(audio: np.ndarray, frame_seconds: float = FRAME_SECONDS) -> np.ndarray:
+    """
+    Return the RMS energy of consecutive, non-overlapping frames.
+
+    Args:
+        audio (np.ndarray): 16 kHz mono samples.
+        frame_seconds (float): Frame length in seconds.
+
+    Returns:
+        np.ndarray: One RMS value per frame (a trailing partial frame is included).
+    """
+    frame_len = max(1, int(frame_seconds * SAMPLE_RATE))
+    n_frames = int(np.ceil(len(audio) / frame_len))
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    padded = np.zeros(n_frames * frame_len, dtype=np.float32)
+    padded[: len(audio)] = audio
+    frames = padded.reshape(n_frames, frame_len)
+    return np.sqrt(np.mean(frames ** 2, axis=1))
+
+
+def split_at_silence(
+    audio: np.ndarray,
+    chunk_seconds: float,
+    overlap_seconds: float = 1.0,
+    search_seconds: float = 5.0,
+) -> list:
+    """
+    Split audio into chunks of roughly ``chunk_seconds`` at quiet points.
+
+    Each cut is placed at the lowest-energy frame within ``search_seconds``
+    before the target boundary, so cuts rarely fall in the middle of a
+    word. Every chunk after the first starts ``overlap_seconds`` before
+    its cut, so words on the boundary appear in both chunks.
+
+    Args:
+        audio (np.ndarray): 16 kHz mono samples.
+        chunk_seconds (float): Target chunk length.
+        overlap_seconds (float): Overlap between neighbouring chunks.
+        search_seconds (float): Window before each boundary searched for silence.
+
+    Returns:
+        list: ``(start, end)`` sample offsets of the chunks, in order.
+    """
+    total = len(audio)
+    chunk_len = int(chunk_seconds * SAMPLE_RATE)
+    if total <= chunk_len:
+        return [(0, total)]
+
+    frame_len = max(1, int(FRAME_SECONDS * SAMPLE_RATE))
+    energy = frame_rms(audio)
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    search = int(search_seconds * SAMPLE_RATE)
+
+    cuts = []
+    position = 0
+    while total - position > chunk_len:
+        target = position + chunk_len
+        lo = max(position + chunk_len // 2, target - search) // frame_len
+        hi = max(lo + 1, target // frame_len)
+        cut = (lo + int(np.argmin(energy[lo:hi]))) * frame_len
+        cuts.append(cut)
+        position = cut
+
+    bounds = [0] + cuts + [total]
+    return [
+        (max(0, start - overlap) if i else start, end)
+        for i, (start, end) in enumerate(zip(bounds, bounds[1:]))
+    ]
+
+
+def detect_speech(
+    audio: np.ndarray,
+    threshold_db: float = -45.0,
+    dynamic_range_db: float = 35.0,
+    min_silence_seconds: float = 0.6,
+    padding_seconds: float = 0.2,
+) -> list:
+    """
+    Find the speech regions of an audio array from its frame energy.
+
+    A frame counts as voiced if its level is above ``threshold_db`` (dBFS)
+    and within ``dynamic_range_db`` of the loud end of the recording (its
+    95th percentile), so the detector adapts to quietly recorded audio.
+    Pauses shorter than ``min_silence_seconds`` are kept, and each span is
+    padded by ``padding_seconds`` so word onsets and endings survive.
+
+    Args:
+        audio (np.ndarray): 16 kHz mono samples.
+        threshold_db (float): Absolute level below which frames are silent.
+        dynamic_range_db (float): Maximum distance from the loud level.
+        min_silence_seconds (float): Shortest pause that is removed.
+        padding_seconds (float): Context kept around every span.
+
+    Returns:
+        list: ``(start, end)`` sample offsets of the speech spans, in order.
+    """
+    energy = frame_rms(audio)
+    if len(energy) == 0:
+        return []
+
+    frame_len = max(1, int(FRAME_SECONDS * SAMPLE_RATE))
+    level = 20 * np.log10(np.maximum(energy, 1e-10))
+    threshold = max(threshold_db, np.percentile(level, 95) - dynamic_range_db)
+    voiced = np.flatnonzero(level > threshold)
+    if len(voiced) == 0:
+        return []
+
+    # Split the voiced frames into runs wherever the gap is a real pause.
+    min_gap = max(1, int(min_silence_seconds / FRAME_SECONDS))
+    breaks = np.flatnonzero(np.diff(voiced) > min_gap)
+    starts = np.concatenate([[voiced[0]], voiced[breaks + 1]])
+    ends = np.concatenate([voiced[breaks], [voiced[-1]]]) + 1
+
+    padding = int(padding_seconds * SAMPLE_RATE)
+    spans = []
+    for start, end in zip(starts * frame_len, ends * frame_len):
+        start = max(0, int(start) - padding)
+        end = min(len(audio), int(end) + padding)
+        if spans and start <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], end)
+        else:
+            spans.append((start, end))
+    return spans
+
+
+def keep_spans(audio: np.ndarray, spans: list) -> np.ndarray:
+    """
+    Return the concatenation of the given sample spans.
+
+    Args:
+        audio (np.ndarray): 16 kHz mono samples.
+        spans (list): ``(start, end)`` sample offsets, as from ``detect_speech``.
+
+    Returns:
+        np.ndarray: The kept samples (empty if there are no spans).
+    """
+    if not spans:
+        return np.zeros(0, dtype=audio.dtype)
+    return np.concatenate([audio[start:end] for start, end in spans])
+
+
+def remap_timestamp(seconds: float, spans: list) -> float:
+    """
+    Map a time in the trimmed audio back to the original recording.
+
+    Args:
+        seconds (float): Time offset within the output of ``keep_spans``.
+        spans (list): The spans that were kept.
+
+    Returns:
+        float: The corresponding time in the original audio.
+    """
+    position = seconds * SAMPLE_RATE
+    offset = 0
+    for start, end in spans:
+        length = end - start
+        if position <= offset + length:
+            return (start + position - offset) / SAMPLE_RATE
+        offset += length
+    return spans[-1][1] / SAMPLE_RATE if spans else seconds
+
+
+def remap_segments(segments: list, spans: list) -> list:
+    """
+    Return Whisper segments with start/end times mapped to the original audio.
+
+    Args:
+        segments (list): Whisper result segments (dicts with ``start`` and ``end``).
+        spans (list): The spans that were kept before transcription.
+
+    Returns:
+        list: Copies of the segments with remapped timestamps.
+    """
+    return [
+        {
+            **segment,
+            "start": remap_timestamp(segment["start"], spans),
+            "end": remap_timestamp(segment["end"], spans),
+        }
+        for segment in segments
+    ]
@@ -0,0 +1,95 @@
+"""
+Durable checkpoints of pipeline stage outputs, keyed by quiz job.
+
+A job that fails in a late stage (e.g. Gemini after a long
+transcription) or whose worker is restarted is retried from the first
+stage without a checkpoint, so a retry only repeats the failed stage.
+
+Stages, in pipeline order:
+- metadata: The parts of the video metadata the later stages need
+  (title, language, duration).
+- transcript: The transcript text.
+- sections: The candidate questions per transcript section (map-reduce
+  generation only, see ``quiz_map_reduce``).
+- response: The raw Gemini response (single-call generation only, and
+  only if it holds a usable draft).
+- payload: The validated quiz payload, saved by the job runner.
+
+Checkpoints are removed once the job succeeded.
+
+Includes:
+- JobCheckpoints: Read and write the checkpoints of one job.
+- NO_CHECKPOINTS: Stand-in for pipeline runs outside a job.
+"""
+
+from quizzes_app.models import PipelineCheckpoint
+from quizzes_app.services import metrics
+
+METADATA = "metadata"
+TRANSCRIPT = "transcript"
+SECTIONS = "sections"
+RESPONSE = "response"
+PAYLOAD = "payload"
+
+
+class JobCheckpoints:
+    """
+    Checkpoints of the pipeline stages of a quiz job.
+
+    Parameters:
+        job (QuizJob): The job the stages run for.
+    """
+
+    def __init__(self, job):
+        self.job_id = job.pk
+
+    def get(self, stage: str):
+        """
+        Return the saved output of a stage and count the resume.
+
+        Args:
+            stage (str): Stage name.
+
+        Returns:
+            The saved data, or None if the stage has no checkpoint.
+        """
+        data = (
+            PipelineCheckpoint.objects.filter(job_id=self.job_id, stage=stage)
+            .values_list("data", flat=True)
+            .first()
+        )
+        if data is not None:
+            metrics.increment("checkpoint_resumed_total", stage=stage)
+        return data
+
+    def save(self, stage: str, data) -> None:
+        """
+        Save (or replace) the output of a stage.
+
+        Args:
+            stage (str): Stage name.
+            data: JSON-serializable stage output.
+        """
+        PipelineCheckpoint.objects.update_or_create(
+            job_id=self.job_id, stage=stage, defaults={"data": data}
+        )
+
+    def clear(self) -> None:
+        """Remove all checkpoints of the job."""
+        PipelineCheckpoint.objects.filter(job_id=self.job_id).delete()
+
+
+class _NoCheckpoints:
+    """Checkpoints that are never found and never saved."""
+
+    def get(self, stage: str):
+        return None
+
+    def save(self, stage: str, data) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+NO_CHECKPOINTS = _NoCheckpoints()
@@ -1,8 +1,16 @@
 """
-Custom exception for handling AI pipeline failures.
+Custom exceptions for handling AI pipeline failures.
 
-Raised when the quiz generation pipeline (stub or prod)
-encounters an unexpected error.
+- AIPipelineError: Raised when the quiz generation pipeline (stub or prod)
+  encounters an unexpected error.
+- AIModelOverloadedError: Raised when Gemini stays overloaded or rate
+  limited after all retries.
+- AIModelTimeoutError: Raised when Gemini does not answer in time after
+  all retries.
+- VideoRejectedError: Raised when a video is rejected before processing
+  (e.g. too long, live, unavailable or age-restricted).
+- PipelineOverloadedError: Raised when all pipeline slots are busy and
+  the wait queue is full (admission control).
 """
 
 from rest_framework.exceptions import APIException
@@ -20,3 +28,80 @@ class AIPipelineError(APIException):
     status_code = 502
     default_detail = "AI pipeline failed"
     default_code = "ai_pipeline_failed"
+
+
+class AIModelOverloadedError(AIPipelineError):
+    """
+    Represents a Gemini overload or rate limit that outlasted all retries.
+
+    ``wait`` (seconds) is sent to the client as Retry-After header.
+
+    Returns:
+    - HTTP 503 Service Unavailable
+    - A consistent error structure for the client
+    """
+
+    status_code = 503
+    default_detail = "AI pipeline failed: model overloaded, try again later."
+    default_code = "ai_model_overloaded"
+
+    def __init__(self, detail=None, wait=None):
+        super().__init__(detail)
+        self.wait = wait
+
+
+class AIModelTimeoutError(AIPipelineError):
+    """
+    Represents Gemini calls that timed out on every attempt.
+
+    Returns:
+    - HTTP 504 Gateway Timeout
+    - A consistent error structure for the client
+    """
+
+    status_code = 504
+    default_detail = "AI pipeline failed: model timed out, try again later."
+    default_code = "ai_model_timeout"
+
+
+class VideoRejectedError(APIException):
+    """
+    Represents a video that cannot be turned into a quiz.
+
+    Raised by the metadata preflight before any audio is downloaded.
+    The rejection reason (e.g. "too_long", "live", "unavailable",
+    "age_restricted") is available as ``reason`` and used as error code.
+
+    Returns:
+    - HTTP 422 Unprocessable Entity
+    - A consistent error structure for the client
+    """
+
+    status_code = 422
+    default_detail = "Video cannot be used for quiz generation"
+    default_code = "video_rejected"
+
+    def __init__(self, detail=None, reason="video_rejected"):
+        super().__init__(detail, code=reason)
+        self.reason = reason
+
+
+class PipelineOverloadedError(APIException):
+    """
+    Represents a request turned away by pipeline admission control.
+
+    ``wait`` (seconds) is the estimated time until a slot is free and is
+    sent to the client as Retry-After header.
+
+    Returns:
+    - HTTP 429 Too Many Requests
+    - A consistent error structure for the client
+    """
+
+    status_code = 429
+    default_detail = "Too many quizzes are being generated, try again later."
+    default_code = "pipeline_overloaded"
+
+    def __init__(self, detail=None, wait=None):
+        super().__init__(detail)
+        self.wait = wait
@@ -0,0 +1,197 @@
+"""
+Fair-share scheduling of queued quiz jobs.
+
+Workers do not simply run the oldest queued job: one user submitting
+many long videos would otherwise hold all workers while everyone else
+waits. The next job is chosen as follows:
+- Jobs waiting longer than QUIZLY_JOB_MAX_WAIT seconds go first (oldest
+  first), so nothing starves.
+- Jobs with a cached transcript (priority "cached") jump the line; they
+  skip download and Whisper.
+- Then the job of the user with the lowest recent usage: the estimated
+  cost (plus QUIZLY_JOB_BASE_COST per job) of their running jobs and of
+  the jobs started within the last QUIZLY_JOB_FAIR_SHARE_WINDOW seconds.
+- Then the cheaper job, then the older one.
+Users with QUIZLY_JOB_USER_CONCURRENCY running jobs are skipped (checked
+when claiming; concurrent workers may exceed the cap by a job or two).
+Jobs queued again after a transient failure wait until their
+``retry_at``.
+
+The cost of a job is estimated by the pipeline backend
+(``PipelineBackend.estimate``) in the estimator thread of the worker
+pool, not on the claim path: on the prod backend, seconds of audio to
+transcribe, i.e. the video duration from the metadata, or 0 for cached
+transcripts and videos with captions. Jobs not estimated yet are
+scheduled with QUIZLY_JOB_DEFAULT_COST. Metadata fetched by the estimate
+is saved as the job's metadata checkpoint, so the pipeline does not fetch
+it again. Jobs whose video is rejected by the estimate fail right away.
+
+Includes:
+- estimate_queued_jobs: Fill in the cost estimates of new queued jobs.
+- scheduled_job_ids: Return the queued job IDs in scheduling order.
+- queue_stats: Report queue depth and longest wait per priority class.
+"""
+
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, FloatField, Min, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+
+from quizzes_app.models import QuizJob
+from quizzes_app.services.checkpoints import METADATA, JobCheckpoints
+from quizzes_app.services.pipeline import get_backend
+
+logger = logging.getLogger(__name__)
+
+# Queued jobs estimated per call and considered for scheduling.
+ESTIMATE_BATCH = 20
+SCAN_LIMIT = 1000
+
+_estimate_lock = threading.Lock()
+
+
+def estimate_queued_jobs() -> int:
+    """
+    Estimate the cost of queued jobs that have no estimate yet (oldest first).
+
+    Only one thread per process estimates at a time; others skip it, so
+    workers do not probe the same videos concurrently.
+
+    Returns:
+        int: Number of jobs estimated (or failed because of a rejection).
+    """
+    if not _estimate_lock.acquire(blocking=False):
+        return 0
+    try:
+        jobs = list(
+            QuizJob.objects.filter(status=QuizJob.STATUS_QUEUED, estimated_cost__isnull=True)
+            .order_by("created_at", "id")
+            .only("id", "video_url")[:ESTIMATE_BATCH]
+        )
+        backend = get_backend() if jobs else None
+        for job in jobs:
+            _estimate_job(backend, job)
+        return len(jobs)
+    finally:
+        _estimate_lock.release()
+
+
+def scheduled_job_ids() -> list:
+    """
+    Return the IDs of the queued jobs that may run now, best first.
+
+    Returns:
+        list: Job IDs; empty if nothing is queued or all owners are at
+        their concurrency cap.
+    """
+    now = timezone.now()
+    queued = list(
+        QuizJob.objects.filter(status=QuizJob.STATUS_QUEUED)
+        .filter(Q(retry_at__isnull=True) | Q(retry_at__lte=now))
+        .order_by("created_at", "id")
+        .values("id", "owner_id", "priority", "estimated_cost", "created_at")[:SCAN_LIMIT]
+    )
+    if not queued:
+        return []
+
+    default_cost = float(getattr(settings, "QUIZLY_JOB_DEFAULT_COST", 600))
+    base_cost = float(getattr(settings, "QUIZLY_JOB_BASE_COST", 60))
+    window = float(getattr(settings, "QUIZLY_JOB_FAIR_SHARE_WINDOW", 3600))
+    max_wait = float(getattr(settings, "QUIZLY_JOB_MAX_WAIT", 1800))
+    cap = int(getattr(settings, "QUIZLY_JOB_USER_CONCURRENCY", 0))
+
+    recent = QuizJob.objects.filter(
+        Q(status=QuizJob.STATUS_RUNNING) | Q(started_at__gte=now - timedelta(seconds=window))
+    )
+    usage = dict(
+        recent.values("owner_id")
+        .annotate(
+            total=Sum(
+                Coalesce("estimated_cost", Value(default_cost)) + Value(base_cost),
+                output_field=FloatField(),
+            )
+        )
+        .values_list("owner_id", "total")
+    )
+    running = {}
+    if cap > 0:
+        running = dict(
+            QuizJob.objects.filter(status=QuizJob.STATUS_RUNNING)
+            .values("owner_id")
+            .annotate(count=Count("id"))
+            .values_list("owner_id", "count")
+        )
+
+    def order(job):
+        if max_wait and (now - job["created_at"]).total_seconds() >= max_wait:
+            return (0, 0, 0.0, 0.0, job["created_at"], job["id"])
+        cost = job["estimated_cost"] if job["estimated_cost"] is not None else default_cost
+        cached = 0 if job["priority"] == QuizJob.PRIORITY_CACHED else 1
+        return (1, cached, usage.get(job["owner_id"], 0.0), cost, job["created_at"], job["id"])
+
+    eligible = [job for job in queued if not cap or running.get(job["owner_id"], 0) < cap]
+    return [job["id"] for job in sorted(eligible, key=order)]
+
+
+def queue_stats() -> dict:
+    """
+    Report the queued jobs per priority class.
+
+    Returns:
+        dict: Priority class -> ``{"depth": int, "oldest_wait": seconds}``
+        for every class (zeros for empty classes).
+    """
+    now = timezone.now()
+    stats = {priority: {"depth": 0, "oldest_wait": 0.0} for priority, _label in QuizJob.PRIORITY_CHOICES}
+    rows = (
+        QuizJob.objects.filter(status=QuizJob.STATUS_QUEUED)
+        .values("priority")
+        .annotate(depth=Count("id"), oldest=Min("created_at"))
+    )
+    for row in rows:
+        stats[row["priority"]] = {
+            "depth": row["depth"],
+            "oldest_wait": max(0.0, (now - row["oldest"]).total_seconds()),
+        }
+    return stats
+
+
+def _estimate_job(backend, job: QuizJob) -> None:
+    try:
+        estimate = backend.estimate(job.video_url)
+    except APIException as e:
+        QuizJob.objects.filter(pk=job.pk, status=QuizJob.STATUS_QUEUED).update(
+            status=QuizJob.STATUS_FAILED,
+            error=str(e.detail),
+            finished_at=timezone.now(),
+            updated_at=timezone.now(),
+        )
+        return
+    except Exception:
+        logger.warning("Could not estimate quiz job %s", job.pk, exc_info=True)
+        estimate = {}
+
+    cost = estimate.get("cost")
+    default_cost = float(getattr(settings, "QUIZLY_JOB_DEFAULT_COST", 600))
+    if estimate.get("cached"):
+        priority = QuizJob.PRIORITY_CACHED
+    elif cost is None:
+        priority = QuizJob.PRIORITY_UNKNOWN
+    elif cost > float(getattr(settings, "QUIZLY_JOB_LONG_COST", 1200)):
+        priority = QuizJob.PRIORITY_LONG
+    else:
+        priority = QuizJob.PRIORITY_SHORT
+
+    duration = estimate.get("duration")
+    updated = QuizJob.objects.filter(pk=job.pk, status=QuizJob.STATUS_QUEUED).update(
+        priority=priority,
+        duration=int(duration) if duration is not None else None,
+        estimated_cost=float(cost) if cost is not None else default_cost,
+    )
+    if updated and estimate.get("metadata"):
+        JobCheckpoints(job).save(METADATA, estimate["metadata"])
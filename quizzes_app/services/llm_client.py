@@ -0,0 +1,184 @@
+"""
+Shared Gemini client with bounded retries.
+
+One ``genai.Client`` (and with it one pooled HTTP connection) is kept per
+process and reused by every quiz generation. Overload, rate-limit and
+timeout failures are retried with jittered exponential backoff, so a
+short Gemini hiccup does not throw away minutes of transcription work.
+
+Includes:
+- get_client: Return the process-wide Gemini client.
+- reset_client: Drop the shared client (used by tests and after settings changes).
+- generate_content: Call Gemini with per-call timeout and retries.
+- backoff_delay: Jittered exponential backoff delay for a retry attempt.
+"""
+
+import logging
+import random
+import re
+import threading
+import time
+
+import httpx
+from django.conf import settings
+from google import genai
+from google.genai import errors, types
+
+from quizzes_app.services import metrics
+from quizzes_app.services.error import (
+    AIModelOverloadedError,
+    AIModelTimeoutError,
+    AIPipelineError,
+)
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRY_DELAY_RE = re.compile(r"^([\d.]+)s$")
+
+_client = None
+_client_key = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Return the shared Gemini client of this process, creating it if needed.
+
+    The client is configured with the per-call timeout
+    (QUIZLY_GEMINI_TIMEOUT) and recreated when that setting changes.
+    The SDK's own retries are left off; ``generate_content`` retries.
+
+    Returns:
+        genai.Client: The shared client.
+    """
+    global _client, _client_key
+
+    timeout = float(getattr(settings, "QUIZLY_GEMINI_TIMEOUT", 120))
+    key = (timeout,)
+
+    with _client_lock:
+        if _client is None or _client_key != key:
+            _client = genai.Client(
+                http_options=types.HttpOptions(timeout=int(timeout * 1000))
+            )
+            _client_key = key
+        return _client
+
+
+def reset_client() -> None:
+    """Forget the shared client; the next call creates a new one."""
+    global _client, _client_key
+
+    with _client_lock:
+        _client = None
+        _client_key = None
+
+
+def backoff_delay(attempt: int, base: float = None, maximum: float = None) -> float:
+    """
+    Return the delay before retry number ``attempt`` (starting at 1).
+
+    Uses "full jitter": a random delay between 0 and
+    ``min(maximum, base * 2 ** (attempt - 1))``, which spreads retries of
+    concurrent callers instead of having them hit Gemini in lockstep.
+
+    Args:
+        attempt (int): The retry number.
+        base (float, optional): Base delay (QUIZLY_GEMINI_BACKOFF_BASE).
+        maximum (float, optional): Delay cap (QUIZLY_GEMINI_BACKOFF_MAX).
+
+    Returns:
+        float: Delay in seconds.
+    """
+    if base is None:
+        base = float(getattr(settings, "QUIZLY_GEMINI_BACKOFF_BASE", 1.0))
+    if maximum is None:
+        maximum = float(getattr(settings, "QUIZLY_GEMINI_BACKOFF_MAX", 30.0))
+    return random.uniform(0, min(maximum, base * 2 ** (attempt - 1)))
+
+
+def generate_content(prompt: str, model: str = None, config=None):
+    """
+    Call ``models.generate_content`` on the shared client with retries.
+
+    Overload (503), rate-limit (429), other 5xx responses and timeouts are
+    retried up to QUIZLY_GEMINI_MAX_ATTEMPTS attempts in total. A server
+    suggested retry delay (RetryInfo) is honoured, capped at the backoff
+    maximum. Other API errors fail immediately.
+
+    Args:
+        prompt (str): The request contents.
+        model (str, optional): Model name. Defaults to QUIZLY_GEMINI_MODEL.
+        config (types.GenerateContentConfig, optional): Request config.
+
+    Returns:
+        GenerateContentResponse: The Gemini response.
+
+    Raises:
+        AIModelOverloadedError: If Gemini is still overloaded after all retries.
+        AIModelTimeoutError: If every attempt timed out.
+        AIPipelineError: If Gemini rejects the request.
+    """
+    model = model or getattr(settings, "QUIZLY_GEMINI_MODEL", "gemini-2.5-flash")
+    attempts = max(1, int(getattr(settings, "QUIZLY_GEMINI_MAX_ATTEMPTS", 4)))
+    max_delay = float(getattr(settings, "QUIZLY_GEMINI_BACKOFF_MAX", 30.0))
+
+    for attempt in range(1, attempts + 1):
+        try:
+            response = get_client().models.generate_content(
+                model=model, contents=prompt, config=config
+            )
+        except errors.APIError as e:
+            if e.code not in RETRYABLE_STATUS_CODES:
+                metrics.increment("gemini_requests_total", outcome="rejected")
+                raise AIPipelineError(f"AI pipeline failed: model request rejected ({e.code})") from e
+            reason, error = "overloaded", e
+            suggested = _suggested_delay(e)
+        except (httpx.TimeoutException, TimeoutError) as e:
+            reason, error, suggested = "timeout", e, None
+        else:
+            metrics.increment("gemini_requests_total", outcome="ok")
+            metrics.observe("gemini_retries", attempt - 1)
+            _record_usage(response)
+            return response
+
+        if attempt == attempts:
+            break
+
+        delay = backoff_delay(attempt, maximum=max_delay)
+        if suggested is not None:
+            delay = min(max_delay, max(delay, suggested))
+        metrics.increment("gemini_retries_total", reason=reason)
+        logger.warning(
+            "Gemini call failed (%s, attempt %d/%d), retrying in %.1fs",
+            reason, attempt, attempts, delay,
+        )
+        time.sleep(delay)
+
+    metrics.increment("gemini_requests_total", outcome=reason)
+    metrics.observe("gemini_retries", attempts - 1)
+    if reason == "timeout":
+        raise AIModelTimeoutError() from error
+    raise AIModelOverloadedError(wait=_suggested_delay(error) or max_delay) from error
+
+
+def _record_usage(response) -> None:
+    """Add the token usage reported by Gemini to the pipeline metrics (total and per call)."""
+    usage = getattr(response, "usage_metadata", None)
+    for stage, field in (("prompt", "prompt_token_count"), ("output", "candidates_token_count")):
+        count = getattr(usage, field, None)
+        if isinstance(count, int):
+            metrics.increment("gemini_tokens_total", count, stage=stage)
+            metrics.observe("gemini_tokens", count, stage=stage)
+
+
+def _suggested_delay(error: errors.APIError):
+    """Return the RetryInfo delay in seconds from an API error, if any."""
+    details = error.details if isinstance(error.details, dict) else {}
+    for detail in details.get("error", {}).get("details", []) or []:
+        if isinstance(detail, dict) and detail.get("@type", "").endswith("RetryInfo"):
+            match = RETRY_DELAY_RE.match(str(detail.get("retryDelay", "")))
+            if match:
+                return float(match.group(1))
+    return None
@@ -0,0 +1,429 @@
+"""
+Lightweight in-process pipeline metrics.
+
+Counters and histograms are kept in memory per worker process and are
+cheap enough to update on every request. With QUIZLY_METRICS_DIR set,
+every process periodically writes its values to its own file in that
+directory, and ``collect`` sums the files of all processes, so the
+``/metrics`` endpoint reports the whole deployment no matter which
+worker answers it. Files are named by PID and a per-process token, so a
+reused PID never overwrites the values of an exited process; files not
+written for a while (exited processes) are merged into an archive file,
+keeping the totals monotonic and the number of files bounded.
+
+Includes:
+- increment: Increase a (labelled) counter.
+- get_counter: Read the current value of a counter.
+- observe: Record a value in a (labelled) histogram.
+- timed: Context manager that records its duration in a histogram.
+- get_histogram: Read the current state of a histogram.
+- snapshot: Return all counters as a dict.
+- reset: Clear all counters and histograms (used by tests).
+- flush: Write the values of this process to QUIZLY_METRICS_DIR.
+- collect: Return the counters and histograms of all processes.
+- render_text: Render all metrics in the Prometheus text format.
+"""
+
+import atexit
+import bisect
+import json
+import math
+import os
+import secrets
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from filelock import FileLock
+
+PREFIX = "quizly_"
+
+# Upper bounds of the histogram buckets; durations (seconds) by default.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+BUCKETS = {
+    "download_bytes": tuple(2 ** i for i in range(16, 31, 2)),  # 64 KiB .. 1 GiB
+    "audio_seconds": (30, 60, 120, 300, 600, 1200, 1800, 3600, 7200, 14400),
+    "transcript_chars": (1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000, 500000),
+    "gemini_tokens": (100, 250, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000),
+    "gemini_retries": (0, 1, 2, 3, 5, 10),
+}
+
+_lock = threading.Lock()
+# Orders the flushes of the flusher thread and request threads.
+_flush_lock = threading.Lock()
+_counters = defaultdict(float)
+_histograms = {}  # key -> [bucket counts (non-cumulative, +Inf last), sum]
+_flusher = None
+_flusher_pid = None
+# Distinguishes this process from earlier ones with the same PID.
+_token = secrets.token_hex(4)
+
+ARCHIVE_FILE = "archive.json"
+LOCK_FILE = "metrics.lock"
+# Flush intervals without a write after which a process counts as exited.
+STALE_FLUSHES = 12
+MIN_STALE_SECONDS = 60
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return (name, tuple(sorted(labels.items())))
+
+
+def increment(name: str, amount: float = 1, **labels) -> None:
+    """
+    Increase the counter ``name`` with the given labels by ``amount``.
+    """
+    with _lock:
+        _counters[_key(name, labels)] += amount
+    _ensure_flusher()
+
+
+def get_counter(name: str, **labels) -> float:
+    """
+    Return the current value of a counter (0 if it was never incremented).
+    """
+    with _lock:
+        return _counters.get(_key(name, labels), 0)
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """
+    Record ``value`` in the histogram ``name`` with the given labels.
+
+    Bucket bounds are taken from ``BUCKETS`` (``DEFAULT_BUCKETS`` for
+    durations in seconds).
+    """
+    bounds = BUCKETS.get(name, DEFAULT_BUCKETS)
+    index = bisect.bisect_left(bounds, value)
+    key = _key(name, labels)
+    with _lock:
+        entry = _histograms.get(key)
+        if entry is None:
+            entry = _histograms[key] = [[0] * (len(bounds) + 1), 0.0]
+        entry[0][index] += 1
+        entry[1] += value
+    _ensure_flusher()
+
+
+@contextmanager
+def timed(name: str, **labels):
+    """
+    Record the duration of the ``with`` block (in seconds) in a histogram.
+
+    The duration is recorded even if the block raises.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def get_histogram(name: str, **labels) -> dict:
+    """
+    Return the state of a histogram of this process.
+
+    Returns:
+        dict: ``count``, ``sum`` and ``buckets`` (cumulative counts keyed
+        by upper bound, ``math.inf`` last).
+    """
+    bounds = BUCKETS.get(name, DEFAULT_BUCKETS)
+    with _lock:
+        counts, total = _histograms.get(_key(name, labels), [[0] * (len(bounds) + 1), 0.0])
+        counts = list(counts)
+    return _histogram_state(bounds, counts, total)
+
+
+def snapshot() -> dict:
+    """
+    Return a copy of all counters keyed by ``(name, labels)``.
+    """
+    with _lock:
+        return dict(_counters)
+
+
+def reset() -> None:
+    """Clear all counters and histograms."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def metrics_dir() -> str:
+    """Return the shared metrics directory, or "" if metrics are per process."""
+    return getattr(settings, "QUIZLY_METRICS_DIR", "")
+
+
+def flush() -> None:
+    """
+    Write the counters and histograms of this process to QUIZLY_METRICS_DIR.
+
+    The file is replaced atomically, so readers never see partial data.
+    Does nothing without a metrics directory.
+    """
+    directory = metrics_dir()
+    if not directory:
+        return
+
+    # Held across the snapshot and the write, so an older snapshot never
+    # replaces a newer one.
+    with _flush_lock:
+        with _lock:
+            data = _serialize(_counters, _histograms)
+
+        os.makedirs(directory, exist_ok=True)
+        _write_file(os.path.join(directory, _process_filename()), data)
+
+
+def collect() -> tuple:
+    """
+    Return the counters and histograms of all worker processes.
+
+    With QUIZLY_METRICS_DIR, this process is flushed first and the files
+    of all processes are summed. Files of exited processes (not written
+    for STALE_FLUSHES flush intervals) are merged into the archive file
+    and removed; their counts remain part of the totals. Otherwise only
+    this process is reported.
+
+    Returns:
+        tuple: ``(counters, histograms)``; counters map ``(name, labels)``
+        to a value, histograms map ``(name, labels)`` to
+        ``[bucket counts, sum]``.
+    """
+    directory = metrics_dir()
+    if not directory:
+        with _lock:
+            return (
+                dict(_counters),
+                {key: [list(counts), total] for key, (counts, total) in _histograms.items()},
+            )
+
+    flush()
+    own = _process_filename()
+    interval = float(getattr(settings, "QUIZLY_METRICS_FLUSH_INTERVAL", 5))
+    cutoff = time.time() - max(MIN_STALE_SECONDS, STALE_FLUSHES * interval)
+    archive_path = os.path.join(directory, ARCHIVE_FILE)
+
+    # Readers take the lock too, so they never see a file both in the
+    # archive and on its own (or in neither).
+    with FileLock(os.path.join(directory, LOCK_FILE), thread_local=False):
+        archive = _read_file(archive_path) or {}
+        merged = set(archive.get("merged", ()))
+        archived_counters = defaultdict(float)
+        archived_histograms = {}
+        _add(archived_counters, archived_histograms, archive)
+
+        live = []
+        exited = []
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith(".json") or filename == ARCHIVE_FILE or filename in merged:
+                continue
+            path = os.path.join(directory, filename)
+            data = _read_file(path)
+            if data is None:
+                continue
+            try:
+                stale = filename != own and os.path.getmtime(path) < cutoff
+            except OSError:
+                continue
+            if stale:
+                _add(archived_counters, archived_histograms, data)
+                exited.append(filename)
+            else:
+                live.append(data)
+
+        if exited:
+            # The archive lists the merged files until they are removed,
+            # so a crash in between cannot count them twice.
+            merged.update(exited)
+            archive = {**_serialize(archived_counters, archived_histograms), "merged": sorted(merged)}
+            _write_file(archive_path, archive)
+        if merged:
+            for filename in list(merged):
+                try:
+                    os.remove(os.path.join(directory, filename))
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    continue
+                merged.discard(filename)
+            archive["merged"] = sorted(merged)
+            _write_file(archive_path, archive)
+
+    counters = archived_counters
+    histograms = archived_histograms
+    for data in live:
+        _add(counters, histograms, data)
+    return dict(counters), histograms
+
+
+def _process_filename() -> str:
+    return f"{os.getpid()}-{_token}.json"
+
+
+def _serialize(counters, histograms) -> dict:
+    return {
+        "counters": [[name, dict(labels), value] for (name, labels), value in counters.items()],
+        "histograms": [
+            [name, dict(labels), list(counts), total]
+            for (name, labels), (counts, total) in histograms.items()
+        ],
+    }
+
+
+def _add(counters, histograms, data: dict) -> None:
+    """Add the values of a metrics file to ``counters`` and ``histograms``."""
+    for name, labels, value in data.get("counters", []):
+        counters[_key(name, labels)] += value
+    for name, labels, counts, total in data.get("histograms", []):
+        key = _key(name, labels)
+        entry = histograms.get(key)
+        if entry is None or len(entry[0]) != len(counts):
+            histograms[key] = [list(counts), total]
+        else:
+            entry[0] = [a + b for a, b in zip(entry[0], counts)]
+            entry[1] += total
+
+
+def _read_file(path: str):
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _write_file(path: str, data: dict) -> None:
+    """Replace a metrics file atomically, so readers never see partial data."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def render_text(gauges=None) -> str:
+    """
+    Render all metrics in the Prometheus text exposition format.
+
+    Metric names are prefixed with ``quizly_``.
+
+    Args:
+        gauges (list, optional): ``(name, labels, value)`` triples of
+            values read at scrape time (e.g. from the database).
+
+    Returns:
+        str: The exposition text.
+    """
+    counters, histograms = collect()
+    lines = []
+
+    for name in sorted({name for name, _labels in counters}):
+        lines.append(f"# TYPE {PREFIX}{name} counter")
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"{PREFIX}{name}{_format_labels(labels)} {_format_value(value)}")
+
+    gauge_values = {_key(name, labels): value for name, labels, value in gauges or ()}
+    for name in sorted({name for name, _labels in gauge_values}):
+        lines.append(f"# TYPE {PREFIX}{name} gauge")
+        for (metric, labels), value in sorted(gauge_values.items()):
+            if metric == name:
+                lines.append(f"{PREFIX}{name}{_format_labels(labels)} {_format_value(value)}")
+
+    for name in sorted({name for name, _labels in histograms}):
+        bounds = BUCKETS.get(name, DEFAULT_BUCKETS)
+        lines.append(f"# TYPE {PREFIX}{name} histogram")
+        for (metric, labels), (counts, total) in sorted(histograms.items()):
+            if metric != name or len(counts) != len(bounds) + 1:
+                continue
+            state = _histogram_state(bounds, counts, total)
+            for bound, count in state["buckets"].items():
+                le = "+Inf" if bound == math.inf else _format_value(bound)
+                bucket_labels = labels + (("le", le),)
+                lines.append(f"{PREFIX}{name}_bucket{_format_labels(bucket_labels)} {count}")
+            lines.append(f"{PREFIX}{name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{PREFIX}{name}_count{_format_labels(labels)} {state['count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+def _histogram_state(bounds, counts, total) -> dict:
+    cumulative = {}
+    running = 0
+    for bound, count in zip(tuple(bounds) + (math.inf,), counts):
+        running += count
+        cumulative[bound] = running
+    return {"count": running, "sum": total, "buckets": cumulative}
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for name, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _ensure_flusher() -> None:
+    """Start the background flush thread of this process (once per process)."""
+    global _flusher, _flusher_pid
+
+    if _flusher_pid == os.getpid() or not metrics_dir():
+        return
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher = threading.Thread(target=_flush_loop, name="quizly-metrics", daemon=True)
+        _flusher_pid = os.getpid()
+    _flusher.start()
+
+
+def _flush_loop() -> None:
+    interval = float(getattr(settings, "QUIZLY_METRICS_FLUSH_INTERVAL", 5))
+    while True:
+        time.sleep(interval)
+        try:
+            flush()
+        except OSError:
+            pass
+
+
+def _after_fork_in_child() -> None:
+    # Values inherited from the parent are reported by the parent's file.
+    global _lock, _flush_lock, _flusher, _flusher_pid, _token
+
+    _lock = threading.Lock()
+    _flush_lock = threading.Lock()
+    _token = secrets.token_hex(4)
+    _counters.clear()
+    _histograms.clear()
+    _flusher = None
+    _flusher_pid = None
+
+
+def _flush_at_exit() -> None:
+    try:
+        flush()
+    except Exception:
+        pass
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+atexit.register(_flush_at_exit)
@@ -0,0 +1,131 @@
+"""
+Negative cache of rejected videos.
+
+A private, deleted, live, age-restricted or over-length video fails the
+metadata preflight only after network round trips to YouTube. Its
+rejection is remembered per video ID, so repeat submissions fail right
+away with the original reason and message:
+- in the database (RejectedVideo), shared by all processes, and
+- in a small in-process memo, so a repeat in the same process does not
+  even query the database.
+
+Entries expire after a per-reason TTL (QUIZLY_NEGATIVE_CACHE_TTLS);
+reasons without a TTL are not cached.
+
+Includes:
+- get_rejection: Return the cached rejection of a video, if any.
+- store_rejection: Remember a rejection.
+- clear: Drop the in-process memo.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from quizzes_app.models import RejectedVideo
+from quizzes_app.services import metrics
+from quizzes_app.services.error import VideoRejectedError
+
+# Videos remembered per process.
+MEMO_SIZE = 1024
+
+DEFAULT_TTLS = {
+    "unavailable": 600,
+    "live": 300,
+    "age_restricted": 86400,
+    "too_long": 86400,
+}
+
+_memo = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_rejection(video_id: str):
+    """
+    Return the cached rejection of a video, if present and not expired.
+
+    Hits are counted in ``negative_cache_hits_total`` per reason and
+    layer (memory or database), misses in ``negative_cache_misses_total``.
+
+    Args:
+        video_id (str): YouTube video ID.
+
+    Returns:
+        VideoRejectedError | None: A new error with the original reason and
+        message, or None if the video is not known to be rejected.
+    """
+    if not video_id:
+        return None
+
+    now = time.time()
+    with _lock:
+        entry = _memo.get(video_id)
+        if entry is not None and entry[0] <= now:
+            del _memo[video_id]
+            entry = None
+    if entry is not None:
+        _expires, reason, detail = entry
+        metrics.increment("negative_cache_hits_total", reason=reason, layer="memory")
+        return VideoRejectedError(detail, reason=reason)
+
+    row = (
+        RejectedVideo.objects.filter(video_id=video_id, expires_at__gt=timezone.now())
+        .values("id", "reason", "detail", "expires_at")
+        .first()
+    )
+    if row is None:
+        metrics.increment("negative_cache_misses_total")
+        return None
+
+    RejectedVideo.objects.filter(pk=row["id"]).update(hits=F("hits") + 1)
+    _remember(video_id, row["expires_at"].timestamp(), row["reason"], row["detail"])
+    metrics.increment("negative_cache_hits_total", reason=row["reason"], layer="database")
+    return VideoRejectedError(row["detail"], reason=row["reason"])
+
+
+def store_rejection(video_id: str, error: VideoRejectedError) -> None:
+    """
+    Remember the rejection of a video for the TTL of its reason.
+
+    Expired entries are removed at the same time.
+
+    Args:
+        video_id (str): YouTube video ID.
+        error (VideoRejectedError): The rejection raised by the preflight.
+    """
+    ttl = _ttls().get(error.reason, 0)
+    if not video_id or ttl <= 0:
+        return
+
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=ttl)
+    detail = str(error.detail)
+    RejectedVideo.objects.filter(expires_at__lte=now).delete()
+    RejectedVideo.objects.update_or_create(
+        video_id=video_id,
+        defaults={"reason": error.reason, "detail": detail, "expires_at": expires_at, "hits": 0},
+    )
+    _remember(video_id, expires_at.timestamp(), error.reason, detail)
+
+
+def clear() -> None:
+    """Drop the in-process memo (the database entries stay)."""
+    with _lock:
+        _memo.clear()
+
+
+def _ttls() -> dict:
+    return {**DEFAULT_TTLS, **getattr(settings, "QUIZLY_NEGATIVE_CACHE_TTLS", {})}
+
+
+def _remember(video_id: str, expires: float, reason: str, detail: str) -> None:
+    with _lock:
+        _memo[video_id] = (expires, reason, detail)
+        _memo.move_to_end(video_id)
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
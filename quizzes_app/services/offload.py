@@ -0,0 +1,73 @@
+"""
+Bounded executor for blocking pipeline stages called from async code.
+
+Network-bound stages (yt-dlp metadata and downloads, caption fetches,
+Gemini calls) are plain blocking functions. The async pipeline runs
+them on one shared thread pool, so the event loop stays free and the
+number of concurrent blocking calls per process is capped
+(QUIZLY_ASYNC_IO_THREADS). CPU-bound Whisper work does not belong here;
+it runs in the transcription process pool.
+
+Includes:
+- get_io_executor: Return the shared I/O thread pool of this process.
+- run_io: Await a blocking call on the I/O thread pool.
+- shutdown_io_executor: Shut down the shared I/O thread pool.
+"""
+
+import asyncio
+import atexit
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+_executor = None
+_executor_size = None
+_executor_lock = threading.Lock()
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """
+    Return the shared I/O thread pool, creating it if needed.
+
+    The pool is recreated when QUIZLY_ASYNC_IO_THREADS changes.
+    """
+    global _executor, _executor_size
+
+    size = max(1, int(getattr(settings, "QUIZLY_ASYNC_IO_THREADS", 32)))
+    with _executor_lock:
+        if _executor is None or _executor_size != size:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="quizly-io")
+            _executor_size = size
+        return _executor
+
+
+async def run_io(fn, *args, **kwargs):
+    """
+    Run ``fn(*args, **kwargs)`` on the I/O thread pool and await its result.
+
+    Context variables (e.g. active settings overrides) are copied into
+    the worker thread. Calls beyond the pool size wait in its queue
+    without blocking the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return await loop.run_in_executor(get_io_executor(), call)
+
+
+def shutdown_io_executor() -> None:
+    """Shut down the shared I/O thread pool (if any)."""
+    global _executor, _executor_size
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+        _executor = None
+        _executor_size = None
+
+
+atexit.register(shutdown_io_executor)
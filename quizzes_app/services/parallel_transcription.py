@@ -0,0 +1,215 @@
+"""
+Chunked, parallel Whisper transcription for long audio.
+
+Long audio is split at silence into overlapping chunks, which are
+transcribed concurrently by a pool of worker processes. Each worker
+loads the Whisper model once when it starts and keeps it for all later
+chunks. The chunk texts are stitched back together with the duplicated
+overlap words removed.
+
+Includes:
+- worker_count: Number of transcription worker processes (QUIZLY_TRANSCRIBE_WORKERS).
+- transcribe_chunked: Transcribe an audio array via the process pool.
+- atranscribe_chunked: Async variant that awaits the chunks without blocking.
+- merge_chunk_texts: Join chunk texts and drop duplicated overlap words.
+- get_pool / warmup_pool / shutdown_pool: Manage the shared process pool.
+"""
+
+import asyncio
+import atexit
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+
+from quizzes_app.services.audio import split_at_silence
+
+WORD_RE = re.compile(r"[\w']+")
+
+_worker_model = None
+_pool = None
+_pool_key = None
+_pool_lock = threading.Lock()
+
+
+def worker_count() -> int:
+    """
+    Return the configured number of transcription processes.
+
+    QUIZLY_TRANSCRIBE_WORKERS = 0 means one process per CPU core.
+    """
+    workers = int(getattr(settings, "QUIZLY_TRANSCRIBE_WORKERS", 1))
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def _init_worker(model_name: str, threads: int) -> None:
+    """Load the Whisper model once per worker process."""
+    global _worker_model
+    import torch
+    import whisper
+
+    torch.set_num_threads(threads)
+    _worker_model = whisper.load_model(model_name)
+
+
+def _transcribe_chunk(chunk, language) -> str:
+    options = {"language": language} if language else {}
+    return _worker_model.transcribe(chunk, **options)["text"]
+
+
+def _worker_pid(_index: int) -> int:
+    return os.getpid()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """
+    Return the shared transcription process pool, creating it if needed.
+
+    The pool is recreated when the model name or worker count changes.
+    Workers use the "spawn" start method, which is safe with PyTorch.
+    """
+    global _pool, _pool_key
+
+    model_name = getattr(settings, "QUIZLY_WHISPER_MODEL", "base")
+    workers = worker_count()
+    key = (model_name, workers)
+
+    with _pool_lock:
+        if _pool is not None and _pool_key == key:
+            return _pool
+
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_name, threads),
+        )
+        _pool_key = key
+        return _pool
+
+
+def warmup_pool() -> int:
+    """
+    Start all worker processes so their models are loaded before the first chunk.
+
+    Returns:
+        int: Number of distinct warmed worker processes.
+    """
+    pool = get_pool()
+    pids = pool.map(_worker_pid, range(worker_count()))
+    return len(set(pids))
+
+
+def shutdown_pool() -> None:
+    """Shut down the shared process pool (if any)."""
+    global _pool, _pool_key
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        _pool_key = None
+
+
+atexit.register(shutdown_pool)
+
+
+def transcribe_chunked(audio, language: str = None, progress=None) -> str:
+    """
+    Transcribe a long audio array in parallel chunks.
+
+    Args:
+        audio (np.ndarray): 16 kHz mono samples.
+        language (str, optional): Spoken language, None for auto-detection.
+        progress (callable, optional): Called as ``progress(fraction)``
+            whenever a chunk is done.
+
+    Returns:
+        str: The stitched transcript text.
+    """
+    chunk_seconds = getattr(settings, "QUIZLY_TRANSCRIBE_CHUNK_SECONDS", 120)
+    overlap_seconds = getattr(settings, "QUIZLY_TRANSCRIBE_CHUNK_OVERLAP", 1.0)
+
+    bounds = split_at_silence(audio, chunk_seconds, overlap_seconds)
+    chunks = [audio[start:end] for start, end in bounds]
+
+    pool = get_pool()
+    futures = [pool.submit(_transcribe_chunk, chunk, language) for chunk in chunks]
+    if progress is not None:
+        for done, _future in enumerate(as_completed(futures), start=1):
+            progress(done / len(futures))
+    return merge_chunk_texts([future.result() for future in futures])
+
+
+async def atranscribe_chunked(audio, language: str = None) -> str:
+    """
+    Transcribe an audio array in chunks, awaiting the process pool.
+
+    Like ``transcribe_chunked``, but the caller's event loop stays free
+    while the worker processes run. Audio shorter than one chunk is sent
+    to the pool as a whole, so Whisper always runs outside the server
+    process.
+
+    Args:
+        audio (np.ndarray): 16 kHz mono samples.
+        language (str, optional): Spoken language, None for auto-detection.
+
+    Returns:
+        str: The stitched transcript text.
+    """
+    chunk_seconds = getattr(settings, "QUIZLY_TRANSCRIBE_CHUNK_SECONDS", 120)
+    overlap_seconds = getattr(settings, "QUIZLY_TRANSCRIBE_CHUNK_OVERLAP", 1.0)
+
+    bounds = split_at_silence(audio, chunk_seconds, overlap_seconds)
+    pool = get_pool()
+    futures = [
+        asyncio.wrap_future(pool.submit(_transcribe_chunk, audio[start:end], language))
+        for start, end in bounds
+    ]
+    return merge_chunk_texts(await asyncio.gather(*futures))
+
+
+def merge_chunk_texts(texts, max_overlap_words: int = 30) -> str:
+    """
+    Join chunk transcripts, dropping words repeated across the overlap.
+
+    The longest run (at least two words) that ends chunk ``n`` and starts
+    chunk ``n + 1`` is kept only once. Words are compared case- and
+    punctuation-insensitively.
+
+    Args:
+        texts (list): Chunk transcripts in order.
+        max_overlap_words (int): Longest overlap that is searched for.
+
+    Returns:
+        str: The merged transcript.
+    """
+    merged = []
+    for text in texts:
+        words = text.split()
+        if merged and words:
+            words = words[_overlap_length(merged, words, max_overlap_words):]
+        merged.extend(words)
+    return " ".join(merged)
+
+
+def _normalize(word: str) -> str:
+    return "".join(WORD_RE.findall(word.lower()))
+
+
+def _overlap_length(previous: list, words: list, max_words: int) -> int:
+    tail = [_normalize(w) for w in previous[-max_words:]]
+    head = [_normalize(w) for w in words[:max_words]]
+    for k in range(min(len(tail), len(head)), 1, -1):
+        if tail[-k:] == head[:k]:
+            return k
+    return 0
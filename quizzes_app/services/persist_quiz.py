@@ -4,14 +4,16 @@ Utility functions for persisting quizzes generated by the AI pipeline.
 Includes:
 - persist_quiz: Saves a quiz and associated questions atomically.
 - validate_payload: Ensures AI payload integrity (10 questions, 4 options each, valid answers).
+- find_invalid_questions: Lists every question slot that breaks these rules.
 """
 
 from django.db import transaction
 from quizzes_app.models import Quiz, Question
+from quizzes_app.services import metrics
 from quizzes_app.services.error import AIPipelineError
+from quizzes_app.services.quiz_schema import OPTION_COUNT, QUESTION_COUNT
 
 
-@transaction.atomic
 def persist_quiz(*, owner, video_url: str, payload: dict) -> Quiz:
     """
     Persist a quiz and its questions into the database.
@@ -31,22 +33,24 @@ def persist_quiz(*, owner, video_url: str, payload: dict) -> Quiz:
     """
     validate_payload(payload)
 
-    quiz = Quiz.objects.create(
-        owner=owner,
-        video_url=video_url,
-        title=payload["title"],
-        description=payload.get("description", "")
-    )
-
-    Question.objects.bulk_create([
-        Question(
-            quiz=quiz,
-            question_title=q["question_title"],
-            question_options=q["question_options"],
-            answer=q["answer"],
+    # Timed including the commit (pipeline_stage_seconds, stage "persist").
+    with metrics.timed("pipeline_stage_seconds", stage="persist"), transaction.atomic():
+        quiz = Quiz.objects.create(
+            owner=owner,
+            video_url=video_url,
+            title=payload["title"],
+            description=payload.get("description", "")
         )
-        for q in payload["questions"]
-    ])
+
+        Question.objects.bulk_create([
+            Question(
+                quiz=quiz,
+                question_title=q["question_title"],
+                question_options=q["question_options"],
+                answer=q["answer"],
+            )
+            for q in payload["questions"]
+        ])
 
     return quiz
 
@@ -65,17 +69,44 @@ def validate_payload(payload: dict):
     """
     questions = payload.get("questions", [])
 
-    if len(questions) != 10:
+    if len(questions) != QUESTION_COUNT:
         raise AIPipelineError("AI pipeline failed: expected 10 questions")
 
-    for i, q in enumerate(questions, start=1):
-        options = q.get("question_options", [])
-        if len(options) != 4:
-            raise AIPipelineError(
-                f"AI pipeline failed: question {i} has {len(options)} options"
-            )
+    problems = find_invalid_questions(payload)
+    if problems:
+        raise AIPipelineError(f"AI pipeline failed: {problems[0][1]}")
 
-        if q.get("answer") not in options:
-            raise AIPipelineError(
-                f"AI pipeline failed: invalid answer in question {i}"
-            )
+
+def find_invalid_questions(payload: dict) -> list:
+    """
+    Return every question slot of the payload that breaks the quiz rules.
+
+    Slots beyond the available questions (up to 10) are reported as
+    missing; surplus questions are ignored.
+
+    Parameters:
+        payload (dict): The quiz data from the pipeline.
+
+    Returns:
+        list: ``(index, reason)`` tuples with 0-based question indices, in order.
+    """
+    questions = payload.get("questions") or []
+    problems = []
+
+    for i in range(QUESTION_COUNT):
+        if i >= len(questions):
+            problems.append((i, f"question {i + 1} is missing"))
+            continue
+
+        q = questions[i]
+        if not isinstance(q, dict) or not isinstance(q.get("question_title"), str):
+            problems.append((i, f"question {i + 1} is malformed"))
+            continue
+
+        options = q.get("question_options") or []
+        if len(options) != OPTION_COUNT:
+            problems.append((i, f"question {i + 1} has {len(options)} options"))
+        elif q.get("answer") not in options:
+            problems.append((i, f"invalid answer in question {i + 1}"))
+
+    return problems
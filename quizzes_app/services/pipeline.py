@@ -0,0 +1,217 @@
+"""
+Entry point to the quiz generation pipeline selected by QUIZLY_PIPELINE_MODE.
+
+QUIZLY_PIPELINE_BACKENDS maps backend names to the dotted paths of their
+classes (see ``pipeline_backends``); QUIZLY_PIPELINE_MODE picks one.
+Backends import their heavy libraries (Whisper, torch, yt-dlp, the
+Gemini SDK) only when they build a quiz or are warmed up, so web workers
+that serve CRUD requests, management commands and the stub mode start
+without them.
+
+With QUIZLY_PIPELINE_WARMUP, the backend is warmed up when a server or
+job worker process starts (``warmup_process``, called by ``core.wsgi``,
+``core.asgi`` and ``run_quiz_workers``), not by other management
+commands; ``manage.py warmup_pipeline`` runs the same steps on demand.
+
+Every run is subject to admission control (see ``admission``): with
+QUIZLY_PIPELINE_CONCURRENCY or QUIZLY_PIPELINE_HOST_CONCURRENCY set,
+requests beyond the limit wait in a bounded queue or get a 429.
+
+Includes:
+- pipeline_mode: Return the configured pipeline mode.
+- get_backend: Return the (shared) backend instance for a mode.
+- build_quiz: Build a quiz payload with the configured pipeline.
+- abuild_quiz: Async variant of build_quiz for ASGI views.
+- warmup: Run the warmup steps of a backend.
+- warmup_process: Warm up a server or worker process at startup.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+from quizzes_app.services import offload
+from quizzes_app.services.admission import admission
+from quizzes_app.services.youtube import video_id_from_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKENDS = {
+    "stub": "quizzes_app.services.pipeline_backends.StubBackend",
+    "prod": "quizzes_app.services.pipeline_backends.ProdBackend",
+    "captions": "quizzes_app.services.pipeline_backends.CaptionsBackend",
+    "replay": "quizzes_app.services.pipeline_backends.ReplayBackend",
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def pipeline_mode() -> str:
+    """Return QUIZLY_PIPELINE_MODE (the name of the active backend)."""
+    return getattr(settings, "QUIZLY_PIPELINE_MODE", "stub")
+
+
+def get_backend(name: str = None):
+    """
+    Return the backend registered under ``name``.
+
+    Instances are created once per process and shared, so warmed caches
+    are kept for later requests.
+
+    Args:
+        name (str, optional): Backend name, defaults to QUIZLY_PIPELINE_MODE.
+
+    Returns:
+        PipelineBackend: The backend.
+
+    Raises:
+        ImproperlyConfigured: If no backend is registered under ``name``.
+    """
+    name = name or pipeline_mode()
+    backends = getattr(settings, "QUIZLY_PIPELINE_BACKENDS", DEFAULT_BACKENDS)
+    path = backends.get(name)
+    if path is None:
+        raise ImproperlyConfigured(
+            f"Unknown pipeline backend {name!r} (available: {', '.join(sorted(backends))})."
+        )
+
+    with _backends_lock:
+        backend = _backends.get((name, path))
+        if backend is None:
+            backend = _backends[(name, path)] = import_string(path)()
+        return backend
+
+
+def build_quiz(video_url: str, progress=None, bounded: bool = True, checkpoints=None) -> dict:
+    """
+    Build a quiz payload for a video with the configured pipeline.
+
+    Args:
+        video_url (str): The normalized YouTube URL.
+        progress (callable, optional): Called as ``progress(stage, percent)``.
+        bounded (bool): Reject the run with 429 when the pipeline is
+            saturated; False waits for a slot (background jobs).
+        checkpoints (JobCheckpoints, optional): Stage checkpoints of a job,
+            used by backends that can resume (``PipelineBackend.resumes``).
+
+    Returns:
+        dict: Parsed quiz payload.
+
+    Raises:
+        PipelineOverloadedError: If admission control rejects the run.
+    """
+    backend = get_backend()
+    with admission.admit(key=_admission_key(backend, video_url), bounded=bounded, stages=backend.stages):
+        if backend.resumes and checkpoints is not None:
+            return backend.build(video_url, progress=progress, checkpoints=checkpoints)
+        return backend.build(video_url, progress=progress)
+
+
+async def abuild_quiz(video_url: str) -> dict:
+    """
+    Async variant of ``build_quiz`` (see ``abuild_quiz_prod``).
+
+    Waiting for a pipeline slot happens on the I/O thread pool, so it
+    does not block the event loop. If the request is cancelled while it
+    waits, the slot is released as soon as the pool thread gets it.
+
+    Args:
+        video_url (str): The normalized YouTube URL.
+
+    Returns:
+        dict: Parsed quiz payload.
+
+    Raises:
+        PipelineOverloadedError: If admission control rejects the run.
+    """
+    backend = get_backend()
+    acquiring = asyncio.ensure_future(
+        offload.run_io(admission.acquire, key=_admission_key(backend, video_url), stages=backend.stages)
+    )
+    try:
+        # Shielded: cancelling the request must not abandon a slot the
+        # pool thread acquires afterwards.
+        ticket = await asyncio.shield(acquiring)
+    except asyncio.CancelledError:
+        acquiring.add_done_callback(_release_acquired)
+        raise
+    try:
+        return await backend.abuild(video_url)
+    finally:
+        admission.release(ticket)
+
+
+def _release_acquired(acquiring) -> None:
+    """Release the ticket of an acquisition whose caller was cancelled."""
+    if not acquiring.cancelled() and acquiring.exception() is None:
+        admission.release(acquiring.result())
+
+
+def warmup(name: str = None, raise_errors: bool = False) -> list:
+    """
+    Run the warmup steps of a backend in this process.
+
+    A failing step is logged and does not stop the others, so a missing
+    model or API key does not keep a worker from serving other requests.
+
+    Args:
+        name (str, optional): Backend name, defaults to QUIZLY_PIPELINE_MODE.
+        raise_errors (bool): Re-raise the first error after all steps ran.
+
+    Returns:
+        list: ``(step, seconds, error)`` per step; ``error`` is None on success.
+    """
+    backend = get_backend(name)
+    results = []
+    first_error = None
+
+    for step, run in backend.warmup_steps():
+        start = time.perf_counter()
+        try:
+            run()
+            error = None
+        except Exception as e:
+            logger.warning("Pipeline warmup step %s/%s failed: %s", backend.name, step, e)
+            error = e
+            first_error = first_error or e
+        results.append((step, time.perf_counter() - start, error))
+
+    if raise_errors and first_error is not None:
+        raise first_error
+    return results
+
+
+def warmup_process() -> None:
+    """
+    Warm up the active backend (QUIZLY_PIPELINE_WARMUP), so the first quiz
+    of this server or worker process is as fast as the following ones.
+
+    Without warmup, the Whisper models listed in QUIZLY_WHISPER_PRELOAD
+    are still preloaded when the production pipeline is active.
+    """
+    if getattr(settings, "QUIZLY_PIPELINE_WARMUP", False):
+        warmup()
+        return
+
+    if pipeline_mode() != "prod" or not getattr(settings, "QUIZLY_WHISPER_PRELOAD", []):
+        return
+
+    from quizzes_app.services.whisper_models import preload_models
+    preload_models()
+
+
+def _admission_key(backend, video_url: str):
+    """Return the admission key of a run: the video ID if the backend coalesces runs."""
+    return (video_id_from_url(video_url) or None) if backend.coalesces else None
+
+
+def reset_backends() -> None:
+    """Drop the shared backend instances (used by tests)."""
+    with _backends_lock:
+        _backends.clear()
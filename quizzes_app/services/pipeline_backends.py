@@ -0,0 +1,303 @@
+"""
+Quiz generation pipeline backends.
+
+A backend builds a quiz payload for a video URL. It declares the stages
+it runs (as reported to progress callbacks) and the warmup steps that
+load its models, clients and caches, so the first quiz of a process is
+as fast as the following ones. Backends are registered by name in
+QUIZLY_PIPELINE_BACKENDS and selected with QUIZLY_PIPELINE_MODE (see
+``quizzes_app.services.pipeline``).
+
+Heavy libraries are imported inside the methods, so selecting a backend
+does not load them; running its warmup does.
+
+Includes:
+- PipelineBackend: Base class of all backends.
+- StubBackend: Static quiz without external services ("stub").
+- ProdBackend: Whisper / captions and Gemini ("prod").
+- CaptionsBackend: YouTube captions and Gemini, no Whisper ("captions").
+- ReplayBackend: Recorded quiz payloads from QUIZLY_REPLAY_DIR ("replay").
+"""
+
+import copy
+import json
+import os
+import threading
+
+from django.conf import settings
+
+from quizzes_app.services import metrics, offload
+from quizzes_app.services.error import AIPipelineError, VideoRejectedError
+from quizzes_app.services.quiz_pipeline_stub import abuild_quiz_stub, build_quiz_stub
+from quizzes_app.services.youtube import video_id_from_url
+
+
+class PipelineBackend:
+    """
+    Base class of the pipeline backends.
+
+    Attributes:
+        name (str): Name the backend is registered under.
+        stages (tuple): Stages reported to ``progress(stage, percent)``, in order.
+        coalesces (bool): Concurrent runs for the same video share one run,
+            so admission control does not give them their own slot.
+        resumes (bool): ``build`` accepts the ``checkpoints`` of a job and
+            resumes a retried job at its first incomplete stage.
+    """
+
+    name = ""
+    stages = ()
+    coalesces = False
+    resumes = False
+
+    def build(self, video_url: str, progress=None) -> dict:
+        """
+        Build a quiz payload for a video.
+
+        Backends with ``resumes`` also accept ``checkpoints``
+        (``JobCheckpoints``) when called for a job.
+
+        Args:
+            video_url (str): The normalized YouTube URL.
+            progress (callable, optional): Called as ``progress(stage, percent)``.
+
+        Returns:
+            dict: Parsed quiz payload.
+        """
+        raise NotImplementedError
+
+    async def abuild(self, video_url: str) -> dict:
+        """
+        Async variant of ``build``; runs it on the I/O thread pool by default.
+        """
+        return await offload.run_io(self.build, video_url)
+
+    def estimate(self, video_url: str) -> dict:
+        """
+        Estimate the cost of a quiz for the job scheduler.
+
+        Args:
+            video_url (str): The normalized YouTube URL.
+
+        Returns:
+            dict: ``cached`` (bool), ``duration`` (seconds or None) and
+            ``cost`` (seconds of audio to transcribe, None if unknown);
+            optionally ``metadata``, saved as the job's metadata
+            checkpoint for ``build`` to reuse.
+
+        Raises:
+            APIException: If the video will be rejected anyway.
+        """
+        return {"cached": False, "duration": None, "cost": None}
+
+    def warmup_steps(self) -> list:
+        """
+        Return the warmup steps of this backend.
+
+        Returns:
+            list: ``(name, callable)`` pairs, run in order.
+        """
+        return []
+
+
+class StubBackend(PipelineBackend):
+    name = "stub"
+    stages = ("generate",)
+
+    def build(self, video_url: str, progress=None) -> dict:
+        return build_quiz_stub(video_url, progress=progress)
+
+    async def abuild(self, video_url: str) -> dict:
+        return await abuild_quiz_stub(video_url)
+
+
+class ProdBackend(PipelineBackend):
+    """
+    The production pipeline (``quiz_pipeline_prod``).
+
+    Warmup imports the pipeline and loads the Whisper models
+    (QUIZLY_WHISPER_PRELOAD, or QUIZLY_WHISPER_MODEL), the transcription
+    process pool, the tokenizer, the Gemini client and yt-dlp's
+    YouTube extractor.
+    """
+
+    name = "prod"
+    stages = ("preflight", "captions", "download", "transcribe", "generate")
+    coalesces = True
+    resumes = True
+
+    def build(self, video_url: str, progress=None, checkpoints=None) -> dict:
+        from quizzes_app.services.quiz_pipeline_prod import build_quiz_prod
+
+        return build_quiz_prod(video_url, progress=progress, checkpoints=checkpoints)
+
+    async def abuild(self, video_url: str) -> dict:
+        from quizzes_app.services.quiz_pipeline_prod import abuild_quiz_prod
+
+        return await abuild_quiz_prod(video_url)
+
+    def estimate(self, video_url: str) -> dict:
+        from quizzes_app.services.quiz_pipeline_prod import estimate_video
+
+        return estimate_video(video_url)
+
+    def warmup_steps(self) -> list:
+        return [
+            ("import", _import_prod_pipeline),
+            ("whisper", _preload_whisper_models),
+            ("transcribe_pool", _warmup_transcribe_pool),
+            ("tokenizer", _warmup_tokenizer),
+            ("gemini", _warmup_gemini),
+            ("yt_dlp", _warmup_downloader),
+        ]
+
+
+class CaptionsBackend(PipelineBackend):
+    """
+    Quizzes from YouTube captions only, for hosts without Whisper capacity.
+
+    Videos without usable captions are rejected (422, reason
+    ``no_captions``) instead of being downloaded and transcribed.
+    """
+
+    name = "captions"
+    stages = ("preflight", "captions", "generate")
+
+    def build(self, video_url: str, progress=None) -> dict:
+        from quizzes_app.services.quiz_pipeline_prod import (
+            checked_preflight,
+            fetch_captions,
+            generate_quiz,
+        )
+
+        report = progress or _ignore_progress
+        report("preflight", 0)
+        with metrics.timed("pipeline_stage_seconds", stage="preflight"):
+            info = checked_preflight(video_url)
+
+        report("captions", 0)
+        with metrics.timed("pipeline_stage_seconds", stage="captions"):
+            captions = fetch_captions(video_url, info=info)
+        if captions is None:
+            raise VideoRejectedError("Video has no usable captions.", reason="no_captions")
+        transcript, kind = captions
+        metrics.increment("transcript_source_total", source=f"captions_{kind}")
+        metrics.observe("transcript_chars", len(transcript), source=f"captions_{kind}")
+
+        report("generate", 70)
+        with metrics.timed("pipeline_stage_seconds", stage="generate"):
+            return generate_quiz(transcript, video_title=info.get("title"))
+
+    def warmup_steps(self) -> list:
+        return [
+            ("import", _import_prod_pipeline),
+            ("tokenizer", _warmup_tokenizer),
+            ("gemini", _warmup_gemini),
+            ("yt_dlp", _warmup_downloader),
+        ]
+
+
+class ReplayBackend(PipelineBackend):
+    """
+    Recorded quiz payloads, for demos, frontend work and load tests.
+
+    QUIZLY_REPLAY_DIR holds one payload per video as ``<video_id>.json``
+    (the dict a pipeline returns) and optionally ``default.json`` for all
+    other videos. Warmup reads every recording into memory; recordings
+    are cached once read, missing ones are looked up again on every call.
+    """
+
+    name = "replay"
+    stages = ("generate",)
+
+    def __init__(self):
+        self._recordings = {}
+        self._lock = threading.Lock()
+
+    def build(self, video_url: str, progress=None) -> dict:
+        if progress is not None:
+            progress("generate", 70)
+        payload = self._recording(video_id_from_url(video_url)) or self._recording("default")
+        if payload is None:
+            raise AIPipelineError("No recorded quiz for this video.")
+        return copy.deepcopy(payload)
+
+    async def abuild(self, video_url: str) -> dict:
+        return self.build(video_url)
+
+    def estimate(self, video_url: str) -> dict:
+        return {"cached": True, "duration": None, "cost": 0}
+
+    def warmup_steps(self) -> list:
+        return [("recordings", self._load_all)]
+
+    def _directory(self) -> str:
+        return getattr(settings, "QUIZLY_REPLAY_DIR", "")
+
+    def _recording(self, name: str):
+        directory = self._directory()
+        if not directory or not name:
+            return None
+        path = os.path.join(directory, f"{name}.json")
+        with self._lock:
+            if path in self._recordings:
+                return self._recordings[path]
+        try:
+            with open(path, encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            # Not cached, so recordings added later are picked up.
+            return None
+        with self._lock:
+            self._recordings[path] = payload
+        return payload
+
+    def _load_all(self) -> None:
+        directory = self._directory()
+        if not directory:
+            return
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith(".json"):
+                self._recording(filename[: -len(".json")])
+
+
+def _ignore_progress(stage: str, percent: int) -> None:
+    """Default progress callback that discards all updates."""
+
+
+def _import_prod_pipeline() -> None:
+    import quizzes_app.services.quiz_pipeline_prod  # noqa: F401
+
+
+def _preload_whisper_models() -> None:
+    from quizzes_app.services.whisper_models import preload_models
+
+    names = getattr(settings, "QUIZLY_WHISPER_PRELOAD", []) or [
+        getattr(settings, "QUIZLY_WHISPER_MODEL", "base")
+    ]
+    preload_models(names)
+
+
+def _warmup_transcribe_pool() -> None:
+    from quizzes_app.services import parallel_transcription
+
+    if parallel_transcription.worker_count() > 1:
+        parallel_transcription.warmup_pool()
+
+
+def _warmup_tokenizer() -> None:
+    from quizzes_app.services.transcript_budget import count_tokens
+
+    count_tokens("warmup")
+
+
+def _warmup_gemini() -> None:
+    from quizzes_app.services import llm_client
+
+    llm_client.get_client()
+
+
+def _warmup_downloader() -> None:
+    from quizzes_app.services.quiz_pipeline_prod import warmup_downloader
+
+    warmup_downloader()
@@ -0,0 +1,390 @@
+"""
+Database-backed job queue for asynchronous quiz generation.
+
+Jobs are stored as QuizJob rows and processed by a local pool of worker
+threads, so the heavy pipeline runs outside the HTTP request without an
+external broker.
+
+Includes:
+- enqueue_quiz_job: Queue a new quiz generation job.
+- claim_next_job: Atomically claim the next queued job (fair-share order).
+- run_job: Run the pipeline for a claimed job and persist the quiz.
+- process_next_job: Claim and run a single job.
+- retry_job: Queue a failed job again (resumes from its checkpoints).
+- requeue_stale_jobs: Queue running jobs of stopped workers again.
+- QuizJobWorkerPool: Background threads that process queued jobs.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+
+from quizzes_app.models import QuizJob
+from quizzes_app.services import job_scheduler, metrics
+from quizzes_app.services.checkpoints import PAYLOAD, JobCheckpoints
+from quizzes_app.services.error import (
+    AIModelOverloadedError,
+    AIModelTimeoutError,
+    PipelineOverloadedError,
+)
+from quizzes_app.services.persist_quiz import persist_quiz
+from quizzes_app.services.pipeline import build_quiz
+
+logger = logging.getLogger(__name__)
+
+# Failures worth retrying later: the job itself is fine.
+TRANSIENT_ERRORS = (AIModelOverloadedError, AIModelTimeoutError, PipelineOverloadedError)
+
+
+def enqueue_quiz_job(*, owner, video_url: str) -> QuizJob:
+    """
+    Queue a quiz generation job for the given user and video.
+
+    Parameters:
+        owner (User): The user who requested the quiz.
+        video_url (str): The normalized YouTube URL.
+
+    Returns:
+        QuizJob: The newly queued job.
+    """
+    return QuizJob.objects.create(owner=owner, video_url=video_url)
+
+
+def claim_next_job():
+    """
+    Claim the next queued job for the current worker.
+
+    The job scheduler picks the job (fair share between users, cached
+    transcripts first, see ``job_scheduler``); jobs are estimated by the
+    pool's estimator thread, never here, so claiming does not wait for
+    the network. The claim is a conditional UPDATE on the job's
+    status, so concurrent workers (threads or processes) never run the
+    same job twice. Every claim counts as an attempt. The time the job
+    waited is recorded in the ``job_queue_wait_seconds`` histogram per
+    priority class.
+
+    Returns:
+        QuizJob | None: The claimed job, or None if no job may run now.
+    """
+    while True:
+        job_ids = job_scheduler.scheduled_job_ids()
+        if not job_ids:
+            return None
+
+        for job_id in job_ids:
+            claimed = QuizJob.objects.filter(id=job_id, status=QuizJob.STATUS_QUEUED).update(
+                status=QuizJob.STATUS_RUNNING,
+                stage="starting",
+                attempts=F("attempts") + 1,
+                retry_at=None,
+                started_at=timezone.now(),
+                updated_at=timezone.now(),
+            )
+            if claimed:
+                job = QuizJob.objects.get(id=job_id)
+                metrics.observe(
+                    "job_queue_wait_seconds",
+                    (job.started_at - job.created_at).total_seconds(),
+                    priority=job.priority,
+                )
+                return job
+
+
+def run_job(job: QuizJob) -> QuizJob:
+    """
+    Run the quiz pipeline for a claimed job and record the outcome.
+
+    Steps:
+    - Execute the configured pipeline (stub or prod) with progress updates,
+      resuming from the job's stage checkpoints (see ``checkpoints``).
+    - Persist the quiz via the service layer.
+    - Mark the job as succeeded (with the quiz) or failed (with the error).
+
+    Jobs failing with a transient error (Gemini overloaded or timed out,
+    no pipeline slot or workspace quota) are queued again after the
+    error's Retry-After or QUIZLY_JOB_RETRY_DELAY seconds, up to
+    QUIZLY_JOB_MAX_ATTEMPTS attempts.
+    The checkpoints are removed once the job succeeded. While the job
+    runs, a heartbeat refreshes its ``updated_at`` every
+    QUIZLY_JOB_HEARTBEAT_INTERVAL seconds, so long stages without
+    progress updates do not look abandoned (see ``requeue_stale_jobs``).
+
+    Parameters:
+        job (QuizJob): A job in the running state.
+
+    Returns:
+        QuizJob: The updated job.
+    """
+    checkpoints = JobCheckpoints(job)
+    try:
+        with _heartbeat(job):
+            payload = _build_payload(job, checkpoints)
+        _update_job(job, stage="persist", progress=95)
+        quiz = persist_quiz(owner=job.owner, video_url=job.video_url, payload=payload)
+    except APIException as e:
+        if not _retry_later(job, e):
+            _finish_job(job, status=QuizJob.STATUS_FAILED, error=str(e.detail))
+    except Exception:
+        logger.exception("Quiz job %s failed unexpectedly", job.pk)
+        _finish_job(job, status=QuizJob.STATUS_FAILED, error="Unexpected server error")
+    else:
+        _finish_job(job, status=QuizJob.STATUS_SUCCEEDED, quiz=quiz)
+        checkpoints.clear()
+
+    return job
+
+
+def process_next_job():
+    """
+    Claim and run the next queued job, if any.
+
+    Returns:
+        QuizJob | None: The processed job, or None if the queue was empty.
+    """
+    job = claim_next_job()
+    if job is None:
+        return None
+    return run_job(job)
+
+
+def retry_job(job: QuizJob) -> bool:
+    """
+    Queue a failed job again.
+
+    The job gets a fresh set of attempts and resumes at the first stage
+    without a checkpoint.
+
+    Parameters:
+        job (QuizJob): The job to retry.
+
+    Returns:
+        bool: True if the job was queued, False if it had not failed.
+    """
+    fields = {
+        "status": QuizJob.STATUS_QUEUED,
+        "stage": QuizJob.STATUS_QUEUED,
+        "progress": 0,
+        "error": "",
+        "attempts": 0,
+        "retry_at": None,
+        "started_at": None,
+        "finished_at": None,
+        "updated_at": timezone.now(),
+    }
+    if not QuizJob.objects.filter(pk=job.pk, status=QuizJob.STATUS_FAILED).update(**fields):
+        return False
+    for name, value in fields.items():
+        setattr(job, name, value)
+    metrics.increment("job_retries_total", reason="manual")
+    return True
+
+
+def requeue_stale_jobs() -> int:
+    """
+    Queue running jobs again whose worker stopped (e.g. a restart).
+
+    A running job without updates for QUIZLY_JOB_STALE_AFTER seconds is
+    considered abandoned; running jobs are refreshed by their heartbeat
+    (QUIZLY_JOB_HEARTBEAT_INTERVAL, which must be well below it). It is queued again (and resumes from its
+    checkpoints) unless it has used up QUIZLY_JOB_MAX_ATTEMPTS, then it
+    fails.
+
+    Returns:
+        int: Number of jobs queued again.
+    """
+    stale_after = float(getattr(settings, "QUIZLY_JOB_STALE_AFTER", 1800))
+    if stale_after <= 0:
+        return 0
+    max_attempts = int(getattr(settings, "QUIZLY_JOB_MAX_ATTEMPTS", 1))
+    stale = QuizJob.objects.filter(
+        status=QuizJob.STATUS_RUNNING,
+        updated_at__lt=timezone.now() - timedelta(seconds=stale_after),
+    )
+    stale.filter(attempts__gte=max_attempts).update(
+        status=QuizJob.STATUS_FAILED,
+        error="The worker running the job stopped.",
+        finished_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
+    requeued = stale.update(
+        status=QuizJob.STATUS_QUEUED, stage=QuizJob.STATUS_QUEUED, updated_at=timezone.now()
+    )
+    if requeued:
+        metrics.increment("job_retries_total", requeued, reason="stale")
+    return requeued
+
+
+def _retry_later(job: QuizJob, error: APIException) -> bool:
+    """Queue the job again after a transient error, if attempts are left."""
+    max_attempts = int(getattr(settings, "QUIZLY_JOB_MAX_ATTEMPTS", 1))
+    if not isinstance(error, TRANSIENT_ERRORS) or job.attempts >= max_attempts:
+        return False
+    delay = getattr(error, "wait", None) or float(getattr(settings, "QUIZLY_JOB_RETRY_DELAY", 30))
+    _update_job(
+        job,
+        status=QuizJob.STATUS_QUEUED,
+        stage=QuizJob.STATUS_QUEUED,
+        error=str(error.detail),
+        retry_at=timezone.now() + timedelta(seconds=delay),
+    )
+    metrics.increment("job_retries_total", reason="transient")
+    return True
+
+
+def _build_payload(job: QuizJob, checkpoints: JobCheckpoints) -> dict:
+    """Return the job's saved payload, or run the pipeline and save it."""
+    payload = checkpoints.get(PAYLOAD)
+    if payload is None:
+        payload = build_quiz(
+            job.video_url,
+            progress=_progress_updater(job),
+            bounded=False,
+            checkpoints=checkpoints,
+        )
+        checkpoints.save(PAYLOAD, payload)
+    return payload
+
+
+@contextmanager
+def _heartbeat(job: QuizJob):
+    """Refresh the job's ``updated_at`` from a background thread while the block runs."""
+    interval = float(getattr(settings, "QUIZLY_JOB_HEARTBEAT_INTERVAL", 60))
+    if interval <= 0:
+        yield
+        return
+
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                try:
+                    _touch_job(job)
+                except Exception:
+                    logger.warning("Heartbeat of quiz job %s failed", job.pk, exc_info=True)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f"quizly-job-heartbeat-{job.pk}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _touch_job(job: QuizJob) -> None:
+    QuizJob.objects.filter(pk=job.pk, status=QuizJob.STATUS_RUNNING).update(updated_at=timezone.now())
+
+
+def _progress_updater(job: QuizJob):
+    """Return a pipeline progress callback that writes to the job row."""
+
+    def report(stage: str, percent: int) -> None:
+        percent = max(0, min(100, int(percent)))
+        if stage == job.stage and percent == job.progress:
+            return
+        _update_job(job, stage=stage, progress=percent)
+
+    return report
+
+
+def _update_job(job: QuizJob, **fields) -> None:
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job.updated_at = timezone.now()
+    QuizJob.objects.filter(pk=job.pk).update(updated_at=job.updated_at, **fields)
+
+
+def _finish_job(job: QuizJob, *, status: str, quiz=None, error: str = "") -> None:
+    fields = {
+        "status": status,
+        "stage": "done" if status == QuizJob.STATUS_SUCCEEDED else job.stage,
+        "error": error,
+        "quiz": quiz,
+        "finished_at": timezone.now(),
+    }
+    if status == QuizJob.STATUS_SUCCEEDED:
+        fields["progress"] = 100
+    _update_job(job, **fields)
+
+
+class QuizJobWorkerPool:
+    """
+    Pool of background threads that process queued quiz jobs.
+
+    Each worker repeatedly claims the next queued job and runs it. When
+    the queue is empty, workers sleep for ``poll_interval`` seconds. An
+    extra estimator thread estimates the cost of new jobs (see
+    ``job_scheduler``) and sleeps as long when there are none.
+
+    Parameters:
+        workers (int, optional): Number of worker threads (QUIZLY_JOB_WORKERS).
+        poll_interval (float, optional): Idle sleep in seconds (QUIZLY_JOB_POLL_INTERVAL).
+    """
+
+    def __init__(self, workers=None, poll_interval=None):
+        if workers is None:
+            workers = getattr(settings, "QUIZLY_JOB_WORKERS", 2)
+        if poll_interval is None:
+            poll_interval = getattr(settings, "QUIZLY_JOB_POLL_INTERVAL", 1.0)
+        self.workers = int(workers)
+        self.poll_interval = float(poll_interval)
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    def start(self) -> None:
+        """Queue the jobs of stopped workers again and start the worker threads."""
+        requeue_stale_jobs()
+        self._stop_event.clear()
+        targets = [(self._estimate, "quizly-job-estimator")]
+        targets += [(self._work, f"quizly-job-worker-{i}") for i in range(self.workers)]
+        for target, name in targets:
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None) -> None:
+        """Signal all workers to stop and wait for running jobs to finish."""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _work(self) -> None:
+        try:
+            while not self._stop_event.is_set():
+                close_old_connections()
+                try:
+                    job = process_next_job()
+                except Exception:
+                    logger.exception("Quiz job worker crashed while claiming a job")
+                    job = None
+
+                if job is None:
+                    self._stop_event.wait(self.poll_interval)
+        finally:
+            connection.close()
+
+    def _estimate(self) -> None:
+        try:
+            while not self._stop_event.is_set():
+                close_old_connections()
+                try:
+                    estimated = job_scheduler.estimate_queued_jobs()
+                except Exception:
+                    logger.exception("Quiz job estimator crashed")
+                    estimated = 0
+
+                if not estimated:
+                    self._stop_event.wait(self.poll_interval)
+        finally:
+            connection.close()
@@ -0,0 +1,241 @@
+"""
+Map-reduce quiz generation for long transcripts.
+
+Instead of one large Gemini call over the whole transcript, the
+transcript is split into sections and candidate questions are generated
+for every section concurrently (map). A cheap reduce step then picks 10
+distinct questions spread over all sections locally and asks Gemini only
+for a title and description based on the chosen questions. Latency thus
+follows the slowest section rather than the total transcript length.
+The map results are checkpointed, so a job retried after a failed
+reduce step does not request the sections again.
+
+Includes:
+- use_map_reduce: Decide whether a transcript is generated via map-reduce.
+- generate_quiz_map_reduce: Generate a quiz via map-reduce.
+- select_questions: Pick distinct questions round-robin over the sections.
+"""
+
+import json
+import logging
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from google.genai import types
+from pydantic import ValidationError
+
+from quizzes_app.services import llm_client, metrics
+from quizzes_app.services.checkpoints import NO_CHECKPOINTS, SECTIONS
+from quizzes_app.services.error import AIPipelineError
+from quizzes_app.services.quiz_repair import repair_quiz
+from quizzes_app.services.quiz_schema import (
+    QUESTION_COUNT,
+    QuizHeader,
+    QuizQuestion,
+    decode_questions,
+    decode_quiz,
+)
+from quizzes_app.services.transcript_budget import (
+    clean_transcript,
+    count_tokens,
+    fit_to_budget,
+    record_transcript_tokens,
+    split_segments,
+)
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r"\w{3,}")
+DUPLICATE_SIMILARITY = 0.6
+
+
+def use_map_reduce(transcript: str) -> bool:
+    """
+    Return whether the quiz for ``transcript`` is generated via map-reduce.
+
+    QUIZLY_QUIZ_STRATEGY selects "single" (one Gemini call, default),
+    "map_reduce" (always) or "auto" (map-reduce above
+    QUIZLY_MAP_REDUCE_MIN_TOKENS transcript tokens).
+    """
+    strategy = getattr(settings, "QUIZLY_QUIZ_STRATEGY", "single")
+    if strategy == "map_reduce":
+        return True
+    if strategy == "auto":
+        min_tokens = int(getattr(settings, "QUIZLY_MAP_REDUCE_MIN_TOKENS", 12000))
+        return count_tokens(transcript) > min_tokens
+    return False
+
+
+def generate_quiz_map_reduce(transcript: str, video_title: str = None, checkpoints=None) -> dict:
+    """
+    Generate a quiz by mapping over transcript sections and reducing the candidates.
+
+    Steps:
+    - Clean the transcript and split it into sections
+      (QUIZLY_MAP_REDUCE_SECTION_TOKENS, at most QUIZLY_MAP_REDUCE_MAX_SECTIONS).
+      The token counts are recorded like for ``prepare_transcript``; all
+      sections together hold the whole cleaned transcript.
+    - Request candidate questions per section, at most
+      QUIZLY_MAP_REDUCE_CONCURRENCY Gemini calls at a time, and
+      checkpoint them. Sections with saved candidates are not requested
+      again.
+    - Pick 10 distinct questions spread over the sections.
+    - Request title and description for the chosen questions.
+    - Fill any missing questions via the repair stage.
+
+    Args:
+        transcript (str): The transcript text.
+        video_title (str, optional): Title of the video, given as context.
+        checkpoints (JobCheckpoints, optional): Stage checkpoints of the job.
+
+    Returns:
+        dict: The validated quiz payload.
+
+    Raises:
+        AIPipelineError: If no section produced questions or the result is invalid.
+    """
+    section_tokens = int(getattr(settings, "QUIZLY_MAP_REDUCE_SECTION_TOKENS", 4000))
+    max_sections = int(getattr(settings, "QUIZLY_MAP_REDUCE_MAX_SECTIONS", 8))
+    concurrency = int(getattr(settings, "QUIZLY_MAP_REDUCE_CONCURRENCY", 4))
+
+    raw_tokens = count_tokens(transcript)
+    text = clean_transcript(transcript)
+    prompt_tokens = count_tokens(text)
+    record_transcript_tokens(raw_tokens, prompt_tokens)
+    logger.info("Transcript tokens: %d raw, %d in map-reduce prompts", raw_tokens, prompt_tokens)
+    section_tokens = max(section_tokens, math.ceil(prompt_tokens / max_sections))
+    sections = split_segments(text, section_tokens) or [text]
+    # One spare candidate per section for duplicates; with few sections
+    # each one must cover a larger share of the quiz.
+    per_section = math.ceil(QUESTION_COUNT / len(sections)) + 1
+
+    checkpoints = checkpoints or NO_CHECKPOINTS
+    candidates = checkpoints.get(SECTIONS)
+    if not isinstance(candidates, list) or len(candidates) != len(sections):
+        candidates = [[] for _ in sections]
+    # Failed sections were saved empty and are requested again.
+    missing = [i for i, questions in enumerate(candidates) if not questions]
+
+    if missing:
+        metrics.increment("quiz_map_reduce_sections_total", len(missing))
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(missing)))) as pool:
+            futures = {
+                i: pool.submit(_map_section, sections[i], i, len(sections), per_section, video_title)
+                for i in missing
+            }
+            for i, future in futures.items():
+                candidates[i] = _section_result(future, i)
+        if any(candidates):
+            checkpoints.save(SECTIONS, candidates)
+
+    if not any(candidates):
+        raise AIPipelineError("AI pipeline failed: no questions generated")
+
+    questions = select_questions(candidates, QUESTION_COUNT)
+    header = _reduce_header(questions, video_title)
+    draft = {**header, "questions": questions}
+
+    if len(questions) < QUESTION_COUNT:
+        budget = int(getattr(settings, "QUIZLY_TRANSCRIPT_TOKEN_BUDGET", 12000))
+        return repair_quiz(draft, fit_to_budget(text, budget))
+    return decode_quiz(json.dumps(draft))
+
+
+def select_questions(candidates: list, count: int) -> list:
+    """
+    Pick ``count`` distinct questions round-robin over the sections.
+
+    Questions whose titles share most of their words with an already
+    chosen question are treated as duplicates. The result keeps the
+    order of the sections, so the quiz follows the video.
+
+    Args:
+        candidates (list): One list of question dicts per section.
+        count (int): Number of questions to pick.
+
+    Returns:
+        list: Up to ``count`` questions.
+    """
+    chosen = []  # (section, rank, question)
+    seen = []
+    for rank in range(max((len(c) for c in candidates), default=0)):
+        for section, questions in enumerate(candidates):
+            if len(chosen) == count:
+                break
+            if rank >= len(questions):
+                continue
+            words = _title_words(questions[rank]["question_title"])
+            if any(_similarity(words, other) >= DUPLICATE_SIMILARITY for other in seen):
+                continue
+            seen.append(words)
+            chosen.append((section, rank, questions[rank]))
+
+    return [question for _section, _rank, question in sorted(chosen, key=lambda c: c[:2])]
+
+
+def _map_section(section: str, index: int, total: int, count: int, video_title: str) -> list:
+    title_hint = f"The video is titled: {video_title}\n" if video_title else ""
+    prompt = (
+        f"This is part {index + 1} of {total} of a video transcript.\n"
+        f"{title_hint}\n"
+        f"Write {count} multiple-choice quiz questions about the content of this part.\n\n"
+        "Requirements:\n"
+        "- Each question must have exactly 4 distinct answer options.\n"
+        "- 'answer' must repeat the correct option exactly as written in 'question_options'.\n"
+        "- Ask about the key facts of this part, not about the speaker or the video itself.\n\n"
+        "Transcript part below:\n\n"
+        f"{section}"
+    )
+    config = types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=list[QuizQuestion],
+    )
+    return decode_questions(llm_client.generate_content(prompt, config=config).text)
+
+
+def _section_result(future, index: int) -> list:
+    # A failed section is dropped; the others still make up the quiz.
+    try:
+        return future.result()
+    except AIPipelineError as e:
+        logger.warning("Map step for section %d failed: %s", index + 1, e.detail)
+    except Exception:
+        logger.warning("Map step for section %d failed unexpectedly", index + 1, exc_info=True)
+    metrics.increment("quiz_map_reduce_failed_sections_total")
+    return []
+
+
+def _reduce_header(questions: list, video_title: str) -> dict:
+    title_hint = f"The video is titled: {video_title}\n\n" if video_title else ""
+    listing = "\n".join(f"- {q['question_title']}" for q in questions)
+    prompt = (
+        "A quiz about a video consists of the questions below.\n\n"
+        f"{title_hint}"
+        "Requirements:\n"
+        "- title: A concise quiz title based on the topic of the questions.\n"
+        "- description: Summarize the topic in no more than 150 characters. "
+        "Do not include any quiz questions or answers.\n\n"
+        "Questions:\n"
+        f"{listing}"
+    )
+    config = types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=QuizHeader,
+    )
+    response = llm_client.generate_content(prompt, config=config)
+    try:
+        return QuizHeader.model_validate_json(response.text or "").model_dump()
+    except ValidationError as e:
+        raise AIPipelineError("AI pipeline failed: invalid JSON output") from e
+
+
+def _title_words(title: str) -> set:
+    return set(WORD_RE.findall(title.lower()))
+
+
+def _similarity(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
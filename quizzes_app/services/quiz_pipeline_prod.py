@@ -2,170 +2,900 @@
 Production quiz generation pipeline.
 
 This module implements the end-to-end "prod" pipeline:
-- Download audio from a YouTube video (yt_dlp).
+- Check the video metadata (duration, live status, availability, age limit);
+  rejections are remembered in the negative cache.
+- Reuse a cached transcript of the video, if available.
+- Use YouTube-provided captions as transcript, if available.
+- Download audio from a YouTube video (yt_dlp) into a temporary workspace.
+- Trim silence and non-speech regions (optional VAD pre-pass).
 - Transcribe the audio using Whisper.
+- Clean the transcript and fit it into the prompt token budget.
 - Generate a quiz from the transcript using Gemini.
 - Return the quiz as a validated Python dict.
+
+``abuild_quiz_prod`` runs the same stages for async (ASGI) views.
 """
 
+import asyncio
 import yt_dlp
-import whisper
 import json
 import os
+import re
 import tempfile
-from google import genai
-
-from quizzes_app.services.error import AIPipelineError
-
-
-def build_quiz_prod(video_url: str) -> dict:
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from google.genai import types
+from whisper.tokenizer import LANGUAGES, TO_LANGUAGE_CODE
+
+from quizzes_app.services import (
+    llm_client,
+    metrics,
+    negative_cache,
+    offload,
+    parallel_transcription,
+    transcript_cache,
+)
+from quizzes_app.services.audio import (
+    SAMPLE_RATE,
+    detect_speech,
+    keep_spans,
+    load_audio,
+)
+from quizzes_app.services.checkpoints import METADATA, NO_CHECKPOINTS, RESPONSE, TRANSCRIPT
+from quizzes_app.services.error import AIPipelineError, VideoRejectedError
+from quizzes_app.services.quiz_map_reduce import generate_quiz_map_reduce, use_map_reduce
+from quizzes_app.services.quiz_repair import load_draft, repair_quiz
+from quizzes_app.services.quiz_schema import QuizPayload, decode_quiz
+from quizzes_app.services.single_flight import single_flight
+from quizzes_app.services.transcript_budget import prepare_transcript
+from quizzes_app.services.whisper_models import use_model
+from quizzes_app.services.workspaces import workspaces
+from quizzes_app.services.youtube import video_id_from_url
+
+CAPTION_FORMATS = ("json3", "vtt")
+VTT_TIMING_RE = re.compile(r"^\d{2}:\d{2}(:\d{2})?\.\d{3} --> ")
+VTT_TAG_RE = re.compile(r"<[^>]+>")
+UNAVAILABLE_STATES = {"private", "premium_only", "subscriber_only", "needs_auth"}
+LIVE_STATES = {"is_live", "is_upcoming", "post_live"}
+
+# Running async pipeline runs by video ID (see abuild_quiz_prod).
+_inflight = {}
+
+# yt-dlp download profiles (selected via QUIZLY_AUDIO_PROFILE):
+# - best: highest bitrate audio as published (previous behavior).
+# - speech: smallest adequate audio, converted to 16 kHz mono FLAC, the
+#   sample format Whisper resamples to, losslessly compressed (about half
+#   the size of WAV). yt-dlp always re-encodes YouTube audio to FLAC, so
+#   the resampling is never skipped.
+# - compact: smallest adequate audio kept as downloaded (least disk usage).
+SPEECH_AUDIO_FORMAT = "bestaudio[abr<=64]/worstaudio/best"
+AUDIO_PROFILES = {
+    "best": {
+        "format": "bestaudio/best",
+    },
+    "speech": {
+        "format": SPEECH_AUDIO_FORMAT,
+        "postprocessors": [{"key": "FFmpegExtractAudio", "preferredcodec": "flac"}],
+        "postprocessor_args": {"extractaudio": ["-ar", "16000", "-ac", "1"]},
+    },
+    "compact": {
+        "format": SPEECH_AUDIO_FORMAT,
+    },
+}
+
+# Workspace bytes reserved per second of video, per download profile
+# (generous estimates; speech briefly holds the download and the FLAC).
+AUDIO_PROFILE_BYTES_PER_SECOND = {
+    "best": 24000,
+    "speech": 16000 + 16000,
+    "compact": 16000,
+}
+
+
+def build_quiz_prod(video_url: str, progress=None, checkpoints=None) -> dict:
     """
     Build a quiz for the given YouTube video URL using the production pipeline.
 
+    Concurrent calls for the same video (in this process or on this host)
+    are coalesced: only one pipeline run executes and all callers share
+    its payload. Each caller still persists its own quiz.
+
     Steps:
-    - Extract audio from the YouTube video.
-    - Transcribe the audio using Whisper.
+    - Run the metadata preflight (rejects unsuitable videos before any download).
+    - Look up the transcript in the transcript cache.
+    - On a cache miss: use the video's captions (manual before automatic).
+    - Without captions: extract audio into a workspace within the disk
+      quota, transcribe it using Whisper, remove the workspace and store
+      the transcript in the cache.
     - Generate a quiz JSON payload using Gemini.
-    - Clean up temporary files and directories.
+
+    The transcript source (cache, captions_manual, captions_auto, whisper)
+    is counted in the ``transcript_source_total`` metric. Stage durations
+    are recorded in the ``pipeline_stage_seconds`` histogram, downloaded
+    bytes, audio seconds and transcript characters in their own histograms.
+
+    With ``checkpoints`` (a job's ``JobCheckpoints``), the metadata, the
+    transcript and the Gemini response are saved as they complete, and a
+    retry of the job starts at the first stage without a checkpoint.
+    Metadata saved by the job's estimate (see ``estimate_video``) replaces
+    the preflight while it is younger than QUIZLY_JOB_METADATA_MAX_AGE.
+
+    Args:
+        video_url (str): The normalized YouTube URL.
+        progress (callable, optional): Called as ``progress(stage, percent)``
+            whenever the pipeline enters a new stage, and while the audio
+            is downloaded (0-30 %) and transcribed (30-70 %).
+        checkpoints (JobCheckpoints, optional): Stage checkpoints of the job.
 
     Returns:
         dict: Parsed quiz payload.
+
+    Raises:
+        VideoRejectedError: If the video fails the metadata preflight.
+        PipelineOverloadedError: If the workspace quota stays exhausted.
+    """
+    report = progress or _ignore_progress
+    video_id = video_id_from_url(video_url)
+
+    return single_flight.do(
+        video_id, lambda: _run_pipeline(video_url, video_id, report, checkpoints)
+    )
+
+
+def _run_pipeline(video_url: str, video_id: str, report, checkpoints=None) -> dict:
+    """
+    Run the pipeline stages for a single video (the single-flight leader).
+    """
+    saved = checkpoints or NO_CHECKPOINTS
+    transcript = saved.get(TRANSCRIPT)
+    if transcript is not None:
+        metadata = saved.get(METADATA) or {}
+        transcript = transcript["text"]
+    else:
+        metadata = saved.get(METADATA)
+        info = _estimated_info(metadata)
+        if info is None:
+            report("preflight", 0)
+            with metrics.timed("pipeline_stage_seconds", stage="preflight"):
+                info = checked_preflight(video_url)
+            # Only what later stages need; download URLs expire, so a retry
+            # without a transcript runs the preflight again.
+            metadata = {key: info.get(key) for key in ("title", "language", "duration")}
+            saved.save(METADATA, metadata)
+
+        transcript = _fetch_transcript(video_url, video_id, info, report)
+        saved.save(TRANSCRIPT, {"text": transcript})
+
+    report("generate", 70)
+    with metrics.timed("pipeline_stage_seconds", stage="generate"):
+        payload = generate_quiz(transcript, video_title=metadata.get("title"), checkpoints=checkpoints)
+    return payload
+
+
+def _fetch_transcript(video_url: str, video_id: str, info: dict, report) -> str:
+    """
+    Return the transcript from the cache, the captions or Whisper.
+    """
+    model_name = getattr(settings, "QUIZLY_WHISPER_MODEL", "base")
+    language = _transcript_language(info)
+
+    transcript = transcript_cache.get_transcript(video_id, model_name, language)
+    source = "cache"
+
+    if transcript is None and getattr(settings, "QUIZLY_USE_CAPTIONS", True):
+        report("captions", 0)
+        with metrics.timed("pipeline_stage_seconds", stage="captions"):
+            captions = fetch_captions(video_url, info=info)
+        if captions is not None:
+            transcript, kind = captions
+            source = f"captions_{kind}"
+
+    if transcript is None:
+        transcript = _download_and_transcribe(video_url, info, language, report)
+        transcript_cache.store_transcript(video_id, model_name, language, transcript)
+        source = "whisper"
+
+    metrics.increment("transcript_source_total", source=source)
+    metrics.observe("transcript_chars", len(transcript), source=source)
+    return transcript
+
+
+def _download_and_transcribe(video_url: str, info: dict, language, report) -> str:
+    """
+    Download the audio of a video into a workspace and transcribe it.
+
+    The workspace (with any partial downloads) is removed afterwards.
+    """
+    with workspaces.open(reserve=_workspace_reservation(info)) as directory:
+        report("download", 0)
+        with metrics.timed("pipeline_stage_seconds", stage="download"):
+            audio_path = extract_audio(
+                video_url,
+                info=info,
+                progress=lambda f: report("download", int(30 * f)),
+                directory=directory,
+            )
+
+        report("transcribe", 30)
+        _observe_audio(audio_path, info)
+        with metrics.timed("pipeline_stage_seconds", stage="transcribe"):
+            return transcribe_audio(
+                audio_path,
+                language=language,
+                progress=lambda f: report("transcribe", 30 + int(40 * f)),
+            )
+
+
+def _workspace_reservation(info: dict) -> int:
+    """
+    Return the workspace bytes to reserve for the audio of a video.
+
+    Videos without a known duration count with QUIZLY_MAX_VIDEO_DURATION.
     """
-    audio_path = extract_audio(video_url)
+    duration = info.get("duration") or getattr(settings, "QUIZLY_MAX_VIDEO_DURATION", 7200) or 7200
+    profile_name = getattr(settings, "QUIZLY_AUDIO_PROFILE", "speech")
+    rate = AUDIO_PROFILE_BYTES_PER_SECOND.get(profile_name, AUDIO_PROFILE_BYTES_PER_SECOND["speech"])
+    return int(duration * rate)
+
 
+def _observe_audio(audio_path: str, info: dict) -> None:
+    """
+    Record the downloaded bytes and the audio length of a video.
+    """
     try:
-        transcript = transcribe_audio(audio_path)
-    finally:
-        # Best-effort cleanup of audio file and temp directory
-        try:
-            if os.path.exists(audio_path):
-                os.remove(audio_path)
-        except OSError:
-            pass
+        metrics.observe("download_bytes", os.path.getsize(audio_path))
+    except OSError:
+        pass
+    if info.get("duration"):
+        metrics.observe("audio_seconds", info["duration"])
+
+
+async def abuild_quiz_prod(video_url: str) -> dict:
+    """
+    Async variant of ``build_quiz_prod`` for ASGI views.
+
+    The stages are the same, but nothing blocks the event loop:
+    network-bound stages (preflight, captions, download, Gemini) run on
+    the bounded I/O thread pool (``offload.run_io``), and Whisper runs in
+    the transcription process pool (``atranscribe_chunked``), at most
+    QUIZLY_TRANSCRIBE_WORKERS transcriptions at a time.
+
+    Concurrent calls for the same video in this process share one run.
+    Unlike ``build_quiz_prod``, calls are not coalesced across processes;
+    the transcript cache still spares later runs the transcription.
+
+    Args:
+        video_url (str): The normalized YouTube URL.
+
+    Returns:
+        dict: Parsed quiz payload.
+
+    Raises:
+        VideoRejectedError: If the video fails the metadata preflight.
+    """
+    video_id = video_id_from_url(video_url)
+
+    task = _inflight.get(video_id)
+    if task is None:
+        task = asyncio.ensure_future(_arun_pipeline(video_url, video_id))
+        _inflight[video_id] = task
+        task.add_done_callback(lambda _task: _inflight.pop(video_id, None))
+    # Shielded: a client that disconnects must not cancel the shared run.
+    return await asyncio.shield(task)
+
 
-        temp_dir = os.path.dirname(audio_path)
+async def _arun_pipeline(video_url: str, video_id: str) -> dict:
+    """
+    Run the pipeline stages for a single video without blocking the event loop.
+    """
+    with metrics.timed("pipeline_stage_seconds", stage="preflight"):
+        info = await _achecked_preflight(video_url, video_id)
+
+    model_name = getattr(settings, "QUIZLY_WHISPER_MODEL", "base")
+    language = _transcript_language(info)
+
+    transcript = await sync_to_async(transcript_cache.get_transcript)(video_id, model_name, language)
+    source = "cache"
+
+    if transcript is None and getattr(settings, "QUIZLY_USE_CAPTIONS", True):
+        with metrics.timed("pipeline_stage_seconds", stage="captions"):
+            captions = await offload.run_io(fetch_captions, video_url, info=info)
+        if captions is not None:
+            transcript, kind = captions
+            source = f"captions_{kind}"
+
+    if transcript is None:
+        workspace = await offload.run_io(workspaces.acquire, _workspace_reservation(info))
         try:
-            if os.path.isdir(temp_dir):
-                os.rmdir(temp_dir)
-        except OSError:
-            pass
+            with metrics.timed("pipeline_stage_seconds", stage="download"):
+                audio_path = await offload.run_io(
+                    extract_audio, video_url, info=info, directory=workspace.path
+                )
+            await offload.run_io(_observe_audio, audio_path, info)
+            with metrics.timed("pipeline_stage_seconds", stage="transcribe"):
+                transcript = await _atranscribe_audio(audio_path, language)
+        finally:
+            await offload.run_io(workspaces.release, workspace)
+        await sync_to_async(transcript_cache.store_transcript)(video_id, model_name, language, transcript)
+        source = "whisper"
+
+    metrics.increment("transcript_source_total", source=source)
+    metrics.observe("transcript_chars", len(transcript), source=source)
+
+    with metrics.timed("pipeline_stage_seconds", stage="generate"):
+        return await offload.run_io(generate_quiz, transcript, video_title=info.get("title"))
+
+
+async def _achecked_preflight(video_url: str, video_id: str) -> dict:
+    """
+    Async variant of ``checked_preflight``; the preflight runs on the I/O pool.
+    """
+    rejection = await sync_to_async(negative_cache.get_rejection)(video_id)
+    if rejection is not None:
+        raise rejection
 
-    payload = generate_quiz(transcript)
-    return payload
+    try:
+        return await offload.run_io(preflight_video, video_url)
+    except VideoRejectedError as e:
+        if not _is_network_failure(e):
+            await sync_to_async(negative_cache.store_rejection)(video_id, e)
+        raise
+
+
+async def _atranscribe_audio(audio_path: str, language) -> str:
+    """
+    Transcribe an audio file in the transcription process pool.
+    """
+    language = language or getattr(settings, "QUIZLY_WHISPER_LANGUAGE", "")
+    audio = await offload.run_io(load_audio, audio_path)
+    if getattr(settings, "QUIZLY_VAD_ENABLED", False):
+        audio, _spans = await offload.run_io(speech_only, audio)
+        if len(audio) == 0:
+            _reject_no_speech()
+    return _require_speech(
+        await parallel_transcription.atranscribe_chunked(audio, language=language or None)
+    )
+
+
+def _ignore_progress(stage: str, percent: int) -> None:
+    """Default progress callback that discards all updates."""
+
+
+def preflight_video(video_url: str) -> dict:
+    """
+    Fetch the video metadata without downloading and reject unsuitable videos.
+
+    Checks:
+    - The video is available (not private, deleted or members-only).
+    - The video is not a live stream or upcoming premiere.
+    - The video is not age-restricted (unless QUIZLY_ALLOW_AGE_RESTRICTED).
+    - The duration does not exceed QUIZLY_MAX_VIDEO_DURATION seconds.
+
+    The returned metadata (duration, language, title, caption tracks) is
+    reused by the later stages, so the video page is only fetched once.
+
+    Args:
+        video_url (str): The URL of the YouTube video.
+
+    Returns:
+        dict: The yt-dlp metadata of the video (unprocessed).
+
+    Raises:
+        VideoRejectedError: If the video fails one of the checks.
+    """
+    ydl_opts = {
+        "quiet": True,
+        "noplaylist": True,
+        "skip_download": True,
+    }
+
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(video_url, download=False, process=False)
+    except yt_dlp.utils.YoutubeDLError as e:
+        raise VideoRejectedError(
+            "Video is unavailable (private, deleted or region-blocked).",
+            reason="unavailable",
+        ) from e
+
+    if info.get("availability") in UNAVAILABLE_STATES:
+        raise VideoRejectedError(
+            "Video is not publicly available.", reason="unavailable"
+        )
+
+    if info.get("is_live") or info.get("live_status") in LIVE_STATES:
+        raise VideoRejectedError(
+            "Live streams and premieres are not supported.", reason="live"
+        )
+
+    age_limit = info.get("age_limit") or 0
+    if age_limit >= 18 and not getattr(settings, "QUIZLY_ALLOW_AGE_RESTRICTED", False):
+        raise VideoRejectedError("Video is age-restricted.", reason="age_restricted")
+
+    duration = info.get("duration") or 0
+    max_duration = getattr(settings, "QUIZLY_MAX_VIDEO_DURATION", 7200)
+    if max_duration and duration > max_duration:
+        raise VideoRejectedError(
+            f"Video is too long ({int(duration // 60)} min, "
+            f"limit {int(max_duration // 60)} min).",
+            reason="too_long",
+        )
+
+    return info
+
+
+def checked_preflight(video_url: str) -> dict:
+    """
+    Run ``preflight_video`` behind the negative cache.
+
+    A video rejected recently fails right away with the original reason
+    (see ``negative_cache``); a new rejection is remembered, unless the
+    metadata could not be fetched because of a network failure.
+
+    Args:
+        video_url (str): The URL of the YouTube video.
+
+    Returns:
+        dict: The yt-dlp metadata of the video (unprocessed).
+
+    Raises:
+        VideoRejectedError: If the video is rejected (now or recently).
+    """
+    video_id = video_id_from_url(video_url)
+    rejection = negative_cache.get_rejection(video_id)
+    if rejection is not None:
+        raise rejection
+
+    try:
+        return preflight_video(video_url)
+    except VideoRejectedError as e:
+        if not _is_network_failure(e):
+            negative_cache.store_rejection(video_id, e)
+        raise
+
+
+def _is_network_failure(error: Exception) -> bool:
+    """
+    Return whether a yt-dlp error was caused by the network, not the video.
+    """
+    cause = error.__cause__
+    for _ in range(10):
+        if cause is None:
+            return False
+        if isinstance(cause, (yt_dlp.networking.exceptions.TransportError, OSError)):
+            return True
+        exc_info = getattr(cause, "exc_info", None)
+        cause = getattr(cause, "cause", None) or (exc_info[1] if exc_info else None)
+    return False
+
+
+def estimate_video(video_url: str) -> dict:
+    """
+    Estimate the pipeline cost of a video for the job scheduler.
+
+    A cached transcript needs no transcription. Otherwise the metadata
+    preflight runs, and the cost is the video duration unless the video
+    has usable captions. The parts of the metadata the pipeline needs are
+    returned as well, so the job's run can skip the preflight.
+
+    Args:
+        video_url (str): The URL of the YouTube video.
+
+    Returns:
+        dict: ``cached`` (bool), ``duration`` (seconds or None), ``cost``
+        (seconds of audio to transcribe, None if unknown) and, after a
+        preflight, ``metadata`` (see ``_estimated_info``).
+
+    Raises:
+        VideoRejectedError: If the video fails the metadata preflight.
+    """
+    video_id = video_id_from_url(video_url)
+    model_name = getattr(settings, "QUIZLY_WHISPER_MODEL", "base")
+    # Normalized like the key the transcript was stored under.
+    language = _transcript_language({})
+    if transcript_cache.has_transcript(video_id, model_name, language):
+        return {"cached": True, "duration": None, "cost": 0}
+
+    info = checked_preflight(video_url)
+    duration = info.get("duration")
+    track, kind = None, None
+    if getattr(settings, "QUIZLY_USE_CAPTIONS", True):
+        track, kind = _select_caption_track(info)
+    metadata = {key: info.get(key) for key in ("title", "language", "duration")}
+    metadata["captions"] = {"kind": kind, "language": _caption_language(info), "track": track} if track else None
+    metadata["fetched_at"] = time.time()
+    cost = 0 if track is not None else duration
+    return {"cached": False, "duration": duration, "cost": cost, "metadata": metadata}
+
+
+def _estimated_info(metadata):
+    """
+    Return the video metadata saved by a job's estimate, if still fresh.
+
+    Only the metadata and the selected caption track are kept, in the
+    shape of ``preflight_video``'s result but without formats (the
+    download fetches them itself). Caption URLs expire, so metadata older
+    than QUIZLY_JOB_METADATA_MAX_AGE seconds is not used.
+
+    Returns:
+        dict | None: The metadata, or None if the preflight must run.
+    """
+    if not metadata or "fetched_at" not in metadata:
+        return None
+    max_age = float(getattr(settings, "QUIZLY_JOB_METADATA_MAX_AGE", 3600))
+    if time.time() - metadata["fetched_at"] > max_age:
+        return None
+
+    info = {key: metadata.get(key) for key in ("title", "language", "duration")}
+    captions = metadata.get("captions")
+    if captions:
+        field = "subtitles" if captions["kind"] == "manual" else "automatic_captions"
+        info[field] = {captions["language"]: [captions["track"]]}
+    return info
+
+
+def warmup_downloader() -> None:
+    """
+    Load yt-dlp's YouTube extractor, so the first download does not pay for it.
+    """
+    with yt_dlp.YoutubeDL({"quiet": True}) as ydl:
+        ydl.get_info_extractor("Youtube")
 
 
-def extract_audio(video_url: str) -> str:
+def _transcript_language(info: dict):
+    """
+    Return the Whisper language for a video, or None for auto-detection.
+
+    QUIZLY_WHISPER_LANGUAGE wins; otherwise the language reported by
+    YouTube is used if Whisper supports it.
+    """
+    language = getattr(settings, "QUIZLY_WHISPER_LANGUAGE", "") or info.get("language") or ""
+    language = language.split("-")[0].lower()
+    if language in LANGUAGES:
+        return language
+    return TO_LANGUAGE_CODE.get(language)
+
+
+def extract_audio(video_url: str, info: dict = None, progress=None, directory: str = None) -> str:
     """
     Download the audio track from a YouTube video into a temporary file.
 
+    The format selection and post-processing follow the download profile
+    QUIZLY_AUDIO_PROFILE (see AUDIO_PROFILES).
+
     Args:
         video_url (str): The URL of the YouTube video.
+        info (dict, optional): Metadata from preflight_video; when given
+            (with formats), the video page is not fetched again.
+        progress (callable, optional): Called as ``progress(fraction)``
+            (0 to 1) from yt-dlp's download progress hook.
+        directory (str, optional): Directory to download into (a workspace,
+            see ``workspaces``); by default a new temporary directory that
+            the caller must remove.
 
     Returns:
-        str: Path to the downloaded audio file.
+        str: Path to the downloaded (and post-processed) audio file.
     """
-    tmp_dir = tempfile.mkdtemp(prefix="quizly_")
+    tmp_dir = directory or tempfile.mkdtemp(prefix="quizly_")
     tmp_filename = os.path.join(tmp_dir, "temp_audio.%(ext)s")
 
+    profile_name = getattr(settings, "QUIZLY_AUDIO_PROFILE", "speech")
+    profile = AUDIO_PROFILES.get(profile_name, AUDIO_PROFILES["speech"])
+
     ydl_opts = {
-        "format": "bestaudio/best",
+        **profile,
         "outtmpl": tmp_filename,
         "quiet": True,
         "noplaylist": True,
     }
+    if progress is not None:
+        ydl_opts["progress_hooks"] = [_download_progress_hook(progress)]
 
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        info = ydl.extract_info(video_url, download=True)
-        audio_file = ydl.prepare_filename(info)
+        if info is None or "formats" not in info:
+            info = ydl.extract_info(video_url, download=True)
+        else:
+            info = ydl.process_ie_result(info, download=True)
+
+        # Post-processors change the extension, so prefer the final path.
+        downloads = info.get("requested_downloads") or []
+        audio_file = downloads[0].get("filepath") if downloads else None
+        if not audio_file:
+            audio_file = ydl.prepare_filename(info)
 
     return audio_file
 
 
-def transcribe_audio(audio_path: str) -> str:
+def _download_progress_hook(progress):
+    """Return a yt-dlp progress hook that reports the downloaded fraction."""
+
+    def hook(status: dict) -> None:
+        total = status.get("total_bytes") or status.get("total_bytes_estimate")
+        if status.get("status") == "finished":
+            progress(1.0)
+        elif status.get("status") == "downloading" and total:
+            progress(min(1.0, status.get("downloaded_bytes", 0) / total))
+
+    return hook
+
+
+def fetch_captions(video_url: str, info: dict = None):
+    """
+    Fetch the video's YouTube captions and convert them to plain text.
+
+    Manual subtitles are preferred over automatic captions (which can be
+    disabled via QUIZLY_CAPTIONS_ALLOW_AUTO). The track language follows
+    QUIZLY_WHISPER_LANGUAGE, then the video's own language, then English.
+    Any failure is treated as "no captions" so the caller can fall back
+    to Whisper.
+
+    Args:
+        video_url (str): The URL of the YouTube video.
+        info (dict, optional): Metadata from preflight_video; when given,
+            the video page is not fetched again.
+
+    Returns:
+        tuple | None: ``(text, kind)`` with kind "manual" or "auto",
+                      or None if no usable captions exist.
+    """
+    ydl_opts = {
+        "quiet": True,
+        "noplaylist": True,
+        "skip_download": True,
+    }
+
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            if info is None:
+                info = ydl.extract_info(video_url, download=False)
+            track, kind = _select_caption_track(info)
+            if track is None:
+                return None
+            raw = ydl.urlopen(track["url"]).read().decode("utf-8", errors="replace")
+    except (yt_dlp.utils.YoutubeDLError, OSError, KeyError, ValueError):
+        return None
+
+    try:
+        text = _captions_to_text(raw, track.get("ext"))
+    except (ValueError, AttributeError, TypeError):
+        # Malformed track (empty or HTML body, unexpected JSON).
+        return None
+    if not text:
+        return None
+    return text, kind
+
+
+def _select_caption_track(info: dict):
+    """
+    Pick the best caption track from yt-dlp metadata.
+
+    Returns:
+        tuple: ``(track, kind)`` or ``(None, None)`` if nothing matches.
+    """
+    preferred = _caption_language(info)
+    sources = [("manual", info.get("subtitles") or {})]
+    if getattr(settings, "QUIZLY_CAPTIONS_ALLOW_AUTO", True):
+        sources.append(("auto", info.get("automatic_captions") or {}))
+
+    for kind, tracks in sources:
+        # "<lang>-orig" is the untranslated automatic track of the spoken language.
+        candidates = [f"{preferred}-orig", preferred]
+        candidates += sorted(lang for lang in tracks if lang.split("-")[0] == preferred)
+        for lang in candidates:
+            for fmt in CAPTION_FORMATS:
+                for track in tracks.get(lang, []):
+                    if track.get("ext") == fmt and track.get("url"):
+                        return track, kind
+
+    return None, None
+
+
+def _caption_language(info: dict) -> str:
+    """Return the preferred caption language of a video."""
+    return getattr(settings, "QUIZLY_WHISPER_LANGUAGE", "") or info.get("language") or "en"
+
+
+def _captions_to_text(raw: str, ext: str) -> str:
+    """
+    Convert a json3 or WebVTT caption file to plain transcript text.
+
+    Consecutive duplicate lines (rolling automatic captions) are dropped.
+    """
+    if ext == "json3":
+        events = json.loads(raw).get("events", [])
+        lines = [
+            "".join(seg.get("utf8", "") for seg in event.get("segs") or [])
+            for event in events
+        ]
+    else:
+        lines = []
+        for line in raw.splitlines():
+            line = line.strip()
+            if (
+                not line
+                or line == "WEBVTT"
+                or VTT_TIMING_RE.match(line)
+                or line.startswith(("Kind:", "Language:", "NOTE"))
+            ):
+                continue
+            lines.append(VTT_TAG_RE.sub("", line))
+
+    text_lines = []
+    for line in lines:
+        line = " ".join(line.split())
+        if line and (not text_lines or text_lines[-1] != line):
+            text_lines.append(line)
+    return " ".join(text_lines)
+
+
+def transcribe_audio(audio_path: str, language: str = None, progress=None) -> str:
     """
     Transcribe an audio file to text using Whisper.
 
+    The model (QUIZLY_WHISPER_MODEL) is taken from the process-wide
+    model registry, so it is only loaded once per worker process.
+
+    With QUIZLY_VAD_ENABLED, an energy-based voice activity detector
+    drops silence and quiet breaks first, so Whisper only sees speech.
+
+    With QUIZLY_TRANSCRIBE_WORKERS > 1, audio longer than
+    QUIZLY_TRANSCRIBE_MIN_PARALLEL_SECONDS is split at silence and
+    transcribed in parallel by a pool of worker processes instead.
+
     Args:
         audio_path (str): Path to the audio file.
+        language (str, optional): Spoken language; skips Whisper's language
+            detection. Defaults to QUIZLY_WHISPER_LANGUAGE (or auto-detect).
+        progress (callable, optional): Called as ``progress(fraction)``
+            (0 to 1) whenever a chunk is done; a single Whisper call
+            reports once, when it finishes.
 
     Returns:
         str: The transcribed text.
+
+    Raises:
+        VideoRejectedError: If the audio contains no speech.
     """
-    model = whisper.load_model("base")
-    result = model.transcribe(audio_path)
-    return result["text"]
+    model_name = getattr(settings, "QUIZLY_WHISPER_MODEL", "base")
+    language = language or getattr(settings, "QUIZLY_WHISPER_LANGUAGE", "")
+    options = {"language": language} if language else {}
+    use_vad = getattr(settings, "QUIZLY_VAD_ENABLED", False)
+    parallel = parallel_transcription.worker_count() > 1
+
+    audio = audio_path
+    if use_vad or parallel:
+        audio = load_audio(audio_path)
+
+    if use_vad:
+        audio, _spans = speech_only(audio)
+        if len(audio) == 0:
+            _reject_no_speech()
+
+    if parallel:
+        min_seconds = getattr(settings, "QUIZLY_TRANSCRIBE_MIN_PARALLEL_SECONDS", 300)
+        if len(audio) >= min_seconds * SAMPLE_RATE:
+            return _require_speech(
+                parallel_transcription.transcribe_chunked(
+                    audio, language=language or None, progress=progress
+                )
+            )
+
+    with use_model(model_name) as model:
+        result = model.transcribe(audio, **options)
+    if progress is not None:
+        progress(1.0)
+    return _require_speech(result["text"])
+
 
+def _require_speech(text: str) -> str:
+    """Return a transcript, rejecting the video if it is empty."""
+    if not text.strip():
+        _reject_no_speech()
+    return text
 
-def generate_quiz(transcript: str) -> dict:
+
+def _reject_no_speech():
+    raise VideoRejectedError("Video contains no speech to build a quiz from.", reason="no_speech")
+
+
+def speech_only(audio) -> tuple:
+    """
+    Drop silence and quiet breaks from an audio array (VAD pre-pass).
+
+    Input and remaining seconds are added to the
+    ``transcribe_audio_seconds_total`` metric (stage "input" / "speech").
+
+    Args:
+        audio (np.ndarray): 16 kHz mono samples.
+
+    Returns:
+        tuple: ``(speech_audio, spans)`` with the kept sample spans (see
+        ``remap_segments``) to map timestamps back to the original audio.
+    """
+    spans = detect_speech(audio)
+    metrics.increment("transcribe_audio_seconds_total", len(audio) / SAMPLE_RATE, stage="input")
+    audio = keep_spans(audio, spans)
+    metrics.increment("transcribe_audio_seconds_total", len(audio) / SAMPLE_RATE, stage="speech")
+    return audio, spans
+
+
+def generate_quiz(transcript: str, video_title: str = None, checkpoints=None) -> dict:
     """
     Generate a quiz payload from a transcript using Gemini.
 
-    The model is instructed to return strictly valid JSON with:
+    Gemini is asked for structured JSON output against the declared
+    ``QuizPayload`` schema:
     - title
     - description
     - questions (10 questions, each with 4 options and one correct answer)
 
+    Long transcripts can be generated via map-reduce instead
+    (QUIZLY_QUIZ_STRATEGY, see ``quiz_map_reduce``), which checkpoints
+    the questions of every section.
+
+    The transcript is cleaned and fitted into the token budget first
+    (``prepare_transcript``). The response is decoded and validated in
+    one step by ``decode_quiz``.
+    If only some questions are invalid, just those are re-requested
+    (``repair_quiz``) instead of failing the whole quiz. Such a response
+    is checkpointed first, so a retry after a failed repair does not
+    request the whole quiz again.
+
     Args:
         transcript (str): The transcript text.
+        video_title (str, optional): Title of the video, given as context.
+        checkpoints (JobCheckpoints, optional): Stage checkpoints of the job.
 
     Returns:
         dict: Parsed quiz payload.
 
     Raises:
-        AIPipelineError: If the model is overloaded or returns invalid JSON.
+        AIPipelineError: If the model is overloaded, times out or returns
+            output that does not match the schema (Gemini calls are retried
+            by ``llm_client`` first).
+    """
+    if use_map_reduce(transcript):
+        return generate_quiz_map_reduce(transcript, video_title=video_title, checkpoints=checkpoints)
+
+    transcript = prepare_transcript(transcript)
+    checkpoints = checkpoints or NO_CHECKPOINTS
+    text = checkpoints.get(RESPONSE)
+    if text is None:
+        text = _request_quiz(transcript, video_title)
+
+    try:
+        return decode_quiz(text)
+    except AIPipelineError:
+        draft = load_draft(text)
+        if draft is None:
+            raise
+        checkpoints.save(RESPONSE, text)
+        return repair_quiz(draft, transcript)
+
+
+def _request_quiz(transcript: str, video_title: str = None) -> str:
     """
+    Request a quiz for a prepared transcript and return the raw response text.
+    """
+    title_hint = f"The video is titled: {video_title}\n\n" if video_title else ""
     prompt = (
-        "Based on the following transcript, generate a quiz in valid JSON format.\n\n"
-        "The quiz must follow this exact structure:\n\n"
-        "{\n"
-        "  \"title\": \"Create a concise quiz title based on the topic of the transcript.\",\n"
-        "  \"description\": \"Summarize the transcript in no more than 150 characters. Do not include any quiz questions or answers.\",\n"
-        "  \"questions\": [\n"
-        "    {\n"
-        "      \"question_title\": \"The question goes here.\",\n"
-        "      \"question_options\": [\"Option A\", \"Option B\", \"Option C\", \"Option D\"],\n"
-        "      \"answer\": \"The correct answer from the above options\"\n"
-        "    }\n"
-        "    ...(exactly 10 questions)\n"
-        "  ]\n"
-        "}\n\n"
+        "Based on the following transcript, generate a quiz.\n\n"
         "Requirements:\n"
+        "- title: A concise quiz title based on the topic of the transcript.\n"
+        "- description: Summarize the transcript in no more than 150 characters. "
+        "Do not include any quiz questions or answers.\n"
+        "- questions: Exactly 10 questions.\n"
         "- Each question must have exactly 4 distinct answer options.\n"
-        "- Only one correct answer is allowed per question, and it must be present in 'question_options'.\n"
-        "- The output must be valid JSON and parsable as-is (e.g., using Python's json.loads).\n"
-        "- Do not include explanations, comments, or any text outside the JSON.\n\n"
+        "- Only one correct answer is allowed per question, and 'answer' must repeat "
+        "the correct option exactly as written in 'question_options'.\n\n"
+        f"{title_hint}"
         "Transcript below:\n\n"
         f"{transcript}"
     )
 
-    client = genai.Client()
-
-    try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-        )
-
-        content = response.text or ""
-        content = content.strip()
-
-        # Handle cases where the model wraps JSON in Markdown code fences
-        if content.startswith("```"):
-            lines = content.splitlines()
-            if lines and lines[0].startswith("```"):
-                lines = lines[1:]
-            if lines and lines[-1].startswith("```"):
-                lines = lines[:-1]
-            content = "\n".join(lines).strip()
-
-        payload = json.loads(content)
-        return payload
-
-    except Exception as e:
-        message = str(e)
-        if "503" in message or "model is overloaded" in message:
-            raise AIPipelineError(
-                "AI pipeline failed: model overloaded, try again later."
-            ) from e
-
-        raise AIPipelineError("AI pipeline failed: invalid JSON output") from e
+    config = types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=QuizPayload,
+    )
+    return llm_client.generate_content(prompt, config=config).text
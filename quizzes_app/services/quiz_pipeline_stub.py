@@ -4,20 +4,43 @@ Stub quiz generation pipeline.
 This module provides a deterministic stub implementation of the quiz
 generation pipeline. It is used for fast end-to-end testing without
 calling external services like yt-dlp, Whisper, or Gemini.
+
+QUIZLY_STUB_LATENCY injects an artificial pipeline duration, e.g. for
+load tests that need requests to stay in flight like real ones.
 """
 
+import asyncio
+import time
+
+from django.conf import settings
+
+
+def _latency() -> float:
+    return float(getattr(settings, "QUIZLY_STUB_LATENCY", 0))
 
-def build_quiz_stub(video_url: str) -> dict:
+
+def build_quiz_stub(video_url: str, progress=None, latency: float = None) -> dict:
     """
     Return a static quiz payload for testing purposes.
 
     Args:
         video_url (str): The YouTube URL (ignored in stub mode).
+        progress (callable, optional): Called as ``progress(stage, percent)``;
+            the stub reports a single "generate" stage.
+        latency (float, optional): Seconds to block before returning.
+            Defaults to QUIZLY_STUB_LATENCY.
 
     Returns:
         dict: A deterministic quiz structure with 10 questions,
               each having 4 options and a single correct answer.
     """
+    if progress is not None:
+        progress("generate", 70)
+
+    latency = _latency() if latency is None else latency
+    if latency > 0:
+        time.sleep(latency)
+
     return {
         "title": "Stub vs. Prod: Understand & Apply",
         "description": "Test your knowledge of stub and production pipelines: purpose, differences, usage, and common pitfalls.",
@@ -124,3 +147,19 @@ def build_quiz_stub(video_url: str) -> dict:
             },
         ],
     }
+
+
+async def abuild_quiz_stub(video_url: str) -> dict:
+    """
+    Async variant of ``build_quiz_stub``; the injected latency is awaited.
+
+    Args:
+        video_url (str): The YouTube URL (ignored in stub mode).
+
+    Returns:
+        dict: The static quiz payload.
+    """
+    latency = _latency()
+    if latency > 0:
+        await asyncio.sleep(latency)
+    return build_quiz_stub(video_url, latency=0)
@@ -0,0 +1,128 @@
+"""
+Targeted repair of invalid quiz questions.
+
+When Gemini returns a quiz in which only some questions break the rules
+(wrong number of options, answer not among the options, missing
+questions), only those questions are requested again and merged back
+into the quiz. The transcript and the already valid questions are given
+as context, so the replacements fit the quiz and do not repeat it.
+
+Includes:
+- load_draft: Parse a model response into a quiz draft, if possible.
+- repair_quiz: Replace invalid questions within a retry budget.
+"""
+
+import json
+
+from django.conf import settings
+from google.genai import types
+
+from quizzes_app.services import llm_client, metrics
+from quizzes_app.services.error import AIPipelineError
+from quizzes_app.services.persist_quiz import find_invalid_questions
+from quizzes_app.services.quiz_schema import QUESTION_COUNT, QuizQuestion, decode_questions, decode_quiz
+
+
+def load_draft(content: str):
+    """
+    Parse a model response into a quiz draft that can be repaired.
+
+    A draft is a JSON object with string ``title`` and ``description`` and
+    a list of ``questions``; the questions themselves may be invalid.
+
+    Args:
+        content (str): The raw JSON text returned by the model.
+
+    Returns:
+        dict | None: The draft, or None if the response cannot be repaired.
+    """
+    try:
+        draft = json.loads(content or "")
+    except ValueError:
+        return None
+
+    if (
+        not isinstance(draft, dict)
+        or not isinstance(draft.get("title"), str)
+        or not isinstance(draft.get("description"), str)
+        or not isinstance(draft.get("questions"), list)
+    ):
+        return None
+    return draft
+
+
+def repair_quiz(draft: dict, transcript: str, attempts: int = None) -> dict:
+    """
+    Re-request the invalid questions of a quiz draft and merge them back.
+
+    Each round asks Gemini only for as many questions as are invalid. Valid
+    replacements are put into the slots of the invalid questions; slots that
+    are still invalid are retried in the next round.
+
+    Args:
+        draft (dict): Quiz draft as returned by ``load_draft``.
+        transcript (str): The transcript the quiz was generated from.
+        attempts (int, optional): Repair rounds (QUIZLY_QUIZ_REPAIR_ATTEMPTS).
+
+    Returns:
+        dict: The repaired, validated quiz payload.
+
+    Raises:
+        AIPipelineError: If invalid questions remain after all rounds.
+    """
+    if attempts is None:
+        attempts = int(getattr(settings, "QUIZLY_QUIZ_REPAIR_ATTEMPTS", 2))
+
+    payload = {**draft, "questions": list(draft["questions"][:QUESTION_COUNT])}
+    initial = len(find_invalid_questions(payload))
+
+    for _ in range(attempts):
+        bad = [index for index, _reason in find_invalid_questions(payload)]
+        if not bad:
+            break
+
+        replacements = _request_questions(payload, bad, transcript)
+        for index in bad:
+            if not replacements:
+                break
+            question = replacements.pop(0)
+            if index < len(payload["questions"]):
+                payload["questions"][index] = question
+            else:
+                payload["questions"].append(question)
+
+    problems = find_invalid_questions(payload)
+    metrics.increment("quiz_repair_questions_total", initial - len(problems), outcome="repaired")
+    if problems:
+        metrics.increment("quiz_repair_questions_total", len(problems), outcome="failed")
+        raise AIPipelineError(f"AI pipeline failed: {problems[0][1]}")
+
+    return decode_quiz(json.dumps(payload))
+
+
+def _request_questions(payload: dict, bad: list, transcript: str) -> list:
+    """Ask Gemini for ``len(bad)`` new questions; return the valid ones as dicts."""
+    keep = [
+        q["question_title"]
+        for i, q in enumerate(payload["questions"])
+        if i not in bad
+    ]
+    existing = "\n".join(f"- {title}" for title in keep) or "- (none)"
+    prompt = (
+        f"The quiz \"{payload['title']}\" needs {len(bad)} more multiple-choice "
+        f"question(s) about the transcript below.\n\n"
+        "Requirements:\n"
+        f"- Return exactly {len(bad)} question(s).\n"
+        "- Each question must have exactly 4 distinct answer options.\n"
+        "- 'answer' must repeat the correct option exactly as written in 'question_options'.\n"
+        "- Do not repeat any of these existing questions:\n"
+        f"{existing}\n\n"
+        "Transcript below:\n\n"
+        f"{transcript}"
+    )
+    config = types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=list[QuizQuestion],
+    )
+    response = llm_client.generate_content(prompt, config=config)
+    return decode_questions(response.text)
@@ -0,0 +1,118 @@
+"""
+Declared schema of the quiz payload produced by the AI pipeline.
+
+The same models are sent to Gemini as response schema (structured
+output) and used to decode its answer, so the payload is checked against
+the rules of ``validate_payload`` in a single typed decode.
+
+Includes:
+- QuizQuestion: One question with exactly 4 options and a valid answer.
+- QuizPayload: Title, description and exactly 10 questions.
+- QuizHeader: Title and description only (map-reduce reduce step).
+- decode_quiz: Decode and validate a JSON quiz payload.
+- decode_questions: Decode a JSON list of questions, keeping only the valid ones.
+"""
+
+import json
+
+from pydantic import BaseModel, Field, ValidationError, model_validator
+
+from quizzes_app.services.error import AIPipelineError
+
+QUESTION_COUNT = 10
+OPTION_COUNT = 4
+
+
+class QuizQuestion(BaseModel):
+    """
+    A single multiple-choice question.
+
+    Fields:
+    - question_title: The question text.
+    - question_options: Exactly 4 answer options.
+    - answer: The correct answer, one of ``question_options``.
+    """
+
+    question_title: str
+    question_options: list[str] = Field(min_length=OPTION_COUNT, max_length=OPTION_COUNT)
+    answer: str
+
+    @model_validator(mode="after")
+    def _answer_in_options(self):
+        if self.answer not in self.question_options:
+            raise ValueError("answer must be one of question_options")
+        return self
+
+
+class QuizPayload(BaseModel):
+    """
+    The complete quiz payload.
+
+    Fields:
+    - title: Concise quiz title.
+    - description: Short summary of the video.
+    - questions: Exactly 10 questions.
+    """
+
+    title: str
+    description: str
+    questions: list[QuizQuestion] = Field(min_length=QUESTION_COUNT, max_length=QUESTION_COUNT)
+
+
+class QuizHeader(BaseModel):
+    """
+    Title and description of a quiz whose questions are already chosen.
+
+    Fields:
+    - title: Concise quiz title.
+    - description: Short summary of the video.
+    """
+
+    title: str
+    description: str
+
+
+def decode_quiz(content: str) -> dict:
+    """
+    Decode a JSON quiz payload and validate it against ``QuizPayload``.
+
+    Args:
+        content (str): The raw JSON text returned by the model.
+
+    Returns:
+        dict: The quiz payload as plain Python data.
+
+    Raises:
+        AIPipelineError: If the content is not valid JSON or violates the schema.
+    """
+    try:
+        return QuizPayload.model_validate_json(content or "").model_dump()
+    except ValidationError as e:
+        raise AIPipelineError("AI pipeline failed: invalid JSON output") from e
+
+
+def decode_questions(content: str) -> list:
+    """
+    Decode a JSON list of questions and keep only the valid ones.
+
+    Unlike ``decode_quiz``, one invalid question does not discard the
+    others; it is simply left out.
+
+    Args:
+        content (str): The raw JSON text returned by the model.
+
+    Returns:
+        list: Valid questions as plain dicts (empty if the content is not a JSON list).
+    """
+    try:
+        items = json.loads(content or "")
+    except ValueError:
+        return []
+
+    questions = []
+    for item in items if isinstance(items, list) else []:
+        try:
+            questions.append(QuizQuestion.model_validate(item).model_dump())
+        except ValidationError:
+            continue
+    return questions
@@ -0,0 +1,177 @@
+"""
+Single-flight coalescing of concurrent pipeline runs.
+
+When many users submit the same video at once, only one pipeline run
+per key (video ID) executes; every concurrent caller shares its result.
+
+Coalescing works on two levels:
+- Within a process, callers wait for the in-flight call of the leader thread.
+- Across processes, a file lock (filelock) serializes the runs, and the
+  leader publishes its result to a short-lived result file that waiting
+  processes pick up instead of running the pipeline again.
+
+Includes:
+- SingleFlight: The coalescing registry.
+- single_flight: The shared instance used by the production pipeline.
+"""
+
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from filelock import FileLock, Timeout
+
+from quizzes_app.services import metrics
+
+
+class _Call:
+    """
+    An in-flight call that followers in the same process can wait for.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time and share its result.
+
+    Parameters:
+        lock_dir (str, optional): Directory for lock and result files
+            (QUIZLY_LOCK_DIR).
+        result_ttl (float, optional): Seconds a published result may be
+            reused by other processes (QUIZLY_SINGLE_FLIGHT_RESULT_TTL).
+        lock_timeout (float, optional): Seconds to wait for the cross-process
+            lock before running anyway (QUIZLY_SINGLE_FLIGHT_LOCK_TIMEOUT).
+
+    Results must be JSON-serializable so they can be shared across processes.
+    """
+
+    def __init__(self, lock_dir=None, result_ttl=None, lock_timeout=None):
+        self._lock_dir = lock_dir
+        self._result_ttl = result_ttl
+        self._lock_timeout = lock_timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    @property
+    def lock_dir(self) -> str:
+        """Return the directory holding lock and result files."""
+        lock_dir = self._lock_dir or getattr(settings, "QUIZLY_LOCK_DIR", "")
+        return lock_dir or os.path.join(tempfile.gettempdir(), "quizly_locks")
+
+    @property
+    def result_ttl(self) -> float:
+        """Return how long published results may be reused, in seconds."""
+        if self._result_ttl is not None:
+            return float(self._result_ttl)
+        return float(getattr(settings, "QUIZLY_SINGLE_FLIGHT_RESULT_TTL", 60))
+
+    @property
+    def lock_timeout(self) -> float:
+        """Return the maximum wait for the cross-process lock, in seconds."""
+        if self._lock_timeout is not None:
+            return float(self._lock_timeout)
+        return float(getattr(settings, "QUIZLY_SINGLE_FLIGHT_LOCK_TIMEOUT", 1800))
+
+    def do(self, key: str, fn):
+        """
+        Return ``fn()``, coalescing concurrent calls with the same key.
+
+        Args:
+            key (str): Coalescing key (e.g. a YouTube video ID).
+            fn (callable): Zero-argument function producing the result.
+
+        Returns:
+            The (deep-copied) result of the leader's call.
+
+        Raises:
+            Exception: Whatever the leader's call raised.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            metrics.increment("single_flight_shared_total", scope="process")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = self._run_exclusive(key, fn)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return copy.deepcopy(call.result)
+
+    def _run_exclusive(self, key: str, fn):
+        os.makedirs(self.lock_dir, exist_ok=True)
+        lock = FileLock(os.path.join(self.lock_dir, f"{key}.lock"))
+
+        try:
+            lock.acquire(timeout=self.lock_timeout)
+        except Timeout:
+            # Never block a request forever on a stuck peer; run unshared.
+            return fn()
+
+        try:
+            shared = self._read_result(key)
+            if shared is not None:
+                metrics.increment("single_flight_shared_total", scope="host")
+                return shared
+
+            result = fn()
+            self._write_result(key, result)
+            return result
+        finally:
+            lock.release()
+
+    def _result_path(self, key: str) -> str:
+        return os.path.join(self.lock_dir, f"{key}.json")
+
+    def _read_result(self, key: str):
+        path = self._result_path(key)
+        try:
+            age = time.time() - os.path.getmtime(path)
+            if age >= self.result_ttl:
+                os.remove(path)
+                return None
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_result(self, key: str, result) -> None:
+        if self.result_ttl <= 0:
+            return
+
+        path = self._result_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,259 @@
+"""
+Transcript preprocessing and token budgeting before prompting Gemini.
+
+Long transcripts make the quiz prompt slow, expensive and more likely to
+hit overload errors. Before prompting, the transcript is cleaned (filler
+words, Whisper sound tags and repetitions are removed) and, if it is
+still above the token budget, reduced to representative segments spread
+over the whole video.
+
+Includes:
+- count_tokens: Count the tokens of a text (tiktoken, with an estimate as fallback).
+- clean_transcript: Remove filler words, sound tags and repetitions.
+- split_segments: Group sentences into segments of a target token size.
+- fit_to_budget: Select representative segments within a token budget.
+- prepare_transcript: Clean and fit a transcript, recording token metrics.
+- record_transcript_tokens: Record the token metrics of a prompted transcript.
+"""
+
+import logging
+import math
+import re
+import threading
+from collections import Counter
+
+import tiktoken
+from django.conf import settings
+
+from quizzes_app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+WORDS_PER_TOKEN = 0.75
+MIN_DEDUP_WORDS = 6
+SEGMENT_SEPARATOR = " [...] "
+
+SOUND_TAG_RE = re.compile(r"\[[^\]]{1,40}\]|\([^)]{0,20}(music|applause|laughter)[^)]{0,20}\)|♪+", re.IGNORECASE)
+# Only unambiguous fillers: "um" is a word in German/Portuguese, "ah" an interjection.
+FILLER_RE = re.compile(r",?\s*(?<!\w)(?:uh+m*|umm+|erm+|hmm+|ähm|äh)(?!\w),?", re.IGNORECASE)
+REPEATED_WORD_RE = re.compile(r"\b(\w+)(?:[\s,]+\1\b)+", re.IGNORECASE)
+SENTENCE_RE = re.compile(r"[^.!?]+(?:[.!?]+|$)")
+WORD_RE = re.compile(r"\w{4,}")
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """Return the tiktoken encoding, or None if it cannot be loaded."""
+    global _encoding, _encoding_loaded
+
+    with _encoding_lock:
+        if not _encoding_loaded:
+            name = getattr(settings, "QUIZLY_TOKEN_ENCODING", "cl100k_base")
+            try:
+                _encoding = tiktoken.get_encoding(name)
+            except Exception:
+                logger.warning("Tokenizer %s unavailable, estimating token counts", name)
+                _encoding = None
+            _encoding_loaded = True
+        return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens of ``text``.
+
+    Uses the tiktoken encoding QUIZLY_TOKEN_ENCODING. Gemini uses its own
+    tokenizer, so the count is an approximation either way; if the
+    encoding cannot be loaded (e.g. offline), ~4 characters per token
+    are assumed.
+
+    Args:
+        text (str): The text to count.
+
+    Returns:
+        int: Number of tokens.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def clean_transcript(text: str) -> str:
+    """
+    Remove filler words, sound tags and repetitions from a transcript.
+
+    Removes:
+    - Sound tags such as "[Music]", "(applause)" or "♪".
+    - Filler words ("uh", "uhm", "erm", "hmm", "äh", ...).
+    - Immediately repeated words ("the the").
+    - Repeated sentences: consecutive repeats (e.g. Whisper looping on the
+      same phrase) and later repeats of longer sentences.
+
+    Args:
+        text (str): The raw transcript.
+
+    Returns:
+        str: The cleaned transcript.
+    """
+    text = SOUND_TAG_RE.sub(" ", text)
+    text = FILLER_RE.sub(" ", text)
+    text = REPEATED_WORD_RE.sub(r"\1", text)
+
+    sentences = []
+    seen = set()
+    previous = None
+    for sentence in _sentences(text):
+        key = re.sub(r"\W+", " ", sentence.lower()).strip()
+        if not key or key == previous or key in seen:
+            continue
+        previous = key
+        if len(key.split()) >= MIN_DEDUP_WORDS:
+            seen.add(key)
+        sentences.append(sentence)
+
+    text = re.sub(r"\s+", " ", " ".join(sentences))
+    return re.sub(r"\s+([,.!?])", r"\1", text).strip()
+
+
+def fit_to_budget(text: str, budget: int, segment_tokens: int = None) -> str:
+    """
+    Reduce a transcript to representative segments within ``budget`` tokens.
+
+    The transcript is split into segments of about ``segment_tokens``
+    tokens (whole sentences). The timeline is divided into as many equal
+    parts as segments fit into the budget, and from each part the segment
+    with the highest salience (sum of the transcript-wide frequencies of
+    its content words, normalized by length) is kept. Kept segments stay
+    in their original order, joined by "[...]".
+
+    Args:
+        text (str): The (cleaned) transcript.
+        budget (int): Maximum number of tokens.
+        segment_tokens (int, optional): Target segment size
+            (QUIZLY_TRANSCRIPT_SEGMENT_TOKENS).
+
+    Returns:
+        str: The transcript, unchanged if it fits the budget.
+    """
+    if count_tokens(text) <= budget:
+        return text
+
+    if segment_tokens is None:
+        segment_tokens = int(getattr(settings, "QUIZLY_TRANSCRIPT_SEGMENT_TOKENS", 300))
+    segments = split_segments(text, segment_tokens)
+    sizes = [count_tokens(segment) for segment in segments]
+    frequencies = Counter(WORD_RE.findall(text.lower()))
+
+    def salience(index):
+        words = WORD_RE.findall(segments[index].lower())
+        return sum(frequencies[w] for w in set(words)) / math.sqrt(len(words) + 1)
+
+    separator_tokens = count_tokens(SEGMENT_SEPARATOR)
+    slots = max(1, budget // (segment_tokens + separator_tokens))
+    bounds = [round(i * len(segments) / slots) for i in range(slots + 1)]
+
+    chosen = []
+    used = 0
+    for start, end in zip(bounds, bounds[1:]):
+        if start >= end:
+            continue
+        best = max(range(start, end), key=salience)
+        cost = sizes[best] + (separator_tokens if chosen else 0)
+        if used + cost > budget:
+            continue
+        chosen.append(best)
+        used += cost
+
+    if not chosen:
+        # A single oversized segment: hard-truncate to the budget.
+        return text[: budget * CHARS_PER_TOKEN]
+    return SEGMENT_SEPARATOR.join(segments[i] for i in chosen)
+
+
+def prepare_transcript(text: str, budget: int = None) -> str:
+    """
+    Clean a transcript and fit it into the prompt token budget.
+
+    Token counts before and after are added to the pipeline metrics
+    (``transcript_tokens_total`` with stage "raw" / "prompt") and logged
+    per request.
+
+    Args:
+        text (str): The raw transcript.
+        budget (int, optional): Token budget (QUIZLY_TRANSCRIPT_TOKEN_BUDGET).
+
+    Returns:
+        str: The transcript to put into the prompt.
+    """
+    if budget is None:
+        budget = int(getattr(settings, "QUIZLY_TRANSCRIPT_TOKEN_BUDGET", 12000))
+
+    raw_tokens = count_tokens(text)
+    prepared = fit_to_budget(clean_transcript(text), budget)
+    prompt_tokens = count_tokens(prepared)
+
+    record_transcript_tokens(raw_tokens, prompt_tokens)
+    logger.info("Transcript tokens: %d raw, %d in prompt (budget %d)", raw_tokens, prompt_tokens, budget)
+    return prepared
+
+
+def record_transcript_tokens(raw_tokens: int, prompt_tokens: int) -> None:
+    """
+    Add the token counts of a transcript before and after preprocessing
+    to ``transcript_tokens_total`` (stage "raw" / "prompt"), and count it
+    in ``transcripts_compressed_total`` if it shrank.
+    """
+    metrics.increment("transcript_tokens_total", raw_tokens, stage="raw")
+    metrics.increment("transcript_tokens_total", prompt_tokens, stage="prompt")
+    if prompt_tokens < raw_tokens:
+        metrics.increment("transcripts_compressed_total")
+
+
+def _sentences(text: str) -> list:
+    return [s.strip() for s in SENTENCE_RE.findall(text) if s.strip()]
+
+
+def _pieces(text: str, segment_tokens: int) -> list:
+    """Sentences, with overlong ones (e.g. unpunctuated captions) split into word windows."""
+    window = max(1, int(segment_tokens * WORDS_PER_TOKEN))
+    pieces = []
+    for sentence in _sentences(text):
+        words = sentence.split()
+        if len(words) <= window:
+            pieces.append(sentence)
+        else:
+            pieces.extend(" ".join(words[i:i + window]) for i in range(0, len(words), window))
+    return pieces
+
+
+def split_segments(text: str, segment_tokens: int) -> list:
+    """
+    Group whole sentences into segments of about ``segment_tokens`` tokens.
+
+    Args:
+        text (str): The transcript.
+        segment_tokens (int): Target segment size.
+
+    Returns:
+        list: The segment texts, in order.
+    """
+    segments = []
+    current = []
+    current_tokens = 0
+    for sentence in _pieces(text, segment_tokens):
+        tokens = count_tokens(sentence)
+        if current and current_tokens + tokens > segment_tokens:
+            segments.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += tokens
+    if current:
+        segments.append(" ".join(current))
+    return segments
@@ -0,0 +1,173 @@
+"""
+Persistent, content-addressed transcript cache.
+
+Transcripts are keyed by (video ID, Whisper model, language), so every
+repeat submission of a video can skip audio download and transcription.
+
+Includes:
+- get_transcript: Look up a cached transcript and record a hit or miss.
+- has_transcript: Check for a cached transcript without recording a hit.
+- store_transcript: Save a transcript and apply eviction.
+- evict: Remove expired entries and enforce the size cap.
+- cache_stats: Report hit/miss counters and cache size.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from quizzes_app.models import CachedTranscript
+from quizzes_app.services import metrics
+
+AUTO_LANGUAGE = "auto"
+
+
+def get_transcript(video_id: str, model_name: str, language: str = None):
+    """
+    Return the cached transcript for the given key, if present and fresh.
+
+    Args:
+        video_id (str): YouTube video ID.
+        model_name (str): Whisper model name.
+        language (str, optional): Transcription language, None for auto-detection.
+
+    Returns:
+        str | None: The cached transcript text, or None on a cache miss.
+    """
+    language = language or AUTO_LANGUAGE
+    entry = (
+        CachedTranscript.objects.filter(
+            video_id=video_id,
+            model_name=model_name,
+            language=language,
+            created_at__gte=_expiry_cutoff(),
+            size__gt=0,
+        )
+        .only("id", "text")
+        .first()
+    )
+
+    if entry is None:
+        metrics.increment("transcript_cache_misses_total")
+        return None
+
+    CachedTranscript.objects.filter(pk=entry.pk).update(
+        hits=F("hits") + 1, last_used_at=timezone.now()
+    )
+    metrics.increment("transcript_cache_hits_total")
+    return entry.text
+
+
+def has_transcript(video_id: str, model_name: str, language: str = None) -> bool:
+    """
+    Return whether a fresh transcript of the video is cached.
+
+    Unlike ``get_transcript``, no hit or miss is recorded (used to
+    estimate the cost of queued jobs).
+
+    Args:
+        video_id (str): YouTube video ID.
+        model_name (str): Whisper model name.
+        language (str, optional): Transcription language; None matches any.
+
+    Returns:
+        bool: True if a transcript is cached.
+    """
+    entries = CachedTranscript.objects.filter(
+        video_id=video_id, model_name=model_name, created_at__gte=_expiry_cutoff(), size__gt=0
+    )
+    if language:
+        entries = entries.filter(language=language)
+    return entries.exists()
+
+
+def store_transcript(video_id: str, model_name: str, language: str, text: str) -> None:
+    """
+    Store a transcript in the cache (replacing an older entry for the same key).
+
+    Empty transcripts are not stored, so a failed transcription is not
+    replayed to later submissions.
+
+    Args:
+        video_id (str): YouTube video ID.
+        model_name (str): Whisper model name.
+        language (str): Transcription language, None for auto-detection.
+        text (str): The transcript text.
+    """
+    if not text.strip():
+        return
+    language = language or AUTO_LANGUAGE
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            CachedTranscript.objects.update_or_create(
+                video_id=video_id,
+                model_name=model_name,
+                language=language,
+                defaults={
+                    "text": text,
+                    "size": len(text),
+                    "created_at": now,
+                    "last_used_at": now,
+                },
+            )
+    except IntegrityError:
+        # A concurrent worker stored the same transcript first.
+        pass
+
+    evict()
+
+
+def evict() -> int:
+    """
+    Apply the cache eviction policy.
+
+    Policy:
+    - Entries older than QUIZLY_TRANSCRIPT_CACHE_TTL seconds are removed.
+    - While the total transcript size exceeds QUIZLY_TRANSCRIPT_CACHE_MAX_MB,
+      the least recently used entries are removed.
+
+    Returns:
+        int: Number of evicted entries.
+    """
+    evicted, _ = CachedTranscript.objects.filter(created_at__lt=_expiry_cutoff()).delete()
+
+    max_bytes = getattr(settings, "QUIZLY_TRANSCRIPT_CACHE_MAX_MB", 256) * 1024 * 1024
+    total = CachedTranscript.objects.aggregate(total=Sum("size"))["total"] or 0
+    if total <= max_bytes:
+        return evicted
+
+    doomed = []
+    for pk, size in CachedTranscript.objects.order_by("last_used_at").values_list("pk", "size"):
+        if total <= max_bytes:
+            break
+        doomed.append(pk)
+        total -= size
+
+    deleted, _ = CachedTranscript.objects.filter(pk__in=doomed).delete()
+    return evicted + deleted
+
+
+def cache_stats() -> dict:
+    """
+    Report transcript cache statistics.
+
+    Returns:
+        dict: Hits and misses of this process, plus entry count and
+              total size of the persistent cache.
+    """
+    aggregate = CachedTranscript.objects.aggregate(total=Sum("size"))
+    return {
+        "hits": int(metrics.get_counter("transcript_cache_hits_total")),
+        "misses": int(metrics.get_counter("transcript_cache_misses_total")),
+        "entries": CachedTranscript.objects.count(),
+        "size": aggregate["total"] or 0,
+    }
+
+
+def _expiry_cutoff():
+    ttl = getattr(settings, "QUIZLY_TRANSCRIPT_CACHE_TTL", 30 * 24 * 3600)
+    return timezone.now() - timedelta(seconds=ttl)
@@ -0,0 +1,232 @@
+"""
+Process-wide cache of loaded Whisper models.
+
+Loading a Whisper model means deserializing hundreds of MB of weights,
+so every worker process keeps each configured model size in memory once
+and hands it out to all transcriptions.
+
+Includes:
+- WhisperModelRegistry: Thread-safe, memory-capped cache of loaded models.
+- registry: The shared registry instance of this process.
+- use_model: Context manager that borrows a model from the shared registry.
+- preload_models: Load the configured models ahead of the first request.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+import whisper
+from django.conf import settings
+
+
+class _CachedModel:
+    """
+    Bookkeeping for a single loaded model.
+
+    Fields:
+    - model: The loaded Whisper model.
+    - size_bytes: Approximate memory footprint of the model weights.
+    - last_used: Monotonic timestamp of the last checkout.
+    - in_use: Number of callers currently holding the model.
+    - lock: Serializes inference, since Whisper installs per-call hooks on the model.
+    """
+
+    def __init__(self, model, size_bytes: int):
+        self.model = model
+        self.size_bytes = size_bytes
+        self.last_used = time.monotonic()
+        self.in_use = 0
+        self.lock = threading.Lock()
+
+
+def _model_size_bytes(model) -> int:
+    """
+    Return the memory footprint of a model's parameters and buffers.
+    """
+    try:
+        tensors = list(model.parameters()) + list(model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    except (AttributeError, TypeError):
+        return 0
+
+
+class WhisperModelRegistry:
+    """
+    Thread-safe cache of Whisper models, keyed by model name.
+
+    Behavior:
+    - Each model name is loaded at most once, even under concurrent requests.
+    - Models unused for longer than ``idle_timeout`` seconds are evicted.
+    - When the loaded models exceed ``max_memory_mb``, the least recently
+      used idle models are evicted until the cap is met again.
+    - Models that are currently in use are never evicted.
+    """
+
+    def __init__(self, *, max_memory_mb=None, idle_timeout=None, loader=None):
+        self._max_memory_mb = max_memory_mb
+        self._idle_timeout = idle_timeout
+        self._loader = loader
+        self._models = {}
+        self._load_locks = {}
+        self._lock = threading.Lock()
+
+    @property
+    def max_memory_bytes(self) -> int:
+        """Return the configured memory cap in bytes."""
+        limit = self._max_memory_mb
+        if limit is None:
+            limit = getattr(settings, "QUIZLY_WHISPER_MAX_MEMORY_MB", 2048)
+        return int(limit) * 1024 * 1024
+
+    @property
+    def idle_timeout(self) -> float:
+        """Return the idle timeout in seconds."""
+        timeout = self._idle_timeout
+        if timeout is None:
+            timeout = getattr(settings, "QUIZLY_WHISPER_IDLE_TIMEOUT", 3600)
+        return float(timeout)
+
+    def loaded(self) -> list:
+        """Return the names of all currently loaded models."""
+        with self._lock:
+            return sorted(self._models)
+
+    def memory_bytes(self) -> int:
+        """Return the combined footprint of all loaded models."""
+        with self._lock:
+            return sum(entry.size_bytes for entry in self._models.values())
+
+    def preload(self, names) -> None:
+        """Load the given model names without checking them out."""
+        for name in names:
+            self._get_or_load(name)
+
+    @contextmanager
+    def use(self, name: str):
+        """
+        Check out a loaded model for exclusive use.
+
+        Loads the model on first use and keeps it cached afterwards.
+        Inference on the same model is serialized by a per-model lock.
+
+        Args:
+            name (str): Whisper model name (e.g. "base").
+
+        Yields:
+            The loaded Whisper model.
+        """
+        entry = self._get_or_load(name, checkout=True)
+        try:
+            with entry.lock:
+                yield entry.model
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+
+    def evict_idle(self) -> list:
+        """
+        Evict models that have been idle longer than the timeout.
+
+        Returns:
+            list: Names of the evicted models.
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                name
+                for name, entry in self._models.items()
+                if entry.in_use == 0 and now - entry.last_used > self.idle_timeout
+            ]
+            for name in expired:
+                del self._models[name]
+        return expired
+
+    def clear(self) -> None:
+        """Drop all cached models."""
+        with self._lock:
+            self._models.clear()
+            self._load_locks.clear()
+
+    def _get_or_load(self, name: str, checkout: bool = False) -> _CachedModel:
+        self.evict_idle()
+
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is not None:
+                self._touch(entry, checkout)
+                return entry
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        # Only one thread loads a given model; the others wait and reuse it.
+        with load_lock:
+            with self._lock:
+                entry = self._models.get(name)
+                if entry is not None:
+                    self._touch(entry, checkout)
+                    return entry
+
+            loader = self._loader or whisper.load_model
+            model = loader(name)
+            entry = _CachedModel(model, _model_size_bytes(model))
+
+            with self._lock:
+                self._models[name] = entry
+                self._touch(entry, checkout)
+                self._enforce_memory_cap(keep=name)
+            return entry
+
+    def _touch(self, entry: _CachedModel, checkout: bool) -> None:
+        entry.last_used = time.monotonic()
+        if checkout:
+            entry.in_use += 1
+
+    def _enforce_memory_cap(self, keep: str) -> None:
+        total = sum(entry.size_bytes for entry in self._models.values())
+        candidates = sorted(
+            (
+                (entry.last_used, name)
+                for name, entry in self._models.items()
+                if name != keep and entry.in_use == 0
+            ),
+        )
+        for _, name in candidates:
+            if total <= self.max_memory_bytes:
+                break
+            total -= self._models.pop(name).size_bytes
+
+
+registry = WhisperModelRegistry()
+
+
+def use_model(name: str = None):
+    """
+    Borrow a model from the shared registry.
+
+    Args:
+        name (str, optional): Model name, defaults to QUIZLY_WHISPER_MODEL.
+
+    Returns:
+        A context manager yielding the loaded Whisper model.
+    """
+    if name is None:
+        name = getattr(settings, "QUIZLY_WHISPER_MODEL", "base")
+    return registry.use(name)
+
+
+def preload_models(names=None) -> list:
+    """
+    Load the configured Whisper models into the shared registry.
+
+    Args:
+        names (list, optional): Model names, defaults to QUIZLY_WHISPER_PRELOAD.
+
+    Returns:
+        list: The names of the preloaded models.
+    """
+    if names is None:
+        names = getattr(settings, "QUIZLY_WHISPER_PRELOAD", [])
+    registry.preload(names)
+    return list(names)
+
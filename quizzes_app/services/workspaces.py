@@ -0,0 +1,348 @@
+"""
+Scoped temporary workspaces for pipeline runs.
+
+Every download gets its own directory below QUIZLY_WORKSPACE_DIR (a
+tmpfs such as ``/dev/shm/quizly`` keeps audio off the disk). The whole
+tree is removed when the run ends, including yt-dlp ``.part`` files and
+post-processor leftovers.
+
+With QUIZLY_WORKSPACE_QUOTA_MB, the workspaces of all processes sharing
+the directory stay within a total size: a run reserves the space it
+will need (estimated from the video duration) before it starts, and
+waits up to QUIZLY_WORKSPACE_WAIT seconds while other runs hold the
+space. The usage of a workspace counts as its reservation or its actual
+size, whichever is larger.
+
+Workspaces left behind by crashed processes are removed by a sweeper
+thread every QUIZLY_WORKSPACE_SWEEP_INTERVAL seconds: directories whose
+process is gone, and directories older than QUIZLY_WORKSPACE_MAX_AGE.
+The directory must be local to the host (process IDs are checked).
+Only directories created here (``quizly-ws-<pid>-<token>`` with a
+marker file) count as workspaces; anything else in the directory is
+left alone, so it may be shared with other software (e.g. /dev/shm).
+
+Includes:
+- WorkspaceManager: Creates, limits and removes workspaces.
+- workspaces: The shared instance used by the prod pipeline.
+"""
+
+import logging
+import os
+import re
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from filelock import FileLock
+
+from quizzes_app.services import metrics
+from quizzes_app.services.error import PipelineOverloadedError, VideoRejectedError
+
+logger = logging.getLogger(__name__)
+
+NAME_PREFIX = "quizly-ws-"
+NAME_RE = re.compile(r"^quizly-ws-(\d+)-[0-9a-f]+$")
+# Marks a directory as a workspace and holds its reserved bytes.
+MARKER_FILE = ".quizly-workspace"
+LOCK_FILE = ".quizly-workspaces.lock"
+
+
+class Workspace:
+    """
+    A workspace directory and the bytes reserved for it.
+    """
+
+    def __init__(self, path: str, reserved: int = 0):
+        self.path = path
+        self.reserved = reserved
+
+
+class WorkspaceManager:
+    """
+    Create per-run workspace directories within a disk quota.
+
+    Parameters:
+        root (str, optional): Parent directory of the workspaces
+            (QUIZLY_WORKSPACE_DIR).
+        quota_mb (float, optional): Total size of all workspaces in MB,
+            0 = unlimited (QUIZLY_WORKSPACE_QUOTA_MB).
+        wait (float, optional): Longest wait for quota in seconds
+            (QUIZLY_WORKSPACE_WAIT).
+        max_age (float, optional): Age in seconds after which any workspace
+            counts as orphaned (QUIZLY_WORKSPACE_MAX_AGE).
+        sweep_interval (float, optional): Seconds between sweeps, 0 = no
+            sweeper thread (QUIZLY_WORKSPACE_SWEEP_INTERVAL).
+        poll_interval (float): Seconds between attempts to reserve quota.
+    """
+
+    def __init__(
+        self,
+        root=None,
+        quota_mb=None,
+        wait=None,
+        max_age=None,
+        sweep_interval=None,
+        poll_interval=0.5,
+    ):
+        self._root = root
+        self._quota_mb = quota_mb
+        self._wait = wait
+        self._max_age = max_age
+        self._sweep_interval = sweep_interval
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._active = set()
+        self._sweeper_pid = None
+
+    @property
+    def root(self) -> str:
+        """Return the parent directory of the workspaces."""
+        root = self._root or getattr(settings, "QUIZLY_WORKSPACE_DIR", "")
+        return root or os.path.join(tempfile.gettempdir(), "quizly_workspaces")
+
+    @property
+    def quota_bytes(self) -> int:
+        """Return the total size limit of all workspaces (0 = unlimited)."""
+        quota_mb = self._quota_mb
+        if quota_mb is None:
+            quota_mb = getattr(settings, "QUIZLY_WORKSPACE_QUOTA_MB", 0)
+        return int(float(quota_mb) * 1024 * 1024)
+
+    @property
+    def wait(self) -> float:
+        """Return the longest wait for quota, in seconds."""
+        if self._wait is not None:
+            return float(self._wait)
+        return float(getattr(settings, "QUIZLY_WORKSPACE_WAIT", 60))
+
+    @property
+    def max_age(self) -> float:
+        """Return the age after which a workspace counts as orphaned."""
+        if self._max_age is not None:
+            return float(self._max_age)
+        return float(getattr(settings, "QUIZLY_WORKSPACE_MAX_AGE", 21600))
+
+    @property
+    def sweep_interval(self) -> float:
+        """Return the seconds between sweeps (0 = no sweeper thread)."""
+        if self._sweep_interval is not None:
+            return float(self._sweep_interval)
+        return float(getattr(settings, "QUIZLY_WORKSPACE_SWEEP_INTERVAL", 600))
+
+    @contextmanager
+    def open(self, reserve: int = 0):
+        """
+        Provide a workspace directory for the duration of the block.
+
+        Args:
+            reserve (int): Bytes the run will need at most.
+
+        Yields:
+            str: Path of the workspace directory.
+
+        Raises:
+            VideoRejectedError: If ``reserve`` exceeds the whole quota.
+            PipelineOverloadedError: If the quota stays exhausted.
+        """
+        workspace = self.acquire(reserve)
+        try:
+            yield workspace.path
+        finally:
+            self.release(workspace)
+
+    def acquire(self, reserve: int = 0) -> Workspace:
+        """
+        Reserve quota and create a workspace; ``release`` removes it.
+
+        Blocks while waiting for quota; async callers run it on the I/O
+        pool. See ``open`` for the arguments.
+        """
+        root = self.root
+        os.makedirs(root, exist_ok=True)
+        self._ensure_sweeper()
+
+        quota = self.quota_bytes
+        if not quota:
+            return self._create(root, 0)
+        if reserve > quota:
+            raise VideoRejectedError(
+                "Video is too large for the temporary disk space.", reason="too_large"
+            )
+
+        start = time.monotonic()
+        while True:
+            with FileLock(os.path.join(root, LOCK_FILE)):
+                if self.usage() + reserve <= quota:
+                    workspace = self._create(root, reserve)
+                    metrics.observe("workspace_wait_seconds", time.monotonic() - start)
+                    return workspace
+            if time.monotonic() - start >= self.wait:
+                metrics.increment("workspace_quota_rejections_total")
+                raise PipelineOverloadedError(
+                    "Not enough temporary disk space, try again later.",
+                    wait=int(getattr(settings, "QUIZLY_PIPELINE_RETRY_AFTER", 30)),
+                )
+            time.sleep(self.poll_interval)
+
+    def release(self, workspace: Workspace) -> None:
+        """Remove a workspace with everything in it."""
+        with self._lock:
+            self._active.discard(workspace.path)
+        self._remove(workspace.path)
+
+    def usage(self) -> int:
+        """
+        Return the bytes used by all workspaces below the root.
+
+        Each workspace counts with its reservation or its actual size,
+        whichever is larger.
+        """
+        total = 0
+        for path in self._workspace_paths():
+            total += max(_reserved(path), _tree_size(path))
+        return total
+
+    def sweep(self) -> int:
+        """
+        Remove orphaned workspaces of crashed or stopped processes.
+
+        Returns:
+            int: Number of workspaces removed.
+        """
+        now = time.time()
+        removed = 0
+        for path in self._workspace_paths():
+            # Checked per path: workspaces are registered before they are
+            # created, so one created during the sweep is never removed.
+            with self._lock:
+                if path in self._active:
+                    continue
+            pid = _owner_pid(path)
+            try:
+                age = now - os.path.getmtime(path)
+            except OSError:
+                continue
+            orphaned = (
+                pid == os.getpid()
+                or not _process_alive(pid)
+                or (self.max_age and age > self.max_age)
+            )
+            if orphaned and self._remove(path):
+                removed += 1
+        if removed:
+            metrics.increment("workspace_swept_total", removed)
+            logger.info("Removed %d orphaned workspace(s) from %s", removed, self.root)
+        return removed
+
+    def _create(self, root: str, reserve: int) -> Workspace:
+        path = os.path.join(root, f"{NAME_PREFIX}{os.getpid()}-{secrets.token_hex(8)}")
+        # Registered before it exists, so the sweeper never takes it for
+        # an orphan of this process.
+        with self._lock:
+            self._active.add(path)
+        try:
+            os.mkdir(path, 0o700)
+            with open(os.path.join(path, MARKER_FILE), "w", encoding="utf-8") as f:
+                f.write(str(int(reserve)))
+        except OSError:
+            with self._lock:
+                self._active.discard(path)
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+        return Workspace(path, reserve)
+
+    def _remove(self, path: str) -> bool:
+        try:
+            # The marker goes last, so a partly removed workspace is
+            # still recognized (and retried) by the sweeper.
+            for entry in os.scandir(path):
+                if entry.name == MARKER_FILE:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+                else:
+                    os.remove(entry.path)
+            shutil.rmtree(path)
+        except FileNotFoundError:
+            return True
+        except OSError:
+            metrics.increment("workspace_cleanup_failures_total")
+            logger.warning("Could not remove workspace %s; the sweeper retries", path, exc_info=True)
+            return False
+        return True
+
+    def _workspace_paths(self) -> list:
+        """Return the workspaces below the root, ignoring unrelated entries."""
+        try:
+            entries = list(os.scandir(self.root))
+        except FileNotFoundError:
+            return []
+        return [
+            entry.path
+            for entry in entries
+            if NAME_RE.match(entry.name)
+            and entry.is_dir(follow_symlinks=False)
+            and os.path.isfile(os.path.join(entry.path, MARKER_FILE))
+        ]
+
+    def _ensure_sweeper(self) -> None:
+        """Start the sweeper thread of this process (once per process)."""
+        if self._sweeper_pid == os.getpid() or self.sweep_interval <= 0:
+            return
+        with self._lock:
+            if self._sweeper_pid == os.getpid():
+                return
+            self._sweeper_pid = os.getpid()
+        thread = threading.Thread(target=self._sweep_loop, name="quizly-workspace-sweeper", daemon=True)
+        thread.start()
+
+    def _sweep_loop(self) -> None:
+        while True:
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("Workspace sweep failed")
+            time.sleep(self.sweep_interval or 600)
+
+
+def _reserved(path: str) -> int:
+    try:
+        with open(os.path.join(path, MARKER_FILE), encoding="utf-8") as f:
+            return int(f.read() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def _tree_size(path: str) -> int:
+    total = 0
+    for directory, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(directory, name))
+            except OSError:
+                pass
+    return total
+
+
+def _owner_pid(path: str):
+    match = NAME_RE.match(os.path.basename(path))
+    return int(match.group(1)) if match else None
+
+
+def _process_alive(pid) -> bool:
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+workspaces = WorkspaceManager()
@@ -0,0 +1,27 @@
+"""
+Helpers for working with normalized YouTube URLs.
+
+Includes:
+- video_id_from_url: Extract the video ID from a normalized watch URL.
+"""
+
+from urllib.parse import urlparse, parse_qs
+
+
+def video_id_from_url(video_url: str) -> str:
+    """
+    Return the video ID of a YouTube URL.
+
+    Accepts the normalized form produced by CreateQuizSerializer
+    (``https://www.youtube.com/watch?v=<id>``) as well as youtu.be links.
+
+    Args:
+        video_url (str): The YouTube URL.
+
+    Returns:
+        str: The 11 character video ID, or an empty string if none is found.
+    """
+    parsed = urlparse(video_url.strip())
+    if parsed.netloc.lower() == "youtu.be":
+        return parsed.path.lstrip("/")
+    return parse_qs(parsed.query).get("v", [""])[0]
@@ -0,0 +1,62 @@
+"""
+Fake Gemini model that replays recorded responses.
+
+Recorded responses live in ``tests/fixtures/gemini/<name>.json`` with the
+raw response ``text`` (plus a ``note`` on how it was obtained). A
+``ReplayGeminiClient`` stands in for ``genai.Client`` and answers each
+``generate_content`` call with the next recorded response (or raises the
+next scripted exception), keeping every request for later assertions.
+"""
+
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+from quizzes_app.services import llm_client
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "gemini"
+
+
+def load_recorded(name: str) -> dict:
+    """Return the recorded response ``name`` as dict."""
+    with open(FIXTURES_DIR / f"{name}.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class RecordedResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class ReplayGeminiClient:
+    """
+    Replays recorded responses in order.
+
+    Args:
+        *steps: Names of recorded responses, or exceptions to raise.
+    """
+
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.requests = []
+        self.models = self
+
+    def __call__(self, **kwargs):
+        # Used as the patched genai.Client constructor.
+        return self
+
+    def generate_content(self, model, contents, config=None):
+        self.requests.append({"model": model, "contents": contents, "config": config})
+        step = self.steps.pop(0)
+        if isinstance(step, Exception):
+            raise step
+        return RecordedResponse(load_recorded(step)["text"])
+
+    def install(self, test_case):
+        """Patch ``genai.Client`` for the duration of ``test_case``."""
+        llm_client.reset_client()
+        test_case.addCleanup(llm_client.reset_client)
+        patcher = patch("quizzes_app.services.llm_client.genai.Client", self)
+        patcher.start()
+        test_case.addCleanup(patcher.stop)
+        return self
@@ -0,0 +1,176 @@
+import asyncio
+import tempfile
+import threading
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from quizzes_app.models import Quiz
+from quizzes_app.services import metrics, offload
+from quizzes_app.services.admission import AdmissionController, admission
+from quizzes_app.services.error import PipelineOverloadedError
+from quizzes_app.services.pipeline import abuild_quiz
+
+
+class AdmissionControllerTests(SimpleTestCase):
+    def setUp(self):
+        self.lock_dir = tempfile.mkdtemp(prefix="quizly_test_locks_")
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def _controller(self, **kwargs):
+        options = {"concurrency": 1, "host_concurrency": 0, "queue_size": 0, "queue_timeout": 5}
+        options.update(kwargs)
+        return AdmissionController(lock_dir=self.lock_dir, poll_interval=0.01, **options)
+
+    def test_unlimited_by_default(self):
+        controller = self._controller(concurrency=0)
+
+        with controller.admit(), controller.admit():
+            pass
+
+        self.assertEqual(metrics.get_counter("pipeline_admission_total", outcome="admitted"), 0)
+
+    def test_full_queue_is_rejected_with_retry_after(self):
+        controller = self._controller()
+
+        with controller.admit():
+            with self.assertRaises(PipelineOverloadedError) as ctx:
+                controller.acquire()
+
+        self.assertEqual(ctx.exception.status_code, 429)
+        self.assertGreaterEqual(ctx.exception.wait, 1)
+        self.assertEqual(metrics.get_counter("pipeline_admission_total", outcome="queue_full"), 1)
+
+    def test_queued_request_runs_when_a_slot_is_released(self):
+        controller = self._controller(queue_size=1)
+        ticket = controller.acquire()
+        admitted = threading.Event()
+
+        def waiter():
+            with controller.admit():
+                admitted.set()
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        self.assertFalse(admitted.wait(0.1))
+        self.assertEqual(controller.waiting, 1)
+
+        controller.release(ticket)
+        thread.join()
+
+        self.assertTrue(admitted.is_set())
+        self.assertEqual(controller.waiting, 0)
+
+    def test_wait_times_out(self):
+        controller = self._controller(queue_size=1, queue_timeout=0.05)
+
+        with controller.admit():
+            with self.assertRaises(PipelineOverloadedError):
+                controller.acquire()
+
+        self.assertEqual(metrics.get_counter("pipeline_admission_total", outcome="timeout"), 1)
+
+    def test_unbounded_wait_ignores_queue_limits(self):
+        controller = self._controller(queue_timeout=0.01)
+        ticket = controller.acquire()
+        threading.Timer(0.1, controller.release, args=[ticket]).start()
+
+        with controller.admit(bounded=False):
+            pass
+
+    def test_same_key_shares_the_slot_of_the_running_call(self):
+        controller = self._controller()
+
+        with controller.admit(key="abcdefghijk"):
+            with controller.admit(key="abcdefghijk"):
+                pass
+            with self.assertRaises(PipelineOverloadedError):
+                controller.acquire(key="zzzzzzzzzzz")
+
+        self.assertEqual(metrics.get_counter("pipeline_admission_total", outcome="coalesced"), 1)
+        with controller.admit(key="zzzzzzzzzzz"):
+            pass
+
+    def test_host_slots_are_shared_between_processes(self):
+        first = self._controller(concurrency=0, host_concurrency=1)
+        other_process = self._controller(concurrency=0, host_concurrency=1, queue_size=1, queue_timeout=0.05)
+
+        with first.admit():
+            with self.assertRaises(PipelineOverloadedError):
+                other_process.acquire()
+
+        with other_process.admit():
+            pass
+
+    def test_retry_after_follows_stage_latencies(self):
+        controller = self._controller(concurrency=2)
+        metrics.observe("pipeline_stage_seconds", 6, stage="download")
+        metrics.observe("pipeline_stage_seconds", 10, stage="generate")
+        metrics.observe("pipeline_stage_seconds", 20, stage="generate")
+
+        # One run takes 6 + 15 seconds; two slots drain the queue.
+        self.assertEqual(controller.retry_after(("download", "generate")), 11)
+
+    @override_settings(QUIZLY_PIPELINE_RETRY_AFTER=40)
+    def test_retry_after_falls_back_to_the_setting(self):
+        self.assertEqual(self._controller().retry_after(("generate",)), 40)
+
+
+@override_settings(
+    QUIZLY_PIPELINE_MODE="stub",
+    QUIZLY_PIPELINE_CONCURRENCY=1,
+    QUIZLY_PIPELINE_QUEUE_SIZE=1,
+    QUIZLY_PIPELINE_QUEUE_TIMEOUT=5,
+)
+class AsyncAdmissionTests(SimpleTestCase):
+    async def test_cancelled_waiter_does_not_keep_the_slot(self):
+        ticket = admission.acquire()
+        waiter = asyncio.ensure_future(abuild_quiz("https://www.youtube.com/watch?v=abcdefghijk"))
+        while admission.waiting == 0:
+            await asyncio.sleep(0.01)
+
+        waiter.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        admission.release(ticket)
+
+        # Only admitted once the slot the cancelled waiter got is released.
+        ticket = await offload.run_io(admission.acquire)
+        admission.release(ticket)
+
+
+@override_settings(
+    QUIZLY_PIPELINE_MODE="stub",
+    QUIZLY_PIPELINE_CONCURRENCY=1,
+    QUIZLY_PIPELINE_QUEUE_SIZE=0,
+)
+class AdmissionApiTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="secret123")
+        self.client.force_authenticate(user=self.user)
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_saturated_pipeline_returns_429_with_retry_after(self):
+        ticket = admission.acquire()
+        self.addCleanup(admission.release, ticket)
+
+        res = self.client.post(
+            reverse("create-quiz"), {"url": "https://www.youtube.com/watch?v=abcdefghijk"}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res.data["detail"].code, "pipeline_overloaded")
+        self.assertGreaterEqual(int(res["Retry-After"]), 1)
+        self.assertEqual(Quiz.objects.count(), 0)
+
+    def test_free_slot_creates_the_quiz(self):
+        res = self.client.post(
+            reverse("create-quiz"), {"url": "https://www.youtube.com/watch?v=abcdefghijk"}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
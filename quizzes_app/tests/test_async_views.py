@@ -0,0 +1,115 @@
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from quizzes_app.api.async_views import create_quiz
+from quizzes_app.models import Quiz, QuizJob
+from quizzes_app.services.admission import admission
+from quizzes_app.services.error import AIModelOverloadedError, AIPipelineError
+
+VIDEO_URL = "https://www.youtube.com/watch?v=abcdefghijk"
+
+
+@override_settings(QUIZLY_PIPELINE_MODE="stub", QUIZLY_STUB_LATENCY=0)
+class AsyncCreateQuizViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="secret123")
+        self.factory = AsyncRequestFactory()
+        self.token = str(AccessToken.for_user(self.user))
+
+    def _request(self, data, token=None, content_type="application/json"):
+        body = json.dumps(data) if content_type == "application/json" else data
+        request = self.factory.post("/api/createQuiz/", body, content_type=content_type)
+        request.COOKIES["access_token"] = token or self.token
+        return request
+
+    async def test_create_quiz_returns_201_with_questions(self):
+        response = await create_quiz(self._request({"url": "https://youtu.be/abcdefghijk"}))
+
+        self.assertEqual(response.status_code, 201)
+        data = json.loads(response.content)
+        self.assertEqual(len(data["questions"]), 10)
+        self.assertEqual(data["video_url"], VIDEO_URL)
+        self.assertEqual(await Quiz.objects.filter(owner=self.user).acount(), 1)
+
+    async def test_invalid_url_returns_400(self):
+        response = await create_quiz(self._request({"url": "https://example.com/video"}))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("url", json.loads(response.content))
+
+    async def test_missing_credentials_return_401(self):
+        request = self.factory.post(
+            "/api/createQuiz/", json.dumps({"url": VIDEO_URL}), content_type="application/json"
+        )
+
+        response = await create_quiz(request)
+
+        self.assertEqual(response.status_code, 401)
+
+    async def test_get_is_not_allowed(self):
+        response = await create_quiz(self.factory.get("/api/createQuiz/"))
+
+        self.assertEqual(response.status_code, 405)
+
+    @override_settings(QUIZLY_ASYNC_JOBS=True)
+    async def test_async_jobs_return_202_with_location(self):
+        response = await create_quiz(self._request({"url": VIDEO_URL}))
+
+        self.assertEqual(response.status_code, 202)
+        job = await QuizJob.objects.aget()
+        self.assertEqual(response["Location"], f"/api/jobs/{job.pk}/")
+
+    @patch("quizzes_app.services.pipeline_backends.abuild_quiz_stub", side_effect=AIModelOverloadedError(wait=12.5))
+    async def test_overload_returns_503_with_retry_after(self, _mock_build):
+        response = await create_quiz(self._request({"url": VIDEO_URL}))
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "13")
+        self.assertIn("detail", json.loads(response.content))
+
+    @override_settings(QUIZLY_PIPELINE_CONCURRENCY=1, QUIZLY_PIPELINE_QUEUE_SIZE=0)
+    async def test_saturated_pipeline_returns_429_with_retry_after(self):
+        ticket = admission.acquire()
+        try:
+            response = await create_quiz(self._request({"url": VIDEO_URL}))
+        finally:
+            admission.release(ticket)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+        self.assertEqual(await Quiz.objects.acount(), 0)
+
+    @patch("quizzes_app.services.pipeline_backends.abuild_quiz_stub")
+    async def test_invalid_payload_returns_502_without_db_write(self, mock_build):
+        mock_build.return_value = {"title": "T", "description": "D", "questions": []}
+
+        response = await create_quiz(self._request({"url": VIDEO_URL}))
+
+        self.assertEqual(response.status_code, 502)
+        self.assertFalse(await Quiz.objects.aexists())
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.abuild_quiz_prod", side_effect=AIPipelineError("boom"))
+    @override_settings(QUIZLY_PIPELINE_MODE="prod")
+    async def test_prod_mode_uses_async_prod_pipeline(self, mock_build):
+        response = await create_quiz(self._request({"url": VIDEO_URL}))
+
+        self.assertEqual(response.status_code, 502)
+        mock_build.assert_awaited_once_with(VIDEO_URL)
+
+    @override_settings(QUIZLY_STUB_LATENCY=0.3)
+    async def test_requests_wait_concurrently(self):
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *[create_quiz(self._request({"url": VIDEO_URL})) for _ in range(20)]
+        )
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual({r.status_code for r in responses}, {201})
+        # Sequential handling would take 20 * 0.3 s.
+        self.assertLess(elapsed, 2.0)
@@ -0,0 +1,143 @@
+import os
+import tempfile
+import wave
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from quizzes_app.services.audio import (
+    SAMPLE_RATE,
+    detect_speech,
+    frame_rms,
+    keep_spans,
+    load_audio,
+    remap_segments,
+    remap_timestamp,
+    split_at_silence,
+)
+
+
+def _tone(seconds, amplitude=0.5):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def _silence(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+class LoadAudioTests(SimpleTestCase):
+    def test_16khz_mono_wav_is_read_without_ffmpeg(self):
+        samples = (_tone(0.5) * 32767).astype(np.int16)
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        with wave.open(path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SAMPLE_RATE)
+            wav.writeframes(samples.tobytes())
+
+        audio = load_audio(path)
+
+        self.assertEqual(audio.dtype, np.float32)
+        self.assertEqual(len(audio), len(samples))
+        np.testing.assert_allclose(audio, samples / 32768.0, atol=1e-6)
+
+
+class FrameRmsTests(SimpleTestCase):
+    def test_rms_separates_speech_from_silence(self):
+        energy = frame_rms(np.concatenate([_tone(1), _silence(1)]))
+
+        self.assertGreater(energy[:30].min(), 0.3)
+        self.assertEqual(energy[-30:].max(), 0)
+
+
+class SplitAtSilenceTests(SimpleTestCase):
+    def test_short_audio_is_a_single_chunk(self):
+        audio = _tone(10)
+
+        self.assertEqual(split_at_silence(audio, chunk_seconds=30), [(0, len(audio))])
+
+    def test_cuts_are_placed_in_silence_with_overlap(self):
+        # Tone 0-27s, silence 27-29s, tone 29-55s: the cut must fall into the pause.
+        audio = np.concatenate([_tone(27), _silence(2), _tone(26)])
+
+        chunks = split_at_silence(audio, chunk_seconds=30, overlap_seconds=1, search_seconds=5)
+
+        self.assertEqual(len(chunks), 2)
+        (first_start, first_end), (second_start, second_end) = chunks
+        self.assertEqual(first_start, 0)
+        self.assertTrue(27 * SAMPLE_RATE <= first_end <= 29 * SAMPLE_RATE)
+        self.assertEqual(second_start, first_end - SAMPLE_RATE)
+        self.assertEqual(second_end, len(audio))
+
+    def test_chunks_cover_the_whole_audio(self):
+        audio = _tone(300)
+
+        chunks = split_at_silence(audio, chunk_seconds=60, overlap_seconds=0)
+
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], len(audio))
+        for (_, end), (start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(start, end)
+
+
+class DetectSpeechTests(SimpleTestCase):
+    def test_silence_has_no_speech(self):
+        self.assertEqual(detect_speech(_silence(5)), [])
+
+    def test_long_pauses_are_removed_with_padding(self):
+        # Silence 0-10s, speech 10-20s, silence 20-30s, speech 30-35s.
+        audio = np.concatenate([_silence(10), _tone(10), _silence(10), _tone(5)])
+
+        spans = detect_speech(audio, padding_seconds=0.2)
+
+        self.assertEqual(len(spans), 2)
+        (first_start, first_end), (second_start, second_end) = spans
+        self.assertAlmostEqual(first_start / SAMPLE_RATE, 9.8, delta=0.05)
+        self.assertAlmostEqual(first_end / SAMPLE_RATE, 20.2, delta=0.05)
+        self.assertAlmostEqual(second_start / SAMPLE_RATE, 29.8, delta=0.05)
+        self.assertEqual(second_end, len(audio))
+
+    def test_short_pauses_are_kept(self):
+        audio = np.concatenate([_tone(2), _silence(0.3), _tone(2)])
+
+        self.assertEqual(detect_speech(audio), [(0, len(audio))])
+
+    def test_quiet_background_is_dropped_relative_to_speech(self):
+        # A -33 dBFS hum is above the absolute floor but far below the speech level.
+        audio = np.concatenate([_tone(5, amplitude=0.03), _tone(5, amplitude=0.5)])
+
+        spans = detect_speech(audio, dynamic_range_db=20, padding_seconds=0)
+
+        self.assertEqual(len(spans), 1)
+        self.assertAlmostEqual(spans[0][0] / SAMPLE_RATE, 5, delta=0.05)
+
+
+class KeepSpansTests(SimpleTestCase):
+    def test_keep_spans_concatenates_spans(self):
+        audio = np.arange(10, dtype=np.float32)
+
+        np.testing.assert_array_equal(keep_spans(audio, [(1, 3), (6, 8)]), [1, 2, 6, 7])
+        self.assertEqual(len(keep_spans(audio, [])), 0)
+
+
+class RemapTests(SimpleTestCase):
+    def setUp(self):
+        # Kept 10-20s and 30-35s of the original audio.
+        self.spans = [(10 * SAMPLE_RATE, 20 * SAMPLE_RATE), (30 * SAMPLE_RATE, 35 * SAMPLE_RATE)]
+
+    def test_remap_timestamp(self):
+        self.assertAlmostEqual(remap_timestamp(0, self.spans), 10)
+        self.assertAlmostEqual(remap_timestamp(4.5, self.spans), 14.5)
+        self.assertAlmostEqual(remap_timestamp(12, self.spans), 32)
+        self.assertAlmostEqual(remap_timestamp(99, self.spans), 35)
+
+    def test_remap_segments_keeps_other_fields(self):
+        segments = [{"start": 9.0, "end": 11.0, "text": " hello"}]
+
+        remapped = remap_segments(segments, self.spans)
+
+        self.assertEqual(remapped, [{"start": 19.0, "end": 31.0, "text": " hello"}])
+        self.assertEqual(segments[0]["start"], 9.0)
@@ -0,0 +1,260 @@
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from google.genai import errors
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from quizzes_app.models import PipelineCheckpoint, Quiz, QuizJob
+from quizzes_app.services import metrics
+from quizzes_app.services.checkpoints import METADATA, PAYLOAD, RESPONSE, TRANSCRIPT, JobCheckpoints
+from quizzes_app.services.error import AIModelOverloadedError, AIPipelineError
+from quizzes_app.services.quiz_jobs import (
+    _touch_job,
+    enqueue_quiz_job,
+    process_next_job,
+    requeue_stale_jobs,
+)
+from quizzes_app.services.quiz_pipeline_prod import build_quiz_prod, generate_quiz
+from quizzes_app.services.quiz_pipeline_stub import build_quiz_stub
+from quizzes_app.tests.gemini_replay import ReplayGeminiClient
+
+VIDEO_URL = "https://www.youtube.com/watch?v=abcdefghijk"
+
+
+class ProdPipelineCheckpointTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="tester", password="secret123")
+        self.job = enqueue_quiz_job(owner=user, video_url=VIDEO_URL)
+        self.checkpoints = JobCheckpoints(self.job)
+        patcher = patch(
+            "quizzes_app.services.quiz_pipeline_prod.single_flight.do",
+            side_effect=lambda key, fn: fn(),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.generate_quiz", return_value={"title": "T"})
+    @patch("quizzes_app.services.quiz_pipeline_prod.fetch_captions", return_value=("caption transcript", "manual"))
+    @patch("quizzes_app.services.quiz_pipeline_prod.preflight_video", return_value={"title": "Video", "formats": []})
+    def test_stages_are_checkpointed(self, _mock_preflight, _mock_captions, mock_generate):
+        build_quiz_prod(VIDEO_URL, checkpoints=self.checkpoints)
+
+        self.assertEqual(self.checkpoints.get(METADATA), {"title": "Video", "language": None, "duration": None})
+        self.assertEqual(self.checkpoints.get(TRANSCRIPT), {"text": "caption transcript"})
+        mock_generate.assert_called_once_with(
+            "caption transcript", video_title="Video", checkpoints=self.checkpoints
+        )
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.generate_quiz", return_value={"title": "T"})
+    @patch("quizzes_app.services.quiz_pipeline_prod.extract_audio")
+    @patch("quizzes_app.services.quiz_pipeline_prod.preflight_video")
+    def test_retry_resumes_after_the_transcript(self, mock_preflight, mock_extract, mock_generate):
+        self.checkpoints.save(METADATA, {"title": "Video", "language": "en", "duration": 600})
+        self.checkpoints.save(TRANSCRIPT, {"text": "saved transcript"})
+
+        build_quiz_prod(VIDEO_URL, checkpoints=self.checkpoints)
+
+        mock_preflight.assert_not_called()
+        mock_extract.assert_not_called()
+        mock_generate.assert_called_once_with(
+            "saved transcript", video_title="Video", checkpoints=self.checkpoints
+        )
+        self.assertEqual(metrics.get_counter("checkpoint_resumed_total", stage=TRANSCRIPT), 1)
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.generate_quiz", return_value={"title": "T"})
+    @patch("quizzes_app.services.quiz_pipeline_prod.yt_dlp.YoutubeDL")
+    @patch("quizzes_app.services.quiz_pipeline_prod.preflight_video")
+    def test_estimate_metadata_replaces_the_preflight(self, mock_preflight, mock_yt, mock_generate):
+        track = {"ext": "vtt", "url": "https://captions"}
+        self.checkpoints.save(METADATA, {
+            "title": "Video", "language": "en", "duration": 600,
+            "captions": {"kind": "manual", "language": "en", "track": track},
+            "fetched_at": time.time(),
+        })
+        mock_yt.return_value.__enter__.return_value.urlopen.return_value.read.return_value = (
+            b"WEBVTT\n\n00:00.000 --> 00:01.000\ncaption transcript\n"
+        )
+
+        build_quiz_prod(VIDEO_URL, checkpoints=self.checkpoints)
+
+        mock_preflight.assert_not_called()
+        mock_yt.return_value.__enter__.return_value.urlopen.assert_called_once_with("https://captions")
+        mock_generate.assert_called_once_with(
+            "caption transcript", video_title="Video", checkpoints=self.checkpoints
+        )
+
+    @override_settings(QUIZLY_JOB_METADATA_MAX_AGE=60)
+    @patch("quizzes_app.services.quiz_pipeline_prod.generate_quiz", return_value={"title": "T"})
+    @patch("quizzes_app.services.quiz_pipeline_prod.fetch_captions", return_value=("caption transcript", "manual"))
+    @patch("quizzes_app.services.quiz_pipeline_prod.preflight_video", return_value={"title": "Video", "formats": []})
+    def test_old_estimate_metadata_is_fetched_again(self, mock_preflight, _mock_captions, _mock_generate):
+        self.checkpoints.save(METADATA, {
+            "title": "Old", "language": "en", "duration": 600, "captions": None, "fetched_at": time.time() - 120,
+        })
+
+        build_quiz_prod(VIDEO_URL, checkpoints=self.checkpoints)
+
+        mock_preflight.assert_called_once()
+        self.assertEqual(self.checkpoints.get(METADATA), {"title": "Video", "language": None, "duration": None})
+
+    @patch("quizzes_app.services.llm_client.time.sleep")
+    def test_failed_repair_resumes_from_the_saved_response(self, _mock_sleep):
+        overloaded = errors.ServerError(
+            503, {"error": {"code": 503, "message": "overloaded", "status": "UNAVAILABLE"}}
+        )
+        ReplayGeminiClient("quiz_answer_not_in_options", *[overloaded] * 4).install(self)
+        with self.assertRaises(AIPipelineError):
+            generate_quiz("some transcript", checkpoints=self.checkpoints)
+        self.assertIsNotNone(self.checkpoints.get(RESPONSE))
+
+        fake = ReplayGeminiClient("repair_one_question").install(self)
+        result = generate_quiz("some transcript", checkpoints=self.checkpoints)
+
+        self.assertEqual(len(fake.requests), 1)
+        self.assertIn("exactly 1 question(s)", fake.requests[0]["contents"])
+        self.assertEqual(result["questions"][3]["answer"], "Cache-Control")
+
+    def test_valid_response_is_not_checkpointed(self):
+        ReplayGeminiClient("quiz_valid").install(self)
+
+        generate_quiz("some transcript", checkpoints=self.checkpoints)
+
+        self.assertIsNone(self.checkpoints.get(RESPONSE))
+
+
+@override_settings(QUIZLY_PIPELINE_MODE="stub", QUIZLY_JOB_MAX_ATTEMPTS=2, QUIZLY_JOB_RETRY_DELAY=30)
+class JobRetryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="secret123")
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    @patch("quizzes_app.services.pipeline_backends.build_quiz_stub")
+    def test_transient_failure_is_retried_later(self, mock_build):
+        mock_build.side_effect = AIModelOverloadedError("AI pipeline failed: model overloaded", wait=20)
+        job = enqueue_quiz_job(owner=self.user, video_url=VIDEO_URL)
+
+        process_next_job()
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (QuizJob.STATUS_QUEUED, 1))
+        self.assertAlmostEqual((job.retry_at - timezone.now()).total_seconds(), 20, delta=5)
+        self.assertIsNone(process_next_job())
+        self.assertEqual(metrics.get_counter("job_retries_total", reason="transient"), 1)
+
+        QuizJob.objects.filter(pk=job.pk).update(retry_at=timezone.now())
+        process_next_job()
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (QuizJob.STATUS_FAILED, 2))
+
+    @patch("quizzes_app.services.quiz_jobs.persist_quiz")
+    @patch("quizzes_app.services.pipeline_backends.build_quiz_stub", side_effect=build_quiz_stub)
+    def test_retry_reuses_the_payload_and_clears_checkpoints(self, mock_build, mock_persist):
+        mock_persist.side_effect = AIModelOverloadedError("AI pipeline failed: model overloaded")
+        job = enqueue_quiz_job(owner=self.user, video_url=VIDEO_URL)
+        process_next_job()
+        self.assertTrue(PipelineCheckpoint.objects.filter(job=job, stage=PAYLOAD).exists())
+
+        mock_persist.side_effect = None
+        mock_persist.return_value = Quiz.objects.create(owner=self.user, title="T", video_url=VIDEO_URL)
+        QuizJob.objects.filter(pk=job.pk).update(retry_at=None)
+        process_next_job()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, QuizJob.STATUS_SUCCEEDED)
+        self.assertEqual(mock_build.call_count, 1)
+        self.assertFalse(PipelineCheckpoint.objects.filter(job=job).exists())
+
+    @override_settings(QUIZLY_JOB_HEARTBEAT_INTERVAL=0.01)
+    @patch("quizzes_app.services.quiz_jobs._touch_job")
+    @patch("quizzes_app.services.pipeline_backends.build_quiz_stub")
+    def test_running_job_sends_heartbeats(self, mock_build, mock_touch):
+        def slow_build(video_url, progress=None):
+            time.sleep(0.2)
+            return build_quiz_stub(video_url)
+
+        mock_build.side_effect = slow_build
+        enqueue_quiz_job(owner=self.user, video_url=VIDEO_URL)
+
+        job = process_next_job()
+
+        self.assertEqual(job.status, QuizJob.STATUS_SUCCEEDED)
+        self.assertGreaterEqual(mock_touch.call_count, 2)
+        calls = mock_touch.call_count
+        time.sleep(0.05)
+        self.assertEqual(mock_touch.call_count, calls)
+
+    def test_stale_running_jobs_are_requeued_or_failed(self):
+        stale = timezone.now() - timedelta(hours=1)
+        running = {"owner": self.user, "video_url": VIDEO_URL, "status": QuizJob.STATUS_RUNNING}
+        resumable = QuizJob.objects.create(attempts=1, **running)
+        exhausted = QuizJob.objects.create(attempts=2, **running)
+        active = QuizJob.objects.create(attempts=1, **running)
+        QuizJob.objects.filter(pk__in=[resumable.pk, exhausted.pk]).update(updated_at=stale)
+
+        self.assertEqual(requeue_stale_jobs(), 1)
+
+        statuses = dict(QuizJob.objects.values_list("pk", "status"))
+        self.assertEqual(statuses[resumable.pk], QuizJob.STATUS_QUEUED)
+        self.assertEqual(statuses[exhausted.pk], QuizJob.STATUS_FAILED)
+        self.assertEqual(statuses[active.pk], QuizJob.STATUS_RUNNING)
+
+    def test_heartbeat_keeps_a_running_job_from_going_stale(self):
+        job = QuizJob.objects.create(owner=self.user, video_url=VIDEO_URL, status=QuizJob.STATUS_RUNNING)
+        QuizJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+        _touch_job(job)
+
+        self.assertEqual(requeue_stale_jobs(), 0)
+
+
+@override_settings(QUIZLY_PIPELINE_MODE="stub")
+class JobRetryApiTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="secret123")
+        self.other = User.objects.create_user(username="other", password="secret123")
+        self.client.force_authenticate(user=self.user)
+
+    def _failed_job(self, owner):
+        job = enqueue_quiz_job(owner=owner, video_url=VIDEO_URL)
+        QuizJob.objects.filter(pk=job.pk).update(
+            status=QuizJob.STATUS_FAILED, error="boom", attempts=1, finished_at=timezone.now()
+        )
+        return job
+
+    def test_failed_job_is_queued_again(self):
+        job = self._failed_job(self.user)
+
+        res = self.client.post(reverse("quiz-job-retry", kwargs={"pk": job.pk}))
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res["Location"], reverse("quiz-job-detail", kwargs={"pk": job.pk}))
+        self.assertEqual(
+            (res.data["status"], res.data["error"], res.data["attempts"]), (QuizJob.STATUS_QUEUED, "", 0)
+        )
+        self.assertEqual(process_next_job().status, QuizJob.STATUS_SUCCEEDED)
+
+    def test_unfailed_job_returns_409(self):
+        job = enqueue_quiz_job(owner=self.user, video_url=VIDEO_URL)
+
+        res = self.client.post(reverse("quiz-job-retry", kwargs={"pk": job.pk}))
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+    def test_foreign_job_returns_403(self):
+        job = self._failed_job(self.other)
+
+        res = self.client.post(reverse("quiz-job-retry", kwargs={"pk": job.pk}))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        job.refresh_from_db()
+        self.assertEqual(job.status, QuizJob.STATUS_FAILED)
@@ -5,7 +5,7 @@ from rest_framework.test import APITestCase
 from django.contrib.auth.models import User
 from unittest.mock import patch
 from quizzes_app.models import Quiz
-from quizzes_app.services.error import AIPipelineError
+from quizzes_app.services.error import AIModelOverloadedError, AIPipelineError, VideoRejectedError
 
 
 def _make_valid_payload():
@@ -45,7 +45,7 @@ class CreateQuizApiTests(APITestCase):
         res = self.client.post(self.url, {"url": "https://www.youtube.com/watch?v=abcdefghijk"}, format="json")
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
-    @patch("quizzes_app.api.views.build_quiz_stub", return_value=_make_valid_payload())
+    @patch("quizzes_app.services.pipeline_backends.build_quiz_stub", return_value=_make_valid_payload())
     def test_youtu_be_normalization_persisted(self, _mock_build):
         res = self.client.post(self.url, {"url": "https://youtu.be/abcdefghijk"}, format="json")
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
@@ -53,21 +53,21 @@ class CreateQuizApiTests(APITestCase):
         self.assertEqual(quiz.video_url, "https://www.youtube.com/watch?v=abcdefghijk")
 
     @override_settings(QUIZLY_PIPELINE_MODE="prod")
-    @patch("quizzes_app.api.views.build_quiz_prod", return_value=_make_valid_payload())
+    @patch("quizzes_app.services.quiz_pipeline_prod.build_quiz_prod", return_value=_make_valid_payload())
     def test_create_quiz_uses_prod_pipeline_and_persists_quiz(self, mock_build):
         payload = {"url": "https://www.youtube.com/watch?v=abcdefghijk"}
 
         res = self.client.post(self.url, payload, format="json")
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
-        mock_build.assert_called_once_with("https://www.youtube.com/watch?v=abcdefghijk")
+        mock_build.assert_called_once_with("https://www.youtube.com/watch?v=abcdefghijk", progress=None, checkpoints=None)
         self.assertEqual(Quiz.objects.count(), 1)
         quiz = Quiz.objects.first()
         self.assertEqual(quiz.video_url, "https://www.youtube.com/watch?v=abcdefghijk")
         self.assertEqual(quiz.questions.count(), 10)
 
     @override_settings(QUIZLY_PIPELINE_MODE="prod")
-    @patch("quizzes_app.api.views.build_quiz_prod", side_effect=AIPipelineError("boom"))
+    @patch("quizzes_app.services.quiz_pipeline_prod.build_quiz_prod", side_effect=AIPipelineError("boom"))
     def test_prod_pipeline_failure_returns_502_and_no_db_write(self, _mock_build):
         payload = {"url": "https://www.youtube.com/watch?v=abcdefghijk"}
 
@@ -75,3 +75,29 @@ class CreateQuizApiTests(APITestCase):
 
         self.assertEqual(res.status_code, status.HTTP_502_BAD_GATEWAY)
         self.assertEqual(Quiz.objects.count(), 0)
+
+
+    @override_settings(QUIZLY_PIPELINE_MODE="prod")
+    @patch(
+        "quizzes_app.services.quiz_pipeline_prod.build_quiz_prod",
+        side_effect=VideoRejectedError("Video is too long.", reason="too_long"),
+    )
+    def test_rejected_video_returns_422(self, _mock_build):
+        payload = {"url": "https://www.youtube.com/watch?v=abcdefghijk"}
+
+        res = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(res.status_code, 422)
+        self.assertEqual(res.data["detail"].code, "too_long")
+        self.assertEqual(Quiz.objects.count(), 0)
+
+    @override_settings(QUIZLY_PIPELINE_MODE="prod")
+    @patch("quizzes_app.services.quiz_pipeline_prod.build_quiz_prod", side_effect=AIModelOverloadedError(wait=12))
+    def test_overloaded_model_returns_503_with_retry_after(self, _mock_build):
+        payload = {"url": "https://www.youtube.com/watch?v=abcdefghijk"}
+
+        res = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res["Retry-After"], "12")
+        self.assertEqual(Quiz.objects.count(), 0)
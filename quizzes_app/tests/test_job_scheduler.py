@@ -0,0 +1,161 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from quizzes_app.models import QuizJob
+from quizzes_app.services import metrics
+from quizzes_app.services.error import VideoRejectedError
+from quizzes_app.services.checkpoints import METADATA, JobCheckpoints
+from quizzes_app.services.job_scheduler import estimate_queued_jobs, queue_stats
+from quizzes_app.services.quiz_jobs import claim_next_job, enqueue_quiz_job
+
+SHORT_URL = "https://www.youtube.com/watch?v=shortvideo1"
+LONG_URL = "https://www.youtube.com/watch?v=longvideo01"
+CACHED_URL = "https://www.youtube.com/watch?v=cachedvideo"
+ESTIMATES = {
+    SHORT_URL: {"cached": False, "duration": 300, "cost": 300},
+    LONG_URL: {"cached": False, "duration": 3600, "cost": 3600},
+    CACHED_URL: {"cached": True, "duration": None, "cost": 0},
+}
+
+
+def fake_estimate(video_url):
+    return ESTIMATES[video_url]
+
+
+@override_settings(QUIZLY_PIPELINE_MODE="prod", QUIZLY_JOB_MAX_WAIT=1800, QUIZLY_JOB_USER_CONCURRENCY=0)
+@patch("quizzes_app.services.quiz_pipeline_prod.estimate_video", side_effect=fake_estimate)
+class FairShareSchedulerTests(TestCase):
+    def setUp(self):
+        self.heavy = User.objects.create_user(username="heavy", password="secret123")
+        self.light = User.objects.create_user(username="light", password="secret123")
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def _claim_order(self):
+        estimate_queued_jobs()
+        order = []
+        while (job := claim_next_job()) is not None:
+            order.append(job.pk)
+        return order
+
+    def test_jobs_are_estimated_and_classified(self, _mock_estimate):
+        short = enqueue_quiz_job(owner=self.light, video_url=SHORT_URL)
+        long = enqueue_quiz_job(owner=self.light, video_url=LONG_URL)
+        cached = enqueue_quiz_job(owner=self.light, video_url=CACHED_URL)
+
+        self.assertEqual(estimate_queued_jobs(), 3)
+
+        for job, priority, cost in ((short, "short", 300), (long, "long", 3600), (cached, "cached", 0)):
+            job.refresh_from_db()
+            self.assertEqual((job.priority, job.estimated_cost), (priority, cost))
+        self.assertEqual(long.duration, 3600)
+
+    def test_heavy_user_does_not_starve_others(self, _mock_estimate):
+        heavy_jobs = [enqueue_quiz_job(owner=self.heavy, video_url=LONG_URL) for _ in range(3)]
+        light_job = enqueue_quiz_job(owner=self.light, video_url=LONG_URL)
+
+        self.assertEqual(
+            self._claim_order(),
+            [heavy_jobs[0].pk, light_job.pk, heavy_jobs[1].pk, heavy_jobs[2].pk],
+        )
+
+    def test_cheaper_job_wins_between_equal_users(self, _mock_estimate):
+        long = enqueue_quiz_job(owner=self.heavy, video_url=LONG_URL)
+        short = enqueue_quiz_job(owner=self.light, video_url=SHORT_URL)
+
+        self.assertEqual(self._claim_order(), [short.pk, long.pk])
+
+    def test_cache_hits_jump_the_line(self, _mock_estimate):
+        short = enqueue_quiz_job(owner=self.light, video_url=SHORT_URL)
+        cached = enqueue_quiz_job(owner=self.heavy, video_url=CACHED_URL)
+        QuizJob.objects.create(owner=self.heavy, video_url=LONG_URL, status=QuizJob.STATUS_RUNNING,
+                               estimated_cost=3600, started_at=timezone.now())
+
+        self.assertEqual(self._claim_order(), [cached.pk, short.pk])
+
+    def test_overdue_jobs_run_first(self, _mock_estimate):
+        QuizJob.objects.create(owner=self.heavy, video_url=LONG_URL, status=QuizJob.STATUS_RUNNING,
+                               estimated_cost=3600, started_at=timezone.now())
+        overdue = enqueue_quiz_job(owner=self.heavy, video_url=LONG_URL)
+        QuizJob.objects.filter(pk=overdue.pk).update(created_at=timezone.now() - timedelta(hours=1))
+        cached = enqueue_quiz_job(owner=self.light, video_url=CACHED_URL)
+
+        self.assertEqual(self._claim_order(), [overdue.pk, cached.pk])
+
+    @override_settings(QUIZLY_JOB_USER_CONCURRENCY=1)
+    def test_user_concurrency_cap_skips_busy_users(self, _mock_estimate):
+        first = enqueue_quiz_job(owner=self.heavy, video_url=SHORT_URL)
+        enqueue_quiz_job(owner=self.heavy, video_url=SHORT_URL)
+
+        self.assertEqual(self._claim_order(), [first.pk])
+
+        QuizJob.objects.filter(pk=first.pk).update(status=QuizJob.STATUS_SUCCEEDED)
+        self.assertIsNotNone(claim_next_job())
+
+    def test_claiming_does_not_estimate(self, mock_estimate):
+        job = enqueue_quiz_job(owner=self.light, video_url=LONG_URL)
+
+        self.assertEqual(claim_next_job().pk, job.pk)
+
+        mock_estimate.assert_not_called()
+
+    def test_estimate_metadata_is_saved_as_checkpoint(self, mock_estimate):
+        metadata = {"title": "Video", "language": "en", "duration": 3600, "captions": None, "fetched_at": 1.0}
+        mock_estimate.side_effect = lambda url: {**ESTIMATES[url], "metadata": metadata}
+        job = enqueue_quiz_job(owner=self.light, video_url=LONG_URL)
+
+        estimate_queued_jobs()
+
+        self.assertEqual(JobCheckpoints(job).get(METADATA), metadata)
+
+    def test_rejected_video_fails_before_it_is_scheduled(self, mock_estimate):
+        mock_estimate.side_effect = VideoRejectedError("Video is too long.", reason="too_long")
+        job = enqueue_quiz_job(owner=self.light, video_url=LONG_URL)
+
+        estimate_queued_jobs()
+        self.assertIsNone(claim_next_job())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, QuizJob.STATUS_FAILED)
+        self.assertEqual(job.error, "Video is too long.")
+        self.assertIsNotNone(job.finished_at)
+
+    def test_wait_is_recorded_per_priority_class(self, _mock_estimate):
+        enqueue_quiz_job(owner=self.light, video_url=CACHED_URL)
+
+        estimate_queued_jobs()
+        claim_next_job()
+
+        self.assertEqual(metrics.get_histogram("job_queue_wait_seconds", priority="cached")["count"], 1)
+
+
+@override_settings(QUIZLY_PIPELINE_MODE="stub")
+class QueueMetricsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="secret123")
+
+    def test_queue_depth_and_oldest_wait_per_class(self):
+        job = enqueue_quiz_job(owner=self.user, video_url=SHORT_URL)
+        QuizJob.objects.filter(pk=job.pk).update(created_at=timezone.now() - timedelta(seconds=90))
+        enqueue_quiz_job(owner=self.user, video_url=SHORT_URL)
+
+        stats = queue_stats()
+
+        self.assertEqual(stats["unknown"]["depth"], 2)
+        self.assertGreaterEqual(stats["unknown"]["oldest_wait"], 90)
+        self.assertEqual(stats["cached"], {"depth": 0, "oldest_wait": 0.0})
+
+    def test_metrics_endpoint_reports_queue_gauges(self):
+        enqueue_quiz_job(owner=self.user, video_url=SHORT_URL)
+
+        text = self.client.get(reverse("metrics")).content.decode()
+
+        self.assertIn("# TYPE quizly_job_queue_depth gauge\n", text)
+        self.assertIn('quizly_job_queue_depth{priority="unknown"} 1\n', text)
+        self.assertIn('quizly_job_queue_depth{priority="long"} 0\n', text)
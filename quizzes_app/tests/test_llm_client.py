@@ -0,0 +1,194 @@
+import threading
+import time
+from unittest.mock import patch
+
+import httpx
+from django.test import SimpleTestCase, override_settings
+from google.genai import errors
+from rest_framework import status
+
+from quizzes_app.services import llm_client, metrics
+from quizzes_app.services.error import (
+    AIModelOverloadedError,
+    AIModelTimeoutError,
+    AIPipelineError,
+)
+
+
+def _overloaded():
+    return errors.ServerError(
+        503, {"error": {"code": 503, "message": "The model is overloaded.", "status": "UNAVAILABLE"}}
+    )
+
+
+def _rate_limited(delay="7s"):
+    return errors.ClientError(
+        429,
+        {
+            "error": {
+                "code": 429,
+                "message": "Quota exceeded.",
+                "status": "RESOURCE_EXHAUSTED",
+                "details": [
+                    {"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": delay}
+                ],
+            }
+        },
+    )
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGeminiClient:
+    """
+    Local stand-in for ``genai.Client``.
+
+    ``script`` lists what each call does: an exception instance is raised,
+    a ``("slow", seconds)`` tuple sleeps and then times out like httpx does
+    when the response exceeds the client timeout, and a string is returned
+    as response text.
+    """
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.http_options = None
+        self.created = 0
+        self.calls = []
+        self.models = self
+
+    def __call__(self, http_options=None):
+        # Used as the patched genai.Client constructor.
+        self.created += 1
+        self.http_options = http_options
+        return self
+
+    def generate_content(self, model, contents, config=None):
+        self.calls.append((model, contents))
+        step = self.script.pop(0)
+        if isinstance(step, Exception):
+            raise step
+        if isinstance(step, tuple):
+            time.sleep(step[1])
+            raise httpx.ReadTimeout("read timed out")
+        return FakeResponse(step)
+
+
+@override_settings(QUIZLY_GEMINI_MAX_ATTEMPTS=4, QUIZLY_GEMINI_BACKOFF_BASE=1.0, QUIZLY_GEMINI_BACKOFF_MAX=30.0)
+class GenerateContentTests(SimpleTestCase):
+    def setUp(self):
+        llm_client.reset_client()
+        self.addCleanup(llm_client.reset_client)
+        metrics.reset()
+
+        sleep_patcher = patch("quizzes_app.services.llm_client.time.sleep")
+        self.mock_sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+    def _use_fake(self, script):
+        fake = FakeGeminiClient(script)
+        patcher = patch("quizzes_app.services.llm_client.genai.Client", fake)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return fake
+
+    def test_retries_overload_then_succeeds(self):
+        fake = self._use_fake([_overloaded(), _overloaded(), "ok"])
+
+        response = llm_client.generate_content("prompt")
+
+        self.assertEqual(response.text, "ok")
+        self.assertEqual(len(fake.calls), 3)
+        self.assertEqual(self.mock_sleep.call_count, 2)
+        self.assertEqual(metrics.get_counter("gemini_retries_total", reason="overloaded"), 2)
+        self.assertEqual(metrics.get_counter("gemini_requests_total", outcome="ok"), 1)
+        self.assertEqual(metrics.get_histogram("gemini_retries")["sum"], 2)
+
+    def test_gives_up_after_max_attempts(self):
+        fake = self._use_fake([_overloaded()] * 4)
+
+        with self.assertRaises(AIModelOverloadedError) as ctx:
+            llm_client.generate_content("prompt")
+
+        self.assertEqual(len(fake.calls), 4)
+        self.assertEqual(ctx.exception.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn("model overloaded", str(ctx.exception.detail))
+        self.assertIsInstance(ctx.exception, AIPipelineError)
+
+    def test_rate_limit_honours_server_retry_delay(self):
+        self._use_fake([_rate_limited("7s"), "ok"])
+
+        with patch("quizzes_app.services.llm_client.random.uniform", return_value=0.5):
+            llm_client.generate_content("prompt")
+
+        self.mock_sleep.assert_called_once_with(7.0)
+
+    def test_exhausted_rate_limit_reports_retry_after(self):
+        self._use_fake([_rate_limited("12s")] * 4)
+
+        with self.assertRaises(AIModelOverloadedError) as ctx:
+            llm_client.generate_content("prompt")
+
+        self.assertEqual(ctx.exception.wait, 12.0)
+
+    def test_slow_responses_time_out_and_are_retried(self):
+        fake = self._use_fake([("slow", 0.01), ("slow", 0.01), "ok"])
+
+        response = llm_client.generate_content("prompt")
+
+        self.assertEqual(response.text, "ok")
+        self.assertEqual(len(fake.calls), 3)
+        self.assertEqual(metrics.get_counter("gemini_retries_total", reason="timeout"), 2)
+
+    @override_settings(QUIZLY_GEMINI_MAX_ATTEMPTS=2)
+    def test_persistent_timeouts_raise_timeout_error(self):
+        self._use_fake([("slow", 0.01), ("slow", 0.01)])
+
+        with self.assertRaises(AIModelTimeoutError) as ctx:
+            llm_client.generate_content("prompt")
+
+        self.assertEqual(ctx.exception.status_code, status.HTTP_504_GATEWAY_TIMEOUT)
+
+    def test_client_errors_are_not_retried(self):
+        fake = self._use_fake(
+            [errors.ClientError(400, {"error": {"code": 400, "message": "bad", "status": "INVALID_ARGUMENT"}})]
+        )
+
+        with self.assertRaises(AIPipelineError) as ctx:
+            llm_client.generate_content("prompt")
+
+        self.assertNotIsInstance(ctx.exception, AIModelOverloadedError)
+        self.assertEqual(len(fake.calls), 1)
+        self.mock_sleep.assert_not_called()
+
+    @override_settings(QUIZLY_GEMINI_TIMEOUT=45)
+    def test_client_is_shared_and_configured_with_timeout(self):
+        fake = self._use_fake(["a", "b"])
+
+        llm_client.generate_content("one")
+        llm_client.generate_content("two")
+
+        self.assertEqual(fake.created, 1)
+        self.assertEqual(fake.http_options.timeout, 45000)
+
+    def test_client_is_created_once_across_threads(self):
+        fake = self._use_fake(["ok"] * 8)
+
+        threads = [threading.Thread(target=llm_client.generate_content, args=("p",)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(fake.created, 1)
+        self.assertEqual(len(fake.calls), 8)
+
+
+class BackoffDelayTests(SimpleTestCase):
+    def test_delay_is_jittered_below_exponential_cap(self):
+        for attempt, cap in [(1, 1.0), (2, 2.0), (3, 4.0), (10, 30.0)]:
+            delays = [llm_client.backoff_delay(attempt, base=1.0, maximum=30.0) for _ in range(50)]
+            self.assertTrue(all(0 <= d <= cap for d in delays))
+            self.assertGreater(len(set(delays)), 1)
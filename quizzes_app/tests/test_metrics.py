@@ -0,0 +1,202 @@
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from quizzes_app.services import metrics
+
+
+class MetricsTestMixin:
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+
+class HistogramTests(MetricsTestMixin, SimpleTestCase):
+    def test_observations_are_bucketed_cumulatively(self):
+        for value in (0.2, 0.7, 3, 5000):
+            metrics.observe("pipeline_stage_seconds", value, stage="download")
+
+        histogram = metrics.get_histogram("pipeline_stage_seconds", stage="download")
+
+        self.assertEqual(histogram["count"], 4)
+        self.assertAlmostEqual(histogram["sum"], 5003.9)
+        self.assertEqual(histogram["buckets"][0.25], 1)
+        self.assertEqual(histogram["buckets"][1], 2)
+        self.assertEqual(histogram["buckets"][5], 3)
+        self.assertEqual(histogram["buckets"][1800], 3)
+        self.assertEqual(histogram["buckets"][math.inf], 4)
+
+    def test_value_on_bound_falls_into_that_bucket(self):
+        metrics.observe("gemini_retries", 1)
+
+        self.assertEqual(metrics.get_histogram("gemini_retries")["buckets"][1], 1)
+        self.assertEqual(metrics.get_histogram("gemini_retries")["buckets"][0], 0)
+
+    def test_timed_records_duration_even_on_error(self):
+        with self.assertRaises(ValueError):
+            with metrics.timed("pipeline_stage_seconds", stage="generate"):
+                raise ValueError("boom")
+
+        self.assertEqual(metrics.get_histogram("pipeline_stage_seconds", stage="generate")["count"], 1)
+
+
+class RenderTextTests(MetricsTestMixin, SimpleTestCase):
+    def test_counters_and_histograms_use_prometheus_format(self):
+        metrics.increment("gemini_requests_total", outcome="ok")
+        metrics.observe("gemini_retries", 2)
+
+        text = metrics.render_text()
+
+        self.assertIn("# TYPE quizly_gemini_requests_total counter\n", text)
+        self.assertIn('quizly_gemini_requests_total{outcome="ok"} 1\n', text)
+        self.assertIn("# TYPE quizly_gemini_retries histogram\n", text)
+        self.assertIn('quizly_gemini_retries_bucket{le="1"} 0\n', text)
+        self.assertIn('quizly_gemini_retries_bucket{le="2"} 1\n', text)
+        self.assertIn('quizly_gemini_retries_bucket{le="+Inf"} 1\n', text)
+        self.assertIn("quizly_gemini_retries_sum 2\n", text)
+        self.assertIn("quizly_gemini_retries_count 1\n", text)
+
+    def test_gauges_are_rendered_with_the_collected_metrics(self):
+        text = metrics.render_text(gauges=[("job_queue_depth", {"priority": "long"}, 3)])
+
+        self.assertIn("# TYPE quizly_job_queue_depth gauge\n", text)
+        self.assertIn('quizly_job_queue_depth{priority="long"} 3\n', text)
+
+    def test_label_values_are_escaped(self):
+        metrics.increment("errors_total", reason='say "hi"\\')
+
+        self.assertIn('quizly_errors_total{reason="say \\"hi\\"\\\\"} 1', metrics.render_text())
+
+
+class MultiProcessTests(MetricsTestMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+
+    def _write_other_process(self, pid, data):
+        with open(os.path.join(self.directory, f"{pid}.json"), "w") as f:
+            json.dump(data, f)
+
+    def test_collect_sums_all_process_files(self):
+        bounds = len(metrics.BUCKETS["gemini_retries"]) + 1
+        self._write_other_process(1, {
+            "counters": [["gemini_requests_total", {"outcome": "ok"}, 2]],
+            "histograms": [["gemini_retries", {}, [1] + [0] * (bounds - 1), 0]],
+        })
+        self._write_other_process(2, {"counters": [["gemini_requests_total", {"outcome": "ok"}, 3]]})
+
+        with override_settings(QUIZLY_METRICS_DIR=self.directory):
+            metrics.increment("gemini_requests_total", outcome="ok")
+            metrics.observe("gemini_retries", 3)
+            counters, histograms = metrics.collect()
+
+        self.assertEqual(counters[("gemini_requests_total", (("outcome", "ok"),))], 6)
+        counts, total = histograms[("gemini_retries", ())]
+        self.assertEqual(sum(counts), 2)
+        self.assertEqual(total, 3)
+        self.assertTrue(any(name.startswith(f"{os.getpid()}-") for name in os.listdir(self.directory)))
+
+    def test_exited_process_files_are_merged_into_the_archive(self):
+        self._write_other_process("1-0123abcd", {"counters": [["jobs_total", {}, 2]]})
+        old = time.time() - 3600
+        os.utime(os.path.join(self.directory, "1-0123abcd.json"), (old, old))
+
+        with override_settings(QUIZLY_METRICS_DIR=self.directory):
+            metrics.increment("jobs_total")
+            first, _histograms = metrics.collect()
+            second, _histograms = metrics.collect()
+
+        self.assertEqual(first, {("jobs_total", ()): 3})
+        self.assertEqual(second, first)
+        self.assertNotIn("1-0123abcd.json", os.listdir(self.directory))
+        self.assertIn(metrics.ARCHIVE_FILE, os.listdir(self.directory))
+
+    def test_reused_pid_does_not_overwrite_the_exited_process(self):
+        with override_settings(QUIZLY_METRICS_DIR=self.directory):
+            metrics.increment("jobs_total", 2)
+            metrics.flush()
+            # A new process with the same PID starts from zero.
+            metrics._after_fork_in_child()
+            metrics.increment("jobs_total")
+            counters, _histograms = metrics.collect()
+
+        self.assertEqual(counters, {("jobs_total", ()): 3})
+
+    def test_unreadable_files_are_skipped(self):
+        with open(os.path.join(self.directory, "3.json"), "w") as f:
+            f.write("{not json")
+
+        with override_settings(QUIZLY_METRICS_DIR=self.directory):
+            metrics.increment("jobs_total")
+            counters, _histograms = metrics.collect()
+
+        self.assertEqual(counters, {("jobs_total", ()): 1})
+
+    def test_concurrent_flushes_do_not_collide(self):
+        errors = []
+
+        def flush_repeatedly():
+            try:
+                for _ in range(50):
+                    metrics.increment("jobs_total")
+                    metrics.flush()
+            except Exception as exc:
+                errors.append(exc)
+
+        with override_settings(QUIZLY_METRICS_DIR=self.directory):
+            threads = [threading.Thread(target=flush_repeatedly) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            counters, _histograms = metrics.collect()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(counters, {("jobs_total", ()): 200})
+        self.assertFalse([name for name in os.listdir(self.directory) if name.endswith(".tmp")])
+
+    def test_flush_without_directory_writes_nothing(self):
+        metrics.increment("jobs_total")
+        metrics.flush()
+
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+class MetricsEndpointTests(MetricsTestMixin, APITestCase):
+    def test_metrics_endpoint_exposes_request_latency(self):
+        user = User.objects.create_user(username="tester", password="secret123")
+        self.client.force_authenticate(user=user)
+        self.client.get("/api/quizzes/")
+
+        res = self.client.get(reverse("metrics"))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn(
+            'quizly_http_request_duration_seconds_count{method="GET",status="200",view="quiz-list"} 1',
+            res.content.decode(),
+        )
+
+    def test_requests_outside_api_are_not_recorded(self):
+        self.client.get(reverse("metrics"))
+
+        self.assertNotIn("http_request_duration_seconds", self.client.get(reverse("metrics")).content.decode())
+
+    @override_settings(QUIZLY_METRICS_TOKEN="scrape-secret")
+    def test_token_is_required_when_configured(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 401)
+
+        res = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-secret")
+
+        self.assertEqual(res.status_code, 200)
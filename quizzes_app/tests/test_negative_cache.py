@@ -0,0 +1,106 @@
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import yt_dlp
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from quizzes_app.models import RejectedVideo
+from quizzes_app.services import metrics, negative_cache
+from quizzes_app.services.error import VideoRejectedError
+from quizzes_app.services.quiz_pipeline_prod import checked_preflight
+
+VIDEO_URL = "https://www.youtube.com/watch?v=abcdefghijk"
+
+
+class NegativeCacheTests(TestCase):
+    def setUp(self):
+        negative_cache.clear()
+        self.addCleanup(negative_cache.clear)
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_miss_for_unknown_video(self):
+        self.assertIsNone(negative_cache.get_rejection("abcdefghijk"))
+        self.assertEqual(metrics.get_counter("negative_cache_misses_total"), 1)
+
+    def test_rejection_is_replayed_from_memory(self):
+        error = VideoRejectedError("Video is too long.", reason="too_long")
+        negative_cache.store_rejection("abcdefghijk", error)
+
+        with self.assertNumQueries(0):
+            error = negative_cache.get_rejection("abcdefghijk")
+
+        self.assertEqual(error.reason, "too_long")
+        self.assertEqual(str(error.detail), "Video is too long.")
+        self.assertEqual(error.status_code, 422)
+        hits = metrics.get_counter("negative_cache_hits_total", reason="too_long", layer="memory")
+        self.assertEqual(hits, 1)
+
+    def test_other_processes_find_the_rejection_in_the_database(self):
+        negative_cache.store_rejection("abcdefghijk", VideoRejectedError("Private.", reason="unavailable"))
+        negative_cache.clear()
+
+        error = negative_cache.get_rejection("abcdefghijk")
+
+        self.assertEqual(error.reason, "unavailable")
+        self.assertEqual(RejectedVideo.objects.get().hits, 1)
+        hits = metrics.get_counter("negative_cache_hits_total", reason="unavailable", layer="database")
+        self.assertEqual(hits, 1)
+
+    def test_expired_rejection_is_ignored(self):
+        negative_cache.store_rejection("abcdefghijk", VideoRejectedError("Live.", reason="live"))
+        RejectedVideo.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        negative_cache.clear()
+
+        self.assertIsNone(negative_cache.get_rejection("abcdefghijk"))
+
+    @override_settings(QUIZLY_NEGATIVE_CACHE_TTLS={"live": 0})
+    def test_reasons_without_ttl_are_not_cached(self):
+        negative_cache.store_rejection("abcdefghijk", VideoRejectedError("Live.", reason="live"))
+        negative_cache.store_rejection("abcdefghijk", VideoRejectedError("Broken.", reason="unknown_reason"))
+
+        self.assertIsNone(negative_cache.get_rejection("abcdefghijk"))
+        self.assertFalse(RejectedVideo.objects.exists())
+
+
+class CheckedPreflightTests(TestCase):
+    def setUp(self):
+        negative_cache.clear()
+        self.addCleanup(negative_cache.clear)
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.preflight_video")
+    def test_repeat_submission_is_rejected_without_yt_dlp(self, mock_preflight):
+        mock_preflight.side_effect = VideoRejectedError("Video is age-restricted.", reason="age_restricted")
+
+        for _ in range(3):
+            with self.assertRaises(VideoRejectedError) as ctx:
+                checked_preflight(VIDEO_URL)
+            self.assertEqual(ctx.exception.get_codes(), "age_restricted")
+
+        mock_preflight.assert_called_once_with(VIDEO_URL)
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.yt_dlp.YoutubeDL")
+    def test_network_failures_are_not_cached(self, mock_yt):
+        ydl_instance = MagicMock()
+        mock_yt.return_value.__enter__.return_value = ydl_instance
+        cause = yt_dlp.utils.ExtractorError(
+            "Unable to download webpage", cause=yt_dlp.networking.exceptions.TransportError("timed out")
+        )
+        ydl_instance.extract_info.side_effect = yt_dlp.utils.DownloadError(
+            "Unable to download webpage", exc_info=(type(cause), cause, None)
+        )
+
+        for _ in range(2):
+            with self.assertRaises(VideoRejectedError):
+                checked_preflight(VIDEO_URL)
+
+        self.assertEqual(ydl_instance.extract_info.call_count, 2)
+        self.assertFalse(RejectedVideo.objects.exists())
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.preflight_video", return_value={"title": "Video"})
+    def test_accepted_video_is_not_cached(self, mock_preflight):
+        checked_preflight(VIDEO_URL)
+        checked_preflight(VIDEO_URL)
+
+        self.assertEqual(mock_preflight.call_count, 2)
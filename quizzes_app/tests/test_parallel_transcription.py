@@ -0,0 +1,139 @@
+import asyncio
+from concurrent.futures import Future
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from quizzes_app.services.audio import SAMPLE_RATE
+from quizzes_app.services.parallel_transcription import (
+    atranscribe_chunked,
+    merge_chunk_texts,
+    transcribe_chunked,
+    worker_count,
+)
+from quizzes_app.services.quiz_pipeline_prod import transcribe_audio
+
+
+class InlinePool:
+    """Runs submitted tasks immediately in the current process."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+class MergeChunkTextsTests(SimpleTestCase):
+    def test_overlap_words_are_kept_once(self):
+        texts = [
+            " Welcome to the lecture. Today we talk about",
+            " we talk about sorting algorithms and their",
+            " and their complexity.",
+        ]
+
+        merged = merge_chunk_texts(texts)
+
+        self.assertEqual(
+            merged,
+            "Welcome to the lecture. Today we talk about sorting algorithms and their complexity.",
+        )
+
+    def test_overlap_comparison_ignores_case_and_punctuation(self):
+        merged = merge_chunk_texts(["It is fast, really fast.", "really Fast and cheap."])
+
+        self.assertEqual(merged, "It is fast, really fast. and cheap.")
+
+    def test_single_word_repeats_are_not_treated_as_overlap(self):
+        merged = merge_chunk_texts(["read the", "the book"])
+
+        self.assertEqual(merged, "read the the book")
+
+
+class TranscribeChunkedTests(SimpleTestCase):
+    @override_settings(QUIZLY_TRANSCRIBE_WORKERS=0)
+    @patch("quizzes_app.services.parallel_transcription.os.cpu_count", return_value=8)
+    def test_zero_workers_means_one_per_core(self, _mock_cpu_count):
+        self.assertEqual(worker_count(), 8)
+
+    @override_settings(QUIZLY_TRANSCRIBE_CHUNK_SECONDS=60, QUIZLY_TRANSCRIBE_CHUNK_OVERLAP=0)
+    @patch("quizzes_app.services.parallel_transcription.get_pool", return_value=InlinePool())
+    @patch("quizzes_app.services.parallel_transcription._worker_model")
+    def test_chunks_are_transcribed_and_stitched_in_order(self, mock_model, _mock_pool):
+        audio = np.zeros(150 * SAMPLE_RATE, dtype=np.float32)
+        mock_model.transcribe.side_effect = [
+            {"text": " one two three"},
+            {"text": " two three four"},
+            {"text": " five"},
+        ]
+
+        text = transcribe_chunked(audio, language="en")
+
+        self.assertEqual(text, "one two three four five")
+        self.assertEqual(mock_model.transcribe.call_count, 3)
+        self.assertEqual(mock_model.transcribe.call_args.kwargs, {"language": "en"})
+
+    @override_settings(QUIZLY_TRANSCRIBE_CHUNK_SECONDS=60, QUIZLY_TRANSCRIBE_CHUNK_OVERLAP=0)
+    @patch("quizzes_app.services.parallel_transcription.get_pool", return_value=InlinePool())
+    @patch("quizzes_app.services.parallel_transcription._worker_model")
+    def test_progress_is_reported_per_chunk(self, mock_model, _mock_pool):
+        mock_model.transcribe.return_value = {"text": " text"}
+        progress = MagicMock()
+
+        transcribe_chunked(np.zeros(150 * SAMPLE_RATE, dtype=np.float32), progress=progress)
+
+        self.assertEqual([c.args[0] for c in progress.call_args_list], [1 / 3, 2 / 3, 1.0])
+
+
+    @override_settings(QUIZLY_TRANSCRIBE_CHUNK_SECONDS=60, QUIZLY_TRANSCRIBE_CHUNK_OVERLAP=0)
+    @patch("quizzes_app.services.parallel_transcription.get_pool", return_value=InlinePool())
+    @patch("quizzes_app.services.parallel_transcription._worker_model")
+    def test_async_variant_awaits_chunks_in_order(self, mock_model, _mock_pool):
+        mock_model.transcribe.side_effect = [{"text": " one"}, {"text": " two"}, {"text": " three"}]
+
+        text = asyncio.run(atranscribe_chunked(np.zeros(150 * SAMPLE_RATE, dtype=np.float32)))
+
+        self.assertEqual(text, "one two three")
+
+    @patch("quizzes_app.services.parallel_transcription.get_pool", return_value=InlinePool())
+    @patch("quizzes_app.services.parallel_transcription._worker_model")
+    def test_async_variant_sends_short_audio_to_pool_whole(self, mock_model, _mock_pool):
+        mock_model.transcribe.return_value = {"text": " short"}
+
+        text = asyncio.run(atranscribe_chunked(np.zeros(10 * SAMPLE_RATE, dtype=np.float32), "de"))
+
+        self.assertEqual(text, "short")
+        mock_model.transcribe.assert_called_once()
+        self.assertEqual(mock_model.transcribe.call_args.kwargs, {"language": "de"})
+
+
+class TranscribeAudioRoutingTests(SimpleTestCase):
+    @override_settings(QUIZLY_TRANSCRIBE_WORKERS=4, QUIZLY_TRANSCRIBE_MIN_PARALLEL_SECONDS=60)
+    @patch("quizzes_app.services.quiz_pipeline_prod.parallel_transcription.transcribe_chunked")
+    @patch("quizzes_app.services.quiz_pipeline_prod.load_audio")
+    def test_long_audio_is_transcribed_in_parallel(self, mock_load, mock_chunked):
+        mock_load.return_value = np.zeros(120 * SAMPLE_RATE, dtype=np.float32)
+        mock_chunked.return_value = "parallel text"
+
+        text = transcribe_audio("/tmp/audio.wav", language="de")
+
+        self.assertEqual(text, "parallel text")
+        mock_chunked.assert_called_once_with(mock_load.return_value, language="de", progress=None)
+
+    @override_settings(QUIZLY_TRANSCRIBE_WORKERS=4, QUIZLY_TRANSCRIBE_MIN_PARALLEL_SECONDS=60)
+    @patch("quizzes_app.services.quiz_pipeline_prod.use_model")
+    @patch("quizzes_app.services.quiz_pipeline_prod.parallel_transcription.transcribe_chunked")
+    @patch("quizzes_app.services.quiz_pipeline_prod.load_audio")
+    def test_short_audio_uses_single_pass_on_loaded_samples(
+        self, mock_load, mock_chunked, mock_use_model
+    ):
+        mock_load.return_value = np.zeros(10 * SAMPLE_RATE, dtype=np.float32)
+        model = MagicMock()
+        model.transcribe.return_value = {"text": "short text"}
+        mock_use_model.return_value.__enter__.return_value = model
+
+        text = transcribe_audio("/tmp/audio.wav")
+
+        self.assertEqual(text, "short text")
+        mock_chunked.assert_not_called()
+        model.transcribe.assert_called_once_with(mock_load.return_value)
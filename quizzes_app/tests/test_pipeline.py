@@ -0,0 +1,244 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from quizzes_app.services import negative_cache
+from quizzes_app.services.error import AIPipelineError, VideoRejectedError
+from quizzes_app.services.pipeline import (
+    abuild_quiz,
+    build_quiz,
+    get_backend,
+    reset_backends,
+    warmup,
+    warmup_process,
+)
+from quizzes_app.services.pipeline_backends import PipelineBackend
+
+ROOT = Path(__file__).resolve().parents[2]
+VIDEO_URL = "https://www.youtube.com/watch?v=abcdefghijk"
+PAYLOAD = {"title": "Recorded", "description": "D", "questions": []}
+TEST_BACKENDS = {
+    "stub": "quizzes_app.services.pipeline_backends.StubBackend",
+    "captions": "quizzes_app.services.pipeline_backends.CaptionsBackend",
+    "replay": "quizzes_app.services.pipeline_backends.ReplayBackend",
+    "recording": "quizzes_app.tests.test_pipeline.RecordingBackend",
+}
+
+
+class RecordingBackend(PipelineBackend):
+    name = "recording"
+    stages = ("generate",)
+
+    def __init__(self):
+        self.calls = []
+
+    def build(self, video_url, progress=None):
+        self.calls.append(video_url)
+        return dict(PAYLOAD)
+
+    def warmup_steps(self):
+        return [
+            ("first", lambda: self.calls.append("first")),
+            ("broken", self._fail),
+            ("last", lambda: self.calls.append("last")),
+        ]
+
+    def _fail(self):
+        raise RuntimeError("no model")
+
+
+class BackendTestMixin:
+    def setUp(self):
+        super().setUp()
+        reset_backends()
+        self.addCleanup(reset_backends)
+
+
+class BuildQuizTests(BackendTestMixin, SimpleTestCase):
+    @override_settings(QUIZLY_PIPELINE_MODE="stub")
+    @patch("quizzes_app.services.pipeline_backends.build_quiz_stub", return_value={"title": "stub"})
+    def test_stub_mode_uses_stub_pipeline(self, mock_build):
+        progress = object()
+
+        self.assertEqual(build_quiz(VIDEO_URL, progress=progress), {"title": "stub"})
+        mock_build.assert_called_once_with(VIDEO_URL, progress=progress)
+
+    @override_settings(QUIZLY_PIPELINE_MODE="prod")
+    @patch("quizzes_app.services.quiz_pipeline_prod.build_quiz_prod", return_value={"title": "prod"})
+    def test_prod_mode_uses_prod_pipeline(self, mock_build):
+        self.assertEqual(build_quiz(VIDEO_URL), {"title": "prod"})
+        mock_build.assert_called_once_with(VIDEO_URL, progress=None, checkpoints=None)
+
+    @override_settings(QUIZLY_PIPELINE_MODE="prod")
+    @patch("quizzes_app.services.quiz_pipeline_prod.abuild_quiz_prod", return_value={"title": "prod"})
+    async def test_async_prod_mode_uses_async_prod_pipeline(self, mock_build):
+        self.assertEqual(await abuild_quiz(VIDEO_URL), {"title": "prod"})
+        mock_build.assert_awaited_once_with(VIDEO_URL)
+
+
+@override_settings(QUIZLY_PIPELINE_BACKENDS=TEST_BACKENDS)
+class BackendRegistryTests(BackendTestMixin, SimpleTestCase):
+    @override_settings(QUIZLY_PIPELINE_MODE="recording")
+    def test_mode_selects_registered_backend(self):
+        self.assertEqual(build_quiz(VIDEO_URL), PAYLOAD)
+        self.assertEqual(get_backend().calls, [VIDEO_URL])
+
+    @override_settings(QUIZLY_PIPELINE_MODE="recording")
+    async def test_default_async_build_runs_build_off_the_event_loop(self):
+        self.assertEqual(await abuild_quiz(VIDEO_URL), PAYLOAD)
+
+    def test_backend_instances_are_shared(self):
+        self.assertIs(get_backend("recording"), get_backend("recording"))
+
+    @override_settings(QUIZLY_PIPELINE_MODE="nonsense")
+    def test_unknown_mode_is_a_configuration_error(self):
+        with self.assertRaises(ImproperlyConfigured):
+            build_quiz(VIDEO_URL)
+
+    def test_warmup_runs_all_steps_and_reports_failures(self):
+        with self.assertLogs("quizzes_app.services.pipeline", level="WARNING"):
+            results = warmup("recording")
+
+        self.assertEqual([step for step, _seconds, _error in results], ["first", "broken", "last"])
+        self.assertIsInstance(results[1][2], RuntimeError)
+        self.assertEqual(get_backend("recording").calls, ["first", "last"])
+
+    def test_warmup_can_raise_after_all_steps(self):
+        with self.assertLogs("quizzes_app.services.pipeline", level="WARNING"):
+            with self.assertRaises(RuntimeError):
+                warmup("recording", raise_errors=True)
+
+        self.assertEqual(get_backend("recording").calls, ["first", "last"])
+
+    @override_settings(QUIZLY_PIPELINE_WARMUP=True, QUIZLY_PIPELINE_MODE="stub")
+    @patch("quizzes_app.services.pipeline.warmup")
+    def test_server_process_warms_up_when_enabled(self, mock_warmup):
+        warmup_process()
+
+        mock_warmup.assert_called_once_with()
+
+    @override_settings(QUIZLY_PIPELINE_WARMUP=True, QUIZLY_PIPELINE_MODE="stub")
+    @patch("quizzes_app.services.pipeline.warmup")
+    def test_app_ready_does_not_warm_up(self, mock_warmup):
+        apps.get_app_config("quizzes_app").ready()
+
+        mock_warmup.assert_not_called()
+
+    def test_warmup_command_reports_steps_and_fails_on_errors(self):
+        out = StringIO()
+
+        with self.assertLogs("quizzes_app.services.pipeline", level="WARNING"):
+            with self.assertRaisesMessage(CommandError, "broken"):
+                call_command("warmup_pipeline", backend="recording", stdout=out)
+
+        self.assertIn("Backend recording: stages generate", out.getvalue())
+        self.assertIn("failed: no model", out.getvalue())
+
+
+@override_settings(QUIZLY_PIPELINE_BACKENDS=TEST_BACKENDS, QUIZLY_PIPELINE_MODE="captions")
+class CaptionsBackendTests(BackendTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        negative_cache.clear()
+        self.addCleanup(negative_cache.clear)
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.generate_quiz", return_value=PAYLOAD)
+    @patch("quizzes_app.services.quiz_pipeline_prod.fetch_captions", return_value=("Some text.", "manual"))
+    @patch("quizzes_app.services.quiz_pipeline_prod.preflight_video", return_value={"title": "T"})
+    def test_quiz_is_generated_from_captions(self, _mock_preflight, _mock_captions, mock_generate):
+        stages = []
+
+        self.assertEqual(build_quiz(VIDEO_URL, progress=lambda stage, _p: stages.append(stage)), PAYLOAD)
+        mock_generate.assert_called_once_with("Some text.", video_title="T")
+        self.assertEqual(stages, list(get_backend().stages))
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.fetch_captions", return_value=None)
+    @patch("quizzes_app.services.quiz_pipeline_prod.preflight_video", return_value={})
+    def test_video_without_captions_is_rejected(self, _mock_preflight, _mock_captions):
+        with self.assertRaises(VideoRejectedError) as ctx:
+            build_quiz(VIDEO_URL)
+
+        self.assertEqual(ctx.exception.status_code, 422)
+        self.assertEqual(ctx.exception.get_codes(), "no_captions")
+
+
+@override_settings(QUIZLY_PIPELINE_BACKENDS=TEST_BACKENDS, QUIZLY_PIPELINE_MODE="replay")
+class ReplayBackendTests(BackendTestMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+
+    def _record(self, name, payload):
+        with open(os.path.join(self.directory, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+
+    def test_recording_of_the_video_is_returned(self):
+        self._record("abcdefghijk", PAYLOAD)
+        self._record("default", {**PAYLOAD, "title": "Default"})
+
+        with override_settings(QUIZLY_REPLAY_DIR=self.directory):
+            self.assertEqual(build_quiz(VIDEO_URL), PAYLOAD)
+            self.assertEqual(build_quiz("https://www.youtube.com/watch?v=zzzzzzzzzzz")["title"], "Default")
+
+    def test_missing_recording_is_a_pipeline_error(self):
+        with override_settings(QUIZLY_REPLAY_DIR=self.directory):
+            with self.assertRaises(AIPipelineError):
+                build_quiz(VIDEO_URL)
+
+    def test_recording_added_after_a_miss_is_picked_up(self):
+        with override_settings(QUIZLY_REPLAY_DIR=self.directory):
+            with self.assertRaises(AIPipelineError):
+                build_quiz(VIDEO_URL)
+            self._record("abcdefghijk", PAYLOAD)
+
+            self.assertEqual(build_quiz(VIDEO_URL), PAYLOAD)
+
+    def test_warmup_keeps_recordings_in_memory(self):
+        self._record("abcdefghijk", PAYLOAD)
+
+        with override_settings(QUIZLY_REPLAY_DIR=self.directory):
+            warmup()
+            os.remove(os.path.join(self.directory, "abcdefghijk.json"))
+            payload = build_quiz(VIDEO_URL)
+            payload["title"] = "Changed"
+
+            self.assertEqual(build_quiz(VIDEO_URL), PAYLOAD)
+
+
+class LazyImportTests(SimpleTestCase):
+    def test_url_conf_does_not_import_ml_or_network_libraries(self):
+        # A fresh interpreter: this test process has long imported everything.
+        code = (
+            "import json, sys, django\n"
+            "django.setup()\n"
+            "import core.urls, quizzes_app.management.commands.run_quiz_workers\n"
+            "from quizzes_app.services.pipeline import get_backend\n"
+            "get_backend('prod')\n"
+            "heavy = ('torch', 'whisper', 'numba', 'tiktoken', 'yt_dlp', 'google.genai')\n"
+            "print(json.dumps([m for m in heavy if m in sys.modules]))\n"
+        )
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "core.settings",
+            "SECRET_KEY": "lazy-import-test",
+            "QUIZLY_PIPELINE_MODE": "prod",
+            "QUIZLY_WHISPER_PRELOAD": "",
+        }
+
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        )
+
+        self.assertEqual(json.loads(result.stdout.strip().splitlines()[-1]), [])
@@ -0,0 +1,111 @@
+import json
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from quizzes_app.models import QuizJob
+from quizzes_app.services.quiz_jobs import enqueue_quiz_job
+from quizzes_app.services.quiz_pipeline_stub import build_quiz_stub
+from quizzes_app.services.persist_quiz import persist_quiz
+
+VIDEO_URL = "https://www.youtube.com/watch?v=abcdefghijk"
+
+
+def parse_events(body: str) -> list:
+    """Return the (event, data) pairs of an SSE body, skipping comments."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@override_settings(QUIZLY_SSE_POLL_INTERVAL=0, QUIZLY_SSE_KEEPALIVE=60)
+class QuizJobEventsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="secret123")
+        self.other = User.objects.create_user(username="other", password="secret123")
+        self.job = enqueue_quiz_job(owner=self.user, video_url=VIDEO_URL)
+        self.url = reverse("quiz-job-events", kwargs={"pk": self.job.pk})
+        self.async_client.cookies["access_token"] = str(AccessToken.for_user(self.user))
+
+    async def _stream(self, url=None):
+        response = await self.async_client.get(url or self.url)
+        body = "".join([chunk.decode() async for chunk in response.streaming_content])
+        return response, parse_events(body)
+
+    def _finish(self, status, **fields):
+        QuizJob.objects.filter(pk=self.job.pk).update(status=status, **fields)
+
+    async def test_succeeded_job_streams_progress_and_quiz(self):
+        quiz = await sync_to_async(persist_quiz)(
+            owner=self.user, video_url=VIDEO_URL, payload=build_quiz_stub(VIDEO_URL)
+        )
+        await sync_to_async(self._finish)(
+            QuizJob.STATUS_SUCCEEDED, stage="done", progress=100, quiz=quiz
+        )
+
+        response, events = await self._stream()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        self.assertEqual([name for name, _data in events], ["progress", "quiz"])
+        self.assertEqual(events[0][1]["progress"], 100)
+        self.assertEqual(events[1][1]["id"], quiz.pk)
+        self.assertEqual(len(events[1][1]["questions"]), 10)
+
+    async def test_progress_changes_are_streamed_until_failure(self):
+        updates = iter([
+            dict(status=QuizJob.STATUS_RUNNING, stage="download", progress=12),
+            dict(status=QuizJob.STATUS_RUNNING, stage="download", progress=12),
+            dict(status=QuizJob.STATUS_RUNNING, stage="transcribe", progress=45),
+            dict(status=QuizJob.STATUS_FAILED, error="AI pipeline failed"),
+        ])
+
+        async def advance(_seconds):
+            fields = next(updates)
+            await sync_to_async(self._finish)(fields.pop("status"), **fields)
+
+        with patch("quizzes_app.api.events.asyncio.sleep", side_effect=advance):
+            _response, events = await self._stream()
+
+        progress = [(data["status"], data["stage"], data["progress"]) for name, data in events if name == "progress"]
+        self.assertEqual(progress, [
+            ("queued", "queued", 0),
+            ("running", "download", 12),
+            ("running", "transcribe", 45),
+            ("failed", "transcribe", 45),
+        ])
+        self.assertEqual(events[-1], ("error", {"detail": "AI pipeline failed"}))
+
+    async def test_foreign_job_returns_403(self):
+        job = await sync_to_async(enqueue_quiz_job)(owner=self.other, video_url=VIDEO_URL)
+
+        response = await self.async_client.get(reverse("quiz-job-events", kwargs={"pk": job.pk}))
+
+        self.assertEqual(response.status_code, 403)
+
+    async def test_missing_job_returns_404(self):
+        response = await self.async_client.get(reverse("quiz-job-events", kwargs={"pk": 999}))
+
+        self.assertEqual(response.status_code, 404)
+
+    async def test_stream_requires_authentication(self):
+        self.async_client.cookies.clear()
+
+        response = await self.async_client.get(self.url)
+
+        self.assertEqual(response.status_code, 401)
+
+    async def test_invalid_token_returns_401(self):
+        self.async_client.cookies["access_token"] = "not-a-token"
+
+        response = await self.async_client.get(self.url)
+
+        self.assertEqual(response.status_code, 401)
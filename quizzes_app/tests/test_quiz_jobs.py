@@ -0,0 +1,120 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from quizzes_app.models import Quiz, QuizJob
+from quizzes_app.services.error import AIPipelineError
+from quizzes_app.services.quiz_jobs import (
+    claim_next_job,
+    enqueue_quiz_job,
+    process_next_job,
+)
+
+VIDEO_URL = "https://www.youtube.com/watch?v=abcdefghijk"
+
+
+@override_settings(QUIZLY_PIPELINE_MODE="stub", QUIZLY_ASYNC_JOBS=True)
+class AsyncCreateQuizApiTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="secret123")
+        self.other = User.objects.create_user(username="other", password="secret123")
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("create-quiz")
+
+    def test_create_quiz_returns_202_with_queued_job(self):
+        res = self.client.post(self.url, {"url": "https://youtu.be/abcdefghijk"}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data["status"], QuizJob.STATUS_QUEUED)
+        self.assertIsNone(res.data["quiz_id"])
+        self.assertEqual(res["Location"], reverse("quiz-job-detail", kwargs={"pk": res.data["id"]}))
+        self.assertEqual(Quiz.objects.count(), 0)
+
+        job = QuizJob.objects.get(pk=res.data["id"])
+        self.assertEqual(job.owner, self.user)
+        self.assertEqual(job.video_url, VIDEO_URL)
+
+    def test_job_status_reports_resulting_quiz(self):
+        res = self.client.post(self.url, {"url": VIDEO_URL}, format="json")
+        process_next_job()
+
+        res = self.client.get(reverse("quiz-job-detail", kwargs={"pk": res.data["id"]}))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["status"], QuizJob.STATUS_SUCCEEDED)
+        self.assertEqual(res.data["stage"], "done")
+        self.assertEqual(res.data["progress"], 100)
+        self.assertEqual(res.data["quiz_id"], Quiz.objects.get().id)
+
+    def test_foreign_job_returns_403(self):
+        job = enqueue_quiz_job(owner=self.other, video_url=VIDEO_URL)
+
+        res = self.client.get(reverse("quiz-job-detail", kwargs={"pk": job.pk}))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_job_status_requires_authentication(self):
+        job = enqueue_quiz_job(owner=self.user, video_url=VIDEO_URL)
+        self.client.force_authenticate(user=None)
+
+        res = self.client.get(reverse("quiz-job-detail", kwargs={"pk": job.pk}))
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(QUIZLY_PIPELINE_MODE="stub")
+class QuizJobQueueTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="secret123")
+
+    def test_claim_next_job_claims_oldest_job_once(self):
+        first = enqueue_quiz_job(owner=self.user, video_url=VIDEO_URL)
+        second = enqueue_quiz_job(owner=self.user, video_url=VIDEO_URL)
+
+        claimed = [claim_next_job(), claim_next_job(), claim_next_job()]
+
+        self.assertEqual([job.pk if job else None for job in claimed], [first.pk, second.pk, None])
+        self.assertEqual(claimed[0].status, QuizJob.STATUS_RUNNING)
+        self.assertIsNotNone(claimed[0].started_at)
+
+    def test_process_next_job_returns_none_on_empty_queue(self):
+        self.assertIsNone(process_next_job())
+
+    @override_settings(QUIZLY_PIPELINE_MODE="prod")
+    @patch("quizzes_app.services.quiz_pipeline_prod.build_quiz_prod")
+    @patch("quizzes_app.services.quiz_pipeline_prod.estimate_video", return_value={"cached": True, "cost": 0})
+    def test_prod_pipeline_progress_is_recorded(self, _mock_estimate, mock_build):
+        stages = []
+
+        def fake_build(video_url, progress, checkpoints):
+            progress("transcribe", 30)
+            stages.append(QuizJob.objects.get().stage)
+            raise AIPipelineError("AI pipeline failed: boom")
+
+        mock_build.side_effect = fake_build
+        enqueue_quiz_job(owner=self.user, video_url=VIDEO_URL)
+
+        job = process_next_job()
+
+        self.assertEqual(stages, ["transcribe"])
+        job.refresh_from_db()
+        self.assertEqual(job.status, QuizJob.STATUS_FAILED)
+        self.assertEqual(job.stage, "transcribe")
+        self.assertEqual(job.error, "AI pipeline failed: boom")
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(Quiz.objects.count(), 0)
+
+    @patch("quizzes_app.services.pipeline_backends.build_quiz_stub")
+    def test_invalid_payload_marks_job_failed(self, mock_build):
+        mock_build.return_value = {"title": "T", "description": "D", "questions": []}
+        enqueue_quiz_job(owner=self.user, video_url=VIDEO_URL)
+
+        job = process_next_job()
+
+        self.assertEqual(job.status, QuizJob.STATUS_FAILED)
+        self.assertIn("expected 10 questions", job.error)
+        self.assertIsNone(job.quiz)
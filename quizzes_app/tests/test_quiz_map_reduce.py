@@ -0,0 +1,268 @@
+import json
+import re
+import threading
+import time
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from quizzes_app.services import llm_client, metrics, transcript_budget
+from quizzes_app.services.checkpoints import SECTIONS
+from quizzes_app.services.error import AIModelOverloadedError, AIPipelineError
+from quizzes_app.services.persist_quiz import validate_payload
+from quizzes_app.services.quiz_map_reduce import (
+    generate_quiz_map_reduce,
+    select_questions,
+    use_map_reduce,
+)
+from quizzes_app.services.quiz_pipeline_prod import generate_quiz
+
+PART_RE = re.compile(r"part (\d+) of (\d+)")
+
+
+def _question(title, answer="A"):
+    return {"question_title": title, "question_options": ["A", "B", "C", "D"], "answer": answer}
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class RoutingGeminiClient:
+    """
+    Fake Gemini client that answers each prompt via ``respond(prompt)``.
+
+    Map-step prompts are answered with section-specific questions; calls
+    may run concurrently, so the peak number of parallel calls is tracked.
+    """
+
+    def __init__(self, respond, delay=0.0):
+        self.respond = respond
+        self.delay = delay
+        self.prompts = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        self.models = self
+
+    def __call__(self, **kwargs):
+        return self
+
+    def generate_content(self, model, contents, config=None):
+        with self.lock:
+            self.prompts.append(contents)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            return FakeResponse(self.respond(contents))
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def default_respond(prompt):
+    match = PART_RE.search(prompt)
+    if match:
+        part = int(match.group(1))
+        count = int(re.search(r"Write (\d+) multiple-choice", prompt).group(1))
+        return json.dumps([_question(f"Section {part} item{part}_{k} question") for k in range(count)])
+    return json.dumps({"title": "Long Lecture", "description": "Covers every section."})
+
+
+class DictCheckpoints:
+    """In-memory stand-in for a job's ``JobCheckpoints``."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, stage):
+        return self.data.get(stage)
+
+    def save(self, stage, data):
+        self.data[stage] = json.loads(json.dumps(data))
+
+
+def _transcript(sentences=400):
+    return " ".join(f"Sentence number {i} explains topic {i // 50} carefully." for i in range(sentences))
+
+
+@override_settings(
+    QUIZLY_MAP_REDUCE_SECTION_TOKENS=500,
+    QUIZLY_MAP_REDUCE_MAX_SECTIONS=8,
+    QUIZLY_MAP_REDUCE_CONCURRENCY=3,
+)
+class GenerateQuizMapReduceTests(SimpleTestCase):
+    def setUp(self):
+        metrics.reset()
+        encoding = patch.object(transcript_budget, "_get_encoding", return_value=None)
+        encoding.start()
+        self.addCleanup(encoding.stop)
+        llm_client.reset_client()
+        self.addCleanup(llm_client.reset_client)
+
+    def _install(self, client):
+        patcher = patch("quizzes_app.services.llm_client.genai.Client", client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return client
+
+    def test_generates_valid_quiz_spread_over_sections(self):
+        client = self._install(RoutingGeminiClient(default_respond))
+
+        payload = generate_quiz_map_reduce(_transcript(), video_title="Lecture")
+
+        validate_payload(payload)
+        self.assertEqual(payload["title"], "Long Lecture")
+        sections = {int(q["question_title"].split()[1]) for q in payload["questions"]}
+        map_calls = [p for p in client.prompts if PART_RE.search(p)]
+        self.assertEqual(len(sections), len(map_calls))
+        self.assertGreater(len(map_calls), 1)
+        numbers = [int(q["question_title"].split()[1]) for q in payload["questions"]]
+        self.assertEqual(numbers, sorted(numbers))
+
+    def test_transcript_tokens_are_recorded(self):
+        self._install(RoutingGeminiClient(default_respond))
+        transcript = "[Music] Uhm, " + _transcript()
+
+        generate_quiz_map_reduce(transcript)
+
+        raw = metrics.get_counter("transcript_tokens_total", stage="raw")
+        self.assertEqual(raw, transcript_budget.count_tokens(transcript))
+        self.assertLess(metrics.get_counter("transcript_tokens_total", stage="prompt"), raw)
+        self.assertEqual(metrics.get_counter("transcripts_compressed_total"), 1)
+
+    def test_single_section_yields_a_full_quiz_without_repair(self):
+        client = self._install(RoutingGeminiClient(default_respond))
+
+        payload = generate_quiz_map_reduce(_transcript(20))
+
+        validate_payload(payload)
+        map_calls = [p for p in client.prompts if PART_RE.search(p)]
+        self.assertEqual(len(map_calls), 1)
+        self.assertEqual(len(client.prompts), 2)
+
+    def test_map_calls_run_concurrently_but_bounded(self):
+        client = self._install(RoutingGeminiClient(default_respond, delay=0.05))
+
+        generate_quiz_map_reduce(_transcript(800))
+
+        self.assertEqual(client.peak, 3)
+
+    def test_sections_are_capped(self):
+        client = self._install(RoutingGeminiClient(default_respond))
+
+        with override_settings(QUIZLY_MAP_REDUCE_MAX_SECTIONS=2):
+            generate_quiz_map_reduce(_transcript(800))
+
+        self.assertEqual(len([p for p in client.prompts if PART_RE.search(p)]), 2)
+
+    @patch("quizzes_app.services.llm_client.time.sleep")
+    def test_failed_section_is_skipped(self, _mock_sleep):
+        def respond(prompt):
+            if "part 1 of" in prompt:
+                raise AIModelOverloadedError()
+            return default_respond(prompt)
+
+        self._install(RoutingGeminiClient(respond))
+
+        payload = generate_quiz_map_reduce(_transcript())
+
+        validate_payload(payload)
+        self.assertFalse(any(q["question_title"].startswith("Section 1 ") for q in payload["questions"]))
+        self.assertEqual(metrics.get_counter("quiz_map_reduce_failed_sections_total"), 1)
+
+    def test_unexpected_section_error_is_skipped(self):
+        def respond(prompt):
+            if "part 2 of" in prompt:
+                raise RuntimeError("unexpected client error")
+            return default_respond(prompt)
+
+        self._install(RoutingGeminiClient(respond))
+
+        with self.assertLogs("quizzes_app.services.quiz_map_reduce", level="WARNING"):
+            payload = generate_quiz_map_reduce(_transcript())
+
+        validate_payload(payload)
+        self.assertFalse(any(q["question_title"].startswith("Section 2 ") for q in payload["questions"]))
+        self.assertEqual(metrics.get_counter("quiz_map_reduce_failed_sections_total"), 1)
+
+    def test_all_sections_failing_raises(self):
+        def respond(prompt):
+            if PART_RE.search(prompt):
+                return "not json"
+            return default_respond(prompt)
+
+        self._install(RoutingGeminiClient(respond))
+
+        with self.assertRaises(AIPipelineError):
+            generate_quiz_map_reduce(_transcript())
+
+    def test_retry_reuses_the_checkpointed_sections(self):
+        def respond(prompt):
+            if PART_RE.search(prompt):
+                return default_respond(prompt)
+            raise AIPipelineError("AI pipeline failed: boom")
+
+        checkpoints = DictCheckpoints()
+        self._install(RoutingGeminiClient(respond))
+        with self.assertRaises(AIPipelineError):
+            generate_quiz_map_reduce(_transcript(), checkpoints=checkpoints)
+        self.assertIn(SECTIONS, checkpoints.data)
+
+        llm_client.reset_client()
+        client = self._install(RoutingGeminiClient(default_respond))
+        payload = generate_quiz_map_reduce(_transcript(), checkpoints=checkpoints)
+
+        validate_payload(payload)
+        self.assertEqual(len(client.prompts), 1)
+        self.assertFalse(PART_RE.search(client.prompts[0]))
+
+    @override_settings(QUIZLY_QUIZ_STRATEGY="map_reduce")
+    def test_generate_quiz_uses_map_reduce_when_configured(self):
+        client = self._install(RoutingGeminiClient(default_respond))
+
+        generate_quiz(_transcript())
+
+        self.assertTrue(any(PART_RE.search(p) for p in client.prompts))
+
+
+class UseMapReduceTests(SimpleTestCase):
+    def setUp(self):
+        encoding = patch.object(transcript_budget, "_get_encoding", return_value=None)
+        encoding.start()
+        self.addCleanup(encoding.stop)
+
+    def test_strategies(self):
+        long_text = "x" * 80000  # ~20000 estimated tokens
+        with override_settings(QUIZLY_QUIZ_STRATEGY="single"):
+            self.assertFalse(use_map_reduce(long_text))
+        with override_settings(QUIZLY_QUIZ_STRATEGY="map_reduce"):
+            self.assertTrue(use_map_reduce("short"))
+        with override_settings(QUIZLY_QUIZ_STRATEGY="auto", QUIZLY_MAP_REDUCE_MIN_TOKENS=12000):
+            self.assertTrue(use_map_reduce(long_text))
+            self.assertFalse(use_map_reduce("short"))
+
+
+class SelectQuestionsTests(SimpleTestCase):
+    def test_round_robin_in_section_order(self):
+        candidates = [
+            [_question("Alpha one"), _question("Alpha two")],
+            [_question("Beta one"), _question("Beta two")],
+            [_question("Gamma one")],
+        ]
+
+        titles = [q["question_title"] for q in select_questions(candidates, 4)]
+
+        self.assertEqual(titles, ["Alpha one", "Alpha two", "Beta one", "Gamma one"])
+
+    def test_near_duplicates_are_skipped(self):
+        candidates = [
+            [_question("What does HTTP stand for?")],
+            [_question("What does HTTP stand for in networking?"), _question("Which port does HTTPS use?")],
+        ]
+
+        titles = [q["question_title"] for q in select_questions(candidates, 10)]
+
+        self.assertEqual(titles, ["What does HTTP stand for?", "Which port does HTTPS use?"])
@@ -1,12 +1,31 @@
-from unittest.mock import patch, MagicMock
-from django.test import SimpleTestCase
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import ANY, patch, MagicMock
+import numpy as np
+import yt_dlp
+from django.test import SimpleTestCase, TestCase, override_settings
+from google.genai import errors
+from quizzes_app.services import llm_client, metrics, negative_cache
 from quizzes_app.services.quiz_pipeline_prod import (
+    abuild_quiz_prod,
     build_quiz_prod,
+    estimate_video,
     extract_audio,
+    fetch_captions,
+    preflight_video,
     transcribe_audio,
     generate_quiz,
 )
-from quizzes_app.services.error import AIPipelineError
+from quizzes_app.services.error import AIPipelineError, VideoRejectedError
+from quizzes_app.services.persist_quiz import validate_payload
+from quizzes_app.services.quiz_schema import QuizPayload
+from quizzes_app.services.transcript_cache import store_transcript
+from quizzes_app.services.whisper_models import registry
+from quizzes_app.tests.gemini_replay import ReplayGeminiClient, load_recorded
 
 
 class QuizPipelineProdExtractAudioTests(SimpleTestCase):
@@ -29,9 +48,226 @@ class QuizPipelineProdExtractAudioTests(SimpleTestCase):
 
         self.assertEqual(path, "/tmp/quizly_123/temp_audio.webm")
 
+    @patch("quizzes_app.services.quiz_pipeline_prod.tempfile.mkdtemp", return_value="/tmp/quizly_123")
+    @patch("quizzes_app.services.quiz_pipeline_prod.yt_dlp.YoutubeDL")
+    def test_extract_audio_speech_profile_converts_to_16khz_mono(self, mock_yt, _mock_mkdtemp):
+        ydl_instance = MagicMock()
+        mock_yt.return_value.__enter__.return_value = ydl_instance
+        ydl_instance.extract_info.return_value = {
+            "id": "abc",
+            "requested_downloads": [{"filepath": "/tmp/quizly_123/temp_audio.flac"}],
+        }
+
+        path = extract_audio("https://www.youtube.com/watch?v=abcdefghijk")
+
+        ydl_opts = mock_yt.call_args.args[0]
+        self.assertEqual(ydl_opts["format"], "bestaudio[abr<=64]/worstaudio/best")
+        self.assertEqual(ydl_opts["postprocessors"][0]["preferredcodec"], "flac")
+        self.assertEqual(
+            ydl_opts["postprocessor_args"]["extractaudio"], ["-ar", "16000", "-ac", "1"]
+        )
+        ydl_instance.prepare_filename.assert_not_called()
+        self.assertEqual(path, "/tmp/quizly_123/temp_audio.flac")
+
+    @override_settings(QUIZLY_AUDIO_PROFILE="best")
+    @patch("quizzes_app.services.quiz_pipeline_prod.tempfile.mkdtemp", return_value="/tmp/quizly_123")
+    @patch("quizzes_app.services.quiz_pipeline_prod.yt_dlp.YoutubeDL")
+    def test_extract_audio_best_profile_keeps_original_audio(self, mock_yt, _mock_mkdtemp):
+        mock_yt.return_value.__enter__.return_value.extract_info.return_value = {"id": "abc"}
+
+        extract_audio("https://www.youtube.com/watch?v=abcdefghijk")
+
+        ydl_opts = mock_yt.call_args.args[0]
+        self.assertEqual(ydl_opts["format"], "bestaudio/best")
+        self.assertNotIn("postprocessors", ydl_opts)
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.tempfile.mkdtemp", return_value="/tmp/quizly_123")
+    @patch("quizzes_app.services.quiz_pipeline_prod.yt_dlp.YoutubeDL")
+    def test_extract_audio_reuses_preflight_metadata(self, mock_yt, _mock_mkdtemp):
+        ydl_instance = MagicMock()
+        mock_yt.return_value.__enter__.return_value = ydl_instance
+        preflight_info = {"id": "abc", "formats": []}
+        processed_info = {"id": "abc", "ext": "webm"}
+        ydl_instance.process_ie_result.return_value = processed_info
+        ydl_instance.prepare_filename.return_value = "/tmp/quizly_123/temp_audio.webm"
+
+        path = extract_audio("https://www.youtube.com/watch?v=abcdefghijk", info=preflight_info)
+
+        ydl_instance.extract_info.assert_not_called()
+        ydl_instance.process_ie_result.assert_called_once_with(preflight_info, download=True)
+        ydl_instance.prepare_filename.assert_called_once_with(processed_info)
+        self.assertEqual(path, "/tmp/quizly_123/temp_audio.webm")
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.tempfile.mkdtemp", return_value="/tmp/quizly_123")
+    @patch("quizzes_app.services.quiz_pipeline_prod.yt_dlp.YoutubeDL")
+    def test_extract_audio_reports_download_progress(self, mock_yt, _mock_mkdtemp):
+        mock_yt.return_value.__enter__.return_value.extract_info.return_value = {"id": "abc"}
+        reported = []
+
+        extract_audio("https://www.youtube.com/watch?v=abcdefghijk", progress=reported.append)
+
+        (hook,) = mock_yt.call_args.args[0]["progress_hooks"]
+        hook({"status": "downloading", "downloaded_bytes": 250, "total_bytes": 1000})
+        hook({"status": "downloading", "downloaded_bytes": 500, "total_bytes_estimate": 1000})
+        hook({"status": "downloading", "downloaded_bytes": 100})
+        hook({"status": "finished", "downloaded_bytes": 1000, "total_bytes": 1000})
+        self.assertEqual(reported, [0.25, 0.5, 1.0])
+
+
+class QuizPipelineProdPreflightTests(SimpleTestCase):
+    def _preflight(self, mock_yt, info=None, error=None):
+        ydl_instance = MagicMock()
+        mock_yt.return_value.__enter__.return_value = ydl_instance
+        ydl_instance.extract_info.return_value = info
+        ydl_instance.extract_info.side_effect = error
+        return preflight_video("https://www.youtube.com/watch?v=abcdefghijk"), ydl_instance
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.yt_dlp.YoutubeDL")
+    def test_preflight_returns_metadata_without_downloading(self, mock_yt):
+        info = {"id": "abcdefghijk", "title": "Video", "duration": 600, "language": "en"}
+
+        result, ydl_instance = self._preflight(mock_yt, info)
+
+        self.assertIs(result, info)
+        ydl_instance.extract_info.assert_called_once_with(
+            "https://www.youtube.com/watch?v=abcdefghijk", download=False, process=False
+        )
+
+    @override_settings(QUIZLY_MAX_VIDEO_DURATION=3600)
+    @patch("quizzes_app.services.quiz_pipeline_prod.yt_dlp.YoutubeDL")
+    def test_preflight_rejects_too_long_video(self, mock_yt):
+        with self.assertRaises(VideoRejectedError) as ctx:
+            self._preflight(mock_yt, {"duration": 4 * 3600})
+
+        self.assertEqual(ctx.exception.reason, "too_long")
+        self.assertEqual(ctx.exception.status_code, 422)
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.yt_dlp.YoutubeDL")
+    def test_preflight_rejects_live_stream(self, mock_yt):
+        with self.assertRaises(VideoRejectedError) as ctx:
+            self._preflight(mock_yt, {"live_status": "is_live", "duration": None})
+
+        self.assertEqual(ctx.exception.reason, "live")
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.yt_dlp.YoutubeDL")
+    def test_preflight_rejects_private_video(self, mock_yt):
+        with self.assertRaises(VideoRejectedError) as ctx:
+            self._preflight(mock_yt, {"availability": "private", "duration": 60})
+
+        self.assertEqual(ctx.exception.reason, "unavailable")
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.yt_dlp.YoutubeDL")
+    def test_preflight_rejects_age_restricted_video(self, mock_yt):
+        with self.assertRaises(VideoRejectedError) as ctx:
+            self._preflight(mock_yt, {"age_limit": 18, "duration": 60})
+
+        self.assertEqual(ctx.exception.reason, "age_restricted")
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.yt_dlp.YoutubeDL")
+    def test_preflight_rejects_when_extraction_fails(self, mock_yt):
+        with self.assertRaises(VideoRejectedError) as ctx:
+            self._preflight(mock_yt, error=yt_dlp.utils.DownloadError("Video unavailable"))
+
+        self.assertEqual(ctx.exception.reason, "unavailable")
+
+
+class QuizPipelineProdCaptionsTests(SimpleTestCase):
+    def _mock_ydl(self, mock_yt, info, raw):
+        ydl_instance = MagicMock()
+        mock_yt.return_value.__enter__.return_value = ydl_instance
+        ydl_instance.extract_info.return_value = info
+        ydl_instance.urlopen.return_value.read.return_value = raw.encode("utf-8")
+        return ydl_instance
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.yt_dlp.YoutubeDL")
+    def test_fetch_captions_prefers_manual_json3_track(self, mock_yt):
+        info = {
+            "language": "en",
+            "subtitles": {
+                "en": [
+                    {"ext": "vtt", "url": "https://example.com/manual.vtt"},
+                    {"ext": "json3", "url": "https://example.com/manual.json3"},
+                ],
+            },
+            "automatic_captions": {
+                "en-orig": [{"ext": "json3", "url": "https://example.com/auto.json3"}],
+            },
+        }
+        raw = '{"events": [{"segs": [{"utf8": "Hello"}, {"utf8": " world"}]}, {"segs": [{"utf8": "\\n"}]}]}'
+        ydl_instance = self._mock_ydl(mock_yt, info, raw)
+
+        result = fetch_captions("https://www.youtube.com/watch?v=abcdefghijk")
+
+        self.assertEqual(result, ("Hello world", "manual"))
+        ydl_instance.extract_info.assert_called_once_with(
+            "https://www.youtube.com/watch?v=abcdefghijk", download=False
+        )
+        ydl_instance.urlopen.assert_called_once_with("https://example.com/manual.json3")
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.yt_dlp.YoutubeDL")
+    def test_fetch_captions_falls_back_to_auto_vtt_and_drops_duplicates(self, mock_yt):
+        info = {
+            "language": "en",
+            "subtitles": {},
+            "automatic_captions": {
+                "de": [{"ext": "vtt", "url": "https://example.com/de.vtt"}],
+                "en-orig": [{"ext": "vtt", "url": "https://example.com/en.vtt"}],
+            },
+        }
+        raw = (
+            "WEBVTT\nKind: captions\nLanguage: en\n\n"
+            "00:00:00.000 --> 00:00:02.000 align:start position:0%\n"
+            "<c>hello</c> everyone\n\n"
+            "00:00:02.000 --> 00:00:04.000\n"
+            "hello everyone\n"
+            "welcome back\n"
+        )
+        ydl_instance = self._mock_ydl(mock_yt, info, raw)
+
+        result = fetch_captions("https://www.youtube.com/watch?v=abcdefghijk")
+
+        self.assertEqual(result, ("hello everyone welcome back", "auto"))
+        ydl_instance.urlopen.assert_called_once_with("https://example.com/en.vtt")
+
+    @override_settings(QUIZLY_CAPTIONS_ALLOW_AUTO=False)
+    @patch("quizzes_app.services.quiz_pipeline_prod.yt_dlp.YoutubeDL")
+    def test_fetch_captions_returns_none_without_usable_track(self, mock_yt):
+        info = {
+            "language": "en",
+            "subtitles": {},
+            "automatic_captions": {"en": [{"ext": "vtt", "url": "https://example.com/en.vtt"}]},
+        }
+        ydl_instance = self._mock_ydl(mock_yt, info, "")
+
+        self.assertIsNone(fetch_captions("https://www.youtube.com/watch?v=abcdefghijk"))
+        ydl_instance.urlopen.assert_not_called()
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.yt_dlp.YoutubeDL")
+    def test_fetch_captions_returns_none_for_malformed_json3_track(self, mock_yt):
+        info = {
+            "language": "en",
+            "subtitles": {"en": [{"ext": "json3", "url": "https://example.com/manual.json3"}]},
+        }
+        for raw in ("", "<html>Sorry</html>", "[1, 2]", '{"events": [1]}'):
+            self._mock_ydl(mock_yt, info, raw)
+
+            self.assertIsNone(fetch_captions("https://www.youtube.com/watch?v=abcdefghijk"), raw)
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.yt_dlp.YoutubeDL")
+    def test_fetch_captions_returns_none_on_download_error(self, mock_yt):
+        ydl_instance = MagicMock()
+        mock_yt.return_value.__enter__.return_value = ydl_instance
+        ydl_instance.extract_info.side_effect = yt_dlp.utils.DownloadError("unavailable")
+
+        self.assertIsNone(fetch_captions("https://www.youtube.com/watch?v=abcdefghijk"))
+
 
 class QuizPipelineProdTranscribeTests(SimpleTestCase):
-    @patch("quizzes_app.services.quiz_pipeline_prod.whisper.load_model")
+    def setUp(self):
+        registry.clear()
+        self.addCleanup(registry.clear)
+
+    @patch("quizzes_app.services.whisper_models.whisper.load_model")
     def test_transcribe_audio_uses_whisper_model(self, mock_load_model):
         model = MagicMock()
         mock_load_model.return_value = model
@@ -43,26 +279,119 @@ class QuizPipelineProdTranscribeTests(SimpleTestCase):
         model.transcribe.assert_called_once_with("/tmp/some_audio.webm")
         self.assertEqual(text, "hello world")
 
+    @patch("quizzes_app.services.whisper_models.whisper.load_model")
+    def test_transcribe_audio_reports_progress_when_done(self, mock_load_model):
+        model = MagicMock()
+        mock_load_model.return_value = model
+        model.transcribe.side_effect = lambda *args, **kwargs: reported.append("transcribe") or {"text": "hello"}
+        reported = []
+
+        transcribe_audio("/tmp/some_audio.webm", progress=reported.append)
+
+        self.assertEqual(reported, ["transcribe", 1.0])
+
+    @patch("quizzes_app.services.whisper_models.whisper.load_model")
+    def test_transcribe_audio_reuses_loaded_model(self, mock_load_model):
+        model = MagicMock()
+        mock_load_model.return_value = model
+        model.transcribe.return_value = {"text": "hello world"}
+
+        transcribe_audio("/tmp/first.webm")
+        transcribe_audio("/tmp/second.webm")
+
+        mock_load_model.assert_called_once_with("base")
+        self.assertEqual(model.transcribe.call_count, 2)
+
+    @override_settings(QUIZLY_VAD_ENABLED=True)
+    @patch("quizzes_app.services.quiz_pipeline_prod.load_audio")
+    @patch("quizzes_app.services.whisper_models.whisper.load_model")
+    def test_transcribe_audio_trims_silence_with_vad(self, mock_load_model, mock_load_audio):
+        sr = 16000
+        tone = 0.5 * np.sin(2 * np.pi * 220 * np.arange(5 * sr) / sr)
+        mock_load_audio.return_value = np.concatenate(
+            [np.zeros(20 * sr), tone, np.zeros(20 * sr)]
+        ).astype(np.float32)
+        model = MagicMock()
+        mock_load_model.return_value = model
+        model.transcribe.return_value = {
+            "text": "hello world",
+            "segments": [{"start": 0.0, "end": 5.0, "text": "hello world"}],
+        }
+        metrics.reset()
+
+        text = transcribe_audio("/tmp/some_audio.wav")
+
+        self.assertEqual(text, "hello world")
+        speech = model.transcribe.call_args.args[0]
+        self.assertLess(len(speech), 6 * sr)
+        self.assertEqual(metrics.get_counter("transcribe_audio_seconds_total", stage="input"), 45)
+        self.assertLess(metrics.get_counter("transcribe_audio_seconds_total", stage="speech"), 6)
+
+    @override_settings(QUIZLY_VAD_ENABLED=True)
+    @patch("quizzes_app.services.quiz_pipeline_prod.load_audio")
+    @patch("quizzes_app.services.whisper_models.whisper.load_model")
+    def test_transcribe_audio_skips_whisper_for_silence(self, mock_load_model, mock_load_audio):
+        mock_load_audio.return_value = np.zeros(16000 * 10, dtype=np.float32)
+
+        with self.assertRaises(VideoRejectedError) as ctx:
+            transcribe_audio("/tmp/silence.wav")
+
+        self.assertEqual(ctx.exception.get_codes(), "no_speech")
+        mock_load_model.assert_not_called()
+
+
+def _fake_download(video_url, info=None, progress=None, directory=None):
+    """Stand-in for extract_audio that leaves yt-dlp style files behind."""
+    with open(os.path.join(directory, "temp_audio.webm.part"), "wb") as f:
+        f.write(b"partial")
+    audio_path = os.path.join(directory, "temp_audio.wav")
+    with open(audio_path, "wb") as f:
+        f.write(b"audio")
+    return audio_path
+
+
+class QuizPipelineProdBuildTests(TestCase):
+    def setUp(self):
+        negative_cache.clear()
+        self.addCleanup(negative_cache.clear)
+        self.workspace_dir = tempfile.mkdtemp(prefix="quizly_test_workspaces_")
+        self.addCleanup(shutil.rmtree, self.workspace_dir, ignore_errors=True)
+        settings_override = override_settings(QUIZLY_WORKSPACE_DIR=self.workspace_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # Run the pipeline directly; coalescing is covered in test_single_flight.
+        patcher = patch(
+            "quizzes_app.services.quiz_pipeline_prod.single_flight.do",
+            side_effect=lambda key, fn: fn(),
+        )
+        self.mock_single_flight = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = patch(
+            "quizzes_app.services.quiz_pipeline_prod.preflight_video",
+            return_value={"id": "abcdefghijk", "title": "Video", "duration": 60},
+        )
+        self.mock_preflight = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = patch(
+            "quizzes_app.services.quiz_pipeline_prod.fetch_captions", return_value=None
+        )
+        self.mock_fetch_captions = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        metrics.reset()
+        self.addCleanup(metrics.reset)
 
-class QuizPipelineProdBuildTests(SimpleTestCase):
     @patch("quizzes_app.services.quiz_pipeline_prod.generate_quiz")
     @patch("quizzes_app.services.quiz_pipeline_prod.transcribe_audio")
-    @patch("quizzes_app.services.quiz_pipeline_prod.extract_audio")
-    @patch("quizzes_app.services.quiz_pipeline_prod.os.rmdir")
-    @patch("quizzes_app.services.quiz_pipeline_prod.os.path.isdir", return_value=True)
-    @patch("quizzes_app.services.quiz_pipeline_prod.os.remove")
-    @patch("quizzes_app.services.quiz_pipeline_prod.os.path.exists", return_value=True)
+    @patch("quizzes_app.services.quiz_pipeline_prod.extract_audio", side_effect=_fake_download)
     def test_build_quiz_prod_calls_steps_and_cleans_up(
         self,
-        mock_exists,
-        mock_remove,
-        mock_isdir,
-        mock_rmdir,
         mock_extract,
         mock_transcribe,
         mock_generate,
     ):
-        mock_extract.return_value = "/tmp/quizly_123/temp_audio.webm"
         mock_transcribe.return_value = "fake transcript"
         fake_payload = {"title": "T", "description": "D", "questions": []}
         mock_generate.return_value = fake_payload
@@ -70,105 +399,302 @@ class QuizPipelineProdBuildTests(SimpleTestCase):
         result = build_quiz_prod("https://www.youtube.com/watch?v=abcdefghijk")
 
         mock_extract.assert_called_once()
+        directory = mock_extract.call_args.kwargs["directory"]
+        self.assertEqual(os.path.dirname(directory), self.workspace_dir)
         mock_transcribe.assert_called_once_with(
-            "/tmp/quizly_123/temp_audio.webm")
-        mock_generate.assert_called_once_with("fake transcript")
+            os.path.join(directory, "temp_audio.wav"), language=None, progress=ANY)
+        mock_generate.assert_called_once_with("fake transcript", video_title="Video", checkpoints=None)
         self.assertEqual(result, fake_payload)
 
-        mock_exists.assert_called_once_with("/tmp/quizly_123/temp_audio.webm")
-        mock_remove.assert_called_once_with("/tmp/quizly_123/temp_audio.webm")
-        mock_isdir.assert_called_once_with("/tmp/quizly_123")
-        mock_rmdir.assert_called_once_with("/tmp/quizly_123")
+        # The whole workspace is gone, partial downloads included.
+        self.assertEqual(os.listdir(self.workspace_dir), [])
+
+        for stage in ("preflight", "captions", "download", "transcribe", "generate"):
+            self.assertEqual(
+                metrics.get_histogram("pipeline_stage_seconds", stage=stage)["count"], 1, stage
+            )
+        self.assertEqual(metrics.get_histogram("audio_seconds")["sum"], 60)
+        self.assertEqual(metrics.get_histogram("transcript_chars", source="whisper")["sum"], 15)
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.generate_quiz")
+    @patch("quizzes_app.services.whisper_models.whisper.load_model")
+    @patch("quizzes_app.services.quiz_pipeline_prod.extract_audio", side_effect=_fake_download)
+    def test_build_quiz_prod_rejects_video_without_speech(self, _mock_extract, mock_load_model, mock_generate):
+        registry.clear()
+        self.addCleanup(registry.clear)
+        mock_load_model.return_value.transcribe.return_value = {"text": " ", "segments": []}
+
+        for _ in range(2):
+            with self.assertRaises(VideoRejectedError) as ctx:
+                build_quiz_prod("https://www.youtube.com/watch?v=abcdefghijk")
+            self.assertEqual(ctx.exception.get_codes(), "no_speech")
+
+        self.assertEqual(mock_load_model.return_value.transcribe.call_count, 2)
+        mock_generate.assert_not_called()
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.generate_quiz")
+    @patch("quizzes_app.services.quiz_pipeline_prod.transcribe_audio", side_effect=RuntimeError("boom"))
+    @patch("quizzes_app.services.quiz_pipeline_prod.extract_audio", side_effect=_fake_download)
+    def test_build_quiz_prod_removes_workspace_on_failure(
+        self,
+        mock_extract,
+        mock_transcribe,
+        mock_generate,
+    ):
+        with self.assertRaises(RuntimeError):
+            build_quiz_prod("https://www.youtube.com/watch?v=abcdefghijk")
+
+        self.assertEqual(os.listdir(self.workspace_dir), [])
+        mock_generate.assert_not_called()
 
     @patch("quizzes_app.services.quiz_pipeline_prod.generate_quiz")
     @patch("quizzes_app.services.quiz_pipeline_prod.transcribe_audio")
     @patch("quizzes_app.services.quiz_pipeline_prod.extract_audio")
-    @patch("quizzes_app.services.quiz_pipeline_prod.os.rmdir", side_effect=OSError("rm dir fail"))
-    @patch("quizzes_app.services.quiz_pipeline_prod.os.path.isdir", return_value=True)
-    @patch("quizzes_app.services.quiz_pipeline_prod.os.remove", side_effect=OSError("rm file fail"))
-    @patch("quizzes_app.services.quiz_pipeline_prod.os.path.exists", return_value=True)
-    def test_build_quiz_prod_cleanup_ignores_oserrors(
+    def test_build_quiz_prod_reuses_cached_transcript(
         self,
-        mock_exists,
-        mock_remove,
-        mock_isdir,
-        mock_rmdir,
         mock_extract,
         mock_transcribe,
         mock_generate,
     ):
-        """
-        Deckt die except OSError: pass-Zweige im Cleanup ab.
-        """
-        mock_extract.return_value = "/tmp/quizly_123/temp_audio.webm"
-        mock_transcribe.return_value = "fake transcript"
-        fake_payload = {"title": "T", "description": "D", "questions": []}
-        mock_generate.return_value = fake_payload
+        store_transcript("abcdefghijk", "base", None, "cached transcript")
+        mock_generate.return_value = {"title": "T", "description": "D", "questions": []}
 
-        result = build_quiz_prod("https://www.youtube.com/watch?v=abcdefghijk")
+        build_quiz_prod("https://www.youtube.com/watch?v=abcdefghijk")
 
-        self.assertEqual(result, fake_payload)
-        mock_exists.assert_called_once_with("/tmp/quizly_123/temp_audio.webm")
-        mock_remove.assert_called_once()
-        mock_isdir.assert_called_once_with("/tmp/quizly_123")
-        mock_rmdir.assert_called_once()
+        mock_extract.assert_not_called()
+        mock_transcribe.assert_not_called()
+        mock_generate.assert_called_once_with("cached transcript", video_title="Video", checkpoints=None)
+        self.assertEqual(self.mock_single_flight.call_args.args[0], "abcdefghijk")
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.generate_quiz")
+    @patch("quizzes_app.services.quiz_pipeline_prod.transcribe_audio", return_value="fresh transcript")
+    @patch("quizzes_app.services.quiz_pipeline_prod.extract_audio", return_value="/tmp/quizly_123/temp_audio.webm")
+    def test_build_quiz_prod_stores_transcript_on_miss(
+        self,
+        mock_extract,
+        mock_transcribe,
+        mock_generate,
+    ):
+        mock_generate.return_value = {"title": "T", "description": "D", "questions": []}
+
+        build_quiz_prod("https://www.youtube.com/watch?v=abcdefghijk")
+        build_quiz_prod("https://www.youtube.com/watch?v=abcdefghijk")
+
+        mock_extract.assert_called_once()
+        mock_transcribe.assert_called_once()
+        self.assertEqual(mock_generate.call_count, 2)
+        self.assertEqual(metrics.get_counter("transcript_source_total", source="whisper"), 1)
+        self.assertEqual(metrics.get_counter("transcript_source_total", source="cache"), 1)
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.generate_quiz")
+    @patch("quizzes_app.services.quiz_pipeline_prod.transcribe_audio")
+    @patch("quizzes_app.services.quiz_pipeline_prod.extract_audio")
+    def test_build_quiz_prod_prefers_captions_over_whisper(
+        self,
+        mock_extract,
+        mock_transcribe,
+        mock_generate,
+    ):
+        self.mock_fetch_captions.return_value = ("caption transcript", "manual")
+        mock_generate.return_value = {"title": "T", "description": "D", "questions": []}
+
+        build_quiz_prod("https://www.youtube.com/watch?v=abcdefghijk")
+
+        mock_extract.assert_not_called()
+        mock_transcribe.assert_not_called()
+        mock_generate.assert_called_once_with("caption transcript", video_title="Video", checkpoints=None)
+        self.assertIs(
+            self.mock_fetch_captions.call_args.kwargs["info"], self.mock_preflight.return_value
+        )
+        self.assertEqual(
+            metrics.get_counter("transcript_source_total", source="captions_manual"), 1
+        )
+
+
+@override_settings(QUIZLY_WHISPER_MODEL="base", QUIZLY_WHISPER_LANGUAGE="", QUIZLY_USE_CAPTIONS=True)
+class QuizPipelineProdEstimateTests(TestCase):
+    URL = "https://www.youtube.com/watch?v=abcdefghijk"
+
+    def setUp(self):
+        negative_cache.clear()
+        self.addCleanup(negative_cache.clear)
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.preflight_video")
+    def test_cached_transcript_costs_nothing_and_skips_preflight(self, mock_preflight):
+        store_transcript("abcdefghijk", "base", "en", "hello world")
+
+        self.assertEqual(estimate_video(self.URL), {"cached": True, "duration": None, "cost": 0})
+        mock_preflight.assert_not_called()
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.preflight_video")
+    def test_configured_language_is_normalized_for_the_cache_lookup(self, mock_preflight):
+        store_transcript("abcdefghijk", "base", "en", "hello world")
+
+        for language in ("en-US", "English"):
+            with override_settings(QUIZLY_WHISPER_LANGUAGE=language):
+                self.assertEqual(estimate_video(self.URL)["cached"], True)
+        mock_preflight.assert_not_called()
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.preflight_video")
+    def test_cost_is_the_duration_unless_captions_exist(self, mock_preflight):
+        mock_preflight.return_value = {"duration": 900, "language": "en"}
+        estimate = estimate_video(self.URL)
+        self.assertEqual((estimate["duration"], estimate["cost"]), (900, 900))
+
+        mock_preflight.return_value["subtitles"] = {"en": [{"ext": "vtt", "url": "https://captions"}]}
+        estimate = estimate_video(self.URL)
+        self.assertEqual((estimate["cached"], estimate["duration"], estimate["cost"]), (False, 900, 0))
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.preflight_video")
+    def test_estimate_returns_the_metadata_for_the_pipeline(self, mock_preflight):
+        track = {"ext": "vtt", "url": "https://captions"}
+        mock_preflight.return_value = {
+            "title": "Video", "duration": 900, "language": "en", "formats": [{}], "subtitles": {"en": [track]},
+        }
+
+        metadata = estimate_video(self.URL)["metadata"]
+
+        self.assertEqual(metadata["title"], "Video")
+        self.assertEqual(metadata["captions"], {"kind": "manual", "language": "en", "track": track})
+        self.assertNotIn("formats", metadata)
+
+
+class QuizPipelineProdAsyncBuildTests(TestCase):
+    def setUp(self):
+        negative_cache.clear()
+        self.addCleanup(negative_cache.clear)
+        patcher = patch(
+            "quizzes_app.services.quiz_pipeline_prod.preflight_video",
+            return_value={"id": "abcdefghijk", "title": "Video", "duration": 60},
+        )
+        self.mock_preflight = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = patch(
+            "quizzes_app.services.quiz_pipeline_prod.fetch_captions", return_value=None
+        )
+        self.mock_fetch_captions = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = patch("quizzes_app.services.quiz_pipeline_prod.generate_quiz")
+        self.mock_generate = patcher.start()
+        self.mock_generate.return_value = {"title": "T", "description": "D", "questions": []}
+        self.addCleanup(patcher.stop)
+
+        self.workspace_dir = tempfile.mkdtemp(prefix="quizly_test_workspaces_")
+        self.addCleanup(shutil.rmtree, self.workspace_dir, ignore_errors=True)
+        settings_override = override_settings(QUIZLY_WORKSPACE_DIR=self.workspace_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.parallel_transcription.atranscribe_chunked")
+    @patch("quizzes_app.services.quiz_pipeline_prod.load_audio")
+    @patch("quizzes_app.services.quiz_pipeline_prod.extract_audio", side_effect=_fake_download)
+    async def test_async_build_transcribes_in_process_pool_and_caches(
+        self, mock_extract, mock_load, mock_transcribe
+    ):
+        mock_load.return_value = np.zeros(10 * 16000, dtype=np.float32)
+        mock_transcribe.return_value = "fresh transcript"
+
+        result = await abuild_quiz_prod("https://www.youtube.com/watch?v=abcdefghijk")
+        await abuild_quiz_prod("https://www.youtube.com/watch?v=abcdefghijk")
+
+        self.assertEqual(result, self.mock_generate.return_value)
+        mock_extract.assert_called_once()
+        mock_transcribe.assert_awaited_once_with(mock_load.return_value, language=None)
+        self.assertEqual(os.listdir(self.workspace_dir), [])
+        self.mock_generate.assert_called_with("fresh transcript", video_title="Video")
+        self.assertEqual(metrics.get_counter("transcript_source_total", source="whisper"), 1)
+        self.assertEqual(metrics.get_counter("transcript_source_total", source="cache"), 1)
+
+    async def test_concurrent_async_builds_share_one_run(self):
+        self.mock_fetch_captions.return_value = ("caption transcript", "auto")
+        self.mock_generate.side_effect = lambda *args, **kwargs: (
+            time.sleep(0.1) or {"title": "T", "description": "D", "questions": []}
+        )
+
+        results = await asyncio.gather(*[
+            abuild_quiz_prod("https://www.youtube.com/watch?v=abcdefghijk") for _ in range(3)
+        ])
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(self.mock_generate.call_count, 1)
+        self.mock_preflight.assert_called_once()
+
+    @patch("quizzes_app.services.quiz_pipeline_prod.preflight_video")
+    async def test_async_build_propagates_rejection(self, mock_preflight):
+        mock_preflight.side_effect = VideoRejectedError("Video is too long.", reason="too_long")
+
+        with self.assertRaises(VideoRejectedError):
+            await abuild_quiz_prod("https://www.youtube.com/watch?v=abcdefghijk")
+
+        self.mock_generate.assert_not_called()
 
 
 class QuizPipelineProdGenerateQuizTests(SimpleTestCase):
-    @patch("quizzes_app.services.quiz_pipeline_prod.genai.Client")
-    def test_generate_quiz_parses_json_from_model_response(self, mock_client_cls):
-        class FakeResponse:
-            text = '{"title": "T", "description": "D", "questions": []}'
+    def test_generate_quiz_decodes_recorded_structured_response(self):
+        fake = ReplayGeminiClient("quiz_valid").install(self)
 
-        client_instance = MagicMock()
-        mock_client_cls.return_value = client_instance
-        client_instance.models.generate_content.return_value = FakeResponse()
+        result = generate_quiz("some transcript", video_title="HTTP for beginners")
 
-        result = generate_quiz("some transcript")
+        self.assertEqual(result, json.loads(load_recorded("quiz_valid")["text"]))
+        validate_payload(result)
+        request = fake.requests[0]
+        self.assertEqual(request["config"].response_mime_type, "application/json")
+        self.assertIs(request["config"].response_schema, QuizPayload)
+        self.assertIn("HTTP for beginners", request["contents"])
 
-        mock_client_cls.assert_called_once()
-        client_instance.models.generate_content.assert_called_once()
+    @override_settings(QUIZLY_QUIZ_REPAIR_ATTEMPTS=0)
+    def test_generate_quiz_rejects_responses_violating_the_schema(self):
+        cases = [
+            ("quiz_answer_not_in_options", "invalid answer in question 4"),
+            ("quiz_nine_questions", "question 10 is missing"),
+            ("quiz_truncated", "invalid JSON output"),
+        ]
+        for name, message in cases:
+            with self.subTest(name):
+                ReplayGeminiClient(name).install(self)
 
-        self.assertEqual(result["title"], "T")
-        self.assertEqual(result["description"], "D")
-        self.assertIn("questions", result)
+                with self.assertRaises(AIPipelineError) as ctx:
+                    generate_quiz("some transcript")
 
-    @patch("quizzes_app.services.quiz_pipeline_prod.genai.Client")
-    def test_generate_quiz_strips_markdown_code_fence(self, mock_client_cls):
-        class FakeResponse:
-            text = """```json
-{"title": "T", "description": "D", "questions": []}
-```"""
+                self.assertIn(message, str(ctx.exception))
 
-        client_instance = MagicMock()
-        mock_client_cls.return_value = client_instance
-        client_instance.models.generate_content.return_value = FakeResponse()
+    def test_generate_quiz_repairs_only_the_invalid_question(self):
+        fake = ReplayGeminiClient("quiz_answer_not_in_options", "repair_one_question").install(self)
 
         result = generate_quiz("some transcript")
 
-        self.assertEqual(result["title"], "T")
+        original = json.loads(load_recorded("quiz_answer_not_in_options")["text"])
+        self.assertEqual(len(fake.requests), 2)
+        self.assertIn("exactly 1 question(s)", fake.requests[1]["contents"])
+        self.assertEqual(result["questions"][3]["answer"], "Cache-Control")
+        self.assertEqual(result["questions"][:3], original["questions"][:3])
+        self.assertEqual(result["questions"][4:], original["questions"][4:])
 
-    @patch("quizzes_app.services.quiz_pipeline_prod.genai.Client")
-    def test_generate_quiz_raises_aipipelineerror_on_503(self, mock_client_cls):
-        client_instance = MagicMock()
-        mock_client_cls.return_value = client_instance
-        client_instance.models.generate_content.side_effect = Exception("503 backend error")
+    @patch("quizzes_app.services.llm_client.time.sleep")
+    def test_generate_quiz_raises_aipipelineerror_on_503(self, _mock_sleep):
+        overloaded = errors.ServerError(
+            503, {"error": {"code": 503, "message": "overloaded", "status": "UNAVAILABLE"}}
+        )
+        ReplayGeminiClient(*[overloaded] * 4).install(self)
 
         with self.assertRaises(AIPipelineError) as ctx:
             generate_quiz("some transcript")
 
         self.assertIn("model overloaded", str(ctx.exception))
 
-    @patch("quizzes_app.services.quiz_pipeline_prod.genai.Client")
-    def test_generate_quiz_raises_aipipelineerror_on_invalid_json(self, mock_client_cls):
-        class FakeResponse:
-            text = "NOT JSON"
+    @patch("quizzes_app.services.llm_client.time.sleep")
+    def test_generate_quiz_recovers_after_transient_503(self, _mock_sleep):
+        overloaded = errors.ServerError(
+            503, {"error": {"code": 503, "message": "overloaded", "status": "UNAVAILABLE"}}
+        )
+        fake = ReplayGeminiClient(overloaded, "quiz_valid").install(self)
 
-        client_instance = MagicMock()
-        mock_client_cls.return_value = client_instance
-        client_instance.models.generate_content.return_value = FakeResponse()
-
-        with self.assertRaises(AIPipelineError) as ctx:
-            generate_quiz("some transcript")
+        result = generate_quiz("some transcript")
 
-        self.assertIn("invalid JSON output", str(ctx.exception))
\ No newline at end of file
+        self.assertEqual(result["title"], "HTTP Basics")
+        self.assertEqual(len(fake.requests), 2)
@@ -1,11 +1,14 @@
+import asyncio
+import time
 from django.urls import reverse
-from django.test import override_settings
+from django.test import SimpleTestCase, override_settings
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth.models import User
 from unittest.mock import patch
 from quizzes_app.services.error import AIPipelineError
 from quizzes_app.models import Quiz
+from quizzes_app.services.quiz_pipeline_stub import abuild_quiz_stub, build_quiz_stub
 
 
 def _make_valid_payload():
@@ -41,13 +44,13 @@ class CreateQuizStubTests(APITestCase):
         self.assertIn("questions", res.data)
         self.assertEqual(len(res.data["questions"]), 10)
 
-    @patch("quizzes_app.api.views.build_quiz_stub", side_effect=AIPipelineError("boom"))
+    @patch("quizzes_app.services.pipeline_backends.build_quiz_stub", side_effect=AIPipelineError("boom"))
     def test_pipeline_failure_returns_502_and_no_db_write(self, _mock):
         res = self.client.post(self.url, self.valid_url, format="json")
         self.assertEqual(res.status_code, status.HTTP_502_BAD_GATEWAY)
         self.assertEqual(Quiz.objects.count(), 0)
 
-    @patch("quizzes_app.api.views.build_quiz_stub")
+    @patch("quizzes_app.services.pipeline_backends.build_quiz_stub")
     def test_invalid_payload_structure_returns_502_no_db_write(self, mock_build):
         bad = _make_valid_payload()
         bad["questions"][3]["question_options"] = [
@@ -58,8 +61,19 @@ class CreateQuizStubTests(APITestCase):
         self.assertEqual(Quiz.objects.count(), 0)
 
     @patch("quizzes_app.services.persist_quiz.Question.objects.bulk_create", side_effect=Exception("db fail"))
-    @patch("quizzes_app.api.views.build_quiz_stub", return_value=_make_valid_payload())
+    @patch("quizzes_app.services.pipeline_backends.build_quiz_stub", return_value=_make_valid_payload())
     def test_atomic_rollback_on_db_error(self, _mock_build, _mock_bulk):
         with self.assertRaises(Exception):
             self.client.post(self.url, self.valid_url, format="json")
         self.assertEqual(Quiz.objects.count(), 0)
+
+
+class StubLatencyTests(SimpleTestCase):
+    @override_settings(QUIZLY_STUB_LATENCY=0.05)
+    def test_injected_latency_is_slept_and_awaited(self):
+        start = time.perf_counter()
+        payload = build_quiz_stub("https://www.youtube.com/watch?v=abcdefghijk")
+        async_payload = asyncio.run(abuild_quiz_stub("https://www.youtube.com/watch?v=abcdefghijk"))
+
+        self.assertGreaterEqual(time.perf_counter() - start, 0.1)
+        self.assertEqual(payload, async_payload)
@@ -0,0 +1,102 @@
+import json
+
+from django.test import SimpleTestCase, override_settings
+
+from quizzes_app.services import metrics
+from quizzes_app.services.error import AIPipelineError
+from quizzes_app.services.persist_quiz import find_invalid_questions, validate_payload
+from quizzes_app.services.quiz_repair import load_draft, repair_quiz
+from quizzes_app.tests.gemini_replay import ReplayGeminiClient, load_recorded
+
+
+def _draft(name):
+    return json.loads(load_recorded(name)["text"])
+
+
+class FindInvalidQuestionsTests(SimpleTestCase):
+    def test_valid_quiz_has_no_problems(self):
+        self.assertEqual(find_invalid_questions(_draft("quiz_valid")), [])
+
+    def test_reports_every_bad_slot(self):
+        payload = _draft("quiz_valid")
+        payload["questions"][1]["question_options"] = ["A", "B", "C"]
+        payload["questions"][6]["answer"] = "nope"
+        payload["questions"] = payload["questions"][:9]
+
+        self.assertEqual(
+            find_invalid_questions(payload),
+            [
+                (1, "question 2 has 3 options"),
+                (6, "invalid answer in question 7"),
+                (9, "question 10 is missing"),
+            ],
+        )
+
+    def test_malformed_question_is_reported(self):
+        payload = _draft("quiz_valid")
+        payload["questions"][0] = "not a question"
+
+        self.assertEqual(find_invalid_questions(payload), [(0, "question 1 is malformed")])
+
+
+class LoadDraftTests(SimpleTestCase):
+    def test_loads_repairable_draft(self):
+        self.assertIsNotNone(load_draft(load_recorded("quiz_answer_not_in_options")["text"]))
+
+    def test_rejects_unrepairable_content(self):
+        for content in (load_recorded("quiz_truncated")["text"], "[]", '{"questions": []}', None):
+            with self.subTest(content=content):
+                self.assertIsNone(load_draft(content))
+
+
+class RepairQuizTests(SimpleTestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def test_missing_question_is_requested_and_appended(self):
+        fake = ReplayGeminiClient("repair_one_question").install(self)
+
+        result = repair_quiz(_draft("quiz_nine_questions"), "transcript text")
+
+        validate_payload(result)
+        self.assertEqual(result["questions"][9]["answer"], "Cache-Control")
+        self.assertIn("transcript text", fake.requests[0]["contents"])
+        self.assertIn("What does HTTP stand for?", fake.requests[0]["contents"])
+        self.assertEqual(metrics.get_counter("quiz_repair_questions_total", outcome="repaired"), 1)
+
+    def test_invalid_replacement_is_retried_in_next_round(self):
+        fake = ReplayGeminiClient("repair_one_invalid_question", "repair_one_question").install(self)
+
+        result = repair_quiz(_draft("quiz_answer_not_in_options"), "transcript", attempts=2)
+
+        self.assertEqual(len(fake.requests), 2)
+        self.assertEqual(find_invalid_questions(result), [])
+
+    def test_gives_up_after_budget(self):
+        fake = ReplayGeminiClient("repair_one_invalid_question").install(self)
+
+        with self.assertRaises(AIPipelineError) as ctx:
+            repair_quiz(_draft("quiz_answer_not_in_options"), "transcript", attempts=1)
+
+        self.assertEqual(len(fake.requests), 1)
+        self.assertIn("invalid answer in question 4", str(ctx.exception))
+        self.assertEqual(metrics.get_counter("quiz_repair_questions_total", outcome="failed"), 1)
+
+    def test_surplus_questions_are_dropped_without_a_request(self):
+        draft = _draft("quiz_valid")
+        draft["questions"].append(draft["questions"][0])
+        fake = ReplayGeminiClient().install(self)
+
+        result = repair_quiz(draft, "transcript")
+
+        self.assertEqual(len(result["questions"]), 10)
+        self.assertEqual(fake.requests, [])
+
+    @override_settings(QUIZLY_QUIZ_REPAIR_ATTEMPTS=0)
+    def test_zero_budget_disables_repair(self):
+        fake = ReplayGeminiClient().install(self)
+
+        with self.assertRaises(AIPipelineError):
+            repair_quiz(_draft("quiz_nine_questions"), "transcript")
+
+        self.assertEqual(fake.requests, [])
@@ -0,0 +1,48 @@
+import json
+
+from django.test import SimpleTestCase
+
+from quizzes_app.services.error import AIPipelineError
+from quizzes_app.services.quiz_schema import QuizPayload, decode_quiz
+from quizzes_app.tests.gemini_replay import load_recorded
+
+
+class DecodeQuizTests(SimpleTestCase):
+    def setUp(self):
+        self.payload = json.loads(load_recorded("quiz_valid")["text"])
+
+    def test_valid_payload_is_decoded(self):
+        self.assertEqual(decode_quiz(json.dumps(self.payload)), self.payload)
+
+    def test_extra_fields_are_dropped(self):
+        self.payload["difficulty"] = "easy"
+
+        self.assertNotIn("difficulty", decode_quiz(json.dumps(self.payload)))
+
+    def test_wrong_option_count_is_rejected(self):
+        self.payload["questions"][0]["question_options"].append("Extra")
+
+        with self.assertRaises(AIPipelineError):
+            decode_quiz(json.dumps(self.payload))
+
+    def test_missing_field_is_rejected(self):
+        del self.payload["description"]
+
+        with self.assertRaises(AIPipelineError):
+            decode_quiz(json.dumps(self.payload))
+
+    def test_empty_or_fenced_text_is_rejected(self):
+        for content in ("", None, "```json\n{}\n```"):
+            with self.subTest(content=content), self.assertRaises(AIPipelineError):
+                decode_quiz(content)
+
+
+class QuizPayloadSchemaTests(SimpleTestCase):
+    def test_json_schema_declares_counts(self):
+        schema = QuizPayload.model_json_schema()
+        question = schema["$defs"]["QuizQuestion"]
+
+        self.assertEqual(schema["properties"]["questions"]["minItems"], 10)
+        self.assertEqual(schema["properties"]["questions"]["maxItems"], 10)
+        self.assertEqual(question["properties"]["question_options"]["minItems"], 4)
+        self.assertEqual(question["properties"]["question_options"]["maxItems"], 4)
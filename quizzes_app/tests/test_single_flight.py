@@ -0,0 +1,86 @@
+import os
+import tempfile
+import threading
+import time
+from unittest.mock import MagicMock
+
+from django.test import SimpleTestCase
+
+from quizzes_app.services import metrics
+from quizzes_app.services.single_flight import SingleFlight
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        self.lock_dir = tempfile.mkdtemp(prefix="quizly_test_locks_")
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_concurrent_calls_share_one_run(self):
+        flight = SingleFlight(lock_dir=self.lock_dir, result_ttl=60)
+        started = threading.Event()
+
+        def slow():
+            started.set()
+            time.sleep(0.1)
+            return {"title": "T"}
+
+        fn = MagicMock(side_effect=slow)
+        results = []
+
+        def call():
+            results.append(flight.do("abcdefghijk", fn))
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        followers = [threading.Thread(target=call) for _ in range(4)]
+        for t in followers:
+            t.start()
+        for t in [leader] + followers:
+            t.join()
+
+        fn.assert_called_once()
+        self.assertEqual(results, [{"title": "T"}] * 5)
+        self.assertEqual(metrics.get_counter("single_flight_shared_total", scope="process"), 4)
+
+    def test_followers_receive_independent_copies(self):
+        flight = SingleFlight(lock_dir=self.lock_dir, result_ttl=60)
+        first = flight.do("abcdefghijk", lambda: {"questions": []})
+        first["questions"].append("mutated")
+
+        second = SingleFlight(lock_dir=self.lock_dir, result_ttl=60).do(
+            "abcdefghijk", lambda: {"questions": ["fresh"]}
+        )
+
+        self.assertEqual(second, {"questions": []})
+
+    def test_result_is_shared_across_processes_within_ttl(self):
+        SingleFlight(lock_dir=self.lock_dir, result_ttl=60).do("abcdefghijk", lambda: {"n": 1})
+        other_process = SingleFlight(lock_dir=self.lock_dir, result_ttl=60)
+        fn = MagicMock(return_value={"n": 2})
+
+        result = other_process.do("abcdefghijk", fn)
+
+        fn.assert_not_called()
+        self.assertEqual(result, {"n": 1})
+        self.assertEqual(metrics.get_counter("single_flight_shared_total", scope="host"), 1)
+
+    def test_expired_result_is_not_reused(self):
+        SingleFlight(lock_dir=self.lock_dir, result_ttl=60).do("abcdefghijk", lambda: {"n": 1})
+        result_path = os.path.join(self.lock_dir, "abcdefghijk.json")
+        os.utime(result_path, (time.time() - 120, time.time() - 120))
+
+        result = SingleFlight(lock_dir=self.lock_dir, result_ttl=60).do(
+            "abcdefghijk", lambda: {"n": 2}
+        )
+
+        self.assertEqual(result, {"n": 2})
+
+    def test_error_is_raised_and_not_cached(self):
+        flight = SingleFlight(lock_dir=self.lock_dir, result_ttl=60)
+
+        with self.assertRaises(RuntimeError):
+            flight.do("abcdefghijk", MagicMock(side_effect=RuntimeError("boom")))
+
+        self.assertEqual(flight.do("abcdefghijk", lambda: {"n": 3}), {"n": 3})
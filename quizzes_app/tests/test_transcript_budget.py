@@ -0,0 +1,113 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from quizzes_app.services import metrics, transcript_budget
+from quizzes_app.services.transcript_budget import (
+    clean_transcript,
+    count_tokens,
+    fit_to_budget,
+    prepare_transcript,
+)
+
+_real_get_encoding = transcript_budget._get_encoding
+
+
+class FakeEncoding:
+    """Whitespace tokenizer, so token counts are easy to reason about."""
+
+    def encode(self, text, disallowed_special=()):
+        return text.split()
+
+
+class TranscriptBudgetTestCase(SimpleTestCase):
+    def setUp(self):
+        patcher = patch.object(transcript_budget, "_get_encoding", return_value=FakeEncoding())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        metrics.reset()
+
+
+class CountTokensTests(TranscriptBudgetTestCase):
+    def test_counts_with_encoding(self):
+        self.assertEqual(count_tokens("one two three"), 3)
+        self.assertEqual(count_tokens(""), 0)
+
+    def test_estimates_without_encoding(self):
+        with patch.object(transcript_budget, "_get_encoding", return_value=None):
+            self.assertEqual(count_tokens("x" * 10), 3)
+
+    @patch("quizzes_app.services.transcript_budget.tiktoken.get_encoding", side_effect=OSError("offline"))
+    def test_missing_encoding_is_only_tried_once(self, mock_get_encoding):
+        with patch.object(transcript_budget, "_encoding_loaded", False), \
+                patch.object(transcript_budget, "_encoding", None):
+            self.assertIsNone(_real_get_encoding())
+            self.assertIsNone(_real_get_encoding())
+
+        mock_get_encoding.assert_called_once()
+
+
+class CleanTranscriptTests(TranscriptBudgetTestCase):
+    def test_removes_fillers_tags_and_repetitions(self):
+        text = (
+            "[Music] Uh, welcome to the the course. Um, today we, erm, talk about HTTP. "
+            "Thank you. Thank you. Thank you. ♪ HTTP is a protocol."
+        )
+
+        self.assertEqual(
+            clean_transcript(text),
+            "welcome to the course. Um, today we talk about HTTP. Thank you. HTTP is a protocol.",
+        )
+
+    def test_long_sentences_repeated_later_are_dropped(self):
+        sentence = "The server answers every request with a status code."
+        text = f"{sentence} Then something else happens. {sentence}"
+
+        self.assertEqual(clean_transcript(text), f"{sentence} Then something else happens.")
+
+    def test_short_sentences_repeated_later_are_kept(self):
+        self.assertEqual(clean_transcript("Yes. Let us go on. Yes."), "Yes. Let us go on. Yes.")
+
+
+class FitToBudgetTests(TranscriptBudgetTestCase):
+    def _lecture(self, sentences=200):
+        topics = ["routing", "caching", "headers", "cookies"]
+        return " ".join(
+            f"Part {i} explains {topics[i * len(topics) // sentences]} in detail with examples."
+            for i in range(sentences)
+        )
+
+    def test_short_transcript_is_unchanged(self):
+        self.assertEqual(fit_to_budget("Short text.", budget=100), "Short text.")
+
+    def test_long_transcript_fits_budget_and_covers_the_timeline(self):
+        text = self._lecture()
+
+        result = fit_to_budget(text, budget=200, segment_tokens=40)
+
+        self.assertLessEqual(count_tokens(result), 200)
+        for topic in ("routing", "caching", "headers", "cookies"):
+            self.assertIn(topic, result)
+        # Segments are kept in their original order.
+        parts = [int(p.split()[0]) for p in result.split("Part ")[1:]]
+        self.assertEqual(parts, sorted(parts))
+
+    def test_unpunctuated_text_is_split_into_windows(self):
+        text = " ".join(f"word{i}" for i in range(2000))
+
+        result = fit_to_budget(text, budget=300, segment_tokens=50)
+
+        self.assertLessEqual(count_tokens(result), 300)
+        self.assertIn("word0", result)
+
+
+class PrepareTranscriptTests(TranscriptBudgetTestCase):
+    def test_records_token_metrics(self):
+        text = "Uh, hello hello world. " * 3
+
+        result = prepare_transcript(text, budget=100)
+
+        self.assertEqual(result, "hello world.")
+        self.assertEqual(metrics.get_counter("transcript_tokens_total", stage="raw"), 12)
+        self.assertEqual(metrics.get_counter("transcript_tokens_total", stage="prompt"), 2)
+        self.assertEqual(metrics.get_counter("transcripts_compressed_total"), 1)
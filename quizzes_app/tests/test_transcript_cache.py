@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from quizzes_app.models import CachedTranscript
+from quizzes_app.services import metrics
+from quizzes_app.services.transcript_cache import (
+    cache_stats,
+    evict,
+    get_transcript,
+    store_transcript,
+)
+
+
+class TranscriptCacheTests(TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_miss_then_hit_is_counted(self):
+        self.assertIsNone(get_transcript("abcdefghijk", "base", None))
+
+        store_transcript("abcdefghijk", "base", None, "hello world")
+        text = get_transcript("abcdefghijk", "base", None)
+
+        self.assertEqual(text, "hello world")
+        stats = cache_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["size"], len("hello world"))
+        self.assertEqual(CachedTranscript.objects.get().hits, 1)
+
+    def test_key_includes_model_and_language(self):
+        store_transcript("abcdefghijk", "base", "de", "hallo welt")
+
+        self.assertIsNone(get_transcript("abcdefghijk", "small", "de"))
+        self.assertIsNone(get_transcript("abcdefghijk", "base", None))
+        self.assertEqual(get_transcript("abcdefghijk", "base", "de"), "hallo welt")
+
+    def test_store_replaces_existing_entry(self):
+        store_transcript("abcdefghijk", "base", None, "old")
+        store_transcript("abcdefghijk", "base", None, "new")
+
+        self.assertEqual(CachedTranscript.objects.count(), 1)
+        self.assertEqual(get_transcript("abcdefghijk", "base", None), "new")
+
+    def test_empty_transcript_is_not_stored(self):
+        store_transcript("abcdefghijk", "base", None, "  ")
+
+        self.assertFalse(CachedTranscript.objects.exists())
+
+    @override_settings(QUIZLY_TRANSCRIPT_CACHE_TTL=60)
+    def test_expired_entries_are_ignored_and_evicted(self):
+        store_transcript("abcdefghijk", "base", None, "stale")
+        CachedTranscript.objects.update(created_at=timezone.now() - timedelta(seconds=120))
+
+        self.assertIsNone(get_transcript("abcdefghijk", "base", None))
+        self.assertEqual(evict(), 1)
+        self.assertFalse(CachedTranscript.objects.exists())
+
+    @override_settings(QUIZLY_TRANSCRIPT_CACHE_MAX_MB=1)
+    def test_least_recently_used_entries_are_evicted_over_size_cap(self):
+        half_mb = "x" * (512 * 1024)
+        store_transcript("AAAAAAAAAAA", "base", None, half_mb)
+        store_transcript("BBBBBBBBBBB", "base", None, half_mb)
+        get_transcript("AAAAAAAAAAA", "base", None)
+
+        store_transcript("CCCCCCCCCCC", "base", None, half_mb)
+
+        remaining = set(CachedTranscript.objects.values_list("video_id", flat=True))
+        self.assertEqual(remaining, {"AAAAAAAAAAA", "CCCCCCCCCCC"})
@@ -0,0 +1,115 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase, override_settings
+
+from quizzes_app.services.whisper_models import WhisperModelRegistry, preload_models, registry
+
+MB = 1024 * 1024
+
+
+class FakeTensor:
+    def __init__(self, size_bytes):
+        self.size_bytes = size_bytes
+
+    def numel(self):
+        return self.size_bytes
+
+    def element_size(self):
+        return 1
+
+
+class FakeModel:
+    def __init__(self, name, size_bytes=MB):
+        self.name = name
+        self._tensors = [FakeTensor(size_bytes)]
+
+    def parameters(self):
+        return iter(self._tensors)
+
+    def buffers(self):
+        return iter([])
+
+
+class WhisperModelRegistryTests(SimpleTestCase):
+    def test_model_is_loaded_once_and_reused(self):
+        loader = MagicMock(side_effect=lambda name: FakeModel(name))
+        reg = WhisperModelRegistry(loader=loader, max_memory_mb=10, idle_timeout=60)
+
+        with reg.use("base") as first:
+            pass
+        with reg.use("base") as second:
+            pass
+
+        loader.assert_called_once_with("base")
+        self.assertIs(first, second)
+        self.assertEqual(reg.loaded(), ["base"])
+
+    def test_concurrent_first_use_loads_only_once(self):
+        def slow_loader(name):
+            time.sleep(0.05)
+            return FakeModel(name)
+
+        loader = MagicMock(side_effect=slow_loader)
+        reg = WhisperModelRegistry(loader=loader, max_memory_mb=10, idle_timeout=60)
+
+        def worker():
+            with reg.use("base"):
+                pass
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        loader.assert_called_once_with("base")
+
+    def test_least_recently_used_model_is_evicted_over_memory_cap(self):
+        loader = MagicMock(side_effect=lambda name: FakeModel(name, size_bytes=2 * MB))
+        reg = WhisperModelRegistry(loader=loader, max_memory_mb=5, idle_timeout=60)
+
+        with reg.use("tiny"):
+            pass
+        with reg.use("base"):
+            pass
+        with reg.use("small"):
+            pass
+
+        self.assertEqual(reg.loaded(), ["base", "small"])
+        self.assertEqual(reg.memory_bytes(), 4 * MB)
+
+    def test_model_in_use_is_not_evicted(self):
+        loader = MagicMock(side_effect=lambda name: FakeModel(name, size_bytes=4 * MB))
+        reg = WhisperModelRegistry(loader=loader, max_memory_mb=5, idle_timeout=60)
+
+        with reg.use("tiny"):
+            with reg.use("base"):
+                self.assertEqual(reg.loaded(), ["base", "tiny"])
+
+    def test_idle_models_are_evicted(self):
+        loader = MagicMock(side_effect=lambda name: FakeModel(name))
+        reg = WhisperModelRegistry(loader=loader, max_memory_mb=10, idle_timeout=0)
+
+        with reg.use("base"):
+            pass
+        time.sleep(0.01)
+
+        self.assertEqual(reg.evict_idle(), ["base"])
+        self.assertEqual(reg.loaded(), [])
+
+
+class PreloadModelsTests(SimpleTestCase):
+    def setUp(self):
+        registry.clear()
+        self.addCleanup(registry.clear)
+
+    @override_settings(QUIZLY_WHISPER_PRELOAD=["tiny", "base"])
+    @patch("quizzes_app.services.whisper_models.whisper.load_model", side_effect=FakeModel)
+    def test_preload_models_uses_configured_names(self, mock_load_model):
+        names = preload_models()
+
+        self.assertEqual(names, ["tiny", "base"])
+        self.assertEqual(mock_load_model.call_count, 2)
+        self.assertEqual(registry.loaded(), ["base", "tiny"])
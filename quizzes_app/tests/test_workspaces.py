@@ -0,0 +1,139 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from quizzes_app.services import metrics
+from quizzes_app.services.error import PipelineOverloadedError, VideoRejectedError
+from quizzes_app.services.workspaces import MARKER_FILE, WorkspaceManager
+
+MB = 1024 * 1024
+
+
+class WorkspaceManagerTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix="quizly_test_workspaces_")
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def _manager(self, **kwargs):
+        kwargs.setdefault("sweep_interval", 0)
+        return WorkspaceManager(root=self.root, poll_interval=0.01, **kwargs)
+
+    def _leftover(self, pid, name="temp_audio.webm.part"):
+        """Create a workspace of another process, as left behind by a crash."""
+        path = os.path.join(self.root, f"quizly-ws-{pid}-0123abcd")
+        os.mkdir(path)
+        for filename in (MARKER_FILE, name):
+            with open(os.path.join(path, filename), "w") as f:
+                f.write("0")
+        return path
+
+    def test_workspace_is_removed_with_leftovers(self):
+        manager = self._manager()
+
+        with manager.open() as directory:
+            os.makedirs(os.path.join(directory, "sub"))
+            for name in ("temp_audio.webm.part", "temp_audio.wav", os.path.join("sub", "frag")):
+                with open(os.path.join(directory, name), "wb") as f:
+                    f.write(b"x")
+
+        self.assertFalse(os.path.exists(directory))
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_reservations_count_against_the_quota(self):
+        manager = self._manager(quota_mb=1, wait=0)
+
+        with manager.open(reserve=MB // 2):
+            self.assertEqual(manager.usage(), MB // 2)
+            with manager.open(reserve=MB // 2):
+                with self.assertRaises(PipelineOverloadedError):
+                    with manager.open(reserve=1):
+                        pass
+
+        self.assertEqual(manager.usage(), 0)
+        self.assertEqual(metrics.get_counter("workspace_quota_rejections_total"), 1)
+
+    def test_actual_size_counts_when_larger_than_the_reservation(self):
+        manager = self._manager(quota_mb=1, wait=0)
+
+        with manager.open(reserve=1) as directory:
+            with open(os.path.join(directory, "audio.wav"), "wb") as f:
+                f.write(b"x" * MB)
+            with self.assertRaises(PipelineOverloadedError):
+                manager.acquire(reserve=1)
+
+    def test_waits_for_space_to_be_released(self):
+        manager = self._manager(quota_mb=1, wait=5)
+        held = manager.acquire(reserve=MB)
+        threading.Timer(0.1, manager.release, args=[held]).start()
+
+        with manager.open(reserve=MB) as directory:
+            self.assertTrue(os.path.isdir(directory))
+
+    def test_reservation_larger_than_the_quota_is_rejected(self):
+        manager = self._manager(quota_mb=1)
+
+        with self.assertRaises(VideoRejectedError) as ctx:
+            manager.acquire(reserve=2 * MB)
+
+        self.assertEqual(ctx.exception.reason, "too_large")
+
+    def test_sweep_removes_orphans_only(self):
+        manager = self._manager(max_age=3600)
+        active = manager.acquire()
+        self._leftover(os.getpid())
+        self._leftover(99999999)
+        alive = self._leftover(os.getppid())
+        expired = os.path.join(self.root, f"quizly-ws-{os.getppid()}-4567abcd")
+        shutil.copytree(alive, expired)
+        old = time.time() - 7200
+        os.utime(expired, (old, old))
+
+        self.assertEqual(manager.sweep(), 3)
+
+        self.assertEqual(sorted(os.listdir(self.root)), sorted([
+            os.path.basename(active.path), os.path.basename(alive),
+        ]))
+        self.assertEqual(metrics.get_counter("workspace_swept_total"), 3)
+        manager.release(active)
+
+    def test_unrelated_entries_are_ignored(self):
+        manager = self._manager(quota_mb=1, wait=0, max_age=1)
+        foreign = [
+            tempfile.mkdtemp(prefix="99999999-", dir=self.root),
+            os.path.join(self.root, "quizly-ws-99999999-0123abcd"),  # without marker
+            os.path.join(self.root, "pulse-cookie"),
+        ]
+        os.mkdir(foreign[1])
+        for path in foreign[:2]:
+            with open(os.path.join(path, "data"), "wb") as f:
+                f.write(b"x" * MB)
+        with open(foreign[2], "wb") as f:
+            f.write(b"x")
+        old = time.time() - 7200
+        for path in foreign:
+            os.utime(path, (old, old))
+
+        self.assertEqual(manager.sweep(), 0)
+        self.assertEqual(manager.usage(), 0)
+        with manager.open(reserve=MB):
+            pass
+        self.assertTrue(all(os.path.exists(path) for path in foreign))
+
+    def test_failed_removal_is_logged_and_left_to_the_sweeper(self):
+        manager = self._manager()
+        workspace = manager.acquire()
+
+        with patch("quizzes_app.services.workspaces.shutil.rmtree", side_effect=OSError("busy")):
+            with self.assertLogs("quizzes_app.services.workspaces", level="WARNING"):
+                manager.release(workspace)
+
+        self.assertEqual(metrics.get_counter("workspace_cleanup_failures_total"), 1)
+        self.assertEqual(manager.sweep(), 1)
+        self.assertFalse(os.path.exists(workspace.path))